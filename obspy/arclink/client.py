@@ -13,7 +13,7 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA @UnusedWildImport
 from future.utils import native_str
 
-from obspy import read, UTCDateTime
+from obspy import read, Stream, UTCDateTime
 from obspy.core.util import AttribDict, complexifyString
 from obspy.core.util.decorator import deprecated_keywords
 
@@ -22,6 +22,7 @@ import io
 from lxml import objectify, etree
 from telnetlib import Telnet
 import os
+import socket
 import time
 import warnings
 
@@ -85,8 +86,12 @@ class Client(object):
     :param command_delay: Delay between each command send to the ArcLink server
         (default is ``0``).
     :type status_delay: float, optional
-    :param status_delay: Delay in seconds between each status request (default
-        is ``0.5`` seconds).
+    :param status_delay: Maximum delay in seconds between each status request
+        (default is ``0.5`` seconds). The status is polled faster right after
+        sending a request.
+
+    Connections to the ArcLink nodes are kept open and reused by subsequent
+    requests until :meth:`close` is called.
 
     .. rubric:: Notes
 
@@ -127,10 +132,11 @@ class Client(object):
         self.init_port = port
         self.timeout = timeout
         self.dcid_keys = dcid_keys
-        self._client = Telnet(host, port, timeout)
+        # open connections by node
+        self._connections = {}
         # silent connection check
         self.debug = False
-        self._hello()
+        self._connect(host, port)
         self.debug = debug
         if self.debug:
             print('\nConnected to %s:%s' % (self._client.host,
@@ -165,6 +171,26 @@ class Client(object):
                 if key not in self.dcid_keys:
                     self.dcid_keys[key] = value.strip()
 
+    def _connect(self, host, port):
+        """
+        Makes the connection to the given ArcLink node the current one.
+
+        Connections are kept open and reused by subsequent requests to the
+        same node, a new connection is greeted with HELLO/USER/INSTITUTION.
+        """
+        client = self._connections.get((host, port))
+        if client is None:
+            client = Telnet()
+            client.host = host
+            client.port = port
+            client.timeout = self.timeout
+            self._client = client
+            self._hello()
+            self._connections[(host, port)] = client
+            if self.debug:
+                print('\nConnected to %s:%s' % (host, str(port)))
+        self._client = client
+
     def _reconnect(self):
         self._client.close()
         try:
@@ -211,15 +237,30 @@ class Client(object):
         self._readln(b'OK')
 
     def _bye(self):
-        self._writeln('BYE')
+        # the connection can not be reused afterwards
+        for key, client in list(self._connections.items()):
+            if client is self._client:
+                del self._connections[key]
+        try:
+            self._writeln('BYE')
+        except (EOFError, socket.error, AttributeError):
+            # connection already closed
+            pass
         self._client.close()
 
+    def close(self):
+        """
+        Closes all connections to ArcLink nodes.
+        """
+        for client in list(self._connections.values()):
+            self._client = client
+            self._bye()
+
     def _fetch(self, request_type, request_data, route=True):
         # skip routing on request
         if not route:
             # always use initial node if routing is disabled
-            self._client.host = self.init_host
-            self._client.port = self.init_port
+            self._connect(self.init_host, self.init_port)
             return self._request(request_type, request_data)
         # request routing table for given network/station/times combination
         # location and channel information are ignored by ArcLink
@@ -233,8 +274,7 @@ class Client(object):
             # retry first ArcLink node if host or port has been changed
             if self._client.host != self.init_host or \
                self._client.port != self.init_port:
-                self._client.host = self.init_host
-                self._client.port = self.init_port
+                self._connect(self.init_host, self.init_port)
                 if self.debug:
                     print('\nRequesting %s:%d' % (self._client.host,
                                                   self._client.port))
@@ -254,114 +294,152 @@ class Client(object):
             if item['host'] == self._client.host and \
                item['port'] == self._client.port:
                 return self._request(request_type, request_data)
-            self._client.host = item['host']
-            self._client.port = item['port']
             if self.debug:
-                print('\nRequesting %s:%d' % (self._client.host,
-                                              self._client.port))
-            self._reconnect()
-            try:
-                return self._request(request_type, request_data)
-            except ArcLinkException:
-                raise
-            except Exception:
-                raise
+                print('\nRequesting %s:%d' % (item['host'], item['port']))
+            self._connect(item['host'], item['port'])
+            return self._request(request_type, request_data)
         msg = 'Could not find route to %s.%s'
         raise ArcLinkException(msg % (request_data[2], request_data[3]))
 
     def _request(self, request_type, request_data):
-        self._hello()
-        self._writeln(request_type)
+        req_id = self._submit(request_type, request_data)
+        # loop until the request is finished
+        state = {}
+        delay = self.status_delay / 8.0
+        while True:
+            xml_doc = self._status(req_id, state)
+            if xml_doc is not None:
+                break
+            # wait a bit, polling faster at the beginning
+            time.sleep(delay)
+            delay = min(delay * 2, self.status_delay)
+        return self._download(req_id, xml_doc)
+
+    def _submit(self, request_type, request_data, retry=True):
+        """
+        Sends a request to the current node and returns its id without
+        waiting for the request to be processed, so several requests can be
+        outstanding on one connection.
+
+        The connection is closed and not reused if anything goes wrong, as
+        unread responses would confuse later requests.
+        """
         # create request string
         # adding one second to start and end time to ensure right date times
         out = (request_data[0] - 1).formatArcLink() + ' '
         out += (request_data[1] + 1).formatArcLink() + ' '
         out += ' '.join([str(i) for i in request_data[2:]])
-        self._writeln(out)
-        self._writeln('END')
-        self._readln(b'OK')
-        # get status id
-        while True:
-            status = self._readln()
+        try:
             try:
-                req_id = int(status)
-            except:
-                if 'ERROR' in status:
-                    self._bye()
-                    raise ArcLinkException('Error requesting status id')
-                pass
-            else:
-                break
-        # loop until we hit ready="true" in the status message
-        _loops = 0
-        _old_xml_doc = None
-        while True:
+                self._writeln(request_type)
+                self._writeln(out)
+                self._writeln('END')
+                self._readln(b'OK')
+            except (EOFError, socket.error):
+                if not retry:
+                    raise
+                # the node closed the idle connection in the meantime
+                self._hello()
+                return self._submit(request_type, request_data, retry=False)
+            # get status id
+            while True:
+                status = self._readln()
+                try:
+                    req_id = int(status)
+                except:
+                    if b'ERROR' in status:
+                        raise ArcLinkException('Error requesting status id')
+                    pass
+                else:
+                    break
+        except:
+            self._bye()
+            raise
+        return req_id
+
+    def _status(self, req_id, state):
+        """
+        Returns the status message of a request on the current connection
+        once it is processed or ``None`` if it is not ready yet.
+
+        ``state`` is a dictionary used for tracking repeated status messages
+        of the request between calls.
+        """
+        try:
             self._writeln('STATUS %d' % req_id)
             xml_doc = self._readln(b'END')
-            if b'ready="true"' in xml_doc:
-                break
-            # check if status messages changes over time
-            if _old_xml_doc == xml_doc:
-                _loops += 1
-            else:
-                _loops = 0
-                _old_xml_doc = xml_doc
-            # if we hit MAX_REQUESTS equal status break the loop
-            if _loops > MAX_REQUESTS:
-                msg = 'MAX_REQUESTS exceeded - breaking current request loop'
-                warnings.warn(msg, UserWarning)
-                break
-            # wait a bit
-            time.sleep(self.status_delay)
+        except:
+            # connection is in an undefined state
+            self._bye()
+            raise
+        if b'ready="true"' in xml_doc:
+            return xml_doc
+        # check if status messages changes over time
+        if state.get('xml_doc') == xml_doc:
+            state['loops'] += 1
+        else:
+            state['loops'] = 0
+            state['xml_doc'] = xml_doc
+        # if we hit MAX_REQUESTS equal status break the loop
+        if state['loops'] > MAX_REQUESTS:
+            msg = 'MAX_REQUESTS exceeded - breaking current request loop'
+            warnings.warn(msg, UserWarning)
+            return xml_doc
+        return None
+
+    def _purge(self, req_id):
+        try:
+            self._writeln('PURGE %d' % req_id)
+            self._readln()
+        except:
+            # connection is in an undefined state
+            self._bye()
+            raise
+
+    def _download(self, req_id, xml_doc):
+        """
+        Downloads the result of a processed request from the current
+        connection and removes the request from the node.
+        """
         # check for errors
         for err_code in (b'DENIED', b'CANCELLED', b'CANCEL', b'ERROR',
                          b'RETRY', b'WARN', b'UNSET'):
             err_str = b'status="' + err_code + b'"'
             if err_str in xml_doc:
                 # cleanup
-                self._writeln('PURGE %d' % req_id)
-                self._bye()
+                self._purge(req_id)
                 # parse XML for reason
                 xml_doc = objectify.fromstring(xml_doc[:-3])
                 msg = xml_doc.request.volume.line.get('message')
                 raise ArcLinkException("%s %s" % (err_code, msg))
         if b'status="NODATA"' in xml_doc:
             # cleanup
-            self._writeln('PURGE %d' % req_id)
-            self._bye()
+            self._purge(req_id)
             raise ArcLinkException('No data available')
         elif b'id="NODATA"' in xml_doc or b'id="ERROR"' in xml_doc:
             # cleanup
-            self._writeln('PURGE %d' % req_id)
-            self._bye()
+            self._purge(req_id)
             # parse XML for error message
             xml_doc = objectify.fromstring(xml_doc[:-3])
             raise ArcLinkException(xml_doc.request.volume.line.get('message'))
         elif b'<line content' not in xml_doc:
             # safeguard for not covered status messages
-            self._writeln('PURGE %d' % req_id)
-            self._bye()
+            self._purge(req_id)
             msg = "Uncovered status message - contact a developer to fix this"
             raise ArcLinkException(msg)
-        self._writeln('DOWNLOAD %d' % req_id)
         try:
-            fd = self._client.get_socket().makefile('rb')
-            length = int(fd.readline(100).strip())
-            data = b''
-            while len(data) < length:
-                buf = fd.read(min(4096, length - len(data)))
-                data += buf
-            buf = fd.readline(100).strip()
-            if buf != b"END" or len(data) != length:
-                raise Exception('Wrong length!')
+            self._writeln('DOWNLOAD %d' % req_id)
+            data = self._readDownload()
             if self.debug:
                 if data.startswith(b'<?xml'):
                     print(data)
                 else:
                     print("%d bytes of data read" % len(data))
-        finally:
-            self._writeln('PURGE %d' % req_id)
+        except:
+            # connection is in an undefined state
             self._bye()
+            raise
+        self._purge(req_id)
         # check for encryption
         if b'encrypted="true"' in xml_doc:
             # extract dcid
@@ -379,6 +457,40 @@ class Client(object):
                 warnings.warn(msg % (dcid))
         return data
 
+    def _readDownload(self):
+        """
+        Reads the response to a DOWNLOAD command directly from the socket,
+        as the telnet processing of telnetlib would corrupt binary data.
+        """
+        client = self._client
+        # data already received by telnetlib
+        buf = bytearray(client.cookedq + client.rawq[client.irawq:])
+        client.cookedq = b''
+        client.rawq = b''
+        client.irawq = 0
+        sock = client.get_socket()
+
+        def _fill():
+            data = sock.recv(65536)
+            if not data:
+                raise EOFError('connection closed')
+            buf.extend(data)
+
+        while buf.find(b'\r\n') < 0:
+            _fill()
+        end = buf.find(b'\r\n')
+        length = int(bytes(buf[:end]).strip())
+        del buf[:end + 2]
+        while len(buf) < length or buf.find(b'\r\n', length) < 0:
+            _fill()
+        data = bytes(buf[:length])
+        end = buf.find(b'\r\n', length)
+        if bytes(buf[length:end]).strip() != b"END":
+            raise Exception('Wrong length!')
+        # keep anything following for the next command
+        client.cookedq = bytes(buf[end + 2:])
+        return data
+
     def getWaveform(self, network, station, location, channel, starttime,
                     endtime, format="MSEED", compressed=True, metadata=False,
                     route=True, **kwargs):
@@ -485,6 +597,122 @@ class Client(object):
                     tr.stats['paz'] = entry.paz
         return stream
 
+    def getWaveforms(self, bulk, format="MSEED", compressed=True,
+                     route=True):
+        """
+        Retrieves waveform data of many streams via ArcLink and returns an
+        ObsPy Stream object.
+
+        All requests are sent to their (routed) ArcLink nodes up front, so
+        the nodes process them in parallel. The results are downloaded as
+        they become ready. Requests without data are skipped with a warning.
+
+        :type bulk: list
+        :param bulk: List of (network, station, location, channel, starttime,
+            endtime) tuples, see :meth:`getWaveform`.
+        :type format: str, optional
+        :param format: Requested format. Either as full SEED (``'FSEED'``) or
+            Mini-SEED (``'MSEED'``) volume. Defaults to ``'MSEED'``.
+        :type compressed: bool, optional
+        :param compressed: Request compressed files from ArcLink server.
+            Defaults to ``True``.
+        :type route: bool, optional
+        :param route: Enables ArcLink routing. Defaults to ``True``.
+        :return: ObsPy :class:`~obspy.core.stream.Stream` object.
+
+        .. rubric:: Example
+
+        >>> from obspy.arclink import Client
+        >>> from obspy import UTCDateTime
+        >>> client = Client("webdc.eu", 18001, user='test@obspy.org')
+        >>> t = UTCDateTime("2009-08-20 04:03:12")
+        >>> bulk = [("BW", "RJOB", "", "EH*", t - 3, t + 15),
+        ...         ("GE", "APE", "", "BHZ", t - 3, t + 15)]
+        >>> st = client.getWaveforms(bulk)  # doctest: +SKIP
+        """
+        format = format.upper()
+        if format not in ["MSEED", "FSEED"]:
+            msg = ("'%s' is not a valid format. Choose either 'MSEED' or "
+                   "'FSEED'")
+            raise ArcLinkException(msg)
+        rtype = 'REQUEST WAVEFORM format=%s' % format
+        if compressed:
+            try:
+                import bz2
+            except:
+                compressed = False
+            else:
+                rtype += " compression=bzip2"
+        # submit all requests
+        routes = {}
+        pending = []
+        done = []
+        try:
+            for network, station, location, channel, starttime, endtime \
+                    in bulk:
+                rdata = [starttime, endtime, network, station, channel,
+                         location]
+                node = (self.init_host, self.init_port)
+                if route:
+                    key = (network, station, str(starttime), str(endtime))
+                    if key not in routes:
+                        routes[key] = self._findRoute(
+                            self.getRouting(network=network, station=station,
+                                            starttime=starttime,
+                                            endtime=endtime),
+                            rdata)
+                    table = routes[key]
+                    if table and table[0] != {}:
+                        node = (table[0]['host'], table[0]['port'])
+                self._connect(*node)
+                req_id = self._submit(rtype, rdata)
+                pending.append((node, req_id, rdata, {}))
+            # download the results as they become ready
+            stream = Stream()
+            delay = self.status_delay / 8.0
+            while pending:
+                done = []
+                for item in pending:
+                    node, req_id, rdata, state = item
+                    self._connect(*node)
+                    xml_doc = self._status(req_id, state)
+                    if xml_doc is None:
+                        continue
+                    try:
+                        data = self._download(req_id, xml_doc)
+                    except ArcLinkException as e:
+                        done.append(item)
+                        msg = "Request %s.%s.%s.%s failed: %s"
+                        warnings.warn(msg % (rdata[2], rdata[3], rdata[5],
+                                             rdata[4], e))
+                        continue
+                    done.append(item)
+                    if data.startswith(b'Salted__'):
+                        warnings.warn("Cannot unpack encrypted waveforms.")
+                        continue
+                    if compressed:
+                        data = bz2.decompress(data)
+                    st = read(io.BytesIO(data), 'MSEED')
+                    st.trim(rdata[0], rdata[1])
+                    stream += st
+                if not done:
+                    # wait a bit, polling faster at the beginning
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.status_delay)
+                pending = [item for item in pending if item not in done]
+        except:
+            # don't leave the remaining requests queued on the nodes
+            for node, req_id, _, _ in pending:
+                if (node, req_id) in [item[:2] for item in done]:
+                    continue
+                try:
+                    self._connect(*node)
+                    self._purge(req_id)
+                except Exception:
+                    pass
+            raise
+        return stream
+
     def saveWaveform(self, filename, network, station, location, channel,
                      starttime, endtime, format="MSEED", compressed=True,
                      route=True, unpack=True):
@@ -5,20 +5,146 @@ The obspy.arclink.client test suite.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA @UnusedWildImport
+from future import standard_library
+with standard_library.hooks():
+    import socketserver
 
-from obspy import read
+from obspy import read, Trace
 from obspy.arclink import Client
 from obspy.arclink.client import ArcLinkException
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile, AttribDict
 
+import bz2
 import io
 import numpy as np
 import operator
+import threading
+import time
 import unittest
 import warnings
 
 
+_ROUTING = """<?xml version="1.0" encoding="utf-8"?>
+<ns0:routing xmlns:ns0="http://geofon.gfz-potsdam.de/ns/Routing/1.0/">
+<ns0:route networkCode="XX" stationCode="" locationCode=""
+ streamCode=""><ns0:arclink address="127.0.0.1:%i" priority="2"
+ start="2000-01-01T00:00:00"/></ns0:route>
+<ns0:route networkCode="XX" stationCode="BBB" locationCode=""
+ streamCode=""><ns0:arclink address="127.0.0.1:%i" priority="1"
+ start="2000-01-01T00:00:00"/></ns0:route>
+</ns0:routing>"""
+
+_STATUS = """<?xml version="1.0" encoding="utf-8"?>
+<arclink><request id="%i" ready="%s"><volume id="%s" status="%s">
+<line content="XX" status="%s" message="%s"/></volume></request></arclink>
+END\r\n"""
+
+
+class _ArcLinkHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal ArcLink node answering each request on the second STATUS.
+
+    The ``fail_request``-th REQUEST is refused, the first ``stall_status``
+    STATUS commands are not answered before the connection is closed.
+    """
+    def _send(self, data):
+        if not isinstance(data, bytes):
+            data = data.encode()
+        self.wfile.write(data)
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        requests = server.requests
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            line = line.strip().decode()
+            server.commands.append(line.split()[0])
+            if line == 'HELLO':
+                self._send('ArcLink v1.0 (2014.01)\r\nFake node\r\n')
+            elif line.startswith('USER') or line.startswith('INSTITUTION'):
+                self._send('OK\r\n')
+            elif line.startswith('REQUEST'):
+                lines = [line]
+                while True:
+                    line = self.rfile.readline().strip().decode()
+                    if line == 'END':
+                        break
+                    lines.append(line)
+                server.count += 1
+                if server.count == server.fail_request:
+                    self._send('OK\r\nERROR\r\n')
+                    continue
+                requests[server.count] = [lines, 0]
+                self._send('OK\r\n%i\r\n' % server.count)
+            elif line.startswith('STATUS'):
+                if server.stall_status > 0:
+                    server.stall_status -= 1
+                    time.sleep(1.0)
+                    return
+                req_id = int(line.split()[1])
+                request = requests[req_id]
+                request[1] += 1
+                if request[1] < 2:
+                    self._send(_STATUS % (req_id, 'false', 'NODATA',
+                                          'PROCESSING', 'PROCESSING', ''))
+                elif self._data(request[0]) is None:
+                    self._send(_STATUS % (req_id, 'true', 'NODATA',
+                                          'NODATA', 'NODATA', 'no data'))
+                else:
+                    self._send(_STATUS % (req_id, 'true', 'LOCAL', 'OK',
+                                          'OK', ''))
+            elif line.startswith('DOWNLOAD'):
+                data = self._data(requests[int(line.split()[1])][0])
+                self._send(('%i\r\n' % len(data)).encode() + data +
+                           b'END\r\n')
+            elif line.startswith('PURGE'):
+                requests.pop(int(line.split()[1]), None)
+                self._send('OK\r\n')
+                if server.close_idle:
+                    return
+            elif line == 'BYE':
+                return
+
+    def _data(self, lines):
+        if 'ROUTING' in lines[0]:
+            return (_ROUTING % (self.server.server_address[1],
+                                self.server.route_port)).encode()
+        station = lines[1].split()[3]
+        if station not in self.server.traces:
+            return None
+        buf = io.BytesIO()
+        self.server.traces[station].write(buf, format='MSEED')
+        data = buf.getvalue()
+        if 'compression=bzip2' in lines[0]:
+            data = bz2.compress(data)
+        return data
+
+
+class _ArcLinkServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, traces, route_port=0):
+        socketserver.TCPServer.__init__(self, ("127.0.0.1", 0),
+                                        _ArcLinkHandler)
+        self.traces = traces
+        self.route_port = route_port
+        self.close_idle = False
+        self.fail_request = 0
+        self.stall_status = 0
+        self.requests = {}
+        self.connections = 0
+        self.count = 0
+        self.commands = []
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+
 class ClientTestCase(unittest.TestCase):
     """
     Test cases for obspy.arclink.client.Client.
@@ -716,8 +842,141 @@ class ClientTestCase(unittest.TestCase):
             self.assertRaises(DeprecationWarning, Client)
 
 
+class ConnectionTestCase(unittest.TestCase):
+    """
+    Test cases for the connection handling of obspy.arclink.client.Client
+    using local ArcLink nodes.
+    """
+    def setUp(self):
+        self.traces = {}
+        for i, station in enumerate(('AAA', 'BBB', 'CCC')):
+            tr = Trace(data=np.arange(200, dtype=np.int32) * (i + 1))
+            tr.stats.network = 'XX'
+            tr.stats.station = station
+            tr.stats.channel = 'BHZ'
+            tr.stats.sampling_rate = 10.0
+            tr.stats.starttime = UTCDateTime(2014, 1, 1)
+            self.traces[station] = tr
+        self.t1 = UTCDateTime(2014, 1, 1, 0, 0, 2)
+        self.t2 = UTCDateTime(2014, 1, 1, 0, 0, 10)
+        # BBB is routed to the second node
+        self.node2 = _ArcLinkServer({'BBB': self.traces['BBB']})
+        self.node1 = _ArcLinkServer(
+            {'AAA': self.traces['AAA'], 'CCC': self.traces['CCC']},
+            route_port=self.node2.server_address[1])
+        self.client = Client('127.0.0.1', self.node1.server_address[1],
+                             user='test@obspy.org', status_delay=0.05)
+
+    def tearDown(self):
+        self.client.close()
+        for node in (self.node1, self.node2):
+            node.shutdown()
+            node.server_close()
+
+    def test_connectionReuse(self):
+        """
+        Requests reuse the connections to the nodes, idle connections
+        closed by a node are reopened.
+        """
+        client = self.client
+        for _i in range(2):
+            for station in ('AAA', 'BBB'):
+                st = client.getWaveform('XX', station, '', 'BHZ', self.t1,
+                                        self.t2)
+                self.assertEqual(len(st), 1)
+                expected = self.traces[station].slice(self.t1, self.t2)
+                np.testing.assert_array_equal(st[0].data, expected.data)
+        self.assertEqual(self.node1.connections, 1)
+        self.assertEqual(self.node2.connections, 1)
+        self.assertEqual(self.node1.commands.count('HELLO'), 1)
+        self.assertEqual(self.node2.commands.count('HELLO'), 1)
+        # node closes connection after each request
+        self.node1.close_idle = True
+        for _i in range(2):
+            st = client.getWaveform('XX', 'AAA', '', 'BHZ', self.t1, self.t2,
+                                    route=False)
+            self.assertEqual(len(st), 1)
+        self.assertEqual(self.node1.connections, 2)
+
+    def test_getWaveforms(self):
+        """
+        All requests are submitted before downloading the results.
+        """
+        bulk = [('XX', station, '', 'BHZ', self.t1, self.t2)
+                for station in ('AAA', 'BBB', 'CCC', 'DDD')]
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            st = self.client.getWaveforms(bulk)
+        w = [x for x in w if x.category is UserWarning]
+        self.assertEqual(len(w), 1)
+        self.assertTrue('XX.DDD..BHZ' in str(w[0].message))
+        self.assertEqual(sorted(tr.stats.station for tr in st),
+                         ['AAA', 'BBB', 'CCC'])
+        for tr in st:
+            expected = self.traces[tr.stats.station].slice(self.t1, self.t2)
+            self.assertEqual(tr.stats.starttime, self.t1)
+            np.testing.assert_array_equal(tr.data, expected.data)
+        # waveform requests are pipelined
+        commands = self.node1.commands
+        downloads = [i for i, c in enumerate(commands) if c == 'DOWNLOAD']
+        requests = [i for i, c in enumerate(commands) if c == 'REQUEST']
+        # 4 routing and 3 waveform requests, one without data
+        self.assertEqual(len(downloads), 6)
+        self.assertEqual(len(requests), 7)
+        self.assertTrue(requests[-1] < downloads[4])
+        self.assertEqual(self.node2.commands,
+                         ['HELLO', 'USER', 'INSTITUTION', 'REQUEST',
+                          'STATUS', 'STATUS', 'DOWNLOAD', 'PURGE'])
+
+    def test_failedRequest(self):
+        """
+        Requests already submitted are purged if a later request fails.
+        """
+        bulk = [('XX', station, '', 'BHZ', self.t1, self.t2)
+                for station in ('AAA', 'CCC')]
+        self.node1.fail_request = 2
+        self.assertRaises(ArcLinkException, self.client.getWaveforms, bulk,
+                          route=False)
+        self.assertEqual(self.node1.commands.count('PURGE'), 1)
+        self.assertEqual(self.node1.requests, {})
+        # the connection with the refused request is not reused
+        self.assertEqual(self.node1.connections, 2)
+        st = self.client.getWaveforms(bulk, route=False)
+        self.assertEqual(len(st), 2)
+        self.assertEqual(self.node1.requests, {})
+        self.assertEqual(self.node1.connections, 2)
+
+    def test_brokenConnection(self):
+        """
+        Connections in an undefined state are not reused.
+        """
+        client = Client('127.0.0.1', self.node1.server_address[1],
+                        user='test@obspy.org', timeout=0.3, status_delay=0.05)
+        connections = self.node1.connections
+        self.node1.stall_status = 1
+        self.assertRaises(ArcLinkException, client.getWaveform, 'XX', 'AAA',
+                          '', 'BHZ', self.t1, self.t2, route=False)
+        self.assertEqual(client._connections, {})
+        st = client.getWaveform('XX', 'AAA', '', 'BHZ', self.t1, self.t2,
+                                route=False)
+        self.assertEqual(len(st), 1)
+        self.assertEqual(self.node1.connections, connections + 1)
+        # pending requests are purged using a new connection
+        self.node1.requests.clear()
+        self.node1.stall_status = 1
+        bulk = [('XX', 'AAA', '', 'BHZ', self.t1, self.t2)]
+        self.assertRaises(ArcLinkException, client.getWaveforms, bulk,
+                          route=False)
+        self.assertEqual(self.node1.connections, connections + 2)
+        self.assertEqual(self.node1.requests, {})
+        client.close()
+
+
 def suite():
-    return unittest.makeSuite(ClientTestCase, 'test')
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ClientTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(ConnectionTestCase, 'test'))
+    return suite
 
 
 if __name__ == '__main__':
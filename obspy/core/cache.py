@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Local on-disk cache for waveform clients.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    import urllib.parse
+
+from obspy.core.stream import Stream, read
+from obspy.core.utcdatetime import UTCDateTime
+import hashlib
+import os
+import shutil
+import tempfile
+import warnings
+
+
+class WaveformCache(object):
+    """
+    Caching wrapper around the waveform requests of any ObsPy client.
+
+    Retrieved waveforms are stored on disk as MiniSEED files, indexed by the
+    requested ``network.station.location.channel`` code (which may contain
+    wildcards) and time span. Requests completely covered by previous
+    requests are answered from disk, otherwise only the missing parts are
+    requested from the client and merged with the stored data. Parts of a
+    request without data are remembered as well, whether the client returns
+    an empty stream or raises one of ``no_data_exceptions`` for them.
+
+    All other attributes are taken from the wrapped client, so the cache can
+    be used in place of the client.
+
+    :param client: The client, e.g. an :class:`obspy.fdsn.client.Client`,
+        :class:`obspy.arclink.client.Client`,
+        :class:`obspy.earthworm.client.Client` or
+        :class:`obspy.neic.client.Client` instance or any other object with
+        a ``get_waveforms()`` or ``getWaveform()`` method taking network,
+        station, location, channel, start and end time as first arguments
+        (e.g. ``client.waveform`` of an :class:`obspy.seishub.client.Client`).
+    :type directory: str
+    :param directory: Directory for the cache files. Created if necessary.
+        It can be shared by several caches and processes as long as they
+        wrap clients of the same data source.
+    :type no_data_exceptions: tuple of exception classes, optional
+    :param no_data_exceptions: Exceptions the client raises for requests
+        without data. Only exceptions whose message contains ``"no data"``
+        are regarded, as e.g. the FDSN client uses the same exception for
+        all errors. Pass e.g. :class:`~obspy.fdsn.header.FDSNException`
+        for an FDSN client or
+        :class:`~obspy.arclink.client.ArcLinkException` for an ArcLink
+        client. Defaults to no exceptions, i.e. only empty streams are
+        remembered.
+
+    .. note::
+        Data which is added to the data source after it has been requested
+        (e.g. for requests close to real time) is not requested again. Only
+        the waveform data and the basic header fields are stored, additional
+        header information (e.g. attached responses) is not retained.
+        Requests without any data at all are always passed on to the
+        client, so it raises its usual exception.
+
+    .. rubric:: Example
+
+    >>> from obspy import UTCDateTime
+    >>> from obspy.fdsn import Client
+    >>> from obspy.core.cache import WaveformCache
+    >>> from obspy.fdsn.header import FDSNException
+    >>> client = WaveformCache(Client("IRIS"), "/tmp/waveforms",
+    ...                        (FDSNException, ))  # doctest: +SKIP
+    >>> t = UTCDateTime("2010-02-27T06:45:00")
+    >>> st = client.get_waveforms("IU", "ANMO", "00", "BHZ", t,
+    ...                           t + 600)  # doctest: +SKIP
+    >>> # only the last five minutes are downloaded
+    >>> st = client.get_waveforms("IU", "ANMO", "00", "BHZ", t + 300,
+    ...                           t + 900)  # doctest: +SKIP
+    """
+    def __init__(self, client, directory, no_data_exceptions=()):
+        self.client = client
+        self.directory = directory
+        self.no_data_exceptions = tuple(no_data_exceptions)
+        if hasattr(client, "get_waveforms"):
+            self._get_waveforms = client.get_waveforms
+        elif hasattr(client, "getWaveform"):
+            self._get_waveforms = client.getWaveform
+        else:
+            msg = "Client %s has no method for requesting waveforms." % client
+            raise TypeError(msg)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(directory):
+                    raise
+
+    def __getattr__(self, name):
+        # only called for attributes not found on the cache
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def get_waveforms(self, network, station, location, channel, starttime,
+                      endtime, **kwargs):
+        """
+        Returns the waveforms of the requested time span, requesting only
+        the parts not cached yet from the client.
+
+        The parameters are the same as for the ``get_waveforms()`` or
+        ``getWaveform()`` method of the client. Additional keyword arguments
+        are passed to the client and are part of the cache index. The
+        returned stream is trimmed to the requested time span. Writing the
+        data to a file with the ``filename`` argument of some clients is
+        not supported.
+
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        if "filename" in kwargs:
+            msg = "The filename argument is not supported by the cache."
+            raise ValueError(msg)
+        starttime = UTCDateTime(starttime)
+        endtime = UTCDateTime(endtime)
+        path = self._path(network, station, location, channel, kwargs)
+        intervals = self._intervals(path)
+        st = Stream()
+        error = None
+        no_data = None
+        missing = self._missing(intervals, starttime, endtime)
+        for t1, t2 in missing:
+            try:
+                part = self._get_waveforms(network, station, location,
+                                           channel, t1, t2, **kwargs)
+            except Exception as e:
+                if self._is_no_data(e):
+                    if no_data is None:
+                        no_data = e
+                    part = Stream()
+                else:
+                    # other parts might have data
+                    if error is None:
+                        error = e
+                    continue
+            self._store(path, t1, t2, part)
+            st += part
+        for t1, t2, filename in intervals:
+            if t1 > endtime or t2 < starttime:
+                continue
+            if not os.path.getsize(filename):
+                # no data
+                continue
+            st += read(filename, format="MSEED", starttime=starttime,
+                       endtime=endtime)
+        if not st:
+            if error is not None:
+                raise error
+            if no_data is not None:
+                raise no_data
+            if not missing:
+                # let the client decide how to answer requests without data
+                st = self._get_waveforms(network, station, location, channel,
+                                         starttime, endtime, **kwargs)
+        elif error is not None:
+            msg = "Parts of the requested data could not be retrieved: %s"
+            warnings.warn(msg % error)
+        # remove samples contained in more than one part
+        st.merge(method=-1)
+        st.trim(starttime, endtime)
+        st.sort()
+        return st
+
+    getWaveform = get_waveforms
+
+    def clear(self):
+        """
+        Removes all cached waveforms.
+        """
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _is_no_data(self, exception):
+        """
+        Checks if an exception of the client signals a request without data.
+        """
+        return isinstance(exception, self.no_data_exceptions) and \
+            "no data" in str(exception).lower()
+
+    def _path(self, network, station, location, channel, kwargs):
+        """
+        Returns the directory for the cache files of a request.
+        """
+        name = ".".join((network, station, location, channel))
+        if kwargs:
+            options = repr(sorted((key, str(value))
+                                  for key, value in kwargs.items()))
+            name += "." + hashlib.sha1(options.encode("utf-8")).hexdigest()
+        # wildcards are not allowed in file names on all systems
+        return os.path.join(self.directory, urllib.parse.quote(name))
+
+    @staticmethod
+    def _intervals(path):
+        """
+        Returns the cached time spans and files of a request directory.
+        """
+        intervals = []
+        if not os.path.isdir(path):
+            return intervals
+        for name in os.listdir(path):
+            if not name.endswith(".mseed"):
+                continue
+            try:
+                t1, t2 = name[:-6].split("_")
+                t1 = UTCDateTime(float(t1))
+                t2 = UTCDateTime(float(t2))
+            except ValueError:
+                continue
+            intervals.append((t1, t2, os.path.join(path, name)))
+        intervals.sort()
+        return intervals
+
+    @staticmethod
+    def _missing(intervals, starttime, endtime):
+        """
+        Returns the parts of the requested time span not covered by the
+        cached time spans.
+        """
+        missing = []
+        current = starttime
+        for t1, t2, _ in intervals:
+            if t2 <= current:
+                continue
+            if t1 >= endtime:
+                break
+            if t1 > current:
+                missing.append((current, t1))
+            current = t2
+            if current >= endtime:
+                break
+        if current < endtime:
+            missing.append((current, endtime))
+        return missing
+
+    @staticmethod
+    def _store(path, starttime, endtime, st):
+        """
+        Stores the data of a requested time span, an empty file marks a
+        time span without data.
+        """
+        if not os.path.isdir(path):
+            try:
+                os.makedirs(path)
+            except OSError:
+                if not os.path.isdir(path):
+                    raise
+        filename = os.path.join(path, "%.6f_%.6f.mseed" % (
+            starttime.timestamp, endtime.timestamp))
+        fd, tempname = tempfile.mkstemp(dir=path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                st = st.split()
+                if st:
+                    st.write(fh, format="MSEED")
+            if os.path.exists(filename):
+                # os.rename does not replace existing files on Windows
+                os.remove(filename)
+            os.rename(tempname, filename)
+        except:
+            if os.path.exists(tempname):
+                os.remove(tempname)
+            raise
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
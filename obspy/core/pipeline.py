@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+Processing pipelines for Trace and Stream objects.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+from future import standard_library
+with standard_library.hooks():
+    from collections import OrderedDict
+
+from obspy.core import compatibility
+from obspy.core.trace import Trace, _deconvolve, _processing_info, \
+    _remove_response_info, _taper_window
+from obspy.core.util.base import _getFunctionFromEntryPoint
+import numpy as np
+import threading
+
+
+def _undecorated(name):
+    """
+    Returns the undecorated Trace method of the given name.
+    """
+    func = getattr(Trace, name)
+    while hasattr(func, '__wrapped__'):
+        func = func.__wrapped__
+    return func
+
+
+class Pipeline(object):
+    """
+    A chain of processing steps applied to traces.
+
+    The steps are :class:`~obspy.core.trace.Trace` processing methods with
+    their arguments. They are validated once when creating the pipeline, so
+    that mistakes show up before any data is processed, and can then be
+    applied to any number of traces and streams, e.g. with
+    :meth:`Stream.process() <obspy.core.stream.Stream.process>` which can
+    process the traces in parallel threads.
+
+    :type steps: list
+    :param steps: Processing steps in the order they are applied. Every step
+        is either the name of a method listed in :attr:`STEPS`, a tuple of
+        the name and a dictionary of keyword arguments or a tuple of the
+        name, a tuple of positional arguments and a dictionary of keyword
+        arguments.
+    :type fuse_filters: bool, optional
+    :param fuse_filters: If ``True``, Butterworth filters (``'bandpass'``,
+        ``'bandstop'``, ``'lowpass'`` and ``'highpass'``) directly following
+        a ``'remove_response'`` step are applied in the frequency domain
+        together with the deconvolution, saving their time domain passes
+        over the data. The combined frequency response of the filters is
+        evaluated once for all traces with the same sampling rate and
+        length, so this pays off for streams of many such traces. The
+        filters are applied with their frequency response to the spectrum of
+        the zero padded data, so the result differs from time domain
+        filtering close to the start and the end of the trace. Defaults to
+        ``False``.
+
+    Demeaning (``detrend`` of type ``'demean'`` or ``'constant'``) and
+    ``taper`` steps directly preceding a ``'remove_response'`` step are
+    always carried out on the copy of the data made for the deconvolution
+    instead of creating new arrays in every step, with the same result as
+    the trace methods.
+
+    The processing information of every step is recorded in
+    ``stats.processing`` of the traces as when calling the methods one
+    after another.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> from obspy.core.pipeline import Pipeline
+    >>> pipeline = Pipeline([
+    ...     ("detrend", {"type": "linear"}),
+    ...     ("taper", {"max_percentage": 0.05}),
+    ...     ("remove_response", {"output": "DISP"}),
+    ...     ("filter", {"type": "bandpass", "freqmin": 1.0, "freqmax": 20.0}),
+    ...     ("decimate", (2, ), {})])
+    >>> print(pipeline)  # doctest: +NORMALIZE_WHITESPACE
+    Pipeline with 5 steps:
+        detrend(type='linear')
+        taper(max_percentage=0.05)
+        remove_response(output='DISP')
+        filter(freqmax=20.0, freqmin=1.0, type='bandpass')
+        decimate(2)
+    >>> st = read()
+    >>> st.process(pipeline)  # doctest: +ELLIPSIS
+    <...Stream object at 0x...>
+    >>> print(st[0].stats.sampling_rate)
+    50.0
+    >>> Pipeline([("filter", {"type": "bandpass",
+    ...                       "freqmin": 1.0})])  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    TypeError: Invalid arguments for processing step 'filter': ...
+    """
+    #: Trace methods that can be used as processing steps.
+    STEPS = ('detrend', 'taper', 'filter', 'simulate', 'remove_response',
+             'resample', 'decimate', 'interpolate', 'differentiate',
+             'integrate', 'normalize')
+    # filters that can be fused with the response removal
+    _FUSABLE_FILTERS = ('bandpass', 'bandstop', 'lowpass', 'highpass')
+    # detrend types that can be fused with the response removal
+    _FUSABLE_DETRENDS = ('demean', 'constant')
+
+    def __init__(self, steps, fuse_filters=False):
+        self.steps = [self._validate(step) for step in steps]
+        self.fuse_filters = fuse_filters
+        self._plan = self._makePlan()
+
+    def __str__(self):
+        lines = ["Pipeline with %d steps:" % len(self.steps)]
+        for name, args, kwargs in self.steps:
+            arguments = [repr(arg) for arg in args]
+            arguments += ["%s=%r" % (key, kwargs[key])
+                          for key in sorted(kwargs)]
+            lines.append("    %s(%s)" % (name, ", ".join(arguments)))
+        return "\n".join(lines)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def process_trace(self, trace):
+        """
+        Applies all processing steps to a trace, in place.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :rtype: :class:`~obspy.core.trace.Trace`
+        :return: The processed trace.
+        """
+        for step in self._plan:
+            step(trace)
+        return trace
+
+    @classmethod
+    def _validate(cls, step):
+        """
+        Returns a step as tuple of name, positional and keyword arguments
+        after checking the arguments against the signature of the method.
+        """
+        if isinstance(step, (str, native_str)):
+            name, args, kwargs = step, (), {}
+        elif len(step) == 2:
+            (name, kwargs), args = step, ()
+        elif len(step) == 3:
+            name, args, kwargs = step
+        else:
+            msg = "Invalid processing step %s." % (step, )
+            raise ValueError(msg)
+        if name not in cls.STEPS:
+            msg = "Unknown processing step '%s'." % name
+            raise ValueError(msg)
+        args = tuple(args)
+        kwargs = dict(kwargs)
+        try:
+            callargs = compatibility.getcallargs(_undecorated(name), None,
+                                                 *args, **kwargs)
+            if name == 'filter':
+                # the options are passed on to the filter function
+                func = _getFunctionFromEntryPoint('filter',
+                                                  callargs['type'].lower())
+                compatibility.getcallargs(func, None, df=1.0,
+                                          **callargs['options'])
+        except TypeError as e:
+            msg = "Invalid arguments for processing step '%s': %s" % (name, e)
+            raise TypeError(msg)
+        return name, args, kwargs
+
+    def _makePlan(self):
+        """
+        Returns the functions carrying out the steps on a trace, with
+        demeaning and tapering fused with the following response removal
+        and filters fused with the preceding response removal if requested.
+        """
+        plan = []
+        i = 0
+        while i < len(self.steps):
+            # preprocessing steps directly before a response removal
+            j = i
+            while j < len(self.steps) and \
+                    self._fusablePreprocessing(self.steps[j]):
+                j += 1
+            if j == len(self.steps) or self.steps[j][0] != 'remove_response':
+                j = i
+            preprocessing = self.steps[i:j]
+            step = self.steps[j]
+            i = j + 1
+            filters = []
+            if self.fuse_filters and step[0] == 'remove_response':
+                while i < len(self.steps) and self._fusable(self.steps[i]):
+                    filters.append(self.steps[i])
+                    i += 1
+            if preprocessing or filters:
+                plan.append(_FusedResponseRemoval(step, filters,
+                                                  preprocessing))
+            else:
+                plan.append(_MethodCall(*step))
+        return plan
+
+    @classmethod
+    def _fusablePreprocessing(cls, step):
+        """
+        Checks if a step can be carried out on the copy of the data made by
+        a following response removal.
+        """
+        name, args, kwargs = step
+        if name not in ('detrend', 'taper'):
+            return False
+        callargs = compatibility.getcallargs(_undecorated(name), None, *args,
+                                             **kwargs)
+        if name == 'taper':
+            # other calls are reinterpreted by the deprecation decorator
+            return 'max_percentage' in kwargs and 'p' not in kwargs
+        # scipy.signal.detrend without further options
+        return callargs['type'].lower() in cls._FUSABLE_DETRENDS and \
+            not callargs['options'] and \
+            _getFunctionFromEntryPoint(
+                'detrend', callargs['type'].lower()).__module__.startswith(
+                    'scipy')
+
+    @classmethod
+    def _fusable(cls, step):
+        """
+        Checks if a step is a filter that can be fused with the response
+        removal.
+        """
+        name, args, kwargs = step
+        if name != 'filter':
+            return False
+        callargs = compatibility.getcallargs(_undecorated(name), None, *args,
+                                             **kwargs)
+        return callargs['type'].lower() in cls._FUSABLE_FILTERS
+
+
+class _MethodCall(object):
+    """
+    Calls a processing method of a trace.
+    """
+    def __init__(self, name, args, kwargs):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, trace):
+        getattr(trace, self.name)(*self.args, **self.kwargs)
+
+
+class _FusedResponseRemoval(object):
+    """
+    Removes the response together with the preceding demeaning and
+    tapering steps and the following Butterworth filters, the filters are
+    applied in the same frequency domain pass.
+    """
+    # number of kept frequency responses of the filters
+    CACHE_SIZE = 8
+
+    def __init__(self, step, filters, preprocessing=()):
+        self.step = step
+        self.filters = filters
+        self.preprocessing = preprocessing
+        # combined responses of the filters by sampling rate and number of
+        # frequencies
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _filterResponse(self, filters, freqs, df):
+        """
+        Returns the product of the frequency responses of the filters given
+        as tuples of type and options, from the cache if possible.
+        """
+        from obspy.signal.filter import _butterworthResponse
+        key = (df, len(freqs))
+        with self._lock:
+            response = self._responses.get(key)
+        if response is not None:
+            return response
+        response = np.ones(len(freqs), dtype=np.complex128)
+        for type, options in filters:
+            response *= _butterworthResponse(type, freqs, df, **options)
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > self.CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+    def _sequential(self, trace):
+        for name, args, kwargs in \
+                list(self.preprocessing) + [self.step] + self.filters:
+            getattr(trace, name)(*args, **kwargs)
+
+    def _preprocessing(self, trace):
+        """
+        Returns the processing information and the functions modifying the
+        float64 copy of the data in place for the preprocessing steps.
+        """
+        infos = []
+        funcs = []
+        for name, args, kwargs in self.preprocessing:
+            infos.append(_processing_info(_undecorated(name), trace, *args,
+                                          **kwargs))
+            if name == 'detrend':
+                if not funcs:
+                    # same as scipy.signal.detrend on the original data
+                    mean = trace.data.mean()
+                    funcs.append(lambda data, mean=mean:
+                                 np.subtract(data, mean, out=data))
+                else:
+                    funcs.append(lambda data: np.subtract(
+                        data, data.mean(), out=data))
+                continue
+            callargs = compatibility.getcallargs(_undecorated(name), trace,
+                                                 *args, **kwargs)
+            callargs.pop('self')
+            callargs.update(callargs.pop('kwargs'))
+            window = _taper_window(trace.stats.npts,
+                                   trace.stats.sampling_rate, **callargs)
+            funcs.append(lambda data, window=window:
+                         np.multiply(data, window, out=data))
+        return infos, funcs
+
+    def __call__(self, trace):
+        from obspy.signal.filter import _butterworthResponse
+        from obspy.station import Response, PolynomialResponseStage
+        response = trace.stats.get('response')
+        if not isinstance(response, Response) or \
+                not response.response_stages or \
+                isinstance(response.response_stages[0],
+                           PolynomialResponseStage) or \
+                not trace.stats.npts or \
+                isinstance(trace.data, np.ma.MaskedArray) or \
+                (self.preprocessing and trace.data.dtype != np.float64 and
+                 not np.issubdtype(trace.data.dtype, np.integer)):
+            # missing responses raise and polynomial responses are applied
+            # in the time domain by the trace methods, the trace methods
+            # also handle empty and masked data and keep the precision of
+            # other data types
+            self._sequential(trace)
+            return
+        _, args, kwargs = self.step
+        callargs = compatibility.getcallargs(_undecorated('remove_response'),
+                                             trace, *args, **kwargs)
+        callargs.pop('self')
+        extra = callargs.pop('kwargs')
+        df = trace.stats.sampling_rate
+        infos, preprocessing = self._preprocessing(trace)
+        infos.append(_processing_info(_undecorated('remove_response'), trace,
+                                      *args, **kwargs))
+        filters = []
+        for _, filter_args, filter_kwargs in self.filters:
+            infos.append(_processing_info(_undecorated('filter'), trace,
+                                          *filter_args, **filter_kwargs))
+            options = compatibility.getcallargs(
+                _undecorated('filter'), trace, *filter_args, **filter_kwargs)
+            options.update(options.pop('options'))
+            options.pop('self')
+            type = options.pop('type').lower()
+            # calculate the response once here, e.g. to raise for bad
+            # corner frequencies before the deconvolution
+            _butterworthResponse(type, [0.0], df, **options)
+            filters.append((type, options))
+        funcs = []
+        if filters:
+            # the frequencies only depend on the sampling rate and the
+            # length of the FFT
+            funcs.append(lambda freqs: self._filterResponse(filters, freqs,
+                                                            df))
+        arguments = [callargs[key] for key in (
+            'output', 'water_level', 'pre_filt', 'zero_mean', 'taper',
+            'taper_fraction')]
+        trace.data = _deconvolve(trace.data, trace.stats.delta, response,
+                                 *arguments, filters=funcs,
+                                 preprocessing=preprocessing, **extra)
+        n = len(self.preprocessing)
+        for info in infos[:n]:
+            trace._addProcessingInfo(info)
+        trace._addProcessingInfo(_remove_response_info(*(arguments +
+                                                         [extra])))
+        for info in infos[n:]:
+            trace._addProcessingInfo(info)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -25,6 +25,7 @@ from obspy.core.util.decorator import map_example_filename
 from obspy.core.util.base import ENTRY_POINTS, _readFromPlugin, \
     _getFunctionFromEntryPoint
 from obspy.core.util.decorator import uncompressFile, raiseIfMasked
+from multiprocessing.pool import ThreadPool
 from pkg_resources import load_entry_point
 import pickle
 import copy
@@ -1585,6 +1586,90 @@ class Stream(object):
             new.append(sliced_trace)
         return new
 
+    def slide(self, window_length, step, offset=0,
+              include_partial_windows=False):
+        """
+        Generator yielding equal length sliding windows of the Stream.
+
+        The windows span the time range from the earliest start time to the
+        latest end time of all traces. Each window is a Stream with the
+        parts of all traces inside the window, windows without data are
+        skipped. The window boundaries are computed in samples of each
+        trace, the traces do not copy the data but are views into the data
+        of the original traces (see
+        :meth:`~obspy.core.trace.Trace.slide`).
+
+        :type window_length: float
+        :param window_length: The length of each window in seconds. A window
+            contains all samples from its start time up to and including its
+            end time (start time plus window length).
+        :type step: float
+        :param step: The step between the start times of two successive
+            windows in seconds. Can be larger, smaller or equal to
+            ``window_length``.
+        :type offset: float
+        :param offset: The offset of the first window in seconds relative to
+            the earliest start time of all traces.
+        :type include_partial_windows: bool
+        :param include_partial_windows: Determines if windows that are
+            shorter than ``window_length`` at the end of the stream are
+            yielded as well.
+
+        .. rubric:: Example
+
+        >>> from obspy import read
+        >>> st = read()
+        >>> for window in st.slide(window_length=10.0, step=10.0):
+        ...     print(window)
+        ...     print("---")  # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
+        3 Trace(s) in Stream:
+        ... | 2009-08-24T00:20:03.000000Z - 2009-08-24T00:20:13.000000Z | ...
+        ... | 2009-08-24T00:20:03.000000Z - 2009-08-24T00:20:13.000000Z | ...
+        ... | 2009-08-24T00:20:03.000000Z - 2009-08-24T00:20:13.000000Z | ...
+        ---
+        3 Trace(s) in Stream:
+        ... | 2009-08-24T00:20:13.000000Z - 2009-08-24T00:20:23.000000Z | ...
+        ... | 2009-08-24T00:20:13.000000Z - 2009-08-24T00:20:23.000000Z | ...
+        ... | 2009-08-24T00:20:13.000000Z - 2009-08-24T00:20:23.000000Z | ...
+        ---
+        """
+        if window_length <= 0 or step <= 0:
+            msg = "Window length and step must be positive."
+            raise ValueError(msg)
+        if not self.traces:
+            return
+        starttime = min(tr.stats.starttime for tr in self)
+        duration = max(tr.stats.endtime for tr in self) - starttime
+        # offset (in seconds), sampling rate and number of samples per trace
+        traces = [(tr, tr.stats.starttime - starttime,
+                   tr.stats.sampling_rate, tr.stats.npts) for tr in self]
+        # skip windows starting before the stream
+        i = max(0, int(math.ceil(-offset / step)))
+        while True:
+            t1 = offset + i * step
+            t2 = t1 + window_length
+            i += 1
+            if t1 < 0:
+                continue
+            if round(t1 - duration, 6) > 0 or (
+                    round(t2 - duration, 6) > 0 and
+                    not include_partial_windows):
+                break
+            new = copy.copy(self)
+            new.traces = []
+            for tr, tr_offset, sampling_rate, npts in traces:
+                first = int(compatibility.round_away(
+                    (t1 - tr_offset) * sampling_rate))
+                last = int(compatibility.round_away(
+                    (t2 - tr_offset) * sampling_rate))
+                first = max(first, 0)
+                last = min(last, npts - 1)
+                if first > last:
+                    continue
+                new.traces.append(tr._window(first, last))
+            if new.traces:
+                yield new
+
     def select(self, network=None, station=None, location=None, channel=None,
                sampling_rate=None, npts=None, component=None, id=None):
         """
@@ -1814,8 +1899,37 @@ class Stream(object):
         self.traces.sort(key=lambda x: listsort(order, id(x)))
         return self
 
+    def _process_traces(self, func, workers=None):
+        """
+        Calls ``func`` with every trace of the stream.
+
+        With ``workers`` larger than one, the traces are distributed over a
+        pool of threads. NumPy, SciPy and the ObsPy C libraries release the
+        GIL for most of the actual processing. Every trace is processed by a
+        single call, so the processing information of the traces is the
+        same as in serial processing. The first exception raised by ``func``
+        is re-raised after all traces have been processed.
+
+        :type func: callable
+        :param func: Function processing a single trace in place.
+        :type workers: int, optional
+        :param workers: Number of threads. Defaults to processing the traces
+            one after another.
+        """
+        if workers is None or workers <= 1 or len(self) <= 1:
+            for tr in self:
+                func(tr)
+            return
+        pool = ThreadPool(min(int(workers), len(self)))
+        try:
+            pool.map(func, self.traces, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
     def simulate(self, paz_remove=None, paz_simulate=None,
-                 remove_sensitivity=True, simulate_sensitivity=True, **kwargs):
+                 remove_sensitivity=True, simulate_sensitivity=True,
+                 workers=None, **kwargs):
         """
         Correct for instrument response / Simulate new instrument response.
 
@@ -1842,6 +1956,9 @@ class Stream(object):
             ``paz_simulate['sensitivity']`` to simulate overall sensitivity of
             new instrument (seismometer/digitizer) during instrument
             simulation.
+        :type workers: int, optional
+        :param workers: Number of threads the traces are processed in.
+            Defaults to processing the traces one after another.
 
         This function corrects for the original instrument response given by
         ``paz_remove`` and/or simulates a new instrument response given by
@@ -1910,13 +2027,15 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             st.simulate(paz_remove=paz_sts2, paz_simulate=paz_1hz)
             st.plot()
         """
-        for tr in self:
+        def _simulate(tr):
             tr.simulate(paz_remove=paz_remove, paz_simulate=paz_simulate,
                         remove_sensitivity=remove_sensitivity,
                         simulate_sensitivity=simulate_sensitivity, **kwargs)
+
+        self._process_traces(_simulate, workers)
         return self
 
-    def filter(self, type, **options):
+    def filter(self, type, workers=None, **options):
         """
         Filters the data of all traces in the Stream.
 
@@ -1927,6 +2046,9 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :param options: Necessary keyword arguments for the respective filter
             that will be passed on. (e.g. ``freqmin=1.0``, ``freqmax=20.0`` for
             ``"bandpass"``)
+        :type workers: int, optional
+        :param workers: Number of threads the traces are processed in.
+            Defaults to processing the traces one after another.
 
         .. note::
 
@@ -1976,17 +2098,61 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             st.filter("highpass", freq=1.0)
             st.plot()
         """
-        for tr in self:
-            tr.filter(type, **options)
+        self._process_traces(lambda tr: tr.filter(type, **options), workers)
         return self
 
-    def trigger(self, type, **options):
+    def process(self, pipeline, workers=None):
+        """
+        Applies a processing pipeline to all traces in the stream.
+
+        :type pipeline: :class:`~obspy.core.pipeline.Pipeline` or list
+        :param pipeline: The pipeline or a list of processing steps to create
+            a pipeline from, see :class:`~obspy.core.pipeline.Pipeline`.
+        :type workers: int, optional
+        :param workers: Number of threads the traces are processed in.
+            Defaults to processing the traces one after another.
+
+        .. note::
+
+            This operation is performed in place on the actual data arrays. The
+            raw data is not accessible anymore afterwards. To keep your
+            original data, use :meth:`~obspy.core.stream.Stream.copy` to create
+            a copy of your stream object.
+            This also makes an entry with information on every applied
+            processing step in ``stats.processing`` of every trace.
+
+        .. rubric:: Example
+
+        >>> from obspy import read
+        >>> st = read()
+        >>> st.process([("detrend", {"type": "demean"}),
+        ...             ("filter", {"type": "lowpass", "freq": 10.0}),
+        ...             ("decimate", {"factor": 4})])  # doctest: +ELLIPSIS
+        <...Stream object at 0x...>
+        >>> print(st)  # doctest: +ELLIPSIS
+        3 Trace(s) in Stream:
+        BW.RJOB..EHZ | 2009-08-24T00:20:03.000000Z ... | 25.0 Hz, 750 samples
+        BW.RJOB..EHN | 2009-08-24T00:20:03.000000Z ... | 25.0 Hz, 750 samples
+        BW.RJOB..EHE | 2009-08-24T00:20:03.000000Z ... | 25.0 Hz, 750 samples
+        """
+        from obspy.core.pipeline import Pipeline
+        if not isinstance(pipeline, Pipeline):
+            pipeline = Pipeline(pipeline)
+        self._process_traces(pipeline.process_trace, workers)
+        return self
+
+    def trigger(self, type, threads=1, **options):
         """
         Runs a triggering algorithm on all traces in the stream.
 
         :param type: String that specifies which trigger is applied (e.g.
             ``'recstalta'``). See the `Supported Trigger`_ section below for
             further details.
+        :type threads: int, optional
+        :param threads: Number of threads the traces are distributed over if
+            ``'recstalta'`` or ``'classicstalta'`` characteristic functions
+            of traces with equal length and sampling rate are computed
+            together. Other triggers process the traces one after another.
         :param options: Necessary keyword arguments for the respective
             trigger that will be passed on. (e.g. ``sta=3``, ``lta=10``)
             Arguments ``sta`` and ``lta`` (seconds) will be mapped to ``nsta``
@@ -2046,14 +2212,55 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             st.trigger('recstalta', sta=1, lta=4)
             st.plot()
         """
+        if self._triggerBatched(type, threads=threads, **options):
+            return self
         for tr in self:
             tr.trigger(type, **options)
         return self
 
+    def _triggerBatched(self, type, threads=1, **options):
+        """
+        Computes ``'recstalta'`` and ``'classicstalta'`` characteristic
+        functions of all traces with a single call into the C library if all
+        traces have the same length and sampling rate.
+
+        Returns ``False`` if the traces can not be processed in one go.
+        """
+        from obspy.core.trace import _processing_info
+        from obspy.signal.trigger import recSTALTA2D, classicSTALTA2D
+        funcs = {'recstalta': recSTALTA2D, 'classicstalta': classicSTALTA2D}
+        func = funcs.get(type.lower())
+        if func is None or len(self) < 2:
+            return False
+        if not set(options).issubset(['sta', 'lta', 'nsta', 'nlta']):
+            return False
+        if len(set((tr.stats.npts, tr.stats.sampling_rate)
+                   for tr in self)) != 1:
+            return False
+        if any(isinstance(tr.data, np.ma.masked_array) or not tr
+               for tr in self):
+            return False
+        infos = [_processing_info(Trace.trigger.__wrapped__, tr, type,
+                                  **options) for tr in self]
+        # convert sta and lta (seconds) to nsta and nlta (samples) like
+        # Trace.trigger() does
+        spr = self[0].stats.sampling_rate
+        options = dict(options)
+        for key in ['sta', 'lta']:
+            if key in options:
+                options['n%s' % (key)] = int(options.pop(key) * spr)
+        data = np.array([tr.data for tr in self], dtype=np.float64)
+        charfct = func(data, threads=threads, **options)
+        for tr, cft, info in zip(self, charfct, infos):
+            tr.data = cft
+            tr._addProcessingInfo(info)
+        return True
+
     def resample(self, sampling_rate, window='hanning', no_filter=True,
-                 strict_length=False):
+                 strict_length=False, method='fft', workers=None):
         """
-        Resample data in all traces of stream using Fourier method.
+        Resample data in all traces of stream using Fourier method or a
+        polyphase filter.
 
         :type sampling_rate: float
         :param sampling_rate: The sampling rate of the resampled signal.
@@ -2067,6 +2274,12 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :type strict_length: bool, optional
         :param strict_length: Leave traces unchanged for which end time of
             trace would change. Defaults to ``False``.
+        :type method: str, optional
+        :param method: ``'fft'`` (default) or ``'polyphase'``, see
+            :meth:`obspy.core.trace.Trace.resample`.
+        :type workers: int, optional
+        :param workers: Number of threads the traces are processed in.
+            Defaults to processing the traces one after another.
 
         .. note::
 
@@ -2105,12 +2318,16 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         BW.RJOB..EHN | 2009-08-24T00:20:03.000000Z ... | 10.0 Hz, 300 samples
         BW.RJOB..EHE | 2009-08-24T00:20:03.000000Z ... | 10.0 Hz, 300 samples
         """
-        for tr in self:
+        def _resample(tr):
             tr.resample(sampling_rate, window=native_str(window),
-                        no_filter=no_filter, strict_length=strict_length)
+                        no_filter=no_filter, strict_length=strict_length,
+                        method=method)
+
+        self._process_traces(_resample, workers)
         return self
 
-    def decimate(self, factor, no_filter=False, strict_length=False):
+    def decimate(self, factor, no_filter=False, strict_length=False,
+                 method='cheby2', workers=None):
         """
         Downsample data in all traces of stream by an integer factor.
 
@@ -2123,6 +2340,13 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :type strict_length: bool, optional
         :param strict_length: Leave traces unchanged for which end time of
             trace would change. Defaults to ``False``.
+        :type method: str, optional
+        :param method: ``'cheby2'`` (default) or ``'multistage'``, see
+            :meth:`obspy.core.trace.Trace.decimate`. All traces are decimated
+            with the same stages and filters.
+        :type workers: int, optional
+        :param workers: Number of threads the traces are processed in.
+            Defaults to processing the traces one after another.
 
         Currently a simple integer decimation is implemented.
         Only every decimation_factor-th sample remains in the trace, all other
@@ -2173,9 +2397,11 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         >>> tr.data
         array([0, 4, 8])
         """
-        for tr in self:
+        def _decimate(tr):
             tr.decimate(factor, no_filter=no_filter,
-                        strict_length=strict_length)
+                        strict_length=strict_length, method=method)
+
+        self._process_traces(_decimate, workers)
         return self
 
     def max(self):
@@ -2254,13 +2480,16 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         return self
 
     @raiseIfMasked
-    def detrend(self, type='simple'):
+    def detrend(self, type='simple', workers=None):
         """
         Method to remove a linear trend from all traces.
 
         :type type: str, optional
         :param type: Method to use for detrending. Defaults to ``'simple'``.
             See the `Supported Methods`_ section below for further details.
+        :type workers: int, optional
+        :param workers: Number of threads the traces are processed in.
+            Defaults to processing the traces one after another.
 
         .. note::
 
@@ -2284,8 +2513,7 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         ``'constant'`` or ``'demean'``
             Mean of data is subtracted (uses :func:`scipy.signal.detrend`).
         """
-        for tr in self:
-            tr.detrend(type=type)
+        self._process_traces(lambda tr: tr.detrend(type=type), workers)
         return self
 
     def taper(self, *args, **kwargs):
@@ -2293,7 +2521,8 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         Method to taper all Traces in Stream.
 
         For details see the corresponding :meth:`~obspy.core.trace.Trace.taper`
-        method of :class:`~obspy.core.trace.Trace`.
+        method of :class:`~obspy.core.trace.Trace`. The traces can be processed
+        in parallel threads with the ``workers`` keyword argument.
 
         .. note::
 
@@ -2302,8 +2531,8 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             original data, use :meth:`~obspy.core.stream.Stream.copy` to create
             a copy of your stream object.
         """
-        for tr in self:
-            tr.taper(*args, **kwargs)
+        workers = kwargs.pop('workers', None)
+        self._process_traces(lambda tr: tr.taper(*args, **kwargs), workers)
         return self
 
     def interpolate(self, *args, **kwargs):
@@ -2312,7 +2541,8 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
 
         For details see the corresponding
         :meth:`~obspy.core.trace.Trace.interpolate` method of
-        :class:`~obspy.core.trace.Trace`.
+        :class:`~obspy.core.trace.Trace`. The traces can be processed in
+        parallel threads with the ``workers`` keyword argument.
 
         .. note::
 
@@ -2345,8 +2575,9 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         BW.RJOB..EHN | 2009-08-24T00:20:03... - ... | 111.1 Hz, 3332 samples
         BW.RJOB..EHE | 2009-08-24T00:20:03... - ... | 111.1 Hz, 3332 samples
         """
-        for tr in self:
-            tr.interpolate(*args, **kwargs)
+        workers = kwargs.pop('workers', None)
+        self._process_traces(lambda tr: tr.interpolate(*args, **kwargs),
+                             workers)
         return self
 
     def std(self):
@@ -2566,6 +2797,9 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         """
         Returns a deepcopy of the Stream object.
 
+        The traces are copied with :meth:`obspy.core.trace.Trace.copy`, so
+        attached responses are shared with the copy.
+
         :rtype: :class:`~obspy.core.stream.Stream`
         :return: Copy of current stream.
 
@@ -2597,7 +2831,14 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             >>> st == st3
             True
         """
-        return copy.deepcopy(self)
+        new = copy.copy(self)
+        for key, value in self.__dict__.items():
+            if key == 'traces':
+                value = [tr.copy() for tr in value]
+            else:
+                value = copy.deepcopy(value)
+            new.__dict__[key] = value
+        return new
 
     def clear(self):
         """
@@ -2803,7 +3044,11 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
 
         For details see the corresponding
         :meth:`~obspy.core.trace.Trace.remove_response` method of
-        :class:`~obspy.core.trace.Trace`.
+        :class:`~obspy.core.trace.Trace`. Traces with equal responses,
+        number of samples and sampling interval are deconvolved together,
+        evaluating the response only once and transforming their data with
+        a single FFT call. The traces can be processed in parallel threads
+        with the ``workers`` keyword argument.
 
         >>> from obspy import read
         >>> st = read()
@@ -2836,10 +3081,78 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             original data, use :meth:`~obspy.core.stream.Stream.copy` to create
             a copy of your stream object.
         """
-        for tr in self:
-            tr.remove_response(*args, **kwargs)
+        workers = kwargs.pop('workers', None)
+        traces = self._removeResponseBatched(*args, **kwargs)
+        Stream(traces=traces)._process_traces(
+            lambda tr: tr.remove_response(*args, **kwargs), workers)
         return self
 
+    def _removeResponseBatched(self, *args, **kwargs):
+        """
+        Deconvolves the responses of groups of traces with equal responses,
+        number of samples and sampling interval in one go.
+
+        Returns the list of traces that have to be processed one by one,
+        e.g. traces without response or with a polynomial response.
+        """
+        from obspy.core.trace import _deconvolve, _processing_info, \
+            _remove_response_info
+        from obspy.station import Response, PolynomialResponseStage
+        # bucket the traces by identical response objects first, traces
+        # read from the same inventory usually share them
+        groups = []
+        buckets = {}
+        for tr in self:
+            response = tr.stats.get('response')
+            if not isinstance(response, Response) or \
+                    not response.response_stages or \
+                    (len(response.response_stages) == 1 and
+                     isinstance(response.response_stages[0],
+                                PolynomialResponseStage)) or \
+                    isinstance(tr.data, np.ma.masked_array) or not tr:
+                continue
+            key = (tr.stats.npts, tr.stats.delta, id(response))
+            if key not in buckets:
+                buckets[key] = []
+                groups.append(buckets[key])
+            buckets[key].append(tr)
+        # merge buckets with equal but distinct response objects, only
+        # comparing responses with matching cheap properties
+        merged = []
+        candidates = {}
+        for group in groups:
+            stats = group[0].stats
+            key = (stats.npts, stats.delta,
+                   len(stats.response.response_stages))
+            for other in candidates.setdefault(key, []):
+                if other[0].stats.response == stats.response:
+                    other.extend(group)
+                    break
+            else:
+                candidates[key].append(group)
+                merged.append(group)
+        groups = [group for group in merged if len(group) > 1]
+        func = Trace.remove_response.__wrapped__
+        for group in groups:
+            first = group[0]
+            infos = [_processing_info(func, tr, *args, **kwargs)
+                     for tr in group]
+            callargs = compatibility.getcallargs(func, first, *args, **kwargs)
+            arguments = [callargs[key] for key in (
+                'output', 'water_level', 'pre_filt', 'zero_mean', 'taper',
+                'taper_fraction')]
+            data = np.array([tr.data for tr in group], dtype=np.float64)
+            data = _deconvolve(data, first.stats.delta,
+                               first.stats.response, *arguments,
+                               **callargs['kwargs'])
+            info = _remove_response_info(*(arguments + [callargs['kwargs']]))
+            for tr, tr_data, tr_info in zip(group, data, infos):
+                tr.data = tr_data
+                tr._addProcessingInfo(info)
+                tr._addProcessingInfo(tr_info)
+        batched = set(id(tr) for group in groups for tr in group)
+        return [tr for tr in self if id(tr) not in batched]
+
 
 def isPickle(filename):  # @UnusedVariable
     """
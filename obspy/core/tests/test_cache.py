@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.core.cache import WaveformCache
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+
+class _NoDataException(Exception):
+    pass
+
+
+class _Client(object):
+    """
+    Client returning the sample index since T0 as data, except for the
+    hour starting at T0 + 7200 without data. Requests fail if ``fail`` is
+    set. Requests without data raise an exception if ``no_data`` is set.
+    """
+    T0 = UTCDateTime(2014, 1, 1)
+    name = "fake"
+    fail = False
+    no_data = False
+
+    def __init__(self):
+        self.requests = []
+
+    def getWaveform(self, network, station, location, channel, starttime,
+                    endtime, **kwargs):
+        self.requests.append((channel, starttime - self.T0,
+                              endtime - self.T0))
+        if self.fail:
+            raise Exception("request failed")
+        st = Stream()
+        for cha in ("BHZ", "BHN"):
+            if channel != "BH*" and channel != cha:
+                continue
+            first = int(np.ceil((starttime - self.T0) * 10))
+            last = int(np.floor((endtime - self.T0) * 10))
+            data = np.arange(first, last + 1, dtype=np.int32)
+            data = data[(data < 72000) | (data >= 108000)]
+            for part in (data[data < 72000], data[data >= 108000]):
+                if not len(part):
+                    continue
+                tr = Trace(data=part)
+                tr.stats.network = network
+                tr.stats.station = station
+                tr.stats.location = location
+                tr.stats.channel = cha
+                tr.stats.sampling_rate = 10.0
+                tr.stats.starttime = self.T0 + part[0] / 10.0
+                st.append(tr)
+        if self.no_data and not st:
+            raise _NoDataException("No data available for request.")
+        return st
+
+
+class WaveformCacheTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.core.cache.WaveformCache.
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='obspy-')
+        self.client = _Client()
+        self.cache = WaveformCache(self.client, self.tempdir)
+        self.t0 = _Client.T0
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _check(self, st, channels, starttime, endtime):
+        self.assertEqual([tr.stats.channel for tr in st], channels)
+        for tr in st:
+            self.assertEqual(tr.stats.starttime, starttime)
+            self.assertEqual(tr.stats.endtime, endtime)
+            first = int(round((starttime - self.t0) * 10))
+            np.testing.assert_array_equal(
+                tr.data, np.arange(first, first + tr.stats.npts))
+
+    def test_partialRequests(self):
+        """
+        Only missing parts are requested from the client.
+        """
+        t0 = self.t0
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 100,
+                                    t0 + 200)
+        self._check(st, ["BHZ"], t0 + 100, t0 + 200)
+        st = self.cache.get_waveforms("XX", "AAA", "", "BHZ", t0 + 120,
+                                      t0 + 180)
+        self._check(st, ["BHZ"], t0 + 120, t0 + 180)
+        self.assertEqual(self.client.requests, [("BHZ", 100, 200)])
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 50,
+                                    t0 + 300)
+        self._check(st, ["BHZ"], t0 + 50, t0 + 300)
+        self.assertEqual(self.client.requests[1:],
+                         [("BHZ", 50, 100), ("BHZ", 200, 300)])
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 100,
+                                    t0 + 250)
+        self._check(st, ["BHZ"], t0 + 100, t0 + 250)
+        self.assertEqual(len(self.client.requests), 3)
+        # wildcards are cached independently
+        st = self.cache.getWaveform("XX", "AAA", "", "BH*", t0 + 100,
+                                    t0 + 200)
+        self._check(st, ["BHN", "BHZ"], t0 + 100, t0 + 200)
+        st = self.cache.getWaveform("XX", "AAA", "", "BH*", t0 + 100,
+                                    t0 + 200)
+        self.assertEqual(len(self.client.requests), 4)
+        # other caches using the same directory
+        cache = WaveformCache(self.client, self.tempdir)
+        cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 50, t0 + 300)
+        self.assertEqual(len(self.client.requests), 4)
+        self.assertEqual(cache.name, "fake")
+        cache.clear()
+        cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 50, t0 + 300)
+        self.assertEqual(len(self.client.requests), 5)
+
+    def test_noData(self):
+        """
+        Time spans without data are not requested again, failed requests
+        are.
+        """
+        t0 = self.t0
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 7300,
+                                    t0 + 7400)
+        self.assertEqual(len(st), 0)
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 7100,
+                                    t0 + 10900)
+        self.assertEqual(len(st), 2)
+        self.assertEqual(st[0].stats.endtime, t0 + 7199.9)
+        self.assertEqual(st[1].stats.starttime, t0 + 10800)
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 7100,
+                                    t0 + 10900)
+        self.assertEqual(len(self.client.requests), 3)
+        # failed requests
+        self.client.fail = True
+        self.assertRaises(Exception, self.cache.getWaveform, "XX", "AAA", "",
+                          "BHZ", t0, t0 + 100)
+        self.assertEqual(os.listdir(self.tempdir), ["XX.AAA..BHZ"])
+        self.client.fail = False
+        self.cache.getWaveform("XX", "AAA", "", "BHZ", t0, t0 + 100)
+        self.client.fail = True
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0, t0 + 200)
+        w = [x for x in w if x.category is UserWarning]
+        self.assertEqual(len(w), 1)
+        self._check(st, ["BHZ"], t0, t0 + 100)
+        self.assertEqual(len(self.client.requests), 6)
+        # keyword arguments are part of the index
+        self.client.fail = False
+        self.cache.getWaveform("XX", "AAA", "", "BHZ", t0, t0 + 100,
+                               quality="B")
+        self.cache.getWaveform("XX", "AAA", "", "BHZ", t0, t0 + 100,
+                               quality="B")
+        self.assertEqual(len(self.client.requests), 7)
+
+    def test_noDataExceptions(self):
+        """
+        Exceptions of the client for requests without data are remembered
+        like empty results, requests without any data still raise.
+        """
+        t0 = self.t0
+        self.client.no_data = True
+        self.cache = WaveformCache(self.client, self.tempdir,
+                                   no_data_exceptions=(_NoDataException, ))
+        self.assertRaises(_NoDataException, self.cache.getWaveform, "XX",
+                          "AAA", "", "BHZ", t0 + 7300, t0 + 7400)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 7100,
+                                        t0 + 7500)
+        self.assertEqual([x for x in w if x.category is UserWarning], [])
+        self._check(st, ["BHZ"], t0 + 7100, t0 + 7199.9)
+        self.assertEqual(self.client.requests[1:],
+                         [("BHZ", 7100, 7300), ("BHZ", 7400, 7500)])
+        # requests without data are passed on to the client
+        self.assertRaises(_NoDataException, self.cache.getWaveform, "XX",
+                          "AAA", "", "BHZ", t0 + 7350, t0 + 7450)
+        self.assertEqual(len(self.client.requests), 4)
+        st = self.cache.getWaveform("XX", "AAA", "", "BHZ", t0 + 7100,
+                                    t0 + 7500)
+        self.assertEqual(len(self.client.requests), 4)
+        # exceptions not configured are regarded as failed requests
+        cache = WaveformCache(self.client, self.tempdir,
+                              no_data_exceptions=[])
+        self.assertRaises(_NoDataException, cache.getWaveform, "XX",
+                          "AAA", "", "BHZ", t0 + 7600, t0 + 7700)
+        self.assertRaises(_NoDataException, cache.getWaveform, "XX",
+                          "AAA", "", "BHZ", t0 + 7600, t0 + 7700)
+        self.assertEqual(len(self.client.requests), 6)
+        # by default no exceptions are regarded
+        cache = WaveformCache(self.client, self.tempdir)
+        self.assertEqual(cache.no_data_exceptions, ())
+
+    def test_filename(self):
+        """
+        Writing the data to a file is not supported.
+        """
+        self.assertRaises(ValueError, self.cache.getWaveform, "XX", "AAA", "",
+                          "BHZ", self.t0, self.t0 + 100, filename="out.mseed")
+        self.assertEqual(self.client.requests, [])
+
+
+def suite():
+    return unittest.makeSuite(WaveformCacheTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
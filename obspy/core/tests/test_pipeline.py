@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.core.pipeline test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from obspy import read
+from obspy.core.compatibility import mock
+from obspy.core.pipeline import Pipeline
+from obspy.signal.filter import _butterworthResponse
+import numpy as np
+import unittest
+
+
+class PipelineTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.core.pipeline.Pipeline.
+    """
+    def setUp(self):
+        self.steps = [
+            ("detrend", {"type": "linear"}),
+            ("taper", (0.05, ), {"type": "cosine"}),
+            ("remove_response", {"output": "DISP", "pre_filt": None}),
+            ("filter", {"type": "bandpass", "freqmin": 1.0,
+                        "freqmax": 20.0}),
+            ("filter", ("lowpass", ), {"freq": 15.0, "zerophase": True}),
+            ("decimate", {"factor": 2}),
+            "differentiate"]
+
+    def _sequential(self, st, steps=None):
+        for step in steps or self.steps:
+            if not isinstance(step, tuple):
+                step = (step, (), {})
+            elif len(step) == 2:
+                step = (step[0], (), step[1])
+            name, args, kwargs = step
+            for tr in st:
+                getattr(tr, name)(*args, **kwargs)
+        return st
+
+    def test_process(self):
+        """
+        Processing with a pipeline is the same as calling the methods one
+        after another.
+        """
+        expected = self._sequential(read())
+        pipeline = Pipeline(self.steps)
+        self.assertEqual(len(pipeline), 7)
+        for workers in (None, 3):
+            st = read()
+            self.assertTrue(st.process(pipeline, workers=workers) is st)
+            self.assertEqual(st, expected)
+        st = read()
+        st.process(self.steps)
+        self.assertEqual(st, expected)
+        tr = read()[0]
+        self.assertTrue(pipeline.process_trace(tr) is tr)
+        self.assertEqual(tr, expected[0])
+
+    def test_fuseFilters(self):
+        """
+        Filters following the response removal can be applied in the
+        frequency domain.
+        """
+        expected = self._sequential(read())
+        st = read()
+        with mock.patch("obspy.signal.filter._butterworthResponse",
+                        wraps=_butterworthResponse) as response:
+            st.process(Pipeline(self.steps, fuse_filters=True))
+        # the responses are only evaluated once for traces of same length
+        self.assertEqual(len([c for c in response.call_args_list
+                              if len(c[0][1]) > 1]), 2)
+        for tr, tr_expected in zip(st, expected):
+            self.assertEqual(tr.stats, tr_expected.stats)
+            # apart from the edges of the trace the results are close
+            edge = tr.stats.npts // 10
+            diff = np.abs(tr.data - tr_expected.data)[edge:-edge]
+            self.assertTrue(diff.max() < 1e-3 * np.abs(tr.data).max())
+        # without responses the trace methods raise
+        st = read()
+        for tr in st:
+            tr.stats.pop('response')
+        self.assertRaises(KeyError, st.process,
+                          Pipeline(self.steps, fuse_filters=True))
+
+    def test_fusePreprocessing(self):
+        """
+        Demeaning and tapering directly before the response removal are done
+        on the copy of the data made for the deconvolution, with the same
+        result as the trace methods.
+        """
+        steps = [("detrend", {"type": "demean"}),
+                 ("taper", {"max_percentage": 0.05, "type": "hann"}),
+                 ("remove_response", {"output": "VEL"}),
+                 ("detrend", {"type": "demean"})]
+        pipeline = Pipeline(steps)
+        self.assertEqual([type(step).__name__ for step in pipeline._plan],
+                         ["_FusedResponseRemoval", "_MethodCall"])
+        for dtype in (np.int32, np.float64, np.float32):
+            st = read()
+            for tr in st:
+                tr.data = tr.data.astype(dtype)
+            expected = self._sequential(st.copy(), steps)
+            st.process(pipeline)
+            self.assertEqual(st, expected)
+        # deprecated taper calls and other detrend types are not fused
+        pipeline = Pipeline([("detrend", {"type": "linear"}),
+                             ("taper", (0.05, ), {"type": "cosine"}),
+                             ("remove_response", {"output": "VEL"})])
+        self.assertEqual([type(step).__name__ for step in pipeline._plan],
+                         ["_MethodCall"] * 3)
+
+    def test_validation(self):
+        """
+        Invalid steps are refused when creating the pipeline.
+        """
+        self.assertRaises(ValueError, Pipeline, ["detrend", "plot"])
+        self.assertRaises(ValueError, Pipeline, [("detrend", (), {}, None)])
+        self.assertRaises(TypeError, Pipeline, [("decimate", {})])
+        self.assertRaises(TypeError, Pipeline, [("taper", {"kind": 1})])
+        self.assertRaises(TypeError, Pipeline, [
+            ("filter", {"type": "lowpass", "freqmin": 1.0})])
+        self.assertRaises(ValueError, Pipeline, [
+            ("filter", {"type": "unknown", "freq": 1.0})])
+        self.assertEqual(str(Pipeline(self.steps[:2])),
+                         "Pipeline with 2 steps:\n"
+                         "    detrend(type='linear')\n"
+                         "    taper(0.05, type='cosine')")
+
+
+def suite():
+    return unittest.makeSuite(PipelineTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
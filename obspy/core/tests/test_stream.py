@@ -432,6 +432,43 @@ class StreamTestCase(unittest.TestCase):
         self.assertEqual(st2.test, 1)
         self.assertEqual(st2.muh, "Muh")
 
+    def test_slide(self):
+        """
+        Sliding windows over traces with different start and end times.
+        """
+        st = read()
+        t0 = st[0].stats.starttime
+        st[1].trim(t0 + 5, t0 + 25)
+        st[2].trim(t0, t0 + 9.5)
+        st.test = 1
+        windows = list(st.slide(window_length=5.0, step=4.0, offset=1.0))
+        self.assertEqual(len(windows), 6)
+        for i, window in enumerate(windows):
+            self.assertEqual(window.test, 1)
+            start = t0 + 1 + i * 4
+            expected = st.slice(start, start + 5)
+            self.assertEqual(len(window), len(expected))
+            for tr, tr2 in zip(window, expected):
+                self.assertEqual(tr.id, tr2.id)
+                self.assertEqual(tr.stats.starttime, tr2.stats.starttime)
+                self.assertEqual(tr.stats.endtime, tr2.stats.endtime)
+                np.testing.assert_array_equal(tr.data, tr2.data)
+                # views into the original data
+                self.assertTrue(tr.data.base is not None)
+        self.assertEqual([len(w) for w in windows], [3, 3, 3, 2, 2, 2])
+        # partial windows at the end
+        windows = list(st.slide(window_length=5.0, step=4.0, offset=1.0,
+                                include_partial_windows=True))
+        self.assertEqual(len(windows), 8)
+        self.assertEqual(windows[-1][0].stats.starttime, t0 + 29)
+        self.assertEqual(windows[-1][0].stats.npts, 100)
+        # windows without data are skipped, negative offsets
+        st = Stream([st[0].slice(None, t0 + 3), st[0].slice(t0 + 20)])
+        windows = list(st.slide(window_length=5.0, step=5.0, offset=-10.0))
+        self.assertEqual([w[0].stats.starttime - t0 for w in windows],
+                         [0.0, 20.0, 20.0])
+        self.assertEqual(list(Stream().slide(1.0, 1.0)), [])
+
     def test_cutout(self):
         """
         Test cutout method of the Stream object. Compare against equivalent
@@ -2130,6 +2167,33 @@ class StreamTestCase(unittest.TestCase):
         st2.remove_response(pre_filt=(0.1, 0.5, 30, 50))
         self.assertEqual(st1, st2)
 
+    def test_remove_response_batched(self):
+        """
+        Traces with equal responses, lengths and sampling rates are
+        deconvolved together with the same result as trace by trace.
+        """
+        st = read()
+        st += read()
+        st[3].data = st[3].data[:1000]
+        st[4].stats.sampling_rate = 50.0
+        st[5].stats.response = deepcopy(st[5].stats.response)
+        st[5].stats.response.response_stages[0].stage_gain *= 2
+        st += st[0].copy()
+        st[-1].stats.pop('response')
+        expected = st.copy()
+        for tr in expected[:-1]:
+            tr.remove_response(output='DISP', pre_filt=(0.1, 0.5, 30, 50))
+        # only the traces without batch partners are processed one by one
+        remaining = st.copy()._removeResponseBatched(
+            output='DISP', pre_filt=(0.1, 0.5, 30, 50))
+        self.assertEqual([tr.stats.npts for tr in remaining],
+                         [1000, 3000, 3000, 3000])
+        self.assertRaises(KeyError, st.copy().remove_response)
+        st.pop()
+        st.remove_response(output='DISP', pre_filt=(0.1, 0.5, 30, 50),
+                           workers=2)
+        self.assertEqual(st, expected[:-1])
+
     def test_interpolate(self):
         """
         Tests that the interpolate command is called for all traces of a
@@ -2144,6 +2208,61 @@ class StreamTestCase(unittest.TestCase):
                           "method": "weighted_average_slopes"},
                          patch.call_args[1])
 
+    def test_resample(self):
+        """
+        Tests that the resample command is called for all traces of a Stream
+        object.
+        """
+        for method in ('fft', 'polyphase'):
+            st1 = read()
+            st2 = read()
+            for tr in st1:
+                tr.resample(40.0, window='blackman', method=method)
+            st2.resample(40.0, window='blackman', method=method)
+            self.assertEqual(st1, st2)
+
+    def test_workers(self):
+        """
+        Tests that processing the traces in parallel threads gives the same
+        data and processing information in the same order as processing
+        them one after another.
+        """
+        paz = {'poles': [-0.037004 + 0.037016j, -0.037004 - 0.037016j,
+                         -251.33 + 0j, -131.04 - 467.29j, -131.04 + 467.29j],
+               'zeros': [0j, 0j], 'gain': 60077000.0,
+               'sensitivity': 2516778400.0}
+        st = read()
+        for _ in range(3):
+            st += read()
+        for i, tr in enumerate(st):
+            tr.stats.station = 'S%02d' % i
+        calls = [
+            ('detrend', (), {'type': 'linear'}),
+            ('taper', (0.05,), {}),
+            ('filter', ('bandpass',), {'freqmin': 1.0, 'freqmax': 20.0}),
+            ('simulate', (), {'paz_remove': paz}),
+            ('remove_response', (), {'output': 'DISP'}),
+            ('resample', (40.0,), {'window': 'blackman',
+                                   'method': 'polyphase'}),
+            ('decimate', (2,), {'method': 'multistage'}),
+            ('interpolate', (), {'sampling_rate': 13.0})]
+        st1 = st.copy()
+        st2 = st.copy()
+        for name, args, kwargs in calls:
+            getattr(st1, name)(*args, **kwargs)
+            getattr(st2, name)(*args, workers=4, **kwargs)
+        self.assertEqual([tr.stats.station for tr in st2],
+                         ['S%02d' % i for i in range(12)])
+        for tr1, tr2 in zip(st1, st2):
+            self.assertEqual(tr1.stats.processing, tr2.stats.processing)
+            self.assertTrue(len(tr2.stats.processing) >= len(calls))
+            np.testing.assert_array_equal(tr1.data, tr2.data)
+        # errors are raised
+        st2 = st.copy()
+        st2[5].data = st2[5].data[:0]
+        self.assertRaises(Exception, st2.filter, 'bandpass', freqmin=1.0,
+                          freqmax=20.0, workers=4)
+
     def test_integrate(self):
         """
         Tests that the integrate command is called for all traces of a Stream
@@ -13,6 +13,7 @@ from obspy.core.util.decorator import skipIf
 from obspy.xseed import Parser
 import math
 import numpy as np
+import pickle
 import unittest
 import warnings
 import os
@@ -594,6 +595,66 @@ class TraceTestCase(unittest.TestCase):
         self.assertTrue("processing" in tr2.stats)
         self.assertTrue("trim" in tr2.stats.processing[0])
 
+    def test_slice_and_copy_stats(self):
+        """
+        Sliced and copied traces have independent headers, only the response
+        is shared.
+        """
+        tr = read()[0]
+        tr.stats.mseed = {'dataquality': 'D',
+                          'blkt1001': {'timing_quality': 5}}
+        tr.stats.processing = ['a']
+        response = tr.stats.response
+        t = tr.stats.starttime
+        for tr2 in (tr.slice(t + 1, t + 2), tr.copy(), Stream([tr]).slice(
+                t + 1, t + 2)[0], Stream([tr]).copy()[0]):
+            self.assertTrue(tr2.stats.response is response)
+            self.assertEqual(tr2.stats.mseed, tr.stats.mseed)
+            tr2.stats.mseed.blkt1001.timing_quality = 10
+            tr2.stats.mseed.dataquality = 'Q'
+            tr2.stats.processing.append('b')
+            tr2.stats.starttime += 1
+            self.assertEqual(tr.stats.mseed.blkt1001.timing_quality, 5)
+            self.assertEqual(tr.stats.mseed.dataquality, 'D')
+            self.assertEqual(tr.stats.processing, ['a'])
+            self.assertEqual(tr.stats.starttime, t)
+        tr2 = tr.copy()
+        self.assertEqual(tr2, tr)
+        tr2.data[0] += 1
+        self.assertNotEqual(tr2.data[0], tr.data[0])
+
+    def test_slide(self):
+        """
+        Tests the sliding windows of trace objects against slice().
+        """
+        tr = read()[0]
+        t0 = tr.stats.starttime
+        for window_length, step, offset in ((3.0, 3.0, 0), (2.5, 0.7, 1.23),
+                                            (10.0, 12.0, 0.003)):
+            t = t0 + offset
+            windows = list(tr.slide(window_length, step, offset=offset))
+            for i, window in enumerate(windows):
+                expected = tr.slice(t + i * step, t + i * step + window_length)
+                self.assertEqual(window.stats.starttime,
+                                 expected.stats.starttime)
+                self.assertEqual(window.stats.npts, expected.stats.npts)
+                np.testing.assert_array_equal(window.data, expected.data)
+                # no copy of the data
+                self.assertTrue(np.may_share_memory(window.data, tr.data))
+            # the last window ends before the end of the trace
+            self.assertTrue(t + len(windows) * step + window_length >
+                            tr.stats.endtime)
+            self.assertTrue(windows[-1].stats.endtime <= tr.stats.endtime)
+        # partial windows
+        windows = list(tr.slide(12.0, 12.0, include_partial_windows=True))
+        self.assertEqual([w.stats.npts for w in windows], [1201, 1201, 600])
+        self.assertEqual(windows[-1].stats.endtime, tr.stats.endtime)
+        # the original trace is not modified
+        windows[0].stats.station = "XXX"
+        self.assertEqual(tr.stats.station, "RJOB")
+        self.assertEqual(tr.stats.npts, 3000)
+        self.assertRaises(ValueError, next, tr.slide(0, 1))
+
     def test_slice_noStarttimeOrEndtime(self):
         """
         Tests the slicing of trace objects with no start time or end time
@@ -871,6 +932,92 @@ class TraceTestCase(unittest.TestCase):
         tr2.data = np.arange(10, dtype=np.float32)
         self.assertRaises(TypeError, tr.__add__, tr2)
 
+    def test_append_data(self):
+        """
+        Tests appending data in place, contiguous chunks are written into
+        spare capacity and everything else is merged like in __add__.
+        """
+        data = np.arange(1000, dtype=np.int32)
+        tr = Trace(data=data[:10])
+        tr.stats.sampling_rate = 20.0
+        views = []
+        for i in range(10, 1000, 10):
+            views.append(tr.data)
+            self.assertTrue(tr.append_data(data[i:i + 10]) is tr)
+        np.testing.assert_array_equal(tr.data, data)
+        self.assertEqual(tr.stats.npts, 1000)
+        self.assertEqual(tr.stats.starttime, UTCDateTime(0))
+        # arrays handed out before are not changed by later appends
+        for view in views:
+            np.testing.assert_array_equal(view, data[:len(view)])
+        # the buffer is reused but not shared with copies and slices
+        pointer = tr.data.ctypes.data
+        tr2 = tr.slice(endtime=tr.stats.endtime)
+        tr3 = tr.copy()
+        tr.append_data(data[:10], tr.stats.endtime + 0.05)
+        self.assertEqual(tr.data.ctypes.data, pointer)
+        for other in (tr2, tr3):
+            other.append_data(data[10:20])
+            np.testing.assert_array_equal(other.data[-10:], data[10:20])
+        np.testing.assert_array_equal(tr.data[-10:], data[:10])
+        # gaps and overlaps
+        for offset in (30, -0.5, 0.5, 2.0):
+            tr = Trace(data=data[:100])
+            starttime = tr.stats.endtime + offset
+            tr2 = Trace(data=data[:50])
+            tr2.stats.starttime = starttime
+            expected = tr.__add__(tr2, fill_value=0)
+            tr.append_data(data[:50], starttime, fill_value=0)
+            self.assertEqual(tr, expected)
+        tr = Trace(data=data[:10])
+        tr.append_data(data[:10], tr.stats.starttime - 20)
+        self.assertEqual(tr.stats.starttime, UTCDateTime(0) - 20)
+        self.assertTrue(is_masked(tr.data))
+        # data type and empty traces
+        self.assertRaises(TypeError, tr.append_data, np.arange(10.0))
+        tr = Trace()
+        tr.append_data(data[:10], UTCDateTime(10))
+        self.assertEqual(tr.stats.starttime, UTCDateTime(10))
+        np.testing.assert_array_equal(tr.data, data[:10])
+
+    def test_append_dataEmptyTrace(self):
+        """
+        Appending to an empty trace keeps its start time unless a start time
+        is given.
+        """
+        t = UTCDateTime(2010, 1, 1)
+        data = np.arange(5, dtype=np.int32)
+        tr = Trace(header={'starttime': t})
+        tr.append_data(data)
+        self.assertEqual(tr.stats.starttime, t)
+        np.testing.assert_array_equal(tr.data, data)
+        tr = Trace(header={'starttime': t})
+        tr.append_data(data, t + 10)
+        self.assertEqual(tr.stats.starttime, t + 10)
+
+    def test_append_dataPickle(self):
+        """
+        The spare capacity of the append buffer is neither pickled nor
+        copied.
+        """
+        tr = Trace(data=np.arange(100000, dtype=np.int32))
+        tr.append_data(np.arange(10, dtype=np.int32))
+        self.assertEqual(len(tr._buffer[0]), 200000)
+        expected = Trace(data=tr.data.copy(), header=tr.stats)
+        for protocol in (0, 2):
+            dump = pickle.dumps(tr, protocol=protocol)
+            self.assertTrue(len(dump) <= len(pickle.dumps(
+                expected, protocol=protocol)))
+            tr2 = pickle.loads(dump)
+            self.assertEqual(tr2, tr)
+            self.assertFalse('_buffer' in tr2.__dict__)
+        for tr2 in (deepcopy(tr), tr.copy()):
+            self.assertEqual(tr2, tr)
+            self.assertFalse('_buffer' in tr2.__dict__)
+            tr2.append_data(np.arange(10, dtype=np.int32))
+            self.assertEqual(tr2.stats.npts, 100020)
+        self.assertEqual(tr.stats.npts, 100010)
+
     def test_addOverlapsDefaultMethod(self):
         """
         Test __add__ method of the Trace object.
@@ -1961,6 +2108,38 @@ class TraceTestCase(unittest.TestCase):
         self.assertRaises(ValueError, tr.resample,
                           sampling_rate=0.5, window=window, no_filter=True)
 
+    def test_resample_polyphase(self):
+        """
+        Tests resampling with a polyphase filter.
+        """
+        from obspy.signal.multirate import polyphaseResample
+        starttime = UTCDateTime(2014, 1, 1)
+        t = np.arange(10000) / 100.0
+        tr0 = Trace(np.sin(2 * np.pi * 0.5 * t),
+                    {'sampling_rate': 100.0, 'starttime': starttime})
+        for sampling_rate, npts in ((40.0, 4000), (20.0, 2000),
+                                    (250.0, 25000)):
+            tr = tr0.copy().resample(sampling_rate, method='polyphase')
+            self.assertEqual(tr.stats.sampling_rate, sampling_rate)
+            self.assertEqual(tr.stats.npts, npts)
+            self.assertEqual(tr.stats.starttime, starttime)
+            self.assertTrue('method=' in tr.stats.processing[-1])
+            # apart from the edges the signal is preserved
+            t = np.arange(npts) / sampling_rate
+            expected = np.sin(2 * np.pi * 0.5 * t)
+            np.testing.assert_allclose(tr.data[npts // 10:-npts // 10],
+                                       expected[npts // 10:-npts // 10],
+                                       atol=1e-3)
+        tr = tr0.copy().resample(40.0, method='polyphase')
+        np.testing.assert_array_equal(
+            tr.data, polyphaseResample(tr0.data, 2, 5))
+        self.assertRaises(ValueError, tr0.copy().resample, np.pi,
+                          method='polyphase')
+        self.assertRaises(ValueError, tr0.copy().resample, 30.0,
+                          method='polyphase', strict_length=True)
+        self.assertRaises(ValueError, tr0.copy().resample, 40.0,
+                          method='spline')
+
 
 def suite():
     return unittest.makeSuite(TraceTestCase, 'test')
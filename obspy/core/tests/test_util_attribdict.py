@@ -5,6 +5,8 @@ from future.builtins import *  # NOQA @UnusedWildImport
 
 import unittest
 
+import numpy as np
+
 from obspy.core import AttribDict
 
 
@@ -289,6 +291,33 @@ class AttribDictTestCase(unittest.TestCase):
         out = ' test1: 1\n test2: 2'
         self.assertEqual(ad._pretty_str(min_label_length=6), out)
 
+    def test_clone(self):
+        """
+        Test _clone method of AttribDict.
+        """
+        class SharingAttribDict(AttribDict):
+            _shared_keys = ['large']
+
+        large = np.arange(10)
+        ad = SharingAttribDict({'a': 1, 'b': 'x', 'c': (1, [2]),
+                                'nested': {'d': [1, 2], 'e': {'f': 3}},
+                                'array': np.arange(3), 'large': large})
+        ad2 = ad._clone()
+        self.assertTrue(isinstance(ad2, SharingAttribDict))
+        self.assertTrue(isinstance(ad2.nested, AttribDict))
+        self.assertEqual(sorted(ad2.keys()), sorted(ad.keys()))
+        self.assertEqual(ad2.nested, ad.nested)
+        self.assertTrue(ad2.large is large)
+        # nested values are independent
+        ad2.nested.d.append(3)
+        ad2.nested.e.f = 4
+        ad2.c[1].append(3)
+        ad2.array[0] = 5
+        self.assertEqual(ad.nested.d, [1, 2])
+        self.assertEqual(ad.nested.e.f, 3)
+        self.assertEqual(ad.c, (1, [2]))
+        self.assertEqual(ad.array[0], 0)
+
 
 def suite():
     return unittest.makeSuite(AttribDictTestCase, 'test')
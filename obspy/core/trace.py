@@ -129,6 +129,8 @@ class Stats(AttribDict):
         4
     """
     readonly = ['endtime']
+    # responses are shared with sliced and copied traces
+    _shared_keys = ['response']
     defaults = {
         'sampling_rate': 1.0,
         'delta': 1.0,
@@ -199,6 +201,29 @@ class Stats(AttribDict):
         return self._pretty_str(priorized_keys)
 
 
+def _processing_info(func, *args, **kwargs):
+    """
+    Returns the informational string about a processing call of func with
+    the given arguments as stored in the Trace.stats.processing list.
+    """
+    callargs = compatibility.getcallargs(func, *args, **kwargs)
+    callargs.pop("self")
+    kwargs_ = callargs.pop("kwargs", {})
+    from obspy import __version__
+    info = "ObsPy {version}: {function}(%s)".format(
+        version=__version__,
+        function=func.__name__)
+    arguments = []
+    arguments += \
+        ["%s=%s" % (k, v) if not isinstance(v, native_str) else
+         "%s='%s'" % (k, v) for k, v in callargs.items()]
+    arguments += \
+        ["%s=%s" % (k, v) if not isinstance(v, native_str) else
+         "%s='%s'" % (k, v) for k, v in kwargs_.items()]
+    arguments.sort()
+    return info % "::".join(arguments)
+
+
 def _add_processing_info(func):
     """
     This is a decorator that attaches information about a processing call as a
@@ -206,22 +231,7 @@ def _add_processing_info(func):
     """
     @functools.wraps(func)
     def new_func(*args, **kwargs):
-        callargs = compatibility.getcallargs(func, *args, **kwargs)
-        callargs.pop("self")
-        kwargs_ = callargs.pop("kwargs", {})
-        from obspy import __version__
-        info = "ObsPy {version}: {function}(%s)".format(
-            version=__version__,
-            function=func.__name__)
-        arguments = []
-        arguments += \
-            ["%s=%s" % (k, v) if not isinstance(v, native_str) else
-             "%s='%s'" % (k, v) for k, v in callargs.items()]
-        arguments += \
-            ["%s=%s" % (k, v) if not isinstance(v, native_str) else
-             "%s='%s'" % (k, v) for k, v in kwargs_.items()]
-        arguments.sort()
-        info = info % "::".join(arguments)
+        info = _processing_info(func, *args, **kwargs)
         self = args[0]
         result = func(*args, **kwargs)
         # Attach after executing the function to avoid having it attached
@@ -232,6 +242,9 @@ def _add_processing_info(func):
     new_func.__name__ = func.__name__
     new_func.__doc__ = func.__doc__
     new_func.__dict__.update(func.__dict__)
+    # undecorated function, e.g. to create the processing information for
+    # a call that is carried out on multiple traces at once
+    new_func.__wrapped__ = func
     return new_func
 
 
@@ -416,8 +429,19 @@ class Trace(object):
         if key == 'data':
             _data_sanity_checks(value)
             self.stats.npts = len(value)
+            # the append buffer is only kept while it backs the data
+            self.__dict__.pop('_buffer', None)
         return super(Trace, self).__setattr__(key, value)
 
+    def __getstate__(self):
+        """
+        Returns the state for pickling and copying without the spare
+        capacity of the append buffer.
+        """
+        state = self.__dict__.copy()
+        state.pop('_buffer', None)
+        return state
+
     def __getitem__(self, index):
         """
         __getitem__ method of Trace object.
@@ -694,7 +718,7 @@ class Trace(object):
         delta = int(compatibility.round_away(delta)) - 1
         delta_endtime = lt.stats.endtime - rt.stats.endtime
         # create the returned trace
-        out = self.__class__(header=deepcopy(lt.stats))
+        out = self.__class__(header=lt.stats._clone())
         # check if overlap or gap
         if delta < 0 and delta_endtime < 0:
             # overlap
@@ -784,6 +808,95 @@ class Trace(object):
         out.data = data
         return out
 
+    def append_data(self, data, starttime=None, method=0,
+                    interpolation_samples=0, fill_value=None):
+        """
+        Appends a chunk of data to the trace, in place.
+
+        Data following the last sample of the trace without gap or overlap
+        is written into spare capacity at the end of an internal buffer that
+        grows by doubling its size, so appending many small chunks, e.g.
+        when collecting real time data packets, takes linear instead of
+        quadratic time. All other cases are handled like
+        :meth:`Trace.__add__` does.
+
+        :type data: :class:`numpy.ndarray`
+        :param data: Data samples to append. Must have the same data type as
+            the data of the trace.
+        :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`,
+            optional
+        :param starttime: Time of the first sample of ``data``. Defaults to
+            the time of the sample following the last sample of the trace or
+            the start time of an empty trace.
+        :type method: int, optional
+        :param method: Method to handle overlaps, see :meth:`Trace.__add__`.
+        :type interpolation_samples: int, optional
+        :param interpolation_samples: Number of samples used to interpolate
+            overlaps, see :meth:`Trace.__add__`.
+        :type fill_value: int, float, str or ``None``, optional
+        :param fill_value: Fill value for gaps, see :meth:`Trace.__add__`.
+
+        .. note::
+
+            Arrays previously obtained from ``Trace.data`` keep their
+            contents, appending never writes to memory they refer to.
+
+        .. rubric:: Example
+
+        >>> tr = Trace(data=np.arange(3))
+        >>> tr.append_data(np.arange(3, 5))  # doctest: +ELLIPSIS
+        <...Trace object at 0x...>
+        >>> print(tr.data)
+        [0 1 2 3 4]
+        >>> t = tr.stats.endtime + 3
+        >>> print(tr.append_data(np.arange(7, 9), t).data)
+        [0 1 2 3 4 -- -- 7 8]
+        """
+        _data_sanity_checks(data)
+        if not self:
+            if starttime is not None:
+                self.stats.starttime = starttime
+            self._append_buffer(data[:0], data)
+            return self
+        if starttime is None:
+            starttime = self.stats.endtime + self.stats.delta
+        delta = (starttime - self.stats.endtime) * self.stats.sampling_rate
+        delta = int(compatibility.round_away(delta)) - 1
+        if delta == 0 and self.data.dtype == data.dtype and \
+                not isinstance(self.data, np.ma.masked_array) and \
+                not isinstance(data, np.ma.masked_array):
+            self._append_buffer(self.data, data)
+            return self
+        trace = self.__class__(data=data, header=self.stats._clone())
+        trace.stats.starttime = starttime
+        out = self.__add__(trace, method=method,
+                           interpolation_samples=interpolation_samples,
+                           fill_value=fill_value)
+        self.data = out.data
+        self.stats.starttime = out.stats.starttime
+        return self
+
+    def _append_buffer(self, data, new_data):
+        """
+        Sets the trace data to ``data`` followed by ``new_data``, writing into
+        the spare capacity of the append buffer if ``data`` is its used part.
+        """
+        state = self.__dict__.get('_buffer')
+        npts = len(data) + len(new_data)
+        # the buffer is only written to behind the samples that were ever
+        # used, shallow copies of the trace may share it
+        if state is None or state[1] != len(data) or \
+                npts > len(state[0]) or \
+                data.__array_interface__['data'][0] != \
+                state[0].__array_interface__['data'][0]:
+            state = [np.empty(max(npts, 2 * len(data)),
+                              dtype=new_data.dtype), len(data)]
+            state[0][:len(data)] = data
+        state[0][len(data):npts] = new_data
+        state[1] = npts
+        self.data = state[0][:npts]
+        self._buffer = state
+
     def getId(self):
         """
         Returns a SEED compatible identifier of the trace.
@@ -1102,10 +1215,83 @@ class Trace(object):
         array([2, 3, 4, 5, 6, 7, 8])
         """
         tr = copy(self)
-        tr.stats = deepcopy(self.stats)
+        tr.stats = self.stats._clone()
         tr.trim(starttime=starttime, endtime=endtime)
         return tr
 
+    def slide(self, window_length, step, offset=0,
+              include_partial_windows=False):
+        """
+        Generator yielding equal length sliding windows of the Trace.
+
+        The window boundaries are computed once in samples. Like
+        :meth:`~obspy.core.trace.Trace.slice`, the windows do not copy the
+        data but are views into the data of the original trace, so they are
+        cheap to create.
+
+        :type window_length: float
+        :param window_length: The length of each window in seconds. A window
+            contains all samples from its start time up to and including its
+            end time (start time plus window length).
+        :type step: float
+        :param step: The step between the start times of two successive
+            windows in seconds. Can be larger, smaller or equal to
+            ``window_length``.
+        :type offset: float
+        :param offset: The offset of the first window in seconds relative to
+            the start time of the trace.
+        :type include_partial_windows: bool
+        :param include_partial_windows: Determines if windows that are
+            shorter than ``window_length`` at the end of the trace are
+            yielded as well.
+
+        .. rubric:: Example
+
+        >>> tr = Trace(data=np.arange(10))
+        >>> for window in tr.slide(window_length=3.0, step=2.0):
+        ...     print(window.stats.starttime, window.data)
+        1970-01-01T00:00:00.000000Z [0 1 2 3]
+        1970-01-01T00:00:02.000000Z [2 3 4 5]
+        1970-01-01T00:00:04.000000Z [4 5 6 7]
+        1970-01-01T00:00:06.000000Z [6 7 8 9]
+        >>> for window in tr.slide(window_length=3.0, step=4.0, offset=1.0,
+        ...                        include_partial_windows=True):
+        ...     print(window.stats.starttime, window.data)
+        1970-01-01T00:00:01.000000Z [1 2 3 4]
+        1970-01-01T00:00:05.000000Z [5 6 7 8]
+        1970-01-01T00:00:09.000000Z [9]
+        """
+        if window_length <= 0 or step <= 0:
+            msg = "Window length and step must be positive."
+            raise ValueError(msg)
+        sampling_rate = self.stats.sampling_rate
+        npts = self.stats.npts
+        length = int(compatibility.round_away(window_length * sampling_rate))
+        # skip windows starting before the trace
+        i = max(0, int(math.ceil(-offset / step)))
+        while True:
+            first = int(compatibility.round_away(
+                (offset + i * step) * sampling_rate))
+            i += 1
+            if first < 0:
+                continue
+            last = first + length
+            if first >= npts or (last >= npts and
+                                 not include_partial_windows):
+                break
+            yield self._window(first, min(last, npts - 1))
+
+    def _window(self, first, last):
+        """
+        Returns a new Trace object with the samples ``first`` to ``last``
+        (inclusive). Does not copy the data.
+        """
+        tr = copy(self)
+        tr.stats = self.stats._clone()
+        tr.stats.starttime = self.stats.starttime + first * self.stats.delta
+        tr.data = self.data[first:last + 1]
+        return tr
+
     def verify(self):
         """
         Verifies current trace object against available meta data.
@@ -1445,10 +1631,10 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
     @skipIfNoData
     @_add_processing_info
     def resample(self, sampling_rate, window='hanning', no_filter=True,
-                 strict_length=False):
+                 strict_length=False, method='fft'):
         """
-        Resample trace data using Fourier method. Spectra are linearly
-        interpolated if required.
+        Resample trace data using Fourier method or a polyphase filter.
+        Spectra are linearly interpolated if required.
 
         :type sampling_rate: float
         :param sampling_rate: The sampling rate of the resampled signal.
@@ -1462,6 +1648,15 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :type strict_length: bool, optional
         :param strict_length: Leave traces unchanged for which end time of
             trace would change. Defaults to ``False``.
+        :type method: str, optional
+        :param method: ``'fft'`` (default) resamples in the frequency domain,
+            ``'polyphase'`` uses a polyphase FIR filter, see
+            :func:`~obspy.signal.multirate.polyphaseResample`. The latter
+            requires the ratio of the sampling rates to be a ratio of
+            integers (e.g. 200 Hz to 40 Hz or 100 Hz to 40 Hz), does not
+            assume the signal to be periodic and is usually faster for long
+            traces. ``window`` and ``no_filter`` are ignored, the anti-alias
+            filter is part of the polyphase filter.
 
         .. note::
 
@@ -1502,12 +1697,22 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         """
         from scipy.signal import get_window
         from scipy.fftpack import rfft, irfft
+        if method not in ('fft', 'polyphase'):
+            msg = "Unknown resampling method '%s'." % method
+            raise ValueError(msg)
         factor = self.stats.sampling_rate / float(sampling_rate)
         # check if end time changes and this is not explicitly allowed
         if strict_length:
             if len(self.data) % factor != 0.0:
                 msg = "End time of trace would change and strict_length=True."
                 raise ValueError(msg)
+        if method == 'polyphase':
+            from obspy.signal.multirate import rationalRatio, \
+                polyphaseResample
+            up, down = rationalRatio(self.stats.sampling_rate, sampling_rate)
+            self.data = polyphaseResample(self.data, up, down)
+            self.stats.sampling_rate = sampling_rate
+            return self
         # do automatic lowpass filtering
         if not no_filter:
             # be sure filter still behaves good
@@ -1562,7 +1767,8 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         return self
 
     @_add_processing_info
-    def decimate(self, factor, no_filter=False, strict_length=False):
+    def decimate(self, factor, no_filter=False, strict_length=False,
+                 method='cheby2'):
         """
         Downsample trace data by an integer factor.
 
@@ -1575,6 +1781,15 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :type strict_length: bool, optional
         :param strict_length: Leave traces unchanged for which end time of
             trace would change. Defaults to ``False``.
+        :type method: str, optional
+        :param method: Anti-alias filtering method. ``'cheby2'`` (default)
+            applies a Chebyshev lowpass filter at the original sampling rate
+            and is limited to factors up to 16. ``'multistage'`` splits the
+            factor into stages of at most 10 with zero phase FIR filters
+            that are only evaluated at the output samples, see
+            :class:`~obspy.signal.multirate.ChunkedDecimator`. It is suited
+            for large factors (e.g. 1000 Hz to 1 Hz) and processes long
+            traces in chunks.
 
         Currently a simple integer decimation is implemented.
         Only every ``decimation_factor``-th sample remains in the trace, all
@@ -1627,6 +1842,15 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         if strict_length and len(self.data) % factor:
             msg = "End time of trace would change and strict_length=True."
             raise ValueError(msg)
+        if method not in ('cheby2', 'multistage'):
+            msg = "Unknown decimation method '%s'." % method
+            raise ValueError(msg)
+
+        if not no_filter and method == 'multistage':
+            from obspy.signal.multirate import multistageDecimate
+            self.data = multistageDecimate(self.data, factor)
+            self.stats.sampling_rate = self.stats.sampling_rate / float(factor)
+            return self
 
         # do automatic lowpass filtering
         if not no_filter:
@@ -1916,48 +2140,9 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         ``'triang'``
             Triangular window. (uses: :func:`scipy.signal.triang`)
         """
-        type = type.lower()
-        side = side.lower()
-        side_valid = ['both', 'left', 'right']
-        npts = self.stats.npts
-        if side not in side_valid:
-            raise ValueError("'side' has to be one of: %s" % side_valid)
-        # retrieve function call from entry points
-        func = _getFunctionFromEntryPoint('taper', type)
-        # store all constraints for maximum taper length
-        max_half_lenghts = []
-        if max_percentage is not None:
-            max_half_lenghts.append(int(max_percentage * npts))
-        if max_length is not None:
-            max_half_lenghts.append(int(max_length * self.stats.sampling_rate))
-        if np.all([2 * mhl > npts for mhl in max_half_lenghts]):
-            msg = "The requested taper is longer than the trace. " \
-                  "The taper will be shortened to trace length."
-            warnings.warn(msg)
-        # add full trace length to constraints
-        max_half_lenghts.append(int(npts / 2))
-        # select shortest acceptable window half-length
-        wlen = min(max_half_lenghts)
-        # obspy.signal.cosTaper has a default value for taper percentage,
-        # we need to override is as we control percentage completely via npts
-        # of taper function and insert ones in the middle afterwards
-        if type == "cosine":
-            kwargs['p'] = 1.0
-        # tapering. tapering functions are expected to accept the number of
-        # samples as first argument and return an array of values between 0 and
-        # 1 with the same length as the data
-        if 2 * wlen == npts:
-            taper_sides = func(2 * wlen, **kwargs)
-        else:
-            taper_sides = func(2 * wlen + 1, **kwargs)
-        if side == 'left':
-            taper = np.hstack((taper_sides[:wlen], np.ones(npts - wlen)))
-        elif side == 'right':
-            taper = np.hstack((np.ones(npts - wlen),
-                               taper_sides[len(taper_sides) - wlen:]))
-        else:
-            taper = np.hstack((taper_sides[:wlen], np.ones(npts - 2 * wlen),
-                               taper_sides[len(taper_sides) - wlen:]))
+        taper = _taper_window(self.stats.npts, self.stats.sampling_rate,
+                              max_percentage, type, max_length, side,
+                              **kwargs)
         self.data = self.data * taper
         return self
 
@@ -2024,7 +2209,8 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         This actually copies all data in the trace and does not only provide
         another pointer to the same data. At any processing step if the
         original data has to be available afterwards, this is the method to
-        use to make a copy of the trace.
+        use to make a copy of the trace. Only an attached response
+        (``stats.response``) is not copied but shared with the copy.
 
         .. rubric:: Example
 
@@ -2052,7 +2238,15 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         >>> tr3 == tr
         True
         """
-        return deepcopy(self)
+        tr = copy(self)
+        for key, value in tr.__dict__.items():
+            if key == 'stats':
+                value = value._clone()
+            else:
+                value = deepcopy(value)
+            # bypass __setattr__, npts is already set
+            tr.__dict__[key] = value
+        return tr
 
     def _addProcessingInfo(self, info):
         """
@@ -2366,7 +2560,6 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :param taper_fraction: Taper fraction of cosine taper to use.
         """
         from obspy.station import Response, PolynomialResponseStage
-        from obspy.signal.invsim import cosTaper, c_sac_taper, specInv
 
         if "response" not in self.stats:
             msg = ("No response information attached to trace "
@@ -2401,43 +2594,123 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             return self
 
         # use evalresp
-        data = self.data.astype(np.float64)
-        npts = len(data)
-        # time domain pre-processing
-        if zero_mean:
-            data -= data.mean()
-        if taper:
-            data *= cosTaper(npts, taper_fraction,
-                             sactaper=True, halfcosine=False)
-        # smart calculation of nfft dodging large primes
-        from obspy.signal.util import _npts2nfft
-        nfft = _npts2nfft(npts)
-        # Transform data to Frequency domain
-        data = np.fft.rfft(data, n=nfft)
-        # calculate and apply frequency response,
-        # optionally prefilter in frequency domain and/or apply water level
-        freq_response, freqs = \
-            self.stats.response.get_evalresp_response(self.stats.delta, nfft,
-                                                      output=output, **kwargs)
-        if pre_filt:
-            data *= c_sac_taper(freqs, flimit=pre_filt)
-        if water_level is not None:
-            specInv(freq_response, water_level)
-        data *= freq_response
-
-        data[-1] = abs(data[-1]) + 0.0j
-        # transform data back into the time domain
-        data = np.fft.irfft(data)[0:npts]
-        # assign processed data and store processing information
-        self.data = data
-        info = ":".join(["remove_response"] +
-                        [str(x) for x in (output, water_level, pre_filt,
-                                          zero_mean, taper, taper_fraction)] +
-                        ["%s=%s" % (k, v) for k, v in kwargs.items()])
-        self._addProcessingInfo(info)
+        self.data = _deconvolve(self.data, self.stats.delta, response,
+                                output, water_level, pre_filt, zero_mean,
+                                taper, taper_fraction, **kwargs)
+        self._addProcessingInfo(_remove_response_info(
+            output, water_level, pre_filt, zero_mean, taper, taper_fraction,
+            kwargs))
         return self
 
 
+def _deconvolve(data, delta, response, output, water_level, pre_filt,
+                zero_mean, taper, taper_fraction, filters=(), preprocessing=(),
+                **kwargs):
+    """
+    Deconvolves the response from the data in the frequency domain using
+    evalresp, see :meth:`Trace.remove_response`.
+
+    ``data`` can also be a 2-D array with the data of several traces of the
+    same length in its rows, the response is then evaluated only once.
+    ``filters`` are functions returning the frequency response of further
+    filters for an array of frequencies, they are applied in the same
+    frequency domain pass. ``preprocessing`` are functions modifying the
+    float64 copy of the data in place before anything else is done.
+    """
+    from obspy.signal.invsim import cosTaper, c_sac_taper, specInv
+    from obspy.signal.util import _npts2nfft
+
+    data = data.astype(np.float64)
+    npts = data.shape[-1]
+    for func in preprocessing:
+        func(data)
+    # time domain pre-processing
+    if zero_mean:
+        data -= data.mean(axis=-1)[..., np.newaxis]
+    if taper:
+        data *= cosTaper(npts, taper_fraction,
+                         sactaper=True, halfcosine=False)
+    # smart calculation of nfft dodging large primes
+    nfft = _npts2nfft(npts)
+    # Transform data to Frequency domain
+    data = np.fft.rfft(data, n=nfft, axis=-1)
+    # calculate and apply frequency response,
+    # optionally prefilter in frequency domain and/or apply water level
+    freq_response, freqs = \
+        response.get_evalresp_response(delta, nfft, output=output, **kwargs)
+    if pre_filt:
+        data *= c_sac_taper(freqs, flimit=pre_filt)
+    if water_level is not None:
+        specInv(freq_response, water_level)
+    data *= freq_response
+    for func in filters:
+        data *= func(freqs)
+
+    data[..., -1] = abs(data[..., -1]) + 0.0j
+    # transform data back into the time domain
+    return np.fft.irfft(data, axis=-1)[..., 0:npts]
+
+
+def _taper_window(npts, sampling_rate, max_percentage, type='hann',
+                  max_length=None, side='both', **kwargs):
+    """
+    Returns the window :meth:`Trace.taper` multiplies the data with.
+    """
+    type = type.lower()
+    side = side.lower()
+    side_valid = ['both', 'left', 'right']
+    if side not in side_valid:
+        raise ValueError("'side' has to be one of: %s" % side_valid)
+    # retrieve function call from entry points
+    func = _getFunctionFromEntryPoint('taper', type)
+    # store all constraints for maximum taper length
+    max_half_lenghts = []
+    if max_percentage is not None:
+        max_half_lenghts.append(int(max_percentage * npts))
+    if max_length is not None:
+        max_half_lenghts.append(int(max_length * sampling_rate))
+    if np.all([2 * mhl > npts for mhl in max_half_lenghts]):
+        msg = "The requested taper is longer than the trace. " \
+              "The taper will be shortened to trace length."
+        warnings.warn(msg)
+    # add full trace length to constraints
+    max_half_lenghts.append(int(npts / 2))
+    # select shortest acceptable window half-length
+    wlen = min(max_half_lenghts)
+    # obspy.signal.cosTaper has a default value for taper percentage,
+    # we need to override is as we control percentage completely via npts
+    # of taper function and insert ones in the middle afterwards
+    if type == "cosine":
+        kwargs['p'] = 1.0
+    # tapering. tapering functions are expected to accept the number of
+    # samples as first argument and return an array of values between 0 and
+    # 1 with the same length as the data
+    if 2 * wlen == npts:
+        taper_sides = func(2 * wlen, **kwargs)
+    else:
+        taper_sides = func(2 * wlen + 1, **kwargs)
+    if side == 'left':
+        taper = np.hstack((taper_sides[:wlen], np.ones(npts - wlen)))
+    elif side == 'right':
+        taper = np.hstack((np.ones(npts - wlen),
+                           taper_sides[len(taper_sides) - wlen:]))
+    else:
+        taper = np.hstack((taper_sides[:wlen], np.ones(npts - 2 * wlen),
+                           taper_sides[len(taper_sides) - wlen:]))
+    return taper
+
+
+def _remove_response_info(output, water_level, pre_filt, zero_mean, taper,
+                          taper_fraction, kwargs):
+    """
+    Returns the processing information of :meth:`Trace.remove_response`.
+    """
+    return ":".join(["remove_response"] +
+                    [str(x) for x in (output, water_level, pre_filt,
+                                      zero_mean, taper, taper_fraction)] +
+                    ["%s=%s" % (k, v) for k, v in kwargs.items()])
+
+
 def _data_sanity_checks(value):
     """
     Checks if a given input is suitable to be used for Trace.data. Raises the
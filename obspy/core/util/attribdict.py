@@ -12,8 +12,15 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA @UnusedWildImport
 
+from future.utils import native_str
+
 import collections
 import copy
+import numbers
+
+
+# Types of values which do not need to be copied.
+IMMUTABLE_TYPES = (numbers.Number, str, native_str, bytes, type(None))
 
 
 class AttribDict(collections.MutableMapping):
@@ -43,6 +50,8 @@ class AttribDict(collections.MutableMapping):
     """
     defaults = {}
     readonly = []
+    # keys of values shared by reference with copies created by _clone()
+    _shared_keys = []
 
     def __init__(self, *args, **kwargs):
         """
@@ -120,6 +129,24 @@ class AttribDict(collections.MutableMapping):
         ad.update(copy.deepcopy(self.__dict__))
         return ad
 
+    def _clone(self):
+        """
+        Returns a copy which is much cheaper to create than a deep copy.
+
+        Immutable values and the values of keys listed in ``_shared_keys``
+        are shared with the copy, nested AttribDicts, dictionaries, lists and
+        tuples are copied recursively and all other values are deep copied.
+        """
+        ad = self.__class__.__new__(self.__class__)
+        # bypass __setitem__, the values have been checked already
+        values = ad.__dict__
+        for key, value in self.__dict__.items():
+            if key in self._shared_keys:
+                values[key] = value
+            else:
+                values[key] = _clone(value)
+        return ad
+
     def update(self, adict={}):
         for (key, value) in adict.items():
             if key in self.readonly:
@@ -161,6 +188,24 @@ class AttribDict(collections.MutableMapping):
         return len(self.__dict__)
 
 
+def _clone(value):
+    """
+    Copies a value for :meth:`AttribDict._clone`.
+    """
+    if isinstance(value, IMMUTABLE_TYPES):
+        return value
+    if isinstance(value, AttribDict):
+        return value._clone()
+    cls = type(value)
+    if cls is dict:
+        return dict((k, _clone(v)) for k, v in value.items())
+    if cls is list:
+        return [_clone(v) for v in value]
+    if cls is tuple:
+        return tuple(_clone(v) for v in value)
+    return copy.deepcopy(value)
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
@@ -15,8 +15,11 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA @UnusedWildImport
 
 from fnmatch import fnmatch
+from multiprocessing.pool import ThreadPool
 from obspy import Stream, UTCDateTime
-from obspy.earthworm.waveserver import readWaveServerV, getMenu
+from obspy.earthworm.waveserver import getMenu, getWaveServerVRaw, \
+    tracebuf2Stream, WaveServerConnection
+import threading
 
 
 class Client(object):
@@ -33,8 +36,15 @@ class Client(object):
     :type debug: bool, optional
     :param debug: Enables verbose output of the connection handling (default is
         ``False``).
+    :type max_connections: int, optional
+    :param max_connections: Maximum number of connections used for
+        concurrent requests of several channels (default is ``4``).
+
+    Connections to the server are kept open and reused by subsequent
+    requests until :meth:`close` is called.
     """
-    def __init__(self, host, port, timeout=None, debug=False):
+    def __init__(self, host, port, timeout=None, debug=False,
+                 max_connections=4):
         """
         Initializes a Earthworm Wave Server client.
 
@@ -44,6 +54,44 @@ class Client(object):
         self.port = port
         self.timeout = timeout
         self.debug = debug
+        self.max_connections = max_connections
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def close(self):
+        """
+        Closes all open connections to the server.
+        """
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            connection.close()
+
+    def _getRaw(self, scnl, starttime, endtime):
+        """
+        Requests the raw tracebuf2 data of one channel using an idle
+        connection or a new one.
+        """
+        with self._lock:
+            if self._connections:
+                connection = self._connections.pop()
+            else:
+                connection = None
+        if connection is None:
+            connection = WaveServerConnection(self.host, self.port,
+                                              timeout=self.timeout)
+        elif self.debug:
+            print("reusing connection to %s:%s" % (self.host, self.port))
+        connection.timeout = self.timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(self.timeout)
+        try:
+            return getWaveServerVRaw(connection, scnl, starttime, endtime)
+        finally:
+            if connection.sock is not None:
+                with self._lock:
+                    self._connections.append(connection)
 
     def getWaveform(self, network, station, location, channel, starttime,
                     endtime, cleanup=True):
@@ -96,28 +144,71 @@ class Client(object):
         """
         # replace wildcards in last char of channel and fetch all 3 components
         if channel[-1] in "?*":
-            st = Stream()
-            for comp in ("Z", "N", "E"):
-                channel_new = channel[:-1] + comp
-                st += self.getWaveform(network, station, location,
-                                       channel_new, starttime, endtime,
-                                       cleanup=cleanup)
-            return st
+            bulk = [(network, station, location, channel[:-1] + comp,
+                     starttime, endtime) for comp in ("Z", "N", "E")]
+            return self.getWaveformBulk(bulk, cleanup=cleanup)
         if location == '':
             location = '--'
         scnl = (station, channel, network, location)
         # fetch waveform
-        tbl = readWaveServerV(self.host, self.port, scnl, starttime, endtime,
-                              timeout=self.timeout)
-        # create new stream
-        st = Stream()
-        for tb in tbl:
-            st.append(tb.getObspyTrace())
+        dat = self._getRaw(scnl, starttime, endtime)
+        if not dat:
+            return Stream()
+        # create new stream, perfectly adjacent packets are merged while
+        # parsing
+        st = tracebuf2Stream(dat, merge=cleanup)
         if cleanup:
             st._cleanup()
         st.trim(starttime, endtime)
         return st
 
+    def getWaveformBulk(self, bulk, cleanup=True):
+        """
+        Retrieves waveform data of several channels from Earthworm Wave
+        Server and returns an ObsPy Stream object.
+
+        The channels are requested concurrently using up to
+        ``max_connections`` connections.
+
+        :type bulk: list
+        :param bulk: List of (network, station, location, channel,
+            starttime, endtime) tuples, see :meth:`getWaveform`. Wildcards
+            are not allowed.
+        :type cleanup: bool
+        :param cleanup: Specifies whether perfectly aligned traces should be
+            merged or not. See :meth:`obspy.core.stream.Stream.merge` for
+            ``method=-1``.
+        :return: ObsPy :class:`~obspy.core.stream.Stream` object with the
+            traces in the order of the requests.
+
+        .. rubric:: Example
+
+        >>> from obspy.earthworm import Client
+        >>> client = Client("pele.ess.washington.edu", 16017)
+        >>> dt = UTCDateTime() - 2000  # now - 2000 seconds
+        >>> bulk = [('UW', 'TUCA', '', 'BHZ', dt, dt + 10),
+        ...         ('UW', 'LON', '', 'BHZ', dt, dt + 10)]
+        >>> st = client.getWaveformBulk(bulk)  # doctest: +SKIP
+        """
+        def _request(args):
+            return self.getWaveform(*args, cleanup=cleanup)
+
+        st = Stream()
+        if not bulk:
+            return st
+        if len(bulk) == 1 or self.max_connections <= 1:
+            results = [_request(args) for args in bulk]
+        else:
+            pool = ThreadPool(min(self.max_connections, len(bulk)))
+            try:
+                results = pool.map(_request, bulk)
+            finally:
+                pool.close()
+                pool.join()
+        for part in results:
+            st += part
+        return st
+
     def saveWaveform(self, filename, network, station, location, channel,
                      starttime, endtime, format="MSEED", cleanup=True):
         """
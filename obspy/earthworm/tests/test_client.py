@@ -5,6 +5,9 @@ The obspy.earthworm.client test suite.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA @UnusedWildImport
+from future import standard_library
+with standard_library.hooks():
+    import socketserver
 
 from numpy import array
 from obspy import read
@@ -12,9 +15,66 @@ from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile
 from obspy.core.util.decorator import skip_on_network_error
 from obspy.earthworm import Client
+from obspy.earthworm.waveserver import tracebuf2Stream
+import numpy as np
+import struct
+import threading
 import unittest
 
 
+def _tracebuf2(net, sta, cha, starttime, data, datatype):
+    """
+    Returns one tracebuf2 packet.
+    """
+    endian = '>' if datatype[0] in 'ts' else '<'
+    rate = 20.0
+    header = struct.pack(
+        (endian + '2i3d7s9s4s3s2s3s2s2s').encode(), 0, len(data), starttime,
+        starttime + (len(data) - 1) / rate, rate, sta.encode(),
+        net.encode(), cha.encode(), b'--', b'20', datatype.encode(),
+        b'\x00\x00', b'\x00\x00')
+    dtype = endian + datatype[0].replace('s', 'i').replace('t', 'f') + \
+        datatype[1]
+    return header + np.require(data, dtype=dtype).tostring()
+
+
+class _WaveServerHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal Wave Server answering GETSCNLRAW requests on persistent
+    connections.
+    """
+    def handle(self):
+        self.server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tokens = line.decode().split()
+            rid, sta, cha, net, loc = tokens[1:6]
+            start, end = float(tokens[6]), float(tokens[7])
+            packets = self.server.packets.get((net, sta, cha), [])
+            data = b''.join(packet for t, packet in packets
+                            if start - 5 < t <= end)
+            flag = 'F' if data else 'FN'
+            response = '%s 0 %s %s %s %s %s i4 %f %f %i\n' % (
+                rid, sta, cha, net, loc, flag, start, end, len(data))
+            self.wfile.write(response.encode() + data)
+
+
+class _WaveServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, packets):
+        socketserver.TCPServer.__init__(self, ("127.0.0.1", 0),
+                                        _WaveServerHandler)
+        self.packets = packets
+        self.connections = 0
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+
 class ClientTestCase(unittest.TestCase):
     """
     Test cases for obspy.earthworm.client.Client.
@@ -116,8 +176,105 @@ class ClientTestCase(unittest.TestCase):
         self.assertTrue('UW.TUCA.--.BHZ' in seeds)
 
 
+class WaveServerTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.earthworm.client.Client using a local Wave Server.
+    """
+    def setUp(self):
+        np.random.seed(815)
+        self.start = UTCDateTime(2013, 1, 17)
+        self.data = {}
+        packets = {}
+        for cha, datatype in (('BHZ', 's4'), ('BHN', 'i4'), ('BHE', 'i2')):
+            data = np.random.randint(-1000, 1000, 1000).astype(np.int32)
+            self.data[cha] = data
+            packets[('UW', 'TUCA', cha)] = [
+                (self.start.timestamp + i / 20.0,
+                 _tracebuf2('UW', 'TUCA', cha, self.start.timestamp + i / 20.0,
+                            data[i:i + 100], datatype))
+                for i in range(0, 1000, 100)]
+        self.server = _WaveServer(packets)
+        self.client = Client("127.0.0.1", self.server.server_address[1],
+                             timeout=10)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_getWaveform(self):
+        """
+        Packets are merged into one trace, connections are reused.
+        """
+        start = self.start
+        st = self.client.getWaveform('UW', 'TUCA', '', 'BHZ', start,
+                                     start + 49.95)
+        self.assertEqual(len(st), 1)
+        self.assertEqual(st[0].id, 'UW.TUCA..BHZ')
+        self.assertEqual(st[0].stats.starttime, start)
+        self.assertEqual(st[0].stats.sampling_rate, 20.0)
+        np.testing.assert_array_equal(st[0].data, self.data['BHZ'])
+        st = self.client.getWaveform('UW', 'TUCA', '', 'BHZ', start + 10,
+                                     start + 19.95, cleanup=False)
+        self.assertEqual(len(st), 2)
+        np.testing.assert_array_equal(np.concatenate([tr.data for tr in st]),
+                                      self.data['BHZ'][200:400])
+        # no data
+        st = self.client.getWaveform('UW', 'TUCA', '', 'BHX', start,
+                                     start + 10)
+        self.assertEqual(len(st), 0)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_getWaveformBulk(self):
+        """
+        Several channels are requested concurrently.
+        """
+        start = self.start
+        st = self.client.getWaveform('UW', 'TUCA', '', 'BH?', start,
+                                     start + 49.95)
+        self.assertEqual([tr.stats.channel for tr in st],
+                         ['BHZ', 'BHN', 'BHE'])
+        for tr in st:
+            np.testing.assert_array_equal(tr.data,
+                                          self.data[tr.stats.channel])
+        self.assertTrue(1 <= self.server.connections <= 3)
+        connections = self.server.connections
+        bulk = [('UW', 'TUCA', '', cha, start, start + 4.95)
+                for cha in ('BHE', 'BHZ')] * 3
+        st = self.client.getWaveformBulk(bulk)
+        self.assertEqual([tr.stats.channel for tr in st],
+                         ['BHE', 'BHZ'] * 3)
+        self.assertTrue(self.server.connections <= 4)
+        self.assertTrue(self.server.connections >= connections)
+
+    def test_tracebuf2Stream(self):
+        """
+        Only perfectly adjacent packets are merged.
+        """
+        t = self.start.timestamp
+        data = np.arange(10)
+        dat = b''.join([_tracebuf2('UW', 'TUCA', 'BHZ', t, data, 's4'),
+                        _tracebuf2('UW', 'TUCA', 'BHN', t, data, 'i2'),
+                        _tracebuf2('UW', 'TUCA', 'BHZ', t + 0.5, data, 's4'),
+                        _tracebuf2('UW', 'TUCA', 'BHZ', t + 1.5, data, 's4'),
+                        _tracebuf2('UW', 'TUCA', 'BHZ', t + 2.0, data, 'i4')])
+        st = tracebuf2Stream(dat)
+        self.assertEqual([(tr.stats.channel, len(tr)) for tr in st],
+                         [('BHZ', 20), ('BHN', 10), ('BHZ', 10), ('BHZ', 10)])
+        np.testing.assert_array_equal(st[0].data, np.concatenate([data] * 2))
+        self.assertEqual(st[0].data.dtype, np.dtype('=i4'))
+        self.assertEqual(st[1].data.dtype, np.dtype('=i2'))
+        self.assertEqual(st[2].stats.starttime, UTCDateTime(t + 1.5))
+        self.assertEqual(len(tracebuf2Stream(dat, merge=False)), 5)
+        # incomplete packet
+        self.assertEqual(len(tracebuf2Stream(dat[:-1])), 3)
+
+
 def suite():
-    return unittest.makeSuite(ClientTestCase, 'test')
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ClientTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(WaveServerTestCase, 'test'))
+    return suite
 
 
 if __name__ == '__main__':
@@ -76,7 +76,7 @@ class tracebuf2:
         Parse tracebuf header into class variables
         """
         packStr = b'2i3d7s9s4s3s2s3s2s2s'
-        dtype = head[-7:-5]
+        dtype = head[-7:-5].decode('ascii', 'replace')
         if dtype[0] in 'ts':
             endian = b'>'
         elif dtype[0] in 'if':
@@ -87,7 +87,7 @@ class tracebuf2:
         (self.pinno, self.ndata, ts, te, self.rate, self.sta, self.net,
          self.chan, self.loc, self.version, tp, self.qual, _pad) = \
             struct.unpack(endian + packStr, head)
-        if not tp.startswith(dtype):
+        if not tp.decode('ascii', 'replace').startswith(dtype):
             print('Error parsing header: %s!=%s' % (dtype, tp))
         self.start = UTCDateTime(ts)
         self.end = UTCDateTime(te)
@@ -132,26 +132,40 @@ def sendSockReq(server, port, reqStr, timeout=None):
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.settimeout(timeout)
     s.connect((server, port))
-    if reqStr[-1] == '\n':
-        s.send(reqStr)
-    else:
-        s.send(reqStr + '\n')
+    s.sendall(_requestBytes(reqStr))
     return s
 
 
+def _requestBytes(reqStr):
+    """
+    Returns the newline terminated request as bytes.
+    """
+    if not isinstance(reqStr, bytes):
+        reqStr = reqStr.encode('ascii', 'strict')
+    if not reqStr.endswith(b'\n'):
+        reqStr += b'\n'
+    return reqStr
+
+
 def getSockCharLine(sock, timeout=10.):
     """
     Retrieves one newline terminated string from input open socket
     """
     sock.settimeout(timeout)
     chunks = []
-    indat = b'^'
     try:
-        while indat[-1] != b'\n':
-            # see http://obspy.org/ticket/383
-            # indat = sock.recv(8192)
-            indat = sock.recv(1)
-            chunks.append(indat)
+        while True:
+            # Look at the pending data without consuming it and only take
+            # the line, the data following it belongs to the caller (see
+            # http://obspy.org/ticket/383).
+            indat = sock.recv(8192, socket.MSG_PEEK)
+            if not indat:
+                break
+            end = indat.find(b'\n')
+            if end >= 0:
+                chunks.append(sock.recv(end + 1))
+                break
+            chunks.append(sock.recv(len(indat)))
     except socket.timeout:
         print('socket timeout in getSockCharLine()')
         return None
@@ -172,14 +186,16 @@ def getSockBytes(sock, nbytes, timeout=None):
     btoread = nbytes
     try:
         while btoread:
-            indat = sock.recv(min(btoread, 8192))
+            indat = sock.recv(min(btoread, 65536))
+            if not indat:
+                break
             btoread -= len(indat)
             chunks.append(indat)
     except socket.timeout:
         print('socket timeout in getSockBytes()')
         return None
     if chunks:
-        response = ''.join(chunks)
+        response = b''.join(chunks)
         return response
     else:
         return None
@@ -232,28 +248,162 @@ def getMenu(server, port, scnl=None, timeout=None):
     return []
 
 
-def readWaveServerV(server, port, scnl, start, end, timeout=None):
+class WaveServerConnection(object):
     """
-    Reads data for specified time interval and scnl on specified waveserverV.
+    Persistent connection to a Wave Server.
 
-    Returns list of tracebuf2 objects
+    The socket is opened on the first request and kept open for further
+    requests. Responses are read through a receive buffer in large chunks.
+    If the server closed the connection in the meantime, the request is
+    repeated once with a new connection.
+
+    :type server: str
+    :param server: Host name of the Wave Server.
+    :type port: int
+    :param port: Port of the Wave Server.
+    :type timeout: float, optional
+    :param timeout: Socket timeout in seconds.
+    """
+    RECV_SIZE = 65536
+
+    def __init__(self, server, port, timeout=None):
+        self.server = server
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+        self._buffer = bytearray()
+
+    def close(self):
+        """
+        Closes the socket.
+        """
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except socket.error:
+                pass
+        self.sock = None
+        self._buffer = bytearray()
+
+    def request(self, reqStr):
+        """
+        Sends a request and returns the first line of the response (without
+        the newline).
+
+        Further response data has to be read with :meth:`readBytes` before
+        the next request.
+        """
+        reqStr = _requestBytes(reqStr)
+        reused = self.sock is not None
+        try:
+            if not reused:
+                self.sock = socket.create_connection(
+                    (self.server, self.port), self.timeout)
+            self.sock.sendall(reqStr)
+            return self.readLine()
+        except socket.timeout:
+            self.close()
+            raise
+        except (socket.error, EOFError):
+            self.close()
+            if not reused:
+                raise
+        # idle connection was closed by the server
+        return self.request(reqStr)
+
+    def _fill(self):
+        data = self.sock.recv(self.RECV_SIZE)
+        if not data:
+            raise EOFError("connection closed by Wave Server")
+        self._buffer.extend(data)
+
+    def readLine(self):
+        """
+        Reads one newline terminated line.
+        """
+        start = 0
+        while True:
+            end = self._buffer.find(b'\n', start)
+            if end >= 0:
+                break
+            start = len(self._buffer)
+            self._fill()
+        line = bytes(self._buffer[:end])
+        del self._buffer[:end + 1]
+        return line
+
+    def readBytes(self, nbytes):
+        """
+        Reads exactly nbytes bytes.
+        """
+        if len(self._buffer) < nbytes:
+            chunks = [bytes(self._buffer)]
+            missing = nbytes - len(self._buffer)
+            self._buffer = bytearray()
+            while missing > 0:
+                data = self.sock.recv(max(missing, self.RECV_SIZE))
+                if not data:
+                    self.close()
+                    raise EOFError("connection closed by Wave Server")
+                chunks.append(data)
+                missing -= len(data)
+            data = b''.join(chunks)
+            if missing < 0:
+                self._buffer.extend(data[nbytes:])
+                data = data[:nbytes]
+            return data
+        data = bytes(self._buffer[:nbytes])
+        del self._buffer[:nbytes]
+        return data
+
+
+def getWaveServerVRaw(connection, scnl, start, end):
+    """
+    Requests data for specified time interval and scnl over an open
+    :class:`WaveServerConnection`.
+
+    Returns the raw tracebuf2 packets as bytes or None if there is no data.
     """
     rid = 'rwserv'
     scnlstr = '%s %s %s %s' % scnl
     reqstr = 'GETSCNLRAW: %s %s %f %f\n' % (rid, scnlstr, start, end)
-    sock = sendSockReq(server, port, reqstr, timeout=timeout)
-    r = getSockCharLine(sock, timeout=timeout)
-    if not r:
-        return []
+    try:
+        r = connection.request(reqstr)
+    except socket.timeout:
+        print('socket timeout in getWaveServerVRaw()')
+        return None
+    except EOFError:
+        print('connection closed by Wave Server in getWaveServerVRaw()')
+        return None
     tokens = r.decode().split()
     flag = tokens[6]
     if flag != 'F':
         msg = 'readWaveServerV returned flag %s - %s'
-        print(msg % (flag, RETURNFLAG_KEY[flag]))
-        return []
+        print(msg % (flag, RETURNFLAG_KEY.get(flag, '')))
+        return None
     nbytes = int(tokens[-1])
-    dat = getSockBytes(sock, nbytes, timeout=timeout)
-    sock.close()
+    try:
+        return connection.readBytes(nbytes)
+    except (socket.timeout, EOFError):
+        # the rest of the response would corrupt further requests
+        connection.close()
+        print('incomplete response in getWaveServerVRaw()')
+        return None
+
+
+def readWaveServerV(server, port, scnl, start, end, timeout=None):
+    """
+    Reads data for specified time interval and scnl on specified waveserverV.
+
+    Returns list of tracebuf2 objects
+    """
+    connection = WaveServerConnection(server, port, timeout=timeout)
+    try:
+        dat = getWaveServerVRaw(connection, scnl, start, end)
+    finally:
+        connection.close()
+    if not dat:
+        return []
     tbl = []
     new = tracebuf2()  # empty..filled below
     bytesread = 1
@@ -278,3 +428,63 @@ def tracebufs2obspyStream(tbuflist):
         tlist.append(tb.getObspyTrace())
     strm = Stream(tlist)
     return strm
+
+
+def tracebuf2Stream(dat, merge=True):
+    """
+    Returns obspy.Stream object from raw tracebuf2 packets.
+
+    Only the packet headers are parsed one by one. The data of consecutive
+    packets of a channel which are perfectly adjacent is copied into one
+    array, so there is one trace per contiguous data segment instead of one
+    trace per packet (unless merge is False).
+    """
+    segments = []
+    # last segment by channel
+    current = {}
+    p = 0
+    while p + 64 <= len(dat):
+        dtype = dat[p + 57:p + 59].decode('ascii', 'replace')
+        if dtype not in DATATYPE_KEY:
+            print('unknown data type %s in tracebuf2 header' % dtype)
+            break
+        tp = getNumpyType(dtype)
+        endian = b'>' if dtype[0] in 'ts' else b'<'
+        (_pinno, ndata, ts, _te, rate, sta, net, chan, loc) = \
+            struct.unpack(endian + b'2i3d7s9s4s3s', dat[p:p + 55])
+        nbytes = 64 + ndata * tp.itemsize
+        if p + nbytes > len(dat):
+            break
+        key = (net, sta, loc, chan)
+        seg = current.get(key)
+        if not merge or seg is None or seg['dtype'] != tp or \
+                seg['rate'] != rate or not rate or \
+                round(ts - seg['start'] - seg['npts'] / rate,
+                      UTCDateTime.DEFAULT_PRECISION) != 0:
+            seg = {'key': key, 'start': ts, 'rate': rate, 'dtype': tp,
+                   'npts': 0, 'packets': []}
+            segments.append(seg)
+            current[key] = seg
+        seg['packets'].append((p + 64, ndata))
+        seg['npts'] += ndata
+        p += nbytes
+    traces = []
+    for seg in segments:
+        data = np.empty(seg['npts'], dtype=seg['dtype'].newbyteorder('='))
+        i = 0
+        for offset, ndata in seg['packets']:
+            data[i:i + ndata] = np.frombuffer(dat, seg['dtype'], ndata,
+                                              offset)
+            i += ndata
+        net, sta, loc, chan = [x.split(b'\x00')[0].decode()
+                               for x in seg['key']]
+        stat = Stats()
+        stat.network = net
+        stat.station = sta
+        stat.location = '' if loc == '--' else loc
+        stat.channel = chan
+        stat.starttime = UTCDateTime(seg['start'])
+        stat.sampling_rate = seg['rate']
+        stat.npts = len(data)
+        traces.append(Trace(data=data, header=stat))
+    return Stream(traces)
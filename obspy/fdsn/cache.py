@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Local on-disk cache for parsed FDSN web service responses.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    import urllib.parse
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+
+class ResponseCache(object):
+    """
+    Cache of parsed web service responses stored as pickle files.
+
+    Every entry is one file in ``directory``, named by a hash of the
+    normalized request. Entries older than ``ttl`` are revalidated with the
+    server (using the ``ETag``/``Last-Modified`` headers of the original
+    response, if the server sent any) before being used again. If the total
+    size of the cache exceeds ``max_size``, the least recently used entries
+    are removed. The cache can be shared by several clients and processes.
+
+    :type directory: str
+    :param directory: Directory for the cache files. Created if necessary.
+    :type ttl: float, optional
+    :param ttl: Time in seconds for which an entry is used without asking
+        the server.
+    :type max_size: int, optional
+    :param max_size: Maximum total size of all cache files in bytes.
+
+    .. rubric:: Example
+
+    >>> from obspy.fdsn import Client
+    >>> from obspy.fdsn.cache import ResponseCache
+    >>> cache = ResponseCache("/tmp/fdsn_cache", ttl=3600)  # doctest: +SKIP
+    >>> client = Client("IRIS", cache=cache)  # doctest: +SKIP
+    >>> inv = client.get_stations(network="IU")  # doctest: +SKIP
+    >>> inv = client.get_stations(network="IU")  # doctest: +SKIP
+    """
+    def __init__(self, directory, ttl=3600.0, max_size=100 * 1024 ** 2):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(directory):
+                    raise
+
+    @staticmethod
+    def key(url, data=None):
+        """
+        Returns a normalized key for a request: the query parameters are
+        sorted and the body of POST requests is included.
+
+        >>> ResponseCache.key("http://example.com/query?b=2&a=1") == \\
+        ...     ResponseCache.key("http://example.com/query?a=1&b=2")
+        True
+        """
+        parts = urllib.parse.urlsplit(url)
+        query = urllib.parse.urlencode(
+            sorted(urllib.parse.parse_qsl(parts.query,
+                                          keep_blank_values=True)))
+        key = urllib.parse.urlunsplit(
+            (parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+        if data is not None:
+            if not isinstance(data, bytes):
+                data = data.encode("utf-8")
+            key = key.encode("utf-8") + b"\n" + data
+        else:
+            key = key.encode("utf-8")
+        return key
+
+    def _filename(self, key):
+        return os.path.join(self.directory,
+                            hashlib.sha1(key).hexdigest() + ".pickle")
+
+    def get(self, key):
+        """
+        Returns the entry stored for key or ``None``.
+
+        An entry is a dictionary with keys ``'object'`` (the cached object),
+        ``'time'`` (time of storage or last revalidation as POSIX
+        timestamp), ``'etag'`` and ``'last_modified'``.
+        """
+        filename = self._filename(key)
+        try:
+            with open(filename, "rb") as fh:
+                entry = pickle.load(fh)
+        except Exception:
+            # missing or broken file or an object pickled by an
+            # incompatible version
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        # mark as recently used
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return entry
+
+    def is_fresh(self, entry):
+        """
+        Returns whether an entry can be used without revalidation.
+        """
+        return time.time() - entry["time"] < self.ttl
+
+    def put(self, key, obj, etag=None, last_modified=None):
+        """
+        Stores an object, replacing any previous entry for key.
+        """
+        entry = {"key": key, "object": obj, "time": time.time(),
+                 "etag": etag, "last_modified": last_modified}
+        filename = self._filename(key)
+        fd, tempname = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(filename):
+                # os.rename does not replace existing files on Windows
+                os.remove(filename)
+            os.rename(tempname, filename)
+        except:
+            if os.path.exists(tempname):
+                os.remove(tempname)
+            raise
+        self._evict()
+
+    def refresh(self, key, entry):
+        """
+        Marks an entry as revalidated by the server.
+        """
+        self.put(key, entry["object"], etag=entry["etag"],
+                 last_modified=entry["last_modified"])
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        for filename in self._files():
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def _files(self):
+        return [os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".pickle")]
+
+    def _evict(self):
+        """
+        Removes least recently used entries until the cache is small
+        enough.
+        """
+        files = []
+        total = 0
+        for filename in self._files():
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, filename))
+            total += stat.st_size
+        files.sort()
+        while total > self.max_size and files:
+            _, size, filename = files.pop(0)
+            try:
+                os.remove(filename)
+            except OSError:
+                continue
+            total -= size
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -15,7 +15,7 @@ from future.builtins import *  # NOQA
 from future.utils import PY2, native_str
 from future import standard_library
 with standard_library.hooks():
-    import queue
+    import http.client
     import urllib.parse
     import urllib.request
     from collections import OrderedDict
@@ -23,6 +23,7 @@ with standard_library.hooks():
 import copy
 import obspy
 from obspy import UTCDateTime, read_inventory
+from obspy.fdsn.cache import ResponseCache
 from obspy.fdsn.wadl_parser import WADLParser
 from obspy.fdsn.header import DEFAULT_USER_AGENT, \
     URL_MAPPINGS, DEFAULT_PARAMETERS, PARAMETER_ALIASES, \
@@ -32,13 +33,30 @@ from obspy.core.util.misc import wrap_long_string
 import collections
 import io
 from lxml import etree
+from multiprocessing.pool import ThreadPool
+import shutil
+import socket
 import threading
+import time
 import warnings
 import os
 
 
 DEFAULT_SERVICE_VERSIONS = {'dataselect': 1, 'station': 1, 'event': 1}
 
+# HTTP codes of temporary errors after which a request is retried (None
+# stands for no response at all) and the initial waiting time in seconds.
+RETRY_CODES = (None, 429, 500, 502, 503, 504)
+RETRY_BACKOFF = 1.0
+
+# Directory and expiry time in seconds of the on-disk cache of discovered
+# services.
+DEFAULT_DISCOVERY_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".obspy",
+                                           "fdsn_discovery")
+DISCOVERY_CACHE_TTL = 24 * 3600.0
+# Maximum time in seconds to wait for the service discovery downloads.
+DISCOVERY_TIMEOUT = 15.0
+
 
 class Client(object):
     """
@@ -52,7 +70,8 @@ class Client(object):
 
     def __init__(self, base_url="IRIS", major_versions=None, user=None,
                  password=None, user_agent=DEFAULT_USER_AGENT, debug=False,
-                 timeout=120, service_mappings=None):
+                 timeout=120, service_mappings=None, cache=None,
+                 discovery_cache=True, keep_alive=True):
         """
         Initializes an FDSN Web Service client.
 
@@ -99,10 +118,32 @@ class Client(object):
             indicated by ``base_url`` and ``major_versions`` will be used. Any
             service that is manually specified as ``None`` (e.g.
             ``service_mappings={'event': None}``) will be deactivated.
+        :type cache: str or :class:`~obspy.fdsn.cache.ResponseCache`
+        :param cache: Directory or cache object for caching the parsed
+            results of event and station queries on disk, see
+            :class:`~obspy.fdsn.cache.ResponseCache`. Disabled by default.
+        :type discovery_cache: bool, str or
+            :class:`~obspy.fdsn.cache.ResponseCache`
+        :param discovery_cache: Directory or cache object for storing the
+            discovered services on disk, so later clients (also in other
+            processes) do not need to download and parse the WADL files
+            again. ``True`` uses ``~/.obspy/fdsn_discovery`` with an expiry
+            time of one day, ``False`` disables the cache.
+        :type keep_alive: bool
+        :param keep_alive: Reuse the connections to the server for later
+            requests. Requests are sent through urllib instead if a proxy is
+            configured (e.g. with the ``HTTP_PROXY`` environment variable),
+            a custom opener is installed with
+            :func:`urllib.request.install_opener` or for authenticated
+            clients.
         """
         self.debug = debug
         self.user = user
         self.timeout = timeout
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache)
+        self.cache = cache
+        self._discovery_cache = discovery_cache
 
         # Cache for the webservice versions. This makes interactive use of
         # the client more convenient.
@@ -125,6 +166,13 @@ class Client(object):
             # install globally
             urllib.request.install_opener(opener)
 
+        # Keep-alive connections for all requests. Authenticated requests go
+        # through the globally installed urllib opener.
+        if keep_alive and user is None:
+            self._keep_alive_pool = ConnectionPool()
+        else:
+            self._keep_alive_pool = None
+
         self.request_headers = {"User-Agent": user_agent}
         # Avoid mutable kwarg.
         if major_versions is None:
@@ -148,6 +196,16 @@ class Client(object):
 
         self._discover_services()
 
+    @property
+    def _connection_pool(self):
+        """
+        The pool of kept-alive connections, ``None`` if the requests have to
+        go through urllib to use proxies or a custom opener.
+        """
+        if self._keep_alive_pool is None or _urllib_configured():
+            return None
+        return self._keep_alive_pool
+
     def get_events(self, starttime=None, endtime=None, minlatitude=None,
                    maxlatitude=None, minlongitude=None, maxlongitude=None,
                    latitude=None, longitude=None, minradius=None,
@@ -280,15 +338,12 @@ class Client(object):
         url = self._create_url_from_parameters(
             "event", DEFAULT_PARAMETERS['event'], kwargs)
 
-        data_stream = self._download(url)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            cat = obspy.readEvents(data_stream, format="quakeml")
-            data_stream.close()
-            return cat
+            self._download(url, filename=filename)
+            return
+        return self._get_parsed(
+            url, lambda data_stream: obspy.readEvents(data_stream,
+                                                      format="quakeml"))
 
     def get_stations(self, starttime=None, endtime=None, startbefore=None,
                      startafter=None, endbefore=None, endafter=None,
@@ -473,15 +528,12 @@ class Client(object):
         url = self._create_url_from_parameters(
             "station", DEFAULT_PARAMETERS['station'], kwargs)
 
-        data_stream = self._download(url)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            inventory = read_inventory(data_stream, format="STATIONXML")
-            data_stream.close()
-            return inventory
+            self._download(url, filename=filename)
+            return
+        return self._get_parsed(
+            url, lambda data_stream: read_inventory(data_stream,
+                                                    format="STATIONXML"))
 
     def get_waveforms(self, network, station, location, channel, starttime,
                       endtime, quality=None, minimumlength=None,
@@ -588,17 +640,16 @@ class Client(object):
         url = self._create_url_from_parameters(
             "dataselect", DEFAULT_PARAMETERS['dataselect'], kwargs)
 
+        if filename:
+            self._download(url, filename=filename)
+            return
         data_stream = self._download(url)
         data_stream.seek(0, 0)
-        if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            st = obspy.read(data_stream, format="MSEED")
-            data_stream.close()
-            if attach_response:
-                self._attach_responses(st)
-            return st
+        st = obspy.read(data_stream, format="MSEED")
+        data_stream.close()
+        if attach_response:
+            self._attach_responses(st)
+        return st
 
     def _attach_responses(self, st):
         """
@@ -628,7 +679,8 @@ class Client(object):
 
     def get_waveforms_bulk(self, bulk, quality=None, minimumlength=None,
                            longestonly=None, filename=None,
-                           attach_response=False, **kwargs):
+                           attach_response=False, parallel=None, chunk=None,
+                           retries=0, **kwargs):
         r"""
         Query the dataselect service of the client. Bulk request.
 
@@ -745,6 +797,21 @@ class Client(object):
             in the result set. A warning will be shown if a response can not be
             found for a channel. Does nothing if output to a file was
             specified.
+        :type parallel: int, optional
+        :param parallel: If given, the request is split into one request per
+            station (and time chunk, see ``chunk``) and up to ``parallel`` of
+            these are sent concurrently.
+        :type chunk: float, optional
+        :param chunk: If given, the request is split into one request per
+            station and time window of at most ``chunk`` seconds. Records
+            overlapping the borders of the time windows are sent twice by
+            the server; they are merged in the returned stream but written
+            twice to ``filename``. The parts written to ``filename`` are
+            in the order of the split requests.
+        :type retries: int, optional
+        :param retries: Number of times a request is repeated after temporary
+            errors (no response or HTTP codes 429, 500, 502, 503 and 504),
+            waiting 1, 2, 4, ... seconds in between.
 
         Any additional keyword arguments will be passed to the webservice as
         additional arguments. If you pass one of the default parameters and the
@@ -761,23 +828,121 @@ class Client(object):
             minimumlength=minimumlength,
             longestonly=longestonly
         )
-        bulk = self._get_bulk_string(bulk, arguments)
-
         url = self._build_url("dataselect", "query")
 
-        data_stream = self._download(url,
-                                     data=bulk.encode('ascii', 'strict'))
-        data_stream.seek(0, 0)
-        if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+        if parallel is not None or chunk is not None:
+            st = self._get_waveforms_bulk_split(
+                url, bulk, arguments, parallel or 1, chunk, filename,
+                retries)
         else:
+            bulk = self._get_bulk_string(bulk, arguments)
+            data = bulk.encode('ascii', 'strict')
+            if filename:
+                self._download(url, data=data, filename=filename,
+                               retries=retries)
+                return
+            data_stream = self._download(url, data=data, retries=retries)
+            data_stream.seek(0, 0)
+            st = obspy.read(data_stream, format="MSEED")
+            data_stream.close()
+        if filename:
+            return
+        if attach_response:
+            self._attach_responses(st)
+        return st
+
+    def _get_waveforms_bulk_split(self, url, bulk, arguments, parallel,
+                                  chunk, filename, retries):
+        """
+        Splits a bulk request by station and time and sends the parts
+        concurrently. See :meth:`get_waveforms_bulk`.
+        """
+        requests = _split_bulk(self._get_bulk_list(bulk, arguments), chunk)
+        if not requests:
+            raise ValueError("Empty bulk request.")
+
+        def _request(lines):
+            tmp = ["%s=%s" % (key, convert_to_string(value))
+                   for key, value in arguments.items() if value is not None]
+            tmp += [" ".join((net, sta, loc or "--", cha,
+                              convert_to_string(t1), convert_to_string(t2)))
+                    for net, sta, loc, cha, t1, t2 in lines]
+            data = "\n".join(tmp).encode('ascii', 'strict')
+            data_stream = self._download(url, data=data, retries=retries,
+                                         no_data_ok=True)
+            if data_stream is None or filename:
+                return data_stream
+            data_stream.seek(0, 0)
             st = obspy.read(data_stream, format="MSEED")
             data_stream.close()
-            if attach_response:
-                self._attach_responses(st)
             return st
 
+        pool = ThreadPool(min(parallel, len(requests)))
+        try:
+            results = pool.imap(_request, requests)
+            if filename:
+                # write the parts in order as they arrive
+                if hasattr(filename, "write"):
+                    fh = filename
+                else:
+                    fh = open(filename, "wb")
+                try:
+                    got_data = False
+                    for data_stream in results:
+                        if data_stream is None:
+                            continue
+                        got_data = True
+                        data_stream.seek(0, 0)
+                        shutil.copyfileobj(data_stream, fh)
+                        data_stream.close()
+                finally:
+                    if fh is not filename:
+                        fh.close()
+                if not got_data:
+                    if fh is not filename:
+                        os.remove(filename)
+                    raise FDSNException("No data available for request.")
+                return
+            st = obspy.Stream()
+            for part in results:
+                if part is not None:
+                    st += part
+        finally:
+            pool.close()
+            pool.join()
+        if not st:
+            raise FDSNException("No data available for request.")
+        # records at the borders of the time chunks are sent twice
+        st.merge(method=-1)
+        return st
+
+    def _get_bulk_list(self, bulk, arguments):
+        """
+        Returns a bulk request as list of lists of network, station,
+        location, channel, starttime and endtime. Parameters given in a
+        request string/file are stored in ``arguments``.
+        """
+        if isinstance(bulk, collections.Iterable) \
+                and not hasattr(bulk, "read") \
+                and not isinstance(bulk, (str, native_str)):
+            return [tuple(line) for line in bulk]
+        bulk = self._get_bulk_string(bulk, {})
+        lines = []
+        for line in bulk.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if "=" in line:
+                key, value = line.split("=", 1)
+                arguments[key.strip()] = value.strip()
+                continue
+            net, sta, loc, cha, t1, t2 = line.split()
+            if loc == "--":
+                loc = ""
+            lines.append((net, sta, loc, cha, UTCDateTime(t1),
+                          UTCDateTime(t2)))
+        return lines
+
     def get_stations_bulk(self, bulk, level=None, includerestricted=None,
                           includeavailability=None, filename=None, **kwargs):
         r"""
@@ -919,17 +1084,13 @@ class Client(object):
 
         url = self._build_url("station", "query")
 
-        data_stream = self._download(url,
-                                     data=bulk.encode('ascii', 'strict'))
-        data_stream.seek(0, 0)
+        data = bulk.encode('ascii', 'strict')
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            self._download(url, data=data, filename=filename)
             return
-        else:
-            inv = obspy.read_inventory(data_stream, format="stationxml")
-            data_stream.close()
-            return inv
+        return self._get_parsed(
+            url, lambda data_stream: obspy.read_inventory(
+                data_stream, format="stationxml"), data=data)
 
     def _get_bulk_string(self, bulk, arguments):
         locs = locals()
@@ -968,13 +1129,6 @@ class Client(object):
                 raise NotImplementedError(msg)
         return bulk
 
-    def _write_to_file_object(self, filename_or_object, data_stream):
-        if hasattr(filename_or_object, "write"):
-            filename_or_object.write(data_stream.read())
-            return
-        with open(filename_or_object, "wb") as fh:
-            fh.write(data_stream.read())
-
     def _create_url_from_parameters(self, service, default_params, parameters):
         """
         """
@@ -1154,12 +1308,102 @@ class Client(object):
 
         print("\n".join(msg))
 
-    def _download(self, url, return_string=False, data=None):
-        code, data = download_url(
-            url, headers=self.request_headers, debug=self.debug,
-            return_string=return_string, data=data, timeout=self.timeout)
+    def _get_parsed(self, url, parse, data=None):
+        """
+        Downloads url and returns the response parsed by the function parse.
+
+        If the client has a cache, fresh cached results are returned
+        directly. Stale ones are revalidated with the server if it sent an
+        ``ETag`` or ``Last-Modified`` header with the original response.
+        """
+        if self.cache is None:
+            data_stream = self._download(url, data=data)
+            data_stream.seek(0, 0)
+            result = parse(data_stream)
+            data_stream.close()
+            return result
+
+        key = self.cache.key(url, data)
+        entry = self.cache.get(key)
+        headers = {}
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                if self.debug is True:
+                    print("Loading %s from cache." % url)
+                return entry["object"]
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response_headers = {}
+        data_stream = self._download(url, data=data, headers=headers,
+                                     response_headers=response_headers)
+        if data_stream is None:
+            # not modified
+            self.cache.refresh(key, entry)
+            return entry["object"]
+        data_stream.seek(0, 0)
+        result = parse(data_stream)
+        data_stream.close()
+        self.cache.put(key, result, etag=response_headers.get("etag"),
+                       last_modified=response_headers.get("last-modified"))
+        return result
+
+    def _download(self, url, return_string=False, data=None, filename=None,
+                  retries=0, no_data_ok=False, headers=None,
+                  response_headers=None):
+        """
+        Downloads url and raises an appropriate exception for any HTTP code
+        but 200 (and 304 for conditional requests, returning ``None``).
+
+        :param filename: File name or open file object the response is
+            streamed to instead of returning it.
+        :param retries: Number of times the request is repeated after a
+            temporary error, see ``RETRY_CODES``.
+        :param no_data_ok: Return ``None`` instead of raising if the request
+            does not yield any data.
+        :param headers: Additional request headers.
+        :param response_headers: Dictionary which is filled with the
+            response headers (lower case names).
+        """
+        if filename is not None and not hasattr(filename, "write"):
+            with open(filename, "wb") as fh:
+                try:
+                    self._download(url, data=data, filename=fh,
+                                   retries=retries, no_data_ok=no_data_ok,
+                                   headers=headers,
+                                   response_headers=response_headers)
+                except Exception:
+                    fh.close()
+                    os.remove(filename)
+                    raise
+            return
+        request_headers = self.request_headers
+        if headers:
+            request_headers = dict(request_headers)
+            request_headers.update(headers)
+        kwargs = {}
+        if response_headers is not None:
+            kwargs["response_headers"] = response_headers
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            code, data_ = download_url(
+                url, headers=request_headers, debug=self.debug,
+                return_string=return_string, data=data, timeout=self.timeout,
+                connection_pool=self._connection_pool, fh=filename, **kwargs)
+            if code not in RETRY_CODES:
+                break
+        data = data_
+        if code is None:
+            raise FDSNException("No response from server.")
+        # Not modified, only possible for conditional requests.
+        elif code == 304:
+            return None
         # No data.
-        if code == 204:
+        elif code == 204:
+            if no_data_ok:
+                return None
             raise FDSNException("No data available for request.")
         elif code == 400:
             msg = "Bad request. Please contact the developers."
@@ -1228,42 +1472,49 @@ class Client(object):
                 self.__service_discovery_cache[url_hash])
             return
 
-        # Request all in parallel.
-        wadl_queue = queue.Queue()
+        # The on-disk cache is specific to the ObsPy version as the parsed
+        # services depend on the WADL parser.
+        disk_cache = self._get_discovery_cache()
+        disk_key = "\n".join(
+            ["obspy %s" % obspy.__version__] + sorted(urls)).encode("utf-8")
+        if disk_cache is not None:
+            entry = disk_cache.get(disk_key)
+            if entry is not None and disk_cache.is_fresh(entry):
+                if self.debug is True:
+                    print("Loading discovered services from disk cache.")
+                self.services = entry["object"]
+                self.__service_discovery_cache[url_hash] = \
+                    copy.deepcopy(self.services)
+                return
 
+        # Request all in parallel.
         headers = self.request_headers
         debug = self.debug
-
-        def get_download_thread(url):
-            class ThreadURL(threading.Thread):
-                def run(self):
-                    # Catch 404s.
-                    try:
-                        code, data = download_url(url, headers=headers,
-                                                  debug=debug)
-                        if code == 200:
-                            wadl_queue.put((url, data))
-                        else:
-                            wadl_queue.put((url, None))
-                    except urllib.request.HTTPError as e:
-                        if e.code == 404:
-                            wadl_queue.put((url, None))
-                        else:
-                            raise
-            return ThreadURL()
-
-        threads = list(map(get_download_thread, urls))
-        for thread in threads:
-            thread.start()
-        for thread in threads:
-            thread.join(15)
+        connection_pool = self._connection_pool
+
+        def download(url):
+            return download_url(url, headers=headers, debug=debug,
+                                connection_pool=connection_pool)
+
+        pool = _get_discovery_pool()
+        results = [pool.apply_async(download, (url,)) for url in urls]
+        deadline = time.time() + DISCOVERY_TIMEOUT
+        wadls = []
+        # Only store complete results on disk, not the ones affected by a
+        # temporary problem.
+        complete = True
+        for url, result in zip(urls, results):
+            try:
+                code, data = result.get(max(deadline - time.time(), 0))
+            except Exception:
+                code, data = None, None
+            if code == 200:
+                wadls.append((url, data))
+            elif code is None or code in RETRY_CODES:
+                complete = False
 
         self.services = {}
-        for _ in range(wadl_queue.qsize()):
-            item = wadl_queue.get()
-            url, wadl = item
-            if wadl is None:
-                continue
+        for url, wadl in wadls:
             if "dataselect" in url:
                 self.services["dataselect"] = WADLParser(wadl).parameters
                 if self.debug is True:
@@ -1302,6 +1553,30 @@ class Client(object):
             print("Storing discovered services in cache.")
         self.__service_discovery_cache[url_hash] = \
             copy.deepcopy(self.services)
+        if disk_cache is not None and complete:
+            try:
+                disk_cache.put(disk_key, self.services)
+            except Exception as e:
+                msg = "Could not store discovered services on disk: %s" % e
+                warnings.warn(msg)
+
+    def _get_discovery_cache(self):
+        """
+        Returns the cache for discovered services or ``None`` if disabled or
+        not accessible.
+        """
+        cache = self._discovery_cache
+        if cache is True:
+            cache = DEFAULT_DISCOVERY_CACHE_DIR
+        elif cache is False or cache is None:
+            return None
+        if not isinstance(cache, ResponseCache):
+            try:
+                cache = ResponseCache(cache, ttl=DISCOVERY_CACHE_TTL)
+            except OSError:
+                return None
+            self._discovery_cache = cache
+        return cache
 
     def get_webservice_version(self, service):
         """
@@ -1439,7 +1714,8 @@ def build_url(base_url, service, major_version, resource_type,
 
 
 def download_url(url, timeout=10, headers={}, debug=False,
-                 return_string=True, data=None):
+                 return_string=True, data=None, connection_pool=None,
+                 fh=None, response_headers=None):
     """
     Returns a pair of tuples.
 
@@ -1451,32 +1727,111 @@ def download_url(url, timeout=10, headers={}, debug=False,
     specified.
 
     Performs a http GET if data=None, otherwise a http POST.
+
+    If a :class:`ConnectionPool` is given, a kept-alive connection is used
+    for the request if possible. If an open file object ``fh`` is given, the
+    body of a successful response is streamed to it and ``None`` is
+    returned as data. If the connection fails while reading the body, the
+    connection is closed, anything written to ``fh`` is removed again and a
+    tuple of Nones is returned. If a dictionary ``response_headers`` is
+    given, it is filled with the headers of a successful response (lower
+    case names).
     """
     if debug is True:
         print("Downloading %s" % url)
 
+    url_obj = None
+    connection = None
+    if connection_pool is not None:
+        try:
+            connection, url_obj = connection_pool.urlopen(
+                url, headers=headers, data=data, timeout=timeout)
+        except Exception:
+            if debug is True:
+                print("Error while downloading: %s" % url)
+            return None, None
+        code = url_obj.status
+        if code >= 300:
+            # Read the body so the connection can be reused.
+            try:
+                body = url_obj.read()
+            except (http.client.HTTPException, socket.error):
+                connection.close()
+                if debug is True:
+                    print("Error while downloading: %s" % url)
+                return None, None
+            connection_pool.release(connection, url_obj)
+            if code in (301, 302, 303, 307):
+                # Let urllib deal with redirects.
+                url_obj = None
+                connection = None
+            else:
+                if debug is True:
+                    msg = "HTTP error %i, reason %s, while downloading " + \
+                          "'%s': %s"
+                    print(msg % (code, url_obj.reason, url, body))
+                return code, None
+
+    if url_obj is None:
+        try:
+            url_obj = urllib.request.urlopen(
+                urllib.request.Request(url=url, headers=headers),
+                timeout=timeout,
+                data=data)
+        # Catch HTTP errors.
+        except urllib.request.HTTPError as e:
+            if debug is True:
+                msg = "HTTP error %i, reason %s, while downloading '%s': %s" \
+                      % (e.code, str(e.reason), url, e.read())
+                print(msg)
+            return e.code, None
+        except Exception as e:
+            if debug is True:
+                print("Error while downloading: %s" % url)
+            return None, None
+        code = url_obj.getcode()
+
+    if response_headers is not None:
+        if connection is not None:
+            items = url_obj.getheaders()
+        else:
+            items = url_obj.info().items()
+        response_headers.update((key.lower(), value) for key, value in items)
+    position = None
+    if fh is not None:
+        try:
+            position = fh.tell()
+        except Exception:
+            pass
     try:
-        url_obj = urllib.request.urlopen(
-            urllib.request.Request(url=url, headers=headers),
-            timeout=timeout,
-            data=data)
-    # Catch HTTP errors.
-    except urllib.request.HTTPError as e:
-        if debug is True:
-            msg = "HTTP error %i, reason %s, while downloading '%s': %s" % \
-                  (e.code, str(e.reason), url, e.read())
-            print(msg)
-        return e.code, None
-    except Exception as e:
+        if fh is not None:
+            shutil.copyfileobj(url_obj, fh, 2 ** 16)
+            # reading in blocks ends silently if the connection drops
+            remaining = getattr(url_obj, "length", None)
+            if remaining:
+                raise http.client.IncompleteRead(b"", remaining)
+            data = None
+        elif return_string is False:
+            data = io.BytesIO(url_obj.read())
+        else:
+            data = url_obj.read()
+    except (http.client.HTTPException, socket.error):
+        # The connection dropped or timed out while reading the body. Close
+        # it and discard the partial body so the request can be repeated.
+        if connection is not None:
+            connection.close()
+        else:
+            url_obj.close()
+        if fh is not None:
+            if position is None:
+                raise
+            fh.seek(position)
+            fh.truncate()
         if debug is True:
             print("Error while downloading: %s" % url)
         return None, None
-
-    code = url_obj.getcode()
-    if return_string is False:
-        data = io.BytesIO(url_obj.read())
-    else:
-        data = url_obj.read()
+    if connection is not None:
+        connection_pool.release(connection, url_obj)
 
     if debug is True:
         print("Downloaded %s with HTTP code: %i" % (url, code))
@@ -1484,6 +1839,187 @@ def download_url(url, timeout=10, headers={}, debug=False,
     return code, data
 
 
+# handlers of an opener created by urllib without further configuration
+_DEFAULT_HANDLERS = tuple(
+    type(handler) for handler in urllib.request.build_opener().handlers)
+
+
+def _urllib_configured():
+    """
+    Checks if requests with urllib would use a proxy or an opener installed
+    with :func:`urllib.request.install_opener`.
+    """
+    if urllib.request.getproxies():
+        return True
+    # urlopen() installs a default opener on first use
+    opener = getattr(urllib.request, "_opener", None)
+    if opener is None:
+        return False
+    for handler in opener.handlers:
+        if isinstance(handler, urllib.request.ProxyHandler):
+            if handler.proxies:
+                return True
+        elif type(handler) not in _DEFAULT_HANDLERS:
+            return True
+    return False
+
+
+class ConnectionPool(object):
+    """
+    Pool of persistent (keep-alive) HTTP/HTTPS connections.
+
+    Idle connections are kept per host and reused by later requests to the
+    same host. The pool is thread-safe, every connection serves only one
+    request at a time.
+
+    :type maxsize: int
+    :param maxsize: Maximum number of idle connections kept per host.
+    """
+    def __init__(self, maxsize=10):
+        self.maxsize = maxsize
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def urlopen(self, url, headers={}, data=None, timeout=10):
+        """
+        Sends a GET request (or a POST request if data is given) and returns
+        the connection and the response. The response has to be read
+        completely before the connection is handed back with
+        :meth:`release`.
+        """
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = dict(headers)
+        if data is None:
+            method = "GET"
+        else:
+            method = "POST"
+            # same as urllib
+            headers.setdefault("Content-Type",
+                               "application/x-www-form-urlencoded")
+        key = (parts.scheme, parts.netloc)
+        while True:
+            connection, reused = self._get(key, timeout)
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                return connection, connection.getresponse()
+            except (http.client.HTTPException, socket.error):
+                connection.close()
+                # The server might have closed an idle connection, retry
+                # with a new one.
+                if not reused:
+                    raise
+
+    def _get(self, key, timeout):
+        """
+        Returns an idle connection for key (scheme and host) or a new one
+        and whether it is reused.
+        """
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                connection = connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        scheme, netloc = key
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(netloc, timeout=timeout)
+        else:
+            connection = http.client.HTTPConnection(netloc, timeout=timeout)
+        connection._pool_key = key
+        return connection, False
+
+    def release(self, connection, response):
+        """
+        Hands back a connection after its response has been read.
+        """
+        if response.will_close:
+            connection.close()
+            return
+        with self._lock:
+            connections = self._idle.setdefault(connection._pool_key, [])
+            if len(connections) < self.maxsize:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """
+        Closes all idle connections.
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+_DISCOVERY_POOL = None
+_DISCOVERY_POOL_PID = None
+_DISCOVERY_POOL_LOCK = threading.Lock()
+_DISCOVERY_POOL_SIZE = 8
+
+
+def _get_discovery_pool():
+    """
+    Returns the thread pool shared by the service discovery of all clients.
+
+    The pool is created on first use and again in forked child processes,
+    which do not inherit the worker threads.
+    """
+    global _DISCOVERY_POOL, _DISCOVERY_POOL_PID
+    with _DISCOVERY_POOL_LOCK:
+        if _DISCOVERY_POOL is None or _DISCOVERY_POOL_PID != os.getpid():
+            _DISCOVERY_POOL = ThreadPool(_DISCOVERY_POOL_SIZE)
+            _DISCOVERY_POOL_PID = os.getpid()
+        return _DISCOVERY_POOL
+
+
+def _split_bulk(bulk, chunk=None):
+    """
+    Splits a bulk request given as list of lists into separate requests per
+    station and, if chunk is given, per time window of at most chunk
+    seconds.
+
+    >>> t = UTCDateTime(2014, 1, 1)
+    >>> bulk = [("IU", "ANMO", "00", "BHZ", t, t + 250),
+    ...         ("IU", "ANMO", "10", "BHZ", t, t + 100),
+    ...         ("IU", "AFI", "", "BHZ", t, t + 100)]
+    >>> for request in _split_bulk(bulk, 100):  # doctest: +ELLIPSIS
+    ...     print([(line[0], line[1], line[2], line[5] - line[4])
+    ...            for line in request])
+    [('IU', 'AFI', '', 100.0)]
+    [('IU', 'ANMO', '00', 100.0), ('IU', 'ANMO', '10', 100.0)]
+    [('IU', 'ANMO', '00', 100.0)]
+    [('IU', 'ANMO', '00', 50.0)]
+    """
+    requests = OrderedDict()
+    for net, sta, loc, cha, t1, t2 in bulk:
+        t1 = UTCDateTime(t1)
+        t2 = UTCDateTime(t2)
+        windows = []
+        if chunk is None:
+            windows.append((t1, t2))
+        else:
+            start = t1
+            while True:
+                end = min(start + chunk, t2)
+                windows.append((start, end))
+                if end >= t2:
+                    break
+                start = end
+        for start, end in windows:
+            key = (net, sta, start.timestamp, end.timestamp)
+            requests.setdefault(key, []).append(
+                (net, sta, loc, cha, start, end))
+    return [requests[key] for key in sorted(requests.keys())]
+
+
 def setup_query_dict(service, locs, kwargs):
     """
     """
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+The obspy.fdsn.cache test suite.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    import http.server
+    import socketserver
+
+from obspy.fdsn import Client
+from obspy.fdsn.cache import ResponseCache
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _FDSNHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for an FDSN web service with station and event service
+    supporting conditional requests.
+    """
+    protocol_version = "HTTP/1.1"
+    # number of queries by service
+    queries = {}
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+    def _send(self, code, body=b"", headers={}):
+        self.send_response(code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if "application.wadl" in self.path:
+            self.queries["wadl"] = self.queries.get("wadl", 0) + 1
+            for service in ("station", "event"):
+                if "/%s/" % service in self.path:
+                    filename = "2014-01-07_iris_%s.wadl" % service
+                    with open(os.path.join(DATA_PATH, filename), "rb") as fh:
+                        self._send(200, fh.read())
+                    return
+        elif "/station/1/query" in self.path:
+            self.queries["station"] = self.queries.get("station", 0) + 1
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304)
+                return
+            with open(os.path.join(DATA_PATH, "stations_by_station.xml"),
+                      "rb") as fh:
+                self._send(200, fh.read(), {"ETag": '"v1"'})
+            return
+        elif "/event/1/query" in self.path:
+            self.queries["event"] = self.queries.get("event", 0) + 1
+            last_modified = "Tue, 07 Jan 2014 00:00:00 GMT"
+            if self.headers.get("If-Modified-Since") == last_modified:
+                self._send(304)
+                return
+            with open(os.path.join(DATA_PATH, "events_by_eventid.xml"),
+                      "rb") as fh:
+                self._send(200, fh.read(), {"Last-Modified": last_modified})
+            return
+        self._send(404)
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.fdsn.cache.ResponseCache.
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='obspy-')
+        _FDSNHandler.queries = {}
+        self.server = _ThreadingHTTPServer(("127.0.0.1", 0), _FDSNHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.base_url = "http://127.0.0.1:%i" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tempdir)
+
+    def _client(self, **kwargs):
+        kwargs.setdefault("discovery_cache",
+                          os.path.join(self.tempdir, "discovery"))
+        return Client(self.base_url, service_mappings={"dataselect": None},
+                      **kwargs)
+
+    def test_stationCache(self):
+        """
+        Repeated station queries are served from the cache, stale entries
+        are revalidated using the ETag.
+        """
+        client = self._client(cache=self.tempdir)
+        inv = client.get_stations(network="IU", station="ANMO")
+        self.assertEqual(_FDSNHandler.queries["station"], 1)
+        # hit, independent of client and parameter order
+        client2 = self._client(cache=ResponseCache(self.tempdir))
+        inv2 = client2.get_stations(station="ANMO", network="IU")
+        self.assertEqual(_FDSNHandler.queries["station"], 1)
+        self.assertEqual(inv2.networks, inv.networks)
+        # miss
+        client.get_stations(network="IU", station="ANMO", level="station")
+        self.assertEqual(_FDSNHandler.queries["station"], 2)
+        # stale entry, not modified
+        client.cache.ttl = 0
+        inv3 = client.get_stations(network="IU", station="ANMO")
+        self.assertEqual(_FDSNHandler.queries["station"], 3)
+        self.assertEqual(inv3.networks, inv.networks)
+        client.cache.ttl = 3600
+        client.get_stations(network="IU", station="ANMO")
+        self.assertEqual(_FDSNHandler.queries["station"], 3)
+        # no cache
+        client = self._client()
+        client.get_stations(network="IU", station="ANMO")
+        client.get_stations(network="IU", station="ANMO")
+        self.assertEqual(_FDSNHandler.queries["station"], 5)
+
+    def test_eventCache(self):
+        """
+        Stale event entries are revalidated using Last-Modified.
+        """
+        client = self._client(cache=ResponseCache(self.tempdir, ttl=0))
+        cat = client.get_events(eventid=609301)
+        cat2 = client.get_events(eventid=609301)
+        self.assertEqual(_FDSNHandler.queries["event"], 2)
+        self.assertEqual(cat2, cat)
+
+    def test_discoveryCache(self):
+        """
+        Discovered services are stored on disk and reused by later clients
+        until they expire.
+        """
+        memory_cache = Client._Client__service_discovery_cache
+        memory_cache.clear()
+        client = self._client()
+        self.assertEqual(_FDSNHandler.queries["wadl"], 2)
+        self.assertEqual(sorted(client.services.keys()),
+                         ["event", "station"])
+        # not downloaded again, neither from memory nor from disk
+        self._client()
+        memory_cache.clear()
+        client2 = self._client()
+        self.assertEqual(_FDSNHandler.queries["wadl"], 2)
+        self.assertEqual(client2.services, client.services)
+        # expired
+        memory_cache.clear()
+        cache = ResponseCache(os.path.join(self.tempdir, "discovery"), ttl=0)
+        self._client(discovery_cache=cache)
+        self.assertEqual(_FDSNHandler.queries["wadl"], 4)
+        # disabled
+        memory_cache.clear()
+        self._client(discovery_cache=False)
+        self.assertEqual(_FDSNHandler.queries["wadl"], 6)
+        memory_cache.clear()
+
+    def test_eviction(self):
+        """
+        The least recently used entries are removed first.
+        """
+        cache = ResponseCache(self.tempdir, max_size=10 ** 6)
+        keys = [cache.key("http://example.com/query?a=%i" % i)
+                for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, b"x" * 300000)
+            filename = cache._filename(key)
+            os.utime(filename, (i, i))
+        # use the oldest one
+        self.assertEqual(cache.get(keys[0])["object"], b"x" * 300000)
+        cache.put(cache.key("http://example.com/query?a=3"), b"x" * 300000)
+        self.assertEqual(cache.get(keys[1]), None)
+        self.assertNotEqual(cache.get(keys[0]), None)
+        self.assertNotEqual(cache.get(keys[2]), None)
+        cache.clear()
+        self.assertEqual(cache.get(keys[0]), None)
+
+
+def suite():
+    return unittest.makeSuite(ResponseCacheTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -13,7 +13,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
-from obspy import readEvents, UTCDateTime, read, read_inventory
+from obspy import readEvents, UTCDateTime, read, read_inventory, Stream
 from obspy.fdsn import Client
 from obspy.fdsn.client import build_url, parse_simple_xml
 from obspy.fdsn.header import DEFAULT_USER_AGENT, FDSNException
@@ -23,6 +23,7 @@ from obspy.station import Response
 
 from difflib import Differ
 import io
+import numpy as np
 import os
 import re
 import sys
@@ -867,7 +868,7 @@ class ClientTestCase(unittest.TestCase):
                 "event": base_url_event,
                 "station": base_url_station,
                 "dataselect": base_url_ds,
-            })
+            }, discovery_cache=False)
         for warning in w:
             self.assertTrue("Could not parse" in str(warning) or
                             "cannot deal with" in str(warning))
@@ -906,6 +907,76 @@ class ClientTestCase(unittest.TestCase):
         self.assertTrue(
             base_url_event in download_url_mock.call_args_list[0][0][0])
 
+    @mock.patch("obspy.fdsn.client.download_url")
+    def test_dataselect_bulk_split(self, download_url_mock):
+        """
+        Bulk requests split by station and time give the same result as a
+        single request.
+        """
+        def discovery(url, *args, **kwargs):
+            if "dataselect" in url and "application.wadl" in url:
+                with open(os.path.join(
+                        self.datapath,
+                        "2014-01-07_iris_dataselect.wadl"), "rb") as fh:
+                    return 200, fh.read()
+            return 404, None
+
+        download_url_mock.side_effect = discovery
+        client = Client(base_url="http://example.com",
+                        service_mappings={"event": None, "station": None},
+                        discovery_cache=False)
+
+        full = read()
+        for tr in full:
+            tr.data = tr.data.astype("int32")
+
+        def dataselect(url, data=None, **kwargs):
+            st = Stream()
+            for line in data.decode().splitlines():
+                if "=" in line:
+                    continue
+                net, sta, loc, cha, t1, t2 = line.split()
+                st += full.select(network=net, station=sta,
+                                  channel=cha).slice(UTCDateTime(t1),
+                                                     UTCDateTime(t2))
+            if not st:
+                return 204, None
+            buf = io.BytesIO()
+            st.write(buf, format="MSEED")
+            buf.seek(0, 0)
+            return 200, buf
+
+        download_url_mock.side_effect = dataselect
+        t = full[0].stats.starttime
+        bulk = [("BW", "RJOB", "", "EH?", t, t + 20),
+                ("XX", "ABCD", "", "EHZ", t, t + 20)]
+        expected = client.get_waveforms_bulk(bulk)
+        download_url_mock.reset_mock()
+        got = client.get_waveforms_bulk(bulk, parallel=3, chunk=7)
+        # two stations with three time chunks each
+        self.assertEqual(download_url_mock.call_count, 6)
+        self.assertEqual(len(got), 3)
+        got.sort()
+        expected.sort()
+        for tr_got, tr_expected in zip(got, expected):
+            self.assertEqual(tr_got.stats.starttime,
+                             tr_expected.stats.starttime)
+            np.testing.assert_array_equal(tr_got.data, tr_expected.data)
+        # request given as string, written to a file
+        bulk = "\n".join(["BW RJOB -- EHZ %s %s" % (t, t + 10),
+                          "XX ABCD -- EHZ %s %s" % (t, t + 10)])
+        buf = io.BytesIO()
+        client.get_waveforms_bulk(bulk, chunk=5, filename=buf)
+        buf.seek(0, 0)
+        st = read(buf)
+        st.merge(method=-1)
+        self.assertEqual(len(st), 1)
+        self.assertEqual(st[0].stats.starttime, t)
+        self.assertEqual(st[0].stats.endtime, t + 10)
+        # no data at all
+        self.assertRaises(FDSNException, client.get_waveforms_bulk,
+                          [("XX", "ABCD", "", "EHZ", t, t + 20)], chunk=5)
+
 
 def suite():
     return unittest.makeSuite(ClientTestCase, 'test')
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for downloads with kept-alive connections and retries in obspy.fdsn.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    import http.server
+    import socketserver
+    import urllib.request
+
+from obspy.core.compatibility import mock
+from obspy.fdsn import Client
+from obspy.fdsn.client import ConnectionPool, download_url
+from obspy.fdsn.header import FDSNException
+import io
+import os
+import threading
+import unittest
+
+
+BODY = b"0123456789" * 10000
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves ``BODY`` with keep-alive. Requests to ``/drop`` get only half of
+    the body before the connection is closed, for the first ``drops``
+    requests.
+    """
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    requests = 0
+    drops = 0
+    paths = []
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+    def setup(self):
+        _Handler.connections += 1
+        http.server.BaseHTTPRequestHandler.setup(self)
+
+    def do_GET(self):
+        _Handler.requests += 1
+        _Handler.paths.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        if self.path.startswith("/drop") and _Handler.drops > 0:
+            _Handler.drops -= 1
+            self.wfile.write(BODY[:len(BODY) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(BODY)
+
+
+class DownloadTestCase(unittest.TestCase):
+    """
+    Test cases for download_url(), ConnectionPool and retries of
+    Client._download().
+    """
+    def setUp(self):
+        _Handler.connections = 0
+        _Handler.requests = 0
+        _Handler.drops = 0
+        _Handler.paths = []
+        self.server = _ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.base_url = "http://127.0.0.1:%i" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keepAlive(self):
+        """
+        Connections are reused by later requests to the same host.
+        """
+        pool = ConnectionPool()
+        for _ in range(3):
+            code, data = download_url(self.base_url + "/ok",
+                                      connection_pool=pool)
+            self.assertEqual(code, 200)
+            self.assertEqual(data, BODY)
+        self.assertEqual(_Handler.requests, 3)
+        self.assertEqual(_Handler.connections, 1)
+        pool.close()
+
+    def test_droppedConnection(self):
+        """
+        A connection dropped while reading the body is closed and not
+        reused, the partial body is removed from the file object.
+        """
+        pool = ConnectionPool()
+        _Handler.drops = 2
+        fh = io.BytesIO()
+        fh.write(b"abc")
+        code, data = download_url(self.base_url + "/drop",
+                                  connection_pool=pool, fh=fh)
+        self.assertEqual((code, data), (None, None))
+        self.assertEqual(fh.getvalue(), b"abc")
+        self.assertEqual(sum(len(c) for c in pool._idle.values()), 0)
+        # without pool
+        self.assertEqual(download_url(self.base_url + "/drop"),
+                         (None, None))
+        code, data = download_url(self.base_url + "/drop",
+                                  connection_pool=pool, fh=fh)
+        self.assertEqual(code, 200)
+        self.assertEqual(fh.getvalue(), b"abc" + BODY)
+        self.assertEqual(_Handler.connections, 3)
+        pool.close()
+
+    def test_retry(self):
+        """
+        Requests failing while reading the body are repeated.
+        """
+        with mock.patch.object(Client, "_discover_services"):
+            client = Client(self.base_url)
+        with mock.patch("obspy.fdsn.client.RETRY_BACKOFF", 0.0):
+            _Handler.drops = 2
+            fh = io.BytesIO()
+            client._download(self.base_url + "/drop", filename=fh,
+                             retries=2)
+            self.assertEqual(fh.getvalue(), BODY)
+            _Handler.drops = 1
+            data = client._download(self.base_url + "/drop", retries=1)
+            self.assertEqual(data.read(), BODY)
+            _Handler.drops = 2
+            self.assertRaises(FDSNException, client._download,
+                              self.base_url + "/drop", retries=1)
+        self.assertEqual(_Handler.requests, 7)
+
+    def test_proxy(self):
+        """
+        Requests go through urllib if a proxy is configured or an opener
+        is installed.
+        """
+        with mock.patch.object(Client, "_discover_services"):
+            client = Client(self.base_url)
+        self.assertTrue(client._connection_pool is not None)
+        environ = dict((key, value) for key, value in os.environ.items()
+                       if not key.lower().endswith("_proxy"))
+        environ["HTTP_PROXY"] = environ["http_proxy"] = self.base_url
+        url = "http://fdsn.invalid/ok"
+        # make urlopen() build a new opener from the environment
+        with mock.patch.dict(os.environ, environ, clear=True):
+            with mock.patch.object(urllib.request, "_opener", None):
+                self.assertTrue(client._connection_pool is None)
+                data = client._download(url)
+        self.assertEqual(data.read(), BODY)
+        self.assertEqual(_Handler.paths, [url])
+        # custom opener
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPBasicAuthHandler())
+        with mock.patch.object(urllib.request, "_opener", opener):
+            self.assertTrue(client._connection_pool is None)
+        with mock.patch.object(urllib.request, "_opener",
+                               urllib.request.build_opener()):
+            self.assertTrue(client._connection_pool is not None)
+        with mock.patch.object(Client, "_discover_services"):
+            client = Client(self.base_url, keep_alive=False)
+        self.assertTrue(client._connection_pool is None)
+
+
+def suite():
+    return unittest.makeSuite(DownloadTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+"""
+Writing continuous data to a MiniSEED archive in SDS layout.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    from collections import OrderedDict
+
+from obspy import Stream, UTCDateTime
+from obspy.core.util import NATIVE_BYTEORDER
+from obspy.mseed import util
+from obspy.mseed.headers import clibmseed, ENCODINGS, HPTMODULUS, \
+    SAMPLETYPE, VALID_RECORD_LENGTHS, blkt_1001_s
+import ctypes as C
+import math
+import numpy as np
+import os
+import time
+
+
+# Default encodings for the supported data types.
+DEFAULT_ENCODINGS = {np.int32: 11, np.float32: 4, np.float64: 5}
+
+
+class SDSArchiveWriter(object):
+    """
+    Writes continuous data to a MiniSEED archive in the SeisComP Data
+    Structure (SDS).
+
+    The data of each channel is written to day files
+    ``ROOT/YEAR/NET/STA/CHAN.D/NET.STA.LOC.CHAN.D.YEAR.DAY``. Incoming data
+    (e.g. packets from a real time connection) is appended to the data of
+    the channel and only complete records are written, so that data arriving
+    in small pieces is not split into many partially filled records. The
+    remaining samples are kept in memory until the record is full, a gap
+    occurs, the day ends or the samples are held longer than
+    ``flush_timeout``. Sequence numbers are continued across calls and for
+    existing files.
+
+    A limited number of files is kept open, the least recently used file is
+    closed when another file is needed.
+
+    :type root: str
+    :param root: Root directory of the archive.
+    :type reclen: int, optional
+    :param reclen: Record length in bytes. Defaults to 512.
+    :type encoding: int or str, optional
+    :param encoding: Data encoding, see
+        :func:`~obspy.mseed.core.writeMSEED`. Derived from the dtype of the
+        data if not given, ``INT16`` data is written as ``STEIM2``.
+    :type byteorder: int or str, optional
+    :param byteorder: ``0`` or ``'<'`` for little endian, ``1`` or ``'>'``
+        for big endian, ``'='`` for the native byte order. Defaults to big
+        endian.
+    :type max_open_files: int, optional
+    :param max_open_files: Maximum number of open files.
+    :type flush_timeout: float, optional
+    :param flush_timeout: Maximum time in seconds samples are held in memory
+        before they are written in a partially filled record. Checked on
+        every call of :meth:`write`, see also :meth:`flush`.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> from obspy.mseed.archive import SDSArchiveWriter
+    >>> with SDSArchiveWriter("/path/to/archive") as archive:
+    ...     archive.write(read())  # doctest: +SKIP
+    """
+    def __init__(self, root, reclen=512, encoding=None, byteorder=1,
+                 max_open_files=100, flush_timeout=60.0):
+        if reclen not in VALID_RECORD_LENGTHS:
+            msg = 'Invalid record length. The record length must be a ' + \
+                'value\nof 2 to the power of X where 8 <= X <= 20.'
+            raise ValueError(msg)
+        if byteorder == '=':
+            byteorder = NATIVE_BYTEORDER
+        if byteorder == '>':
+            byteorder = 1
+        elif byteorder == '<':
+            byteorder = 0
+        if byteorder not in (0, 1):
+            msg = "Invalid byte order. It must be either '<', '>', 0 or 1."
+            raise ValueError(msg)
+        if encoding is not None:
+            encoding = util._convert_and_check_encoding_for_writing(encoding)
+        self.root = root
+        self.reclen = reclen
+        self.encoding = encoding
+        self.byteorder = byteorder
+        self.max_open_files = max_open_files
+        self.flush_timeout = flush_timeout
+        self._channels = {}
+        self._files = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, data):
+        """
+        Writes the complete records of the given data to the archive.
+
+        :type data: :class:`~obspy.core.stream.Stream` or
+            :class:`~obspy.core.trace.Trace`
+        :param data: Data to append. The traces of a channel have to be given
+            in chronological order, data overlapping with previously written
+            data of a channel is written as is.
+        """
+        if not isinstance(data, Stream):
+            data = [data]
+        for trace in data:
+            self._write(trace)
+        if self.flush_timeout is not None:
+            self.flush(self.flush_timeout)
+
+    def flush(self, timeout=None):
+        """
+        Writes the samples held in memory in partially filled records.
+
+        :type timeout: float, optional
+        :param timeout: Only write the samples of channels which are held
+            longer than the given number of seconds. Otherwise all samples
+            are written and all open files are flushed.
+        """
+        now = time.time()
+        for channel in self._channels.values():
+            if not channel.numsamples:
+                continue
+            if timeout is not None and now - channel.since < timeout:
+                continue
+            fh = channel.pack(flush=True)
+            if fh is not None and timeout is not None:
+                fh.flush()
+        if timeout is None:
+            for fh in self._files.values():
+                fh.flush()
+
+    def close(self):
+        """
+        Writes all samples held in memory and closes all files.
+        """
+        try:
+            for channel in self._channels.values():
+                if channel.numsamples:
+                    channel.pack(flush=True)
+        finally:
+            for channel in self._channels.values():
+                channel.free()
+            self._channels = {}
+            while self._files:
+                self._files.popitem(last=False)[1].close()
+
+    def _write(self, trace):
+        """
+        Appends a single trace to the data of its channel, splitting it at
+        day boundaries.
+        """
+        if not trace.stats.npts:
+            return
+        data = trace.data
+        if isinstance(data, np.ma.masked_array):
+            msg = "Masked arrays can not be written, split the trace first."
+            raise ValueError(msg)
+        if data.dtype.type == np.int16:
+            data = data.astype(np.int32)
+        elif not data.dtype.isnative:
+            data = data.byteswap().newbyteorder()
+        data = np.ascontiguousarray(data)
+        if data.dtype.type not in DEFAULT_ENCODINGS:
+            msg = "Unsupported data type %s for trace %s." % (
+                data.dtype, trace.id)
+            raise ValueError(msg)
+        encoding = self.encoding or DEFAULT_ENCODINGS[data.dtype.type]
+        if data.dtype.type != ENCODINGS[encoding][2]:
+            msg = "Wrong dtype %s for trace %s for encoding %s." % (
+                data.dtype, trace.id, ENCODINGS[encoding][0])
+            raise ValueError(msg)
+        stats = trace.stats
+        channel = self._channels.get(trace.id)
+        if channel is not None and not channel.continues(stats, data):
+            # gap, overlap or changed data type
+            if channel.numsamples:
+                channel.pack(flush=True)
+            channel.reset()
+        starttime = stats.starttime
+        while len(data):
+            day = UTCDateTime(starttime.date)
+            # number of samples before the end of the day
+            count = (day + 86400 - starttime) * stats.sampling_rate
+            count = min(int(math.ceil(round(count, 6))), len(data))
+            if channel is None:
+                channel = _Channel(self, stats, encoding)
+                self._channels[trace.id] = channel
+            if channel.day != day:
+                if channel.numsamples:
+                    channel.pack(flush=True)
+                channel.reset()
+                channel.day = day
+            channel.encoding = encoding
+            channel.append(starttime, stats.sampling_rate, data[:count])
+            channel.pack(flush=False)
+            data = data[count:]
+            starttime = starttime + count / stats.sampling_rate
+
+    def _path(self, network, station, location, channel, day):
+        """
+        Returns the SDS path of a day file.
+        """
+        filename = "%s.%s.%s.%s.D.%04d.%03d" % (
+            network, station, location, channel, day.year, day.julday)
+        return os.path.join(self.root, "%04d" % day.year, network, station,
+                            channel + ".D", filename)
+
+    def _file(self, path):
+        """
+        Returns an open file handle for appending to the given file, closing
+        the least recently used file if necessary.
+        """
+        fh = self._files.pop(path, None)
+        if fh is None:
+            while self._files and len(self._files) >= self.max_open_files:
+                self._files.popitem(last=False)[1].close()
+            directory = os.path.dirname(path)
+            if not os.path.isdir(directory):
+                try:
+                    os.makedirs(directory)
+                except OSError:
+                    # created concurrently
+                    if not os.path.isdir(directory):
+                        raise
+            fh = open(path, "ab")
+        self._files[path] = fh
+        return fh
+
+
+class _Channel(object):
+    """
+    Packing state of a single channel.
+
+    The samples not yet written are kept in a libmseed MSTrace structure
+    which also holds the compression history, the MSRecord template holds
+    the sequence number.
+    """
+    def __init__(self, writer, stats, encoding):
+        self.writer = writer
+        self.id = (stats.network, stats.station, stats.location,
+                   stats.channel)
+        self.encoding = encoding
+        self.sampling_rate = stats.sampling_rate
+        self.sampletype = None
+        self.endtime = None
+        self.day = None
+        self.since = None
+        self.mst = None
+        self.blkt1001 = False
+        self.msr = clibmseed.msr_init(None)
+        msr = self.msr.contents
+        msr.network = stats.network.encode('ascii', 'strict')
+        msr.station = stats.station.encode('ascii', 'strict')
+        msr.location = stats.location.encode('ascii', 'strict')
+        msr.channel = stats.channel.encode('ascii', 'strict')
+        try:
+            dataquality = stats.mseed.dataquality
+        except AttributeError:
+            dataquality = 'D'
+        msr.dataquality = dataquality.encode('ascii', 'strict')
+        msr.sequence_number = 0
+
+    @property
+    def numsamples(self):
+        if not self.mst:
+            return 0
+        return self.mst.contents.numsamples
+
+    def continues(self, stats, data):
+        """
+        Checks if the given data directly follows the previous data.
+        """
+        if self.endtime is None:
+            return True
+        if stats.sampling_rate != self.sampling_rate or \
+                SAMPLETYPE[data.dtype.type].encode() != self.sampletype:
+            return False
+        delta = 1.0 / self.sampling_rate
+        return abs(stats.starttime - (self.endtime + delta)) < 0.5 * delta
+
+    def reset(self):
+        """
+        Starts a new segment, only the sequence number is kept.
+        """
+        if self.mst:
+            clibmseed.mst_free(C.pointer(self.mst))
+        self.mst = None
+        self.endtime = None
+        self.since = None
+
+    def free(self):
+        """
+        Frees all allocated memory.
+        """
+        self.reset()
+        if self.msr:
+            clibmseed.msr_free(C.pointer(self.msr))
+        self.msr = None
+
+    def append(self, starttime, sampling_rate, data):
+        """
+        Appends samples to the samples not yet written.
+        """
+        if not self.mst:
+            self.mst = clibmseed.mst_init(None)
+            mst = self.mst.contents
+            mst.network, mst.station, mst.location, mst.channel = \
+                [x.encode('ascii', 'strict') for x in self.id]
+            mst.dataquality = self.msr.contents.dataquality
+            mst.starttime = util._convertDatetimeToMSTime(starttime)
+            self.sampling_rate = sampling_rate
+            mst.samprate = sampling_rate
+            self.sampletype = SAMPLETYPE[data.dtype.type].encode()
+            mst.sampletype = self.sampletype
+            # Blockette 1001 is needed for start times or sampling
+            # intervals with a precision of more than 100 microseconds.
+            if not self.blkt1001 and (
+                    mst.starttime % 100 != 0 or
+                    (1.0 / self.sampling_rate * HPTMODULUS) % 100 != 0):
+                self._addBlockette1001()
+        mst = self.mst.contents
+        if not mst.numsamples:
+            self.since = time.time()
+        old = mst.numsamples * data.itemsize
+        ptr = clibmseed.allocate_bytes(old + data.nbytes)
+        if old:
+            C.memmove(ptr, mst.datasamples, old)
+            clibmseed.free_bytes(mst.datasamples)
+        C.memmove(ptr + old, data.ctypes.data, data.nbytes)
+        mst.datasamples = ptr
+        mst.numsamples += len(data)
+        mst.samplecnt += len(data)
+        self.endtime = starttime + (len(data) - 1) / self.sampling_rate
+
+    def pack(self, flush):
+        """
+        Writes the complete records or, if flush is set, all samples to the
+        day file.
+
+        Returns the file handle written to or ``None``.
+        """
+        writer = self.writer
+        path = writer._path(*(self.id + (self.day,)))
+        if self.msr.contents.sequence_number == 0:
+            self.msr.contents.sequence_number = \
+                _nextSequenceNumber(path, writer.reclen)
+        packedsamples = C.c_int64()
+        buf = C.POINTER(C.c_char)()
+        bufsize = C.c_int64()
+        errcode = clibmseed.packMSTraceToBuffer(
+            self.mst, writer.reclen, self.encoding, writer.byteorder,
+            C.byref(packedsamples), 1 if flush else 0, 0, self.msr,
+            writer.reclen * 4, C.byref(buf), C.byref(bufsize))
+        if errcode == -1:
+            raise Exception('Error in mst_pack')
+        fh = None
+        try:
+            if bufsize.value:
+                fh = writer._file(path)
+                fh.write(C.string_at(buf, bufsize.value))
+        finally:
+            clibmseed.free_bytes(buf)
+        if not self.numsamples:
+            self.since = None
+        return fh
+
+    def _addBlockette1001(self):
+        """
+        Adds a Blockette 1001 to the record template.
+        """
+        size = C.sizeof(blkt_1001_s)
+        blkt = C.create_string_buffer(b'\x00' * size, size)
+        ret_val = clibmseed.msr_addblockette(self.msr, blkt, size, 1001, 0)
+        if bool(ret_val) is False:
+            raise Exception('Error in msr_addblockette')
+        self.blkt1001 = True
+
+
+def _nextSequenceNumber(path, reclen):
+    """
+    Returns the sequence number following the last record of an existing
+    file or 1.
+    """
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            if size < reclen or size % reclen:
+                return 1
+            fh.seek(size - reclen, os.SEEK_SET)
+            number = int(fh.read(6))
+    except (IOError, OSError, ValueError):
+        return 1
+    return number % 999999 + 1
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
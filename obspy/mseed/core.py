@@ -16,6 +16,8 @@ from obspy.mseed import util
 
 from obspy import Stream, Trace, UTCDateTime
 from obspy.core.util import NATIVE_BYTEORDER
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 import ctypes as C
 import numpy as np
 import os
@@ -437,7 +439,8 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
 
 
 def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
-               sequence_number=None, flush=True, verbose=0, **_kwargs):
+               sequence_number=None, flush=True, verbose=0, threads=None,
+               **_kwargs):
     """
     Write Mini-SEED file from a Stream object.
 
@@ -479,6 +482,10 @@ def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
     :type verbose: int, optional
     :param verbose: Controls verbosity, a value of ``0`` will result in no
         diagnostic output.
+    :type threads: int, optional
+    :param threads: Number of threads used for packing the traces in
+        parallel. Defaults to the number of CPUs, ``1`` packs the traces
+        one after another.
 
     .. note::
         The ``reclen``, ``encoding``, ``byteorder`` and ``sequence_count``
@@ -593,9 +600,9 @@ def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
         # header will suffice (see ms_genfactmult in libmseed/genutils.c)
         if trace.stats.sampling_rate >= 32727.0 or \
            trace.stats.sampling_rate <= (1.0 / 32727.0):
-            use_blkt_100 = True
+            trace_attr['use_blkt_100'] = True
         else:
-            use_blkt_100 = False
+            trace_attr['use_blkt_100'] = False
 
         if sequence_number is not None:
             trace_attr['sequence_number'] = sequence_number
@@ -767,99 +774,132 @@ def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
     else:
         f = filename
 
-    # Loop over every trace and finally write it to the filehandler.
+    # Skip empty traces.
+    traces = []
     for trace, data, trace_attr in zip(stream, trace_data, trace_attributes):
         if not len(data):
             msg = 'Skipping empty trace "%s".' % (trace)
             warnings.warn(msg)
             continue
-        # Create C struct MSTrace.
-        mst = MST(trace, data, dataquality=trace_attr['dataquality'])
-
-        # Initialize packedsamples pointer for the mst_pack function
-        packedsamples = C.c_int()
-
-        # Callback function for mst_pack to actually write the file
-        def record_handler(record, reclen, _stream):
-            f.write(record[0:reclen])
-        # Define Python callback function for use in C function
-        recHandler = C.CFUNCTYPE(C.c_void_p, C.POINTER(C.c_char), C.c_int,
-                                 C.c_void_p)(record_handler)
-
-        # Fill up msr record structure, this is already contained in
-        # mstg, however if blk1001 is set we need it anyway
-        msr = clibmseed.msr_init(None)
-        msr.contents.network = trace.stats.network.encode('ascii', 'strict')
-        msr.contents.station = trace.stats.station.encode('ascii', 'strict')
-        msr.contents.location = trace.stats.location.encode('ascii', 'strict')
-        msr.contents.channel = trace.stats.channel.encode('ascii', 'strict')
-        msr.contents.dataquality = trace_attr['dataquality'].\
-            encode('ascii', 'strict')
-
-        # Set starting sequence number
-        msr.contents.sequence_number = trace_attr['sequence_number']
-
-        # Only use Blockette 1001 if necessary.
-        if use_blkt_1001:
-            # Timing quality has been set in trace_attr
-
-            size = C.sizeof(blkt_1001_s)
-            # Only timing quality matters here, other blockette attributes will
-            # be filled by libmseed.msr_normalize_header
-            blkt_value = pack(native_str("BBBB"), trace_attr['timing_quality'],
-                              0, 0, 0)
-            blkt_ptr = C.create_string_buffer(blkt_value, len(blkt_value))
-
-            # Usually returns a pointer to the added blockette in the
-            # blockette link chain and a NULL pointer if it fails.
-            # NULL pointers have a false boolean value according to the
-            # ctypes manual.
-            ret_val = clibmseed.msr_addblockette(msr, blkt_ptr,
-                                                 size, 1001, 0)
-
-            if bool(ret_val) is False:
-                clibmseed.msr_free(C.pointer(msr))
-                del msr
-                raise Exception('Error in msr_addblockette')
-        # Only use Blockette 100 if necessary.
-        if use_blkt_100:
-            size = C.sizeof(blkt_100_s)
-            blkt100 = C.c_char(b' ')
-            C.memset(C.pointer(blkt100), 0, size)
-            ret_val = clibmseed.msr_addblockette(
-                msr, C.pointer(blkt100), size, 100, 0)  # NOQA
-            # Usually returns a pointer to the added blockette in the
-            # blockette link chain and a NULL pointer if it fails.
-            # NULL pointers have a false boolean value according to the
-            # ctypes manual.
-            if bool(ret_val) is False:
-                clibmseed.msr_free(C.pointer(msr))  # NOQA
-                del msr  # NOQA
-                raise Exception('Error in msr_addblockette')
-
-        # Pack mstg into a MSEED file using the callback record_handler as
-        # write method.
-        errcode = clibmseed.mst_pack(
-            mst.mst, recHandler, None, trace_attr['reclen'],
-            trace_attr['encoding'], trace_attr['byteorder'],
-            C.byref(packedsamples), flush, verbose, msr)  # NOQA
-
-        if errcode == 0:
-            msg = ("Did not write any data for trace '%s' even though it "
-                   "contains data values.") % trace
-            raise ValueError(msg)
-        if errcode == -1:
-            clibmseed.msr_free(C.pointer(msr))  # NOQA
-            del mst, msr  # NOQA
-            raise Exception('Error in mst_pack')
-        # Deallocate any allocated memory.
-        clibmseed.msr_free(C.pointer(msr))  # NOQA
-        del mst, msr  # NOQA
+        traces.append((trace, data, trace_attr))
+
+    def _pack(args):
+        trace, data, trace_attr = args
+        return _packTrace(trace, data, trace_attr, use_blkt_1001, flush,
+                          verbose)
+
+    # Pack the traces and write the records of each trace at once. The
+    # traces are independent and libmseed is called without holding the GIL,
+    # so the traces can be packed in parallel. The records are written in the
+    # order of the traces in any case.
+    if threads is None:
+        threads = cpu_count()
+    threads = min(threads, len(traces))
+    if threads > 1:
+        pool = ThreadPool(threads)
+        try:
+            for record in pool.imap(_pack, traces):
+                f.write(record)
+        finally:
+            pool.terminate()
+    else:
+        for args in traces:
+            f.write(_pack(args))
     # Close if its a file handler.
     if not hasattr(filename, 'write'):
         f.close()
 
 
+def _packTrace(trace, data, trace_attr, use_blkt_1001, flush, verbose):
+    """
+    Packs the data of a trace into Mini-SEED records.
+
+    Returns all records of the trace as one bytes object.
+    """
+    # Create C struct MSTrace.
+    mst = MST(trace, data, dataquality=trace_attr['dataquality'])
+
+    # Initialize packedsamples pointer for the packMSTraceToBuffer function
+    packedsamples = C.c_int64()
+
+    # Fill up msr record structure, this is already contained in
+    # mstg, however if blk1001 is set we need it anyway
+    msr = clibmseed.msr_init(None)
+    msr.contents.network = trace.stats.network.encode('ascii', 'strict')
+    msr.contents.station = trace.stats.station.encode('ascii', 'strict')
+    msr.contents.location = trace.stats.location.encode('ascii', 'strict')
+    msr.contents.channel = trace.stats.channel.encode('ascii', 'strict')
+    msr.contents.dataquality = trace_attr['dataquality'].\
+        encode('ascii', 'strict')
+
+    # Set starting sequence number
+    msr.contents.sequence_number = trace_attr['sequence_number']
+
+    # Only use Blockette 1001 if necessary.
+    if use_blkt_1001:
+        # Timing quality has been set in trace_attr
+
+        size = C.sizeof(blkt_1001_s)
+        # Only timing quality matters here, other blockette attributes will
+        # be filled by libmseed.msr_normalize_header
+        blkt_value = pack(native_str("BBBB"), trace_attr['timing_quality'],
+                          0, 0, 0)
+        blkt_ptr = C.create_string_buffer(blkt_value, len(blkt_value))
+
+        # Usually returns a pointer to the added blockette in the
+        # blockette link chain and a NULL pointer if it fails.
+        # NULL pointers have a false boolean value according to the
+        # ctypes manual.
+        ret_val = clibmseed.msr_addblockette(msr, blkt_ptr,
+                                             size, 1001, 0)
+
+        if bool(ret_val) is False:
+            clibmseed.msr_free(C.pointer(msr))
+            del msr
+            raise Exception('Error in msr_addblockette')
+    # Only use Blockette 100 if necessary.
+    if trace_attr['use_blkt_100']:
+        size = C.sizeof(blkt_100_s)
+        blkt100 = C.c_char(b' ')
+        C.memset(C.pointer(blkt100), 0, size)
+        ret_val = clibmseed.msr_addblockette(
+            msr, C.pointer(blkt100), size, 100, 0)  # NOQA
+        # Usually returns a pointer to the added blockette in the
+        # blockette link chain and a NULL pointer if it fails.
+        # NULL pointers have a false boolean value according to the
+        # ctypes manual.
+        if bool(ret_val) is False:
+            clibmseed.msr_free(C.pointer(msr))  # NOQA
+            del msr  # NOQA
+            raise Exception('Error in msr_addblockette')
+
+    # Pack mstg into records collected in a single buffer. The initial size
+    # of the buffer is enough for uncompressed data, it grows if necessary.
+    buf = C.POINTER(C.c_char)()
+    bufsize = C.c_int64()
+    reclen = trace_attr['reclen']
+    nrecords = data.nbytes // (reclen - 64) + 1
+    errcode = clibmseed.packMSTraceToBuffer(
+        mst.mst, reclen, trace_attr['encoding'], trace_attr['byteorder'],
+        C.byref(packedsamples), flush, verbose, msr, nrecords * reclen,
+        C.byref(buf), C.byref(bufsize))  # NOQA
+
+    # Deallocate any allocated memory.
+    clibmseed.msr_free(C.pointer(msr))  # NOQA
+    del mst, msr  # NOQA
+    if errcode == -1:
+        raise Exception('Error in mst_pack')
+    try:
+        records = C.string_at(buf, bufsize.value)
+    finally:
+        clibmseed.free_bytes(buf)
+    if errcode == 0:
+        msg = ("Did not write any data for trace '%s' even though it "
+               "contains data values.") % trace
+        raise ValueError(msg)
+    return records
+
+
 class MST(object):
     """
     Class that transforms a ObsPy Trace object to a libmseed internal MSTrace
@@ -728,6 +728,17 @@ clibmseed.allocate_bytes.argtypes = (C.c_int,)
 clibmseed.allocate_bytes.restype = C.c_void_p
 
 
+clibmseed.free_bytes.argtypes = (C.c_void_p,)
+clibmseed.free_bytes.restype = C.c_void_p
+
+
+clibmseed.packMSTraceToBuffer.argtypes = [
+    C.POINTER(MSTrace), C.c_int, C.c_byte, C.c_byte,
+    C.POINTER(C.c_int64), C.c_byte, C.c_byte, C.POINTER(MSRecord),
+    C.c_int64, C.POINTER(C.POINTER(C.c_char)), C.POINTER(C.c_int64)]
+clibmseed.packMSTraceToBuffer.restype = C.c_int
+
+
 # Python callback functions for C
 def __PyFile_callback(_f):
     return 1
@@ -569,3 +569,89 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
     }
     return idListHead;
 }
+
+
+// Growable memory buffer for the records created by mst_pack.
+typedef struct RecordBuffer_s {
+    char *data;         // Packed records
+    int64_t size;       // Number of used bytes
+    int64_t capacity;   // Number of allocated bytes
+    int error;          // Set if memory could not be allocated
+}
+RecordBuffer;
+
+
+// Record handler for mst_pack appending each record to a RecordBuffer.
+static void record_buffer_handler(char *record, int reclen, void *handlerdata) {
+    RecordBuffer *buffer = (RecordBuffer *) handlerdata;
+    int64_t capacity;
+    char *data;
+
+    if (buffer->error) {
+        return;
+    }
+    if (buffer->size + reclen > buffer->capacity) {
+        capacity = buffer->capacity * 2;
+        if (capacity < buffer->size + reclen) {
+            capacity = buffer->size + reclen;
+        }
+        data = (char *) realloc(buffer->data, (size_t) capacity);
+        if (data == NULL) {
+            buffer->error = 1;
+            return;
+        }
+        buffer->data = data;
+        buffer->capacity = capacity;
+    }
+    memcpy(buffer->data + buffer->size, record, reclen);
+    buffer->size += reclen;
+}
+
+
+// Packs a MSTrace into records which are collected in a single buffer
+// instead of passing every single record to a callback function. The
+// buffer is allocated with an initial size of bufsize bytes and grows as
+// needed. It has to be freed by the caller with free_bytes().
+//
+// Returns the number of created records or -1 on error.
+int packMSTraceToBuffer(MSTrace *mst, int reclen, flag encoding,
+                        flag byteorder, int64_t *packedsamples, flag flush,
+                        flag verbose, MSRecord *mstemplate, int64_t bufsize,
+                        char **data, int64_t *size) {
+    RecordBuffer buffer;
+    int records;
+
+    *data = NULL;
+    *size = 0;
+    if (bufsize < reclen) {
+        bufsize = reclen;
+    }
+    buffer.data = (char *) malloc((size_t) bufsize);
+    if (buffer.data == NULL) {
+        ms_log(2, "packMSTraceToBuffer(): Cannot allocate buffer\n");
+        return -1;
+    }
+    buffer.size = 0;
+    buffer.capacity = bufsize;
+    buffer.error = 0;
+
+    records = mst_pack(mst, &record_buffer_handler, (void *) &buffer,
+                       reclen, encoding, byteorder, packedsamples, flush,
+                       verbose, mstemplate);
+    if (records < 0 || buffer.error) {
+        if (buffer.error) {
+            ms_log(2, "packMSTraceToBuffer(): Cannot reallocate buffer\n");
+        }
+        free(buffer.data);
+        return -1;
+    }
+    *data = buffer.data;
+    *size = buffer.size;
+    return records;
+}
+
+
+// Dummy wrapper around free.
+void free_bytes(void *ptr) {
+    free(ptr);
+}
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.mseed.archive test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from obspy import Stream, Trace, UTCDateTime, read
+from obspy.mseed.archive import SDSArchiveWriter
+import io
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class SDSArchiveWriterTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.mseed.archive.SDSArchiveWriter.
+    """
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='obspy-')
+        np.random.seed(815)
+        data = np.cumsum(np.random.randint(-100, 100, 120000))
+        self.trace = Trace(data=data.astype(np.int32))
+        self.trace.stats.network = 'XX'
+        self.trace.stats.station = 'AAA'
+        self.trace.stats.channel = 'HHZ'
+        self.trace.stats.sampling_rate = 100.0
+        self.trace.stats.starttime = UTCDateTime(2014, 1, 1, 23, 50)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _path(self, julday, channel='HHZ'):
+        return os.path.join(self.root, '2014', 'XX', 'AAA', channel + '.D',
+                            'XX.AAA..%s.D.2014.%03d' % (channel, julday))
+
+    def _packets(self, tr, size=137):
+        t = tr.stats.starttime
+        for i in range(0, tr.stats.npts, size):
+            yield tr.slice(t + i / 100.0, t + (i + size - 1) / 100.0)
+
+    def _sequenceNumbers(self, filename):
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+        return [int(data[i:i + 6]) for i in range(0, len(data), 512)]
+
+    def test_packets(self):
+        """
+        Small packets are written in complete records, the file is the same
+        as when writing the data at once.
+        """
+        tr = self.trace.slice(None,
+                              UTCDateTime(2014, 1, 1, 23, 59, 59, 990000))
+        writer = SDSArchiveWriter(self.root, flush_timeout=None)
+        for packet in self._packets(tr):
+            writer.write(Stream([packet]))
+            if os.path.exists(self._path(1)):
+                self.assertEqual(os.path.getsize(self._path(1)) % 512, 0)
+        writer.close()
+        buf = io.BytesIO()
+        tr.write(buf, format='MSEED', reclen=512, encoding='STEIM2')
+        with open(self._path(1), 'rb') as fh:
+            self.assertEqual(fh.read(), buf.getvalue())
+
+    def test_dayBoundaryAndSequenceNumbers(self):
+        """
+        Files are split at day boundaries, sequence numbers are continued
+        across days and for existing files.
+        """
+        writer = SDSArchiveWriter(self.root, flush_timeout=None)
+        for packet in self._packets(self.trace):
+            writer.write(packet)
+        writer.close()
+        st = read(self._path(1))
+        self.assertEqual(len(st), 1)
+        self.assertEqual(st[0].stats.endtime,
+                         UTCDateTime(2014, 1, 1, 23, 59, 59, 990000))
+        st += read(self._path(2))
+        self.assertEqual(st[1].stats.starttime, UTCDateTime(2014, 1, 2))
+        st.merge()
+        np.testing.assert_array_equal(st[0].data, self.trace.data)
+        numbers = self._sequenceNumbers(self._path(1)) + \
+            self._sequenceNumbers(self._path(2))
+        self.assertEqual(numbers, list(range(1, len(numbers) + 1)))
+        # continue with the existing file
+        tr = self.trace.copy()
+        tr.stats.starttime += 1200
+        with SDSArchiveWriter(self.root) as writer:
+            writer.write(tr)
+        numbers = self._sequenceNumbers(self._path(2))
+        self.assertEqual(numbers, list(range(numbers[0],
+                                             numbers[0] + len(numbers))))
+        st = read(self._path(2))
+        self.assertEqual(len(st), 1)
+        self.assertEqual(st[0].stats.npts, 180000)
+
+    def test_gapsAndTimeout(self):
+        """
+        Gaps and the flush timeout result in partially filled records.
+        """
+        tr1 = self.trace.slice(None, self.trace.stats.starttime + 9.99)
+        tr2 = self.trace.slice(self.trace.stats.starttime + 20,
+                               self.trace.stats.starttime + 29.99)
+        writer = SDSArchiveWriter(self.root, flush_timeout=None)
+        writer.write(tr1)
+        channel = writer._channels[tr1.id]
+        numsamples = channel.numsamples
+        self.assertTrue(0 < numsamples < 1000)
+        writer.flush(timeout=3600)
+        self.assertEqual(channel.numsamples, numsamples)
+        writer.write(tr2)
+        self.assertTrue(0 < channel.numsamples < 1000)
+        writer.flush()
+        st = read(self._path(1))
+        self.assertEqual(len(st), 2)
+        for tr, expected in zip(st, (tr1, tr2)):
+            self.assertEqual(tr.stats.starttime, expected.stats.starttime)
+            np.testing.assert_array_equal(tr.data, expected.data)
+        writer.close()
+        # all data is written immediately
+        shutil.rmtree(self.root)
+        with SDSArchiveWriter(self.root, flush_timeout=0) as writer:
+            writer.write(self.trace.slice(None, tr1.stats.starttime + 1))
+            self.assertEqual(len(read(self._path(1))[0]), 101)
+
+    def test_openFiles(self):
+        """
+        Only a limited number of files is kept open.
+        """
+        writer = SDSArchiveWriter(self.root, max_open_files=2,
+                                  flush_timeout=0)
+        tr = self.trace.slice(None, self.trace.stats.starttime + 1)
+        for channel in ('HHZ', 'HHN', 'HHE', 'HHZ'):
+            tr.stats.channel = channel
+            writer.write(tr)
+            self.assertTrue(len(writer._files) <= 2)
+        self.assertEqual(list(writer._files.keys()),
+                         [self._path(1, 'HHE'), self._path(1, 'HHZ')])
+        writer.close()
+        self.assertEqual(len(writer._files), 0)
+        for channel in ('HHN', 'HHE'):
+            self.assertEqual(len(read(self._path(1, channel))), 1)
+        self.assertEqual(self._sequenceNumbers(self._path(1, 'HHZ')), [1, 2])
+
+
+def suite():
+    return unittest.makeSuite(SDSArchiveWriterTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -1231,6 +1231,44 @@ class MSEEDReadingAndWritingTestCase(unittest.TestCase):
             self.assertRaises(ValueError, st.write, tf, format="mseed",
                               encoding=11, reclen=512)
 
+    def test_write_with_threads(self):
+        """
+        Packing the traces in parallel results in the same file as packing
+        them one after another.
+        """
+        np.random.seed(815)
+        st = Stream()
+        for i, (dtype, encoding) in enumerate([
+                (np.int32, 'STEIM2'), (np.int32, 'STEIM1'),
+                (np.float64, 'FLOAT64'), (np.float32, 'FLOAT32'),
+                (np.int32, 'INT32'), (np.int32, 'STEIM2')]):
+            data = np.cumsum(np.random.randint(-100, 100, 20000 + i))
+            tr = Trace(data=data.astype(dtype))
+            tr.stats.station = 'ST%i' % i
+            tr.stats.sampling_rate = 100.0
+            tr.stats.mseed = AttribDict({'encoding': encoding})
+            st.append(tr)
+        # an empty trace is skipped
+        st.insert(2, Trace(data=np.array([], dtype=np.int32)))
+        for kwargs in ({}, {'reclen': 512}, {'flush': False},
+                       {'byteorder': '<', 'sequence_number': 999990}):
+            files = []
+            for threads in (1, 4):
+                buf = io.BytesIO()
+                with warnings.catch_warnings(record=True):
+                    warnings.simplefilter("ignore")
+                    writeMSEED(st, buf, threads=threads, **kwargs)
+                files.append(buf.getvalue())
+            self.assertEqual(files[0], files[1])
+            reclen = kwargs.get('reclen', 4096)
+            self.assertEqual(len(files[0]) % reclen, 0)
+        # all traces are written in order
+        st2 = read(io.BytesIO(files[1]))
+        self.assertEqual([tr.stats.station for tr in st2],
+                         ['ST%i' % i for i in range(6)])
+        for tr, tr2 in zip(st2, st[:2] + st[3:]):
+            np.testing.assert_array_equal(tr.data, tr2.data)
+
 
 def suite():
     return unittest.makeSuite(MSEEDReadingAndWritingTestCase, 'test')
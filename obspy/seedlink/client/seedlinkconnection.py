@@ -1235,7 +1235,17 @@ class SeedLinkConnection(object):
         bytes = sendStr + b"\r"
         bytesread = self.sendData(bytes, self.sladdr,
                                   SeedLinkConnection.DFT_READBUF_SIZE)
+        self.parseHelloResponse(bytesread)
 
+    def parseHelloResponse(self, bytesread):
+        """
+        Parse the server ID and version from the response to HELLO.
+
+        :param bytesread: the response bytes.
+
+        :raise SeedLinkException: if the response is not from a SeedLink
+            server.
+        """
         # Parse the server ID and version from the returned string
         servstr = None
         try:
@@ -1392,10 +1402,41 @@ class SeedLinkConnection(object):
         msg = "response: %s selector(s) accepted"
         logger.debug(msg % (acceptsel))
 
-        # Issue the DATA, FETCH or TIME action commands. A specified start (and
-        # optionally, stop time) takes precedence over the resumption from any
-        # previous sequence number.
+        # Issue the DATA, FETCH or TIME action command
+        sendStr = self.buildActionCommand(curstream)
+
+        # Send action command and receive response
+        logger.debug("sending: %s" % (sendStr))
+        bytes = sendStr + b"\r"
+        bytesread = None
+        bytesread = self.sendData(bytes, self.sladdr,
+                                  SeedLinkConnection.DFT_READBUF_SIZE)
+
+        # Check response to DATA/FETCH/TIME
+        readStr = bytesread.decode()
+        if readStr == "OK\r\n":
+            logger.debug("response: DATA/FETCH/TIME command is OK")
+            acceptsel += 1
+        elif readStr == "ERROR\r\n":
+            msg = "response: DATA/FETCH/TIME command is not accepted"
+            raise SeedLinkException(msg)
+        else:
+            msg = "response: invalid response to DATA/FETCH/TIME command: %s"
+            raise SeedLinkException(msg % (readStr))
+
+    def buildActionCommand(self, curstream):
+        """
+        Build the DATA, FETCH or TIME action command for a station.
+
+        A specified start (and optionally, stop time) takes precedence over
+        the resumption from any previous sequence number.
 
+        :param curstream: the description of the station.
+        :return: the command without the trailing carriage return.
+
+        :raise SeedLinkException: if the server does not support a TIME
+            window.
+        """
         sendStr = None
         if (curstream.seqnum != -1) and self.resume:
             if self.dialup:
@@ -1403,23 +1444,21 @@ class SeedLinkConnection(object):
             else:
                 sendStr = b"DATA"
 
+            # Next sequence number as six digit hexadecimal number
+            seqstr = ("%06X" % (curstream.seqnum + 1)).encode('ascii')
             # Append the last packet time if the feature is enabled and server
             # is >= 2.93
             if self.lastpkttime and self.checkVersion(2.93) >= 0 and \
                curstream.btime is not None:
-                # Increment sequence number by 1
-                sendStr += b" " + hex(curstream.seqnum + 1) + b" " + \
-                    curstream.getSLTimeStamp()
+                sendStr += b" " + seqstr + b" " + \
+                    curstream.getSLTimeStamp().encode('ascii', 'strict')
                 msg = "requesting resume data from 0x%s (decimal: %s) at %s"
-                logger.info(msg % (hex(curstream.seqnum + 1).upper(),
-                            curstream.seqnum + 1),
-                            curstream.getSLTimeStamp())
+                logger.info(msg % (seqstr.decode(), curstream.seqnum + 1,
+                                   curstream.getSLTimeStamp()))
             else:
-                # Increment sequence number by 1
-                sendStr += b" " + hex(curstream.seqnum + 1)
+                sendStr += b" " + seqstr
                 msg = "requesting resume data from 0x%s (decimal: %s)"
-                logger.info(msg % (hex(curstream.seqnum + 1).upper(),
-                                   curstream.seqnum + 1))
+                logger.info(msg % (seqstr.decode(), curstream.seqnum + 1))
         elif self.begin_time is not None:
             # begin time specified (should only be at initial startup)
             if self.checkVersion(2.92) >= 0:
@@ -1440,25 +1479,7 @@ class SeedLinkConnection(object):
             else:
                 sendStr = b"DATA"
             logger.info("requesting next available data")
-
-        # Send action command and receive response
-        logger.debug("sending: %s" % (sendStr))
-        bytes = sendStr + b"\r"
-        bytesread = None
-        bytesread = self.sendData(bytes, self.sladdr,
-                                  SeedLinkConnection.DFT_READBUF_SIZE)
-
-        # Check response to DATA/FETCH/TIME
-        readStr = bytesread.decode()
-        if readStr == "OK\r\n":
-            logger.debug("response: DATA/FETCH/TIME command is OK")
-            acceptsel += 1
-        elif readStr == "ERROR\r\n":
-            msg = "response: DATA/FETCH/TIME command is not accepted"
-            raise SeedLinkException(msg)
-        else:
-            msg = "response: invalid response to DATA/FETCH/TIME command: %s"
-            raise SeedLinkException(msg % (readStr))
+        return sendStr
 
     def negotiateUniStation(self):
         """
@@ -1567,9 +1588,9 @@ class SeedLinkConnection(object):
         seqnum = slpacket.getSequenceNumber()
         if (seqnum == -1):
             raise SeedLinkException("could not determine sequence number")
-        trace = None
+        header = None
         try:
-            trace = slpacket.getTrace()
+            header = slpacket.getHeader()
         except Exception as e:
             msg = "blockette not 1000 (Data Only SEED Blockette) or other " + \
                 "error reading miniseed data: %s"
@@ -1580,9 +1601,9 @@ class SeedLinkConnection(object):
         station = None
         btime = None
         try:
-            station = trace.stats['station']
-            net = trace.stats['network']
-            btime = trace.stats['starttime']
+            station = header['station']
+            net = header['network']
+            btime = header['starttime']
             # print("DEBUG: station, net, btime:", station, net, btime)
         except Exception as se:
             raise SeedLinkException("trace header read error: %s" % (se))
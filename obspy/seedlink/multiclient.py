@@ -0,0 +1,663 @@
+# -*- coding: utf-8 -*-
+"""
+Receiving data from many SeedLink servers in a single thread.
+
+The :class:`~obspy.seedlink.multiclient.MultiSeedLinkClient` class drives any
+number of non-blocking SeedLink connections with one ``select()`` based event
+loop, so monitoring a dozen servers does not need a dozen threads.
+
+.. code-block:: python
+
+    from obspy.seedlink.multiclient import MultiSeedLinkClient
+
+    def handle_data(trace):
+        print(trace)
+
+    client = MultiSeedLinkClient()
+    client.add_server('geofon.gfz-potsdam.de:18000', 'GE_APE:BH?,GE_MORC',
+                      on_data=handle_data)
+    client.add_server('rtserve.iris.washington.edu:18000', 'IU_ANMO:BH?',
+                      on_data=handle_data, statefile='iris.state')
+    client.run()
+
+The connections are
+:class:`~obspy.seedlink.multiclient.NonBlockingSeedLinkConnection` objects.
+They are configured like a
+:class:`~obspy.seedlink.client.seedlinkconnection.SeedLinkConnection` (stream
+lists, selectors, state files, time windows, keepalive, network timeout and
+reconnect delay) and support uni- and multi-station mode as well as INFO
+requests.
+
+.. note::
+
+    All callbacks are called from the thread running
+    :meth:`~obspy.seedlink.multiclient.MultiSeedLinkClient.run` and should
+    return quickly, as no other connection is served in the meantime. Host
+    names are resolved synchronously when (re)connecting.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from obspy.seedlink.client.seedlinkconnection import SeedLinkConnection
+from obspy.seedlink.client.slnetstation import SLNetStation
+from obspy.seedlink.client.slstate import SLState
+from obspy.seedlink.seedlinkexception import SeedLinkException
+from obspy.seedlink.slpacket import SLPacket
+import errno
+import io
+import logging
+import os
+import select
+import socket
+import threading
+import time
+
+
+# default logger
+logger = logging.getLogger('obspy.seedlink')
+
+# error numbers of non-blocking socket operations that have to be retried
+_WOULDBLOCK = (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINPROGRESS,
+               getattr(errno, 'WSAEWOULDBLOCK', 10035))
+
+
+def _wouldBlock(e):
+    return getattr(e, 'errno', None) in _WOULDBLOCK
+
+
+class NonBlockingSeedLinkConnection(SeedLinkConnection):
+    """
+    SeedLink connection driven by a
+    :class:`~obspy.seedlink.multiclient.MultiSeedLinkClient`.
+
+    The connection is configured with the methods inherited from
+    :class:`~obspy.seedlink.client.seedlinkconnection.SeedLinkConnection`,
+    e.g. :meth:`addStream`, :meth:`parseStreamlist`, :meth:`setUniParams`,
+    :meth:`setStateFile`, :meth:`setBeginTime` or :meth:`requestInfo`, but
+    never blocks. Received data and events are passed to the callback
+    methods, which can either be overridden in a subclass or given on
+    initialization.
+
+    A connection without any streams only sends the requested INFO and is
+    finished afterwards. Otherwise the connection is reestablished after
+    errors and network timeouts, resuming from the last received packets,
+    until the server ends the data transfer (e.g. at the end of a
+    requested time window) or :meth:`terminate` is called.
+
+    :type sladdr: str
+    :param sladdr: The host:port of the SeedLink server.
+    :type on_data: callable
+    :param on_data: Called with each received
+        :class:`~obspy.core.trace.Trace`.
+    :type on_packet: callable
+    :param on_packet: Called with each received
+        :class:`~obspy.seedlink.slpacket.SLPacket` instead of ``on_data``,
+        e.g. the
+        :meth:`~obspy.seedlink.ringbuffer.BatchDecoder.add_packet` method of
+        a :class:`~obspy.seedlink.ringbuffer.BatchDecoder` to skip decoding
+        every single packet.
+    :type on_info: callable
+    :param on_info: Called with the XML string of each complete INFO
+        response.
+    :type on_seedlink_error: callable
+    :param on_seedlink_error: Called without arguments when the server
+        responds with ``ERROR``.
+    :type on_terminate: callable
+    :param on_terminate: Called without arguments when the connection is
+        finished.
+
+    :var phase: One of ``DOWN``, ``CONNECTING``, ``NEGOTIATING``,
+        ``STREAMING`` and ``FINISHED``.
+    :type phase: int
+    """
+    DOWN = 0
+    CONNECTING = 1
+    NEGOTIATING = 2
+    STREAMING = 3
+    FINISHED = 4
+    # timeouts (seconds) for establishing the socket connection and for
+    # server responses, as in the blocking connection
+    CONNECT_TIMEOUT = 4.0
+    RESPONSE_TIMEOUT = 30.0
+    RECV_SIZE = 65536
+    PACKET_SIZE = SLPacket.SLHEADSIZE + SLPacket.SLRECSIZE
+
+    def __init__(self, sladdr=None, on_data=None, on_info=None,
+                 on_seedlink_error=None, on_terminate=None, on_packet=None):
+        super(NonBlockingSeedLinkConnection, self).__init__()
+        if sladdr is not None:
+            self.setSLAddress(sladdr)
+        if on_data is not None:
+            self.on_data = on_data
+        if on_info is not None:
+            self.on_info = on_info
+        if on_packet is not None:
+            self.on_packet = on_packet
+        if on_seedlink_error is not None:
+            self.on_seedlink_error = on_seedlink_error
+        if on_terminate is not None:
+            self.on_terminate = on_terminate
+        self.phase = self.DOWN
+        self._retry_time = 0.0
+        self._deadline = None
+        self._last_received = 0.0
+        self._last_keepalive = 0.0
+        self._buffer = bytearray()
+        self._outbuf = bytearray()
+        self._negotiation = None
+        self._response_lines = 0
+
+    def fileno(self):
+        """
+        File descriptor of the socket, used by ``select()``.
+        """
+        return self.socket.fileno()
+
+    def on_data(self, trace):
+        """
+        Callback for received waveform data.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: The trace of one received packet.
+        """
+        pass
+
+    def on_packet(self, slpacket):
+        """
+        Callback for received data packets, decodes the packet and passes
+        the trace to :meth:`on_data`.
+
+        :type slpacket: :class:`~obspy.seedlink.slpacket.SLPacket`
+        :param slpacket: The received packet.
+        """
+        self.on_data(slpacket.getTrace())
+
+    def on_info(self, info_string):
+        """
+        Callback for complete responses to INFO requests.
+
+        :type info_string: str
+        :param info_string: The XML response.
+        """
+        pass
+
+    def on_seedlink_error(self):
+        """
+        Callback for ``ERROR`` responses of the server. The connection is
+        reestablished afterwards.
+        """
+        pass
+
+    def on_terminate(self):
+        """
+        Callback for the end of the connection.
+        """
+        pass
+
+    def _wantsRead(self):
+        return self.socket is not None and \
+            self.phase in (self.NEGOTIATING, self.STREAMING)
+
+    def _wantsWrite(self):
+        return self.socket is not None and \
+            (self.phase == self.CONNECTING or len(self._outbuf) > 0)
+
+    def _open(self, now):
+        """
+        Starts connecting the socket.
+        """
+        host = self.sladdr[0:self.sladdr.find(':')]
+        sock = None
+        try:
+            port = int(self.sladdr[self.sladdr.find(':') + 1:])
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setblocking(0)
+            err = sock.connect_ex((host, port))
+        except (socket.error, ValueError) as e:
+            if sock is not None:
+                sock.close()
+            self._reconnectLater("cannot connect to SeedLink server: %s" % e)
+            return
+        self.socket = sock
+        if err != 0 and err not in _WOULDBLOCK:
+            self._reconnectLater("cannot connect to SeedLink server: %s" %
+                                 os.strerror(err))
+            return
+        self.phase = self.CONNECTING
+        self._deadline = now + self.CONNECT_TIMEOUT
+
+    def _reconnectLater(self, msg):
+        """
+        Closes the socket after an error and schedules the reconnection.
+        """
+        logger.error("[%s] %s, reconnecting in %ss" %
+                     (self.sladdr, msg, self.netdly))
+        self.disconnect()
+        self.phase = self.DOWN
+        self._retry_time = time.time() + self.netdly
+        self._buffer = bytearray()
+        self._outbuf = bytearray()
+        self._negotiation = None
+        self._response_lines = 0
+
+    def _finish(self):
+        """
+        Closes the connection for good.
+        """
+        self.phase = self.FINISHED
+        self.close()
+        self.on_terminate()
+
+    def _send(self, command):
+        logger.debug("[%s] sending: %s" % (self.sladdr, command.decode()))
+        self._outbuf += command + b"\r"
+
+    def _sendInfo(self, level, query_mode):
+        if self.checkVersion(2.92) < 0:
+            msg = "detected SeedLink version %s does not support INFO requests"
+            logger.error(msg % (self.server_version))
+            return
+        self._send(b"INFO " + level.encode('ascii', 'strict'))
+        self.state.expect_info = True
+        self.state.query_mode = query_mode
+
+    def _tick(self, now):
+        """
+        Timer driven work: (re)connecting, timeouts, keepalive and in-stream
+        INFO requests.
+        """
+        if self.terminate_flag:
+            logger.info("[%s] terminating connection" % (self.sladdr))
+            self._finish()
+        elif self.phase == self.DOWN:
+            if now >= self._retry_time:
+                self._open(now)
+        elif self.phase == self.CONNECTING:
+            if now > self._deadline:
+                msg = "socket connect time-out %ss" % (self.CONNECT_TIMEOUT)
+                self._reconnectLater(msg)
+        elif self.phase == self.NEGOTIATING:
+            if now - self._last_received > self.RESPONSE_TIMEOUT:
+                self._reconnectLater("no response from SeedLink server")
+        elif self.phase == self.STREAMING:
+            if self.netto > 0 and now - self._last_received > self.netto:
+                self._reconnectLater("network timeout (%s)" % (self.netto))
+            elif self.state.expect_info:
+                pass
+            elif self.info_request_string is not None:
+                level = self.info_request_string
+                self.info_request_string = None
+                self._sendInfo(level, SLState.INFO_QUERY)
+            elif self.keepalive > 0 and now - max(
+                    self._last_received,
+                    self._last_keepalive) > self.keepalive:
+                logger.debug("[%s] sending: keepalive request" %
+                             (self.sladdr))
+                self._sendInfo("ID", SLState.KEEP_ALIVE_QUERY)
+                self._last_keepalive = now
+
+    def _handleWrite(self, now):
+        if self.phase == self.CONNECTING:
+            err = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                self._reconnectLater("cannot connect to SeedLink server: %s" %
+                                     os.strerror(err))
+                return
+            logger.info("[%s] network socket opened" % (self.sladdr))
+            self.phase = self.NEGOTIATING
+            self.state.state = SLState.SL_UP
+            self._last_received = now
+            self._negotiation = self._negotiate()
+            self._advance(None)
+            return
+        try:
+            sent = self.socket.send(bytes(self._outbuf))
+        except socket.error as e:
+            if not _wouldBlock(e):
+                self._reconnectLater("socket write error: %s" % (e))
+            return
+        del self._outbuf[:sent]
+
+    def _handleRead(self, now):
+        try:
+            data = self.socket.recv(self.RECV_SIZE)
+        except socket.error as e:
+            if not _wouldBlock(e):
+                self._reconnectLater("socket read error: %s" % (e))
+            return
+        if not data:
+            self._reconnectLater("connection closed by server")
+            return
+        self._last_received = now
+        self._buffer += data
+        self._processBuffer()
+
+    def _negotiate(self):
+        """
+        Generator yielding the commands of the handshake together with the
+        number of expected response lines (0 for none and -1 for an INFO
+        response). The responses are sent back into the generator.
+        """
+        response = yield b"HELLO", 2
+        self.parseHelloResponse(response)
+
+        if self.info_request_string is not None:
+            level = self.info_request_string
+            self.info_request_string = None
+            if self.checkVersion(2.92) >= 0:
+                yield b"INFO " + level.encode('ascii', 'strict'), -1
+            else:
+                msg = "detected SeedLink version %s does not support INFO " + \
+                    "requests"
+                logger.error(msg % (self.server_version))
+        if not self.streams:
+            return
+
+        if self.multistation and self.checkVersion(2.5) < 0:
+            msg = "detected SeedLink version %s does not support " + \
+                "multi-station protocol"
+            raise SeedLinkException(msg % (self.server_version))
+        acceptsta = 0
+        for curstream in self.streams:
+            if self.multistation:
+                response = yield ("STATION " + curstream.station + " " +
+                                  curstream.net).encode('ascii', 'strict'), 1
+                if not self._isAccepted(response, "STATION"):
+                    continue
+            selectors = [selector.encode('ascii', 'strict')
+                         for selector in curstream.getSelectors()]
+            acceptsel = 0
+            for selector in selectors:
+                if len(selector) > SLNetStation.MAX_SELECTOR_SIZE:
+                    logger.warn("invalid selector: %s" % (selector))
+                    continue
+                response = yield b"SELECT " + selector, 1
+                acceptsel += self._isAccepted(response, "SELECT")
+            if selectors and acceptsel < 1:
+                logger.error("response: no data stream selector(s) accepted")
+                continue
+            response = yield self.buildActionCommand(curstream), 1
+            acceptsta += self._isAccepted(response, "DATA/FETCH/TIME")
+        if acceptsta < 1:
+            raise SeedLinkException("no stations accepted")
+        logger.info("[%s] %s station(s) accepted" % (self.sladdr, acceptsta))
+        if self.multistation:
+            yield b"END", 0
+
+    def _isAccepted(self, response, command):
+        if response == b"OK\r\n":
+            return True
+        elif response == b"ERROR\r\n":
+            logger.error("response: %s command not accepted" % (command))
+            return False
+        msg = "response: invalid response to %s command: %s"
+        raise SeedLinkException(msg % (command, response))
+
+    def _advance(self, response):
+        """
+        Passes a response to the handshake and sends the next command.
+        """
+        while True:
+            try:
+                command, lines = self._negotiation.send(response)
+            except StopIteration:
+                self._negotiation = None
+                if not self.streams:
+                    self._finish()
+                else:
+                    self.phase = self.STREAMING
+                    self.state.state = SLState.SL_DATA
+                return
+            except SeedLinkException as e:
+                msg = "negotiation with remote SeedLink failed: %s" % (e)
+                self._reconnectLater(msg)
+                return
+            self._send(command)
+            if lines > 0:
+                self._response_lines = lines
+            elif lines < 0:
+                self.state.expect_info = True
+                self.state.query_mode = SLState.INFO_QUERY
+            if lines != 0:
+                return
+            response = None
+
+    def _processBuffer(self):
+        """
+        Handles all complete responses and packets in the receive buffer.
+        """
+        while self._wantsRead():
+            if self._response_lines > 0:
+                end = 0
+                for _i in range(self._response_lines):
+                    end = self._buffer.find(b"\r\n", end)
+                    if end < 0:
+                        return
+                    end += 2
+                response = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                self._response_lines = 0
+                self._advance(response)
+            elif self.phase == self.NEGOTIATING and \
+                    not self.state.expect_info:
+                return
+            elif not self._processPacket():
+                return
+
+    def _processPacket(self):
+        """
+        Handles the next packet in the receive buffer. Returns ``False`` if
+        more data is needed.
+        """
+        buf = self._buffer
+        if buf[:2].lower() == SLPacket.SIGNATURE.lower():
+            if len(buf) < self.PACKET_SIZE:
+                return False
+            slpacket = SLPacket(buf, 0)
+            del buf[:self.PACKET_SIZE]
+            self._handlePacket(slpacket)
+            return True
+        signature = SLPacket.ERRORSIGNATURE
+        if buf[:len(signature)].lower() == signature.lower():
+            logger.error("[%s] SeedLink reported an error with the last "
+                         "command" % (self.sladdr))
+            self.on_seedlink_error()
+            self._reconnectLater("SeedLink error")
+            return False
+        signature = SLPacket.ENDSIGNATURE
+        if buf[:len(signature)].lower() == signature.lower():
+            logger.info("[%s] end of buffer or selected time window" %
+                        (self.sladdr))
+            self._finish()
+            return False
+        if len(buf) >= len(SLPacket.ERRORSIGNATURE):
+            self._reconnectLater("unexpected data received")
+        return False
+
+    def _handlePacket(self, slpacket):
+        if slpacket.slhead[:len(SLPacket.INFOSIGNATURE)].lower() == \
+                SLPacket.INFOSIGNATURE.lower():
+            terminated = chr(slpacket.slhead[SLPacket.SLHEADSIZE - 1]) != '*'
+            if not self.state.expect_info:
+                logger.error("unexpected INFO packet received, skipping")
+                return
+            if self.state.query_mode == SLState.KEEP_ALIVE_QUERY:
+                if terminated:
+                    logger.debug("keepalive packet received")
+                    self.state.expect_info = False
+                    self.state.query_mode = SLState.NO_QUERY
+                return
+            self.info_response_buffer.write(slpacket.getStringPayload())
+            if not terminated:
+                return
+            self.info_string = self.info_response_buffer.getvalue().\
+                decode('ASCII', errors='ignore').\
+                replace("><", ">\n<").rstrip('\x00')
+            self.info_response_buffer = io.BytesIO()
+            self.state.expect_info = False
+            self.state.query_mode = SLState.NO_QUERY
+            self.on_info(self.info_string)
+            if self.phase == self.NEGOTIATING:
+                self._advance(None)
+            return
+
+        try:
+            self.updateStream(slpacket)
+        except SeedLinkException as sle:
+            logger.error("bad packet: %s" % (sle))
+            return
+        if self.statefile is not None:
+            try:
+                self.saveState(self.statefile)
+            except SeedLinkException as sle:
+                logger.error(sle.value)
+        self.on_packet(slpacket)
+
+
+class MultiSeedLinkClient(object):
+    """
+    Receives data from many SeedLink connections in one thread.
+
+    Connections are added with
+    :meth:`~obspy.seedlink.multiclient.MultiSeedLinkClient.add_server` or
+    :meth:`~obspy.seedlink.multiclient.MultiSeedLinkClient.add_connection`
+    and served by
+    :meth:`~obspy.seedlink.multiclient.MultiSeedLinkClient.run`.
+
+    :var connections: The
+        :class:`~obspy.seedlink.multiclient.NonBlockingSeedLinkConnection`
+        objects.
+    :type connections: list
+    """
+    # maximum time (seconds) the loop waits for network events, this
+    # determines the resolution of all timers
+    POLL_INTERVAL = 0.25
+
+    def __init__(self):
+        self.connections = []
+        self._stop = threading.Event()
+
+    def add_connection(self, connection):
+        """
+        Adds a configured connection.
+
+        :type connection:
+            :class:`~obspy.seedlink.multiclient.NonBlockingSeedLinkConnection`
+        :param connection: The connection.
+        :raise SeedLinkException: if the connection description is invalid.
+        """
+        if not connection.checkslcd():
+            msg = "problems with the connection description"
+            raise SeedLinkException(msg)
+        self.connections.append(connection)
+        return connection
+
+    def add_server(self, sladdr, streams=None, selectors=None,
+                   statefile=None, begin_time=None, end_time=None,
+                   **kwargs):
+        """
+        Creates and adds a connection to a SeedLink server.
+
+        :type sladdr: str
+        :param sladdr: The host:port of the SeedLink server.
+        :type streams: str
+        :param streams: Streams for multi-station mode in the form
+            ``'NET_STA[:selectors],...'``, see
+            :meth:`~obspy.seedlink.client.seedlinkconnection.SeedLinkConnection.parseStreamlist`.
+            Uni-station mode is used if not given.
+        :type selectors: str
+        :param selectors: Default selectors, e.g. ``'BH?'``.
+        :type statefile: str
+        :param statefile: File to save the stream state to and to recover
+            it from, if it exists.
+        :type begin_time: str
+        :param begin_time: Begin of the requested time window in SeedLink
+            format (``'year,month,day,hour,minute,second'``).
+        :type end_time: str
+        :param end_time: End of the requested time window.
+        :param kwargs: Callbacks passed to
+            :class:`~obspy.seedlink.multiclient.NonBlockingSeedLinkConnection`.
+        :rtype:
+            :class:`~obspy.seedlink.multiclient.NonBlockingSeedLinkConnection`
+        """
+        connection = NonBlockingSeedLinkConnection(sladdr, **kwargs)
+        if streams is not None:
+            connection.parseStreamlist(streams, selectors)
+        else:
+            connection.setUniParams(selectors, -1, None)
+        if statefile is not None:
+            connection.setStateFile(statefile)
+        connection.setBeginTime(begin_time)
+        connection.setEndTime(end_time)
+        return self.add_connection(connection)
+
+    def run(self, timeout=None):
+        """
+        Serves all connections until they are finished,
+        :meth:`~obspy.seedlink.multiclient.MultiSeedLinkClient.stop` is
+        called (from another thread or a callback) or the timeout expired.
+
+        :type timeout: float
+        :param timeout: Maximum run time in seconds.
+        """
+        self._stop.clear()
+        end = None
+        if timeout is not None:
+            end = time.time() + timeout
+        while not self._stop.is_set():
+            now = time.time()
+            if end is not None and now >= end:
+                break
+            active = [conn for conn in self.connections
+                      if conn.phase != conn.FINISHED]
+            if not active:
+                break
+            for conn in active:
+                conn._tick(now)
+            readers = [conn for conn in active if conn._wantsRead()]
+            writers = [conn for conn in active if conn._wantsWrite()]
+            wait = self.POLL_INTERVAL
+            if end is not None:
+                wait = max(min(wait, end - now), 0)
+            if not readers and not writers:
+                time.sleep(wait)
+                continue
+            try:
+                readable, writable, _ = select.select(readers, writers, [],
+                                                      wait)
+            except select.error as e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+            now = time.time()
+            for conn in writable:
+                if conn._wantsWrite():
+                    conn._handleWrite(now)
+            for conn in readable:
+                if conn._wantsRead():
+                    conn._handleRead(now)
+
+    def stop(self):
+        """
+        Makes :meth:`~obspy.seedlink.multiclient.MultiSeedLinkClient.run`
+        return. The connections stay open.
+        """
+        self._stop.set()
+
+    def close(self):
+        """
+        Closes all connections, saving their state files.
+        """
+        for conn in self.connections:
+            if conn.phase != conn.FINISHED:
+                conn.phase = conn.FINISHED
+                conn.close()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Batched decoding of SeedLink packets into per-channel ring buffers.
+
+Decoding every 512 byte record into its own
+:class:`~obspy.core.trace.Trace` and adding these up is expensive for many
+channels. The :class:`~obspy.seedlink.ringbuffer.BatchDecoder` collects the
+received records, decodes them with one call to libmseed and appends the
+samples to preallocated :class:`~obspy.seedlink.ringbuffer.RingBuffer`
+objects, one per channel, which keep the latest data of a fixed time span.
+
+.. code-block:: python
+
+    from obspy.seedlink.multiclient import MultiSeedLinkClient
+    from obspy.seedlink.ringbuffer import BatchDecoder
+
+    decoder = BatchDecoder(buffer_length=600)
+    client = MultiSeedLinkClient()
+    client.add_server('geofon.gfz-potsdam.de:18000', 'GE_APE:BH?',
+                      on_packet=decoder.add_packet)
+    client.run(timeout=60)
+    st = decoder.get_stream()
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from obspy.core.stream import Stream
+from obspy.core.trace import Stats, Trace
+from obspy.mseed.core import readMSEED
+import io
+import time
+
+import numpy as np
+
+
+class RingBuffer(object):
+    """
+    Fixed size buffer holding the latest samples of one channel.
+
+    The samples are stored twice in an array of double the capacity, so the
+    buffered data is always available as one contiguous array without
+    copying. Appended data is checked for gaps and overlaps relative to the
+    end of the buffered data (with a tolerance of half a sample). Gaps are
+    filled with ``fill_value`` or, if it is ``None`` or the gap is longer
+    than the buffer, the buffer is emptied. Samples of overlapping data
+    which are already buffered are skipped. A change of the sampling rate
+    or data type empties the buffer as well.
+
+    :type length: float
+    :param length: Time span in seconds to keep.
+    :type fill_value: int or float, optional
+    :param fill_value: Value for filling gaps.
+
+    :var gaps: ``(endtime, starttime)`` tuples of the buffered data before
+        and the appended data after each gap.
+    :type gaps: list
+    :var overlaps: ``(starttime, endtime)`` tuples of the appended data and
+        the buffered data of each overlap.
+    :type overlaps: list
+    """
+    def __init__(self, length, fill_value=None):
+        self.length = length
+        self.fill_value = fill_value
+        self.stats = None
+        self.gaps = []
+        self.overlaps = []
+        self.capacity = 0
+        self._data = None
+        self._pos = 0
+        self._count = 0
+        # start time of the next expected sample
+        self._next = None
+
+    def __len__(self):
+        return self._count
+
+    def append(self, trace):
+        """
+        Appends the data of a trace.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: Trace with the same id as all previously appended
+            traces.
+        """
+        data = trace.data
+        stats = trace.stats
+        if self.stats is None or \
+                stats.sampling_rate != self.stats.sampling_rate or \
+                data.dtype != self._data.dtype:
+            self._allocate(stats, data.dtype)
+        starttime = stats.starttime
+        if self._count:
+            diff = (starttime - self._next) * stats.sampling_rate
+            if diff > 0.5:
+                self.gaps.append((self._next - stats.delta, starttime))
+                samples = int(round(diff))
+                if self.fill_value is None or samples >= self.capacity:
+                    self._count = 0
+                else:
+                    fill = np.empty(samples, dtype=data.dtype)
+                    fill.fill(self.fill_value)
+                    self._write(fill)
+            elif diff < -0.5:
+                self.overlaps.append((starttime, self._next - stats.delta))
+                skip = int(round(-diff))
+                if skip >= len(data):
+                    return
+                data = data[skip:]
+                starttime += skip * stats.delta
+        self._write(data)
+        # pin the timing to the last appended data
+        self._next = starttime + len(data) * stats.delta
+
+    def _allocate(self, stats, dtype):
+        self.stats = Stats()
+        for key in ('network', 'station', 'location', 'channel',
+                    'sampling_rate', 'calib'):
+            self.stats[key] = stats[key]
+        self.capacity = max(int(round(self.length * stats.sampling_rate)), 1)
+        self._data = np.empty(2 * self.capacity, dtype=dtype)
+        self._pos = 0
+        self._count = 0
+
+    def _write(self, data):
+        cap = self.capacity
+        if len(data) > cap:
+            data = data[-cap:]
+        npts = len(data)
+        first = min(npts, cap - self._pos)
+        end = self._pos + first
+        self._data[self._pos:end] = data[:first]
+        self._data[self._pos + cap:end + cap] = data[:first]
+        rest = npts - first
+        self._data[:rest] = data[first:]
+        self._data[cap:cap + rest] = data[first:]
+        self._pos = (self._pos + npts) % cap
+        self._count = min(self._count + npts, cap)
+
+    def get_trace(self):
+        """
+        Returns the buffered data as trace.
+
+        The data of the trace is a view into the buffer and is overwritten
+        by subsequently appended data; copy the trace to keep it.
+
+        :rtype: :class:`~obspy.core.trace.Trace`
+        """
+        if self.stats is None:
+            return Trace()
+        cap = self.capacity
+        start = self._pos + cap - self._count
+        data = self._data[start:self._pos + cap]
+        header = self.stats.copy()
+        header.npts = self._count
+        if self._count:
+            header.starttime = self._next - self._count * header.delta
+        return Trace(data=data, header=header)
+
+
+class BatchDecoder(object):
+    """
+    Decodes SeedLink packets in batches into per-channel ring buffers.
+
+    Records are collected until ``batch_size`` records were added or the
+    oldest one waits for more than ``max_delay`` seconds; then all of them
+    are decoded at once and appended to the
+    :class:`~obspy.seedlink.ringbuffer.RingBuffer` of their channel. The
+    records of one channel have to be added in time order.
+
+    :type buffer_length: float
+    :param buffer_length: Time span in seconds kept for every channel.
+    :type batch_size: int
+    :param batch_size: Number of records decoded together.
+    :type max_delay: float
+    :param max_delay: Maximum time in seconds a record is kept undecoded.
+        Checked when records are added, call :meth:`flush` to decode the
+        remaining records when no more data arrives.
+    :type fill_value: int or float, optional
+    :param fill_value: Value for filling gaps, see
+        :class:`~obspy.seedlink.ringbuffer.RingBuffer`.
+
+    :var buffers: The ring buffers by trace id.
+    :type buffers: dict
+    """
+    def __init__(self, buffer_length=300.0, batch_size=100, max_delay=1.0,
+                 fill_value=None):
+        self.buffer_length = buffer_length
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.fill_value = fill_value
+        self.buffers = {}
+        self._records = []
+        self._first_added = None
+
+    def add_packet(self, slpacket):
+        """
+        Adds the MiniSEED record of a received packet.
+
+        :type slpacket: :class:`~obspy.seedlink.slpacket.SLPacket`
+        :param slpacket: The packet, e.g. passed to the ``on_packet``
+            callback of a
+            :class:`~obspy.seedlink.multiclient.NonBlockingSeedLinkConnection`.
+        :rtype: list
+        :return: Ids of the updated channels, empty if nothing was decoded.
+        """
+        return self.add_record(slpacket.msrecord)
+
+    def add_record(self, record):
+        """
+        Adds a MiniSEED record.
+
+        :type record: bytes
+        :param record: The MiniSEED record.
+        :rtype: list
+        :return: Ids of the updated channels, empty if nothing was decoded.
+        """
+        now = time.time()
+        if not self._records:
+            self._first_added = now
+        self._records.append(bytes(record))
+        if len(self._records) >= self.batch_size or \
+                now - self._first_added >= self.max_delay:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Decodes all collected records.
+
+        :rtype: list
+        :return: Ids of the updated channels.
+        """
+        if not self._records:
+            return []
+        buf = io.BytesIO(b"".join(self._records))
+        self._records = []
+        st = readMSEED(buf)
+        # the traces of one channel are in time order
+        st.traces.sort(key=lambda tr: (tr.id, tr.stats.starttime))
+        ids = []
+        for tr in st:
+            try:
+                buffer = self.buffers[tr.id]
+            except KeyError:
+                buffer = RingBuffer(self.buffer_length, self.fill_value)
+                self.buffers[tr.id] = buffer
+            buffer.append(tr)
+            if not ids or ids[-1] != tr.id:
+                ids.append(tr.id)
+        return ids
+
+    def get_trace(self, id):
+        """
+        Returns the buffered data of one channel after decoding all
+        collected records.
+
+        The data is a view into the ring buffer, see
+        :meth:`~obspy.seedlink.ringbuffer.RingBuffer.get_trace`.
+
+        :type id: str
+        :param id: The trace id, e.g. ``'GE.APE..BHZ'``.
+        :rtype: :class:`~obspy.core.trace.Trace`
+        """
+        self.flush()
+        return self.buffers[id].get_trace()
+
+    def get_stream(self):
+        """
+        Returns the buffered data of all channels after decoding all
+        collected records.
+
+        The data are views into the ring buffers, see
+        :meth:`~obspy.seedlink.ringbuffer.RingBuffer.get_trace`.
+
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        self.flush()
+        return Stream(traces=[self.buffers[id].get_trace()
+                              for id in sorted(self.buffers)])
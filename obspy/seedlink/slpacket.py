@@ -17,6 +17,7 @@ from future.builtins import *  # NOQA
 
 from obspy.core.compatibility import frombuffer
 from obspy.core.trace import Trace
+from obspy.core.utcdatetime import UTCDateTime
 from obspy.mseed.headers import clibmseed, HPTMODULUS, MSRecord
 from obspy.mseed.util import _convertMSRToDict, _ctypesArray2NumpyArray
 from obspy.seedlink.seedlinkexception import SeedLinkException
@@ -106,13 +107,14 @@ class SLPacket(object):
             return -1
         return seqnum
 
-    def getMSRecord(self):
+    def getMSRecord(self, decode=True):
         # following from  obspy.mseed.tests.test_libmseed.py -> test_msrParse
         msr = clibmseed.msr_init(C.POINTER(MSRecord)())
         pyobj = frombuffer(self.msrecord, dtype=np.uint8)
         errcode = \
             clibmseed.msr_parse(pyobj.ctypes.data_as(C.POINTER(C.c_char)),
-                                len(pyobj), C.pointer(msr), -1, 1, 1)
+                                len(pyobj), C.pointer(msr), -1, int(decode),
+                                1)
         if errcode != 0:
             msg = "failed to decode mini-seed record: msr_parse errcode: %s"
             raise SeedLinkException(msg % (errcode))
@@ -121,13 +123,25 @@ class SLPacket(object):
         # print "DEBUG: msrecord_py:", msrecord_py
         return msrecord_py
 
-    def getTrace(self):
+    def getHeader(self):
+        """
+        Get the header fields of the MiniSEED record without decoding the
+        data samples.
 
+        :rtype: dict
+        :return: ``network``, ``station``, ``location``, ``channel``,
+            ``starttime`` and ``sampling_rate`` of the record.
+        """
         if self.trace is not None:
-            return self.trace
-
-        msrecord_py = self.getMSRecord()
-        # print "DEBUG: msrecord_py:", msrecord_py
+            stats = self.trace.stats
+        else:
+            stats = self._getHeader(self.getMSRecord(decode=False))
+            stats['starttime'] = UTCDateTime(stats['starttime'])
+        keys = ('network', 'station', 'location', 'channel', 'starttime',
+                'sampling_rate')
+        return dict((key, stats[key]) for key in keys)
+
+    def _getHeader(self, msrecord_py):
         header = _convertMSRToDict(msrecord_py)
 
         # XXX Workaround: the fields in the returned struct of type
@@ -146,6 +160,16 @@ class SLPacket(object):
         if 'samprate' in header:
             header['sampling_rate'] = header['samprate']
             del header['samprate']
+        return header
+
+    def getTrace(self):
+
+        if self.trace is not None:
+            return self.trace
+
+        msrecord_py = self.getMSRecord()
+        # print "DEBUG: msrecord_py:", msrecord_py
+        header = self._getHeader(msrecord_py)
         # Access data directly as NumPy array.
 
         # XXX Workaround: in Python 3 msrecord_py.sampletype is a byte
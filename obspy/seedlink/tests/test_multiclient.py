@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.seedlink.multiclient test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    import socketserver
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.seedlink.multiclient import MultiSeedLinkClient, \
+    NonBlockingSeedLinkConnection
+from obspy.seedlink.seedlinkexception import SeedLinkException
+
+
+class _SeedLinkHandler(socketserver.BaseRequestHandler):
+    """
+    Minimal multi-station SeedLink server sending all packets of the
+    selected stations after the END command, followed by END.
+    """
+    def handle(self):
+        server = self.server
+        buf = b""
+        station = None
+        selected = []
+        while True:
+            data = self.request.recv(1024)
+            if not data:
+                return
+            buf += data
+            while b"\r" in buf:
+                line, buf = buf.split(b"\r", 1)
+                line = line.strip()
+                if not line:
+                    continue
+                server.commands.append(line)
+                words = line.split()
+                if words[0] == b"HELLO":
+                    self.request.sendall(b"SeedLink v3.1 (2014.071)\r\n"
+                                         b"Fake SeedLink server\r\n")
+                elif words[0] == b"INFO":
+                    self.request.sendall(server.info_packet)
+                elif words[0] == b"STATION":
+                    station = (words[2].decode(), words[1].decode())
+                    if station in server.packets:
+                        self.request.sendall(b"OK\r\n")
+                    else:
+                        self.request.sendall(b"ERROR\r\n")
+                elif words[0] == b"SELECT":
+                    self.request.sendall(b"OK\r\n")
+                elif words[0] == b"DATA":
+                    start = int(words[1], 16) if len(words) > 1 else 0
+                    selected.append((station, start))
+                    self.request.sendall(b"OK\r\n")
+                elif words[0] == b"END":
+                    for station, start in selected:
+                        for seqnum, record in server.packets[station]:
+                            if seqnum >= start:
+                                header = ("SL%06X" % seqnum).encode()
+                                self.request.sendall(header + record)
+                    self.request.sendall(b"END")
+                    return
+
+
+class _SeedLinkServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, packets, info_packet):
+        socketserver.TCPServer.__init__(self, ("127.0.0.1", 0),
+                                        _SeedLinkHandler)
+        self.packets = packets
+        self.info_packet = info_packet
+        self.commands = []
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def sladdr(self):
+        return "127.0.0.1:%i" % self.server_address[1]
+
+
+class MultiSeedLinkClientTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.seedlink.multiclient.
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='obspy-')
+        path = os.path.join(os.path.dirname(__file__), 'data',
+                            'info_packet_geofon.slink')
+        with open(path, 'rb') as fh:
+            info_packet = fh.read()
+        np.random.seed(815)
+        self.traces = {}
+        self.servers = []
+        seqnum = 0
+        for stations in (['AAA', 'BBB'], ['CCC']):
+            packets = {}
+            for station in stations:
+                tr = Trace(data=np.random.randint(-1000, 1000, 5000).astype(
+                    np.int32))
+                tr.stats.network = 'XX'
+                tr.stats.station = station
+                tr.stats.channel = 'HHZ'
+                tr.stats.sampling_rate = 100.0
+                tr.stats.starttime = UTCDateTime(2014, 1, 1)
+                buf = io.BytesIO()
+                tr.write(buf, format='MSEED', reclen=512, encoding='STEIM2')
+                data = buf.getvalue()
+                packets[('XX', station)] = []
+                for i in range(0, len(data), 512):
+                    packets[('XX', station)].append((seqnum,
+                                                     data[i:i + 512]))
+                    seqnum += 1
+                self.traces[station] = tr
+            self.servers.append(_SeedLinkServer(packets, info_packet))
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(self.tempdir)
+
+    def test_multipleServers(self):
+        """
+        Data of several servers is received in one thread, the state file
+        allows resuming.
+        """
+        received = []
+        terminated = []
+        client = MultiSeedLinkClient()
+        statefile = os.path.join(self.tempdir, 'state')
+        conn = client.add_server(self.servers[0].sladdr, 'XX_AAA:HHZ,XX_BBB',
+                                 statefile=statefile,
+                                 on_data=received.append,
+                                 on_terminate=lambda: terminated.append(1))
+        client.add_server(self.servers[1].sladdr, 'XX_CCC,XX_DDD',
+                          on_data=received.append,
+                          on_terminate=lambda: terminated.append(2))
+        client.run(timeout=30)
+        self.assertEqual(sorted(terminated), [1, 2])
+        self.assertEqual(conn.phase, conn.FINISHED)
+        self.assertEqual(self.servers[0].commands,
+                         [b'HELLO', b'STATION AAA XX', b'SELECT HHZ',
+                          b'DATA', b'STATION BBB XX', b'DATA', b'END'])
+        self.assertEqual(self.servers[1].commands,
+                         [b'HELLO', b'STATION CCC XX', b'DATA',
+                          b'STATION DDD XX', b'END'])
+        st = Stream(traces=received)
+        st.merge()
+        self.assertEqual(len(st), 3)
+        for tr in st:
+            expected = self.traces[tr.stats.station]
+            self.assertEqual(tr.stats.starttime, expected.stats.starttime)
+            np.testing.assert_array_equal(tr.data, expected.data)
+
+        # resume after the last packet of each station
+        last = dict((stream.station, stream.seqnum)
+                    for stream in conn.streams)
+        with open(statefile, 'rt') as fh:
+            self.assertEqual(len(fh.readlines()), 2)
+        received = []
+        client = MultiSeedLinkClient()
+        conn = NonBlockingSeedLinkConnection(self.servers[0].sladdr,
+                                             on_data=received.append)
+        conn.addStream('XX', 'AAA', 'HHZ', -1, None)
+        conn.addStream('XX', 'BBB', None, -1, None)
+        conn.setStateFile(statefile)
+        client.add_connection(conn)
+        client.run(timeout=30)
+        self.assertEqual(received, [])
+        self.assertEqual(self.servers[0].commands[7:],
+                         [b'HELLO', b'STATION AAA XX', b'SELECT HHZ',
+                          ('DATA %06X' % (last['AAA'] + 1)).encode(),
+                          b'STATION BBB XX',
+                          ('DATA %06X' % (last['BBB'] + 1)).encode(),
+                          b'END'])
+
+    def test_stateFileError(self):
+        """
+        Errors writing the state file are logged, the data is received
+        nevertheless.
+        """
+        class _Connection(NonBlockingSeedLinkConnection):
+            def saveState(self, statefile):
+                raise SeedLinkException("writing state file failed")
+
+        received = []
+        client = MultiSeedLinkClient()
+        conn = _Connection(self.servers[1].sladdr, on_data=received.append)
+        conn.addStream('XX', 'CCC', None, -1, None)
+        conn.setStateFile(os.path.join(self.tempdir, 'state'))
+        client.add_connection(conn)
+        client.run(timeout=30)
+        self.assertEqual(conn.phase, conn.FINISHED)
+        st = Stream(traces=received)
+        st.merge()
+        self.assertEqual(len(st), 1)
+        np.testing.assert_array_equal(st[0].data, self.traces['CCC'].data)
+
+    def test_info(self):
+        """
+        A connection without streams returns the INFO response and is
+        finished.
+        """
+        info = []
+        client = MultiSeedLinkClient()
+        conn = NonBlockingSeedLinkConnection(self.servers[0].sladdr,
+                                             on_info=info.append)
+        conn.requestInfo('CAPABILITIES')
+        client.add_connection(conn)
+        client.run(timeout=30)
+        self.assertEqual(conn.phase, conn.FINISHED)
+        self.assertEqual(len(info), 1)
+        self.assertTrue(info[0].startswith('<?xml'))
+        self.assertEqual(self.servers[0].commands,
+                         [b'HELLO', b'INFO CAPABILITIES'])
+
+    def test_stop(self):
+        """
+        Unreachable servers are retried until the client is stopped.
+        """
+        client = MultiSeedLinkClient()
+        conn = client.add_server('127.0.0.1:1', 'XX_AAA')
+        conn.setNetDelay(0.1)
+        timer = threading.Timer(0.5, client.stop)
+        timer.start()
+        client.run(timeout=30)
+        timer.join()
+        self.assertEqual(conn.phase, conn.DOWN)
+        client.close()
+        self.assertEqual(conn.phase, conn.FINISHED)
+
+
+def suite():
+    return unittest.makeSuite(MultiSeedLinkClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
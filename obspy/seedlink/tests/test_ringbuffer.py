@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.seedlink.ringbuffer test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import unittest
+
+import numpy as np
+
+from obspy import Trace, UTCDateTime
+from obspy.seedlink.ringbuffer import BatchDecoder, RingBuffer
+from obspy.seedlink.slpacket import SLPacket
+
+
+def _records(tr):
+    """
+    Returns the 512 byte STEIM2 records of a trace.
+    """
+    buf = io.BytesIO()
+    tr.write(buf, format='MSEED', reclen=512, encoding='STEIM2')
+    data = buf.getvalue()
+    return [data[i:i + 512] for i in range(0, len(data), 512)]
+
+
+class RingBufferTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.seedlink.ringbuffer.
+    """
+    def setUp(self):
+        np.random.seed(815)
+        self.traces = []
+        for station in ('AAA', 'BBB'):
+            tr = Trace(data=np.random.randint(-1000, 1000, 5000).astype(
+                np.int32))
+            tr.stats.network = 'XX'
+            tr.stats.station = station
+            tr.stats.channel = 'HHZ'
+            tr.stats.sampling_rate = 100.0
+            tr.stats.starttime = UTCDateTime(2014, 1, 1)
+            self.traces.append(tr)
+
+    def test_batchDecoder(self):
+        """
+        Interleaved packets of several channels are decoded in batches.
+        """
+        decoder = BatchDecoder(buffer_length=100, batch_size=7,
+                               max_delay=3600)
+        records = [_records(tr) for tr in self.traces]
+        self.assertTrue(len(records[0]) > 7)
+        updated = set()
+        for i in range(max(len(r) for r in records)):
+            for recs in records:
+                if i < len(recs):
+                    packet = SLPacket(b'SL000000' + recs[i], 0)
+                    updated.update(decoder.add_packet(packet))
+        self.assertEqual(updated, set(['XX.AAA..HHZ', 'XX.BBB..HHZ']))
+        st = decoder.get_stream()
+        self.assertEqual(len(st), 2)
+        for tr, expected in zip(st, self.traces):
+            self.assertEqual(tr.id, expected.id)
+            self.assertEqual(tr.stats.starttime, expected.stats.starttime)
+            self.assertEqual(tr.stats.sampling_rate, 100.0)
+            np.testing.assert_array_equal(tr.data, expected.data)
+        buffer = decoder.buffers['XX.AAA..HHZ']
+        self.assertEqual(buffer.gaps, [])
+        self.assertEqual(buffer.overlaps, [])
+
+    def test_wraparound(self):
+        """
+        Only the latest samples are kept, the trace is a view into the
+        buffer.
+        """
+        buffer = RingBuffer(length=12.34)
+        tr = self.traces[0]
+        for i in range(0, 5000, 700):
+            buffer.append(tr.slice(tr.stats.starttime + i / 100.0,
+                                   tr.stats.starttime + (i + 699) / 100.0))
+            expected = tr.slice(None, tr.stats.starttime + (i + 699) / 100.0)
+            expected = expected.data[-1234:]
+            result = buffer.get_trace()
+            self.assertEqual(len(buffer), len(expected))
+            self.assertEqual(result.stats.endtime,
+                             tr.stats.starttime + min(i + 699, 4999) / 100.0)
+            np.testing.assert_array_equal(result.data, expected)
+        self.assertTrue(result.data.base is buffer._data)
+
+    def test_gapsAndOverlaps(self):
+        """
+        Gaps are filled or reset the buffer, overlapping samples are
+        skipped.
+        """
+        tr = self.traces[0]
+        t0 = tr.stats.starttime
+        for fill_value in (None, 0):
+            buffer = RingBuffer(length=30, fill_value=fill_value)
+            buffer.append(tr.slice(t0, t0 + 9.99))
+            buffer.append(tr.slice(t0 + 11, t0 + 19.99))
+            buffer.append(tr.slice(t0 + 15, t0 + 24.99))
+            self.assertEqual(buffer.gaps, [(t0 + 9.99, t0 + 11)])
+            self.assertEqual(buffer.overlaps, [(t0 + 15, t0 + 19.99)])
+            result = buffer.get_trace()
+            self.assertEqual(result.stats.endtime, t0 + 24.99)
+            if fill_value is None:
+                self.assertEqual(result.stats.starttime, t0 + 11)
+                np.testing.assert_array_equal(result.data,
+                                              tr.data[1100:2500])
+            else:
+                self.assertEqual(result.stats.starttime, t0)
+                expected = tr.data[:2500].copy()
+                expected[1000:1100] = 0
+                np.testing.assert_array_equal(result.data, expected)
+        # a completely buffered trace is skipped
+        buffer.append(tr.slice(t0 + 20, t0 + 21))
+        self.assertEqual(len(buffer.overlaps), 2)
+        self.assertEqual(buffer.get_trace().stats.endtime, t0 + 24.99)
+
+
+def suite():
+    return unittest.makeSuite(RingBufferTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -208,7 +208,8 @@ from obspy.signal.spectral_estimation import psd, PPSD
 from obspy.signal.konnoohmachismoothing import konnoOhmachiSmoothing
 from obspy.signal.trigger import recSTALTA, recSTALTAPy, carlSTATrig, \
     classicSTALTA, delayedSTALTA, zDetect, triggerOnset, pkBaer, arPick, \
-    coincidenceTrigger, classicSTALTAPy
+    coincidenceTrigger, classicSTALTAPy, ChunkedRecSTALTA, \
+    ChunkedClassicSTALTA, ChunkedDelayedSTALTA, recSTALTA2D, classicSTALTA2D
 
 
 if __name__ == '__main__':
@@ -25,14 +25,16 @@ import warnings
 import numpy as np
 import ctypes as C
 import scipy
+import scipy.signal
 from obspy import Trace, Stream
 from obspy.signal.headers import clibsignal
 from obspy.signal import cosTaper
+from obspy.signal.util import _next_fast_len
 
 
-def xcorr(tr1, tr2, shift_len, full_xcorr=False):
+def xcorr(tr1, tr2, shift_len, full_xcorr=False, method='auto'):
     """
-    Cross correlation of tr1 and tr2 in the time domain using window_len.
+    Cross correlation of tr1 and tr2 in the time or frequency domain.
 
     ::
 
@@ -52,19 +54,32 @@ def xcorr(tr1, tr2, shift_len, full_xcorr=False):
     :type full_xcorr: bool
     :param full_xcorr: If ``True``, the complete xcorr function will be
         returned as :class:`~numpy.ndarray`
+    :type method: str
+    :param method: ``'direct'`` computes the correlation in the time domain
+        in C (single precision, ``shift_len`` has to be smaller than half
+        the length of the traces), ``'fft'`` computes it in the frequency
+        domain (double precision, any ``shift_len``, lags without overlap of
+        the traces are zero). ``'auto'`` (default) uses the faster of both
+        and always uses ``'fft'`` if ``shift_len`` is too large for
+        ``'direct'``.
     :return: **index, value[, fct]** - Index of maximum xcorr value and the
         value itself. The complete xcorr function is returned only if
         ``full_xcorr=True``.
 
     .. note::
-       As shift_len gets higher the window supporting the cross correlation
-       actually gets smaller. So with shift_len=0 you get the correlation
-       coefficient of both traces as a whole without any shift applied. As the
-       xcorr function works in time domain and does not zero pad at all, with
-       higher shifts allowed the window of support gets smaller so that the
-       moving windows shifted against each other do not run out of the
-       timeseries bounds at high time shifts. Of course there are other
-       possibilities to do cross correlations e.g. in frequency domain.
+       With ``method='direct'`` the window supporting the cross correlation
+       actually gets smaller as shift_len gets higher. So with shift_len=0
+       you get the correlation coefficient of both traces as a whole without
+       any shift applied. As the time domain version does not zero pad at
+       all, with higher shifts allowed the window of support gets smaller so
+       that the moving windows shifted against each other do not run out of
+       the timeseries bounds at high time shifts. A ``shift_len`` of half
+       the trace length or more raises a :class:`ValueError`.
+
+       With ``method='fft'``, and with the default ``method='auto'`` whenever
+       ``shift_len`` is too large for the time domain version, the traces
+       are zero padded instead, so no error is raised and lags without any
+       overlap of the traces have a correlation of zero.
 
     .. seealso::
         `ObsPy-users mailing list
@@ -83,16 +98,41 @@ def xcorr(tr1, tr2, shift_len, full_xcorr=False):
     1.0
     """
     # if we get Trace objects, use their data arrays
-    for tr in [tr1, tr2]:
-        if isinstance(tr, Trace):
-            tr = tr.data
+    if isinstance(tr1, Trace):
+        tr1 = tr1.data
+    if isinstance(tr2, Trace):
+        tr2 = tr2.data
+    if method not in ('auto', 'direct', 'fft'):
+        msg = "method has to be one of 'auto', 'direct' or 'fft'."
+        raise ValueError(msg)
 
-    # check if shift_len parameter is in an acceptable range.
+    # check if shift_len parameter is in an acceptable range for the time
+    # domain version.
     # if not the underlying c code tampers with shift_len and uses shift_len/2
     # instead. we want to avoid this silent automagic and raise an error in the
     # python layer right here.
     # see ticket #249 and src/xcorr.c lines 43-57
-    if min(len(tr1), len(tr2)) - 2 * shift_len <= 0:
+    direct_possible = min(len(tr1), len(tr2)) - 2 * shift_len > 0
+    if method == 'auto':
+        if direct_possible and not _fft_is_faster(max(len(tr1), len(tr2)),
+                                                  2 * shift_len + 1):
+            method = 'direct'
+        else:
+            method = 'fft'
+    if method == 'fft':
+        corp = _xcorr_fft(tr1, tr2, shift_len)
+        index = np.abs(corp).argmax()
+        if corp[index] == 0:
+            # same as the time domain version, no shift for zero correlation
+            index = shift_len
+        shift = int(index - shift_len)
+        value = float(corp[index])
+        if full_xcorr:
+            return shift, value, corp
+        else:
+            return shift, value
+
+    if not direct_possible:
         msg = "shift_len too large. The underlying C code would silently " + \
               "use shift_len/2 which we want to avoid."
         raise ValueError(msg)
@@ -115,6 +155,175 @@ def xcorr(tr1, tr2, shift_len, full_xcorr=False):
         return shift.value, coe_p.value
 
 
+def _fft_is_faster(npts, nlags):
+    """
+    Rough estimate if correlating traces of length npts for nlags lags is
+    faster in the frequency domain than in the time domain.
+    """
+    nfft = _next_fast_len(2 * npts - 1)
+    # three FFTs of length nfft against npts multiply-adds per lag, the
+    # constant accounts for the overhead of the FFT
+    return npts * nlags > 10 * nfft * np.log2(nfft)
+
+
+def _xcorr_fft(tr1, tr2, shift_len):
+    """
+    Normalized cross correlation of tr1 and tr2 for lags -shift_len to
+    shift_len computed in the frequency domain.
+
+    The lag ``k`` entry is ``sum(tr1[n + k] * tr2[n])`` of the demeaned
+    traces, normalized like in the time domain version.
+    """
+    tr1 = np.asarray(tr1, dtype=np.float64)
+    tr2 = np.asarray(tr2, dtype=np.float64)
+    tr1 = tr1 - tr1.mean()
+    tr2 = tr2 - tr2.mean()
+    corp = np.zeros(2 * shift_len + 1, dtype=np.float64)
+    norm = np.sqrt((tr1 ** 2).sum() * (tr2 ** 2).sum())
+    if norm == 0:
+        return corp
+    nfft = _next_fast_len(len(tr1) + len(tr2) - 1)
+    cc = np.fft.irfft(np.fft.rfft(tr1, nfft) * np.fft.rfft(tr2, nfft).conj(),
+                      nfft)
+    # negative lags are wrapped around to the end of the array
+    lags = np.arange(-shift_len, shift_len + 1)
+    valid = (lags > -len(tr2)) & (lags < len(tr1))
+    corp[valid] = cc[lags[valid] % nfft]
+    corp /= norm
+    return corp
+
+
+def correlateTemplate(data, template):
+    """
+    Normalized cross correlation of a template sliding along (long) data.
+
+    The correlation is computed in the frequency domain. Entry ``i`` of the
+    result is the correlation coefficient of the template and
+    ``data[i:i + len(template)]``, i.e. the result has
+    ``len(data) - len(template) + 1`` samples. Windows of data without any
+    variation have a correlation coefficient of zero.
+
+    :type data: :class:`~numpy.ndarray` or :class:`~obspy.core.trace.Trace`
+    :param data: Continuous data to search.
+    :type template: :class:`~numpy.ndarray` or
+        :class:`~obspy.core.trace.Trace`
+    :param template: Template waveform, shorter than data.
+    :rtype: :class:`~numpy.ndarray`
+    :return: Correlation coefficients for all positions of the template.
+
+    .. rubric:: Example
+
+    >>> np.random.seed(815)
+    >>> data = np.random.randn(1000)
+    >>> cc = correlateTemplate(data, data[200:300])
+    >>> len(cc)
+    901
+    >>> int(cc.argmax()), round(cc.max(), 7)
+    (200, 1.0)
+    """
+    if isinstance(data, Trace):
+        data = data.data
+    if isinstance(template, Trace):
+        template = template.data
+    template = np.asarray(template, dtype=np.float64)
+    return correlateTemplates(data, template[np.newaxis, :])[0]
+
+
+def correlateTemplates(data, templates):
+    """
+    Normalized cross correlation of many templates against many channels.
+
+    The spectra and sliding window norms of the data channels are computed
+    only once and shared by all templates, so correlating a batch of
+    templates is much faster than correlating each template on its own (see
+    :func:`~obspy.signal.cross_correlation.correlateTemplate`).
+
+    :type data: :class:`~numpy.ndarray`
+    :param data: Continuous data, either 1-D or 2-D of shape
+        ``(nchannels, npts)``.
+    :type templates: :class:`~numpy.ndarray`
+    :param templates: Template waveforms of equal length. For 1-D data an
+        array of shape ``(ntemplates, nsamples)``, for 2-D data an array of
+        shape ``(ntemplates, nchannels, nsamples)`` with one template
+        waveform per channel of data.
+    :rtype: :class:`~numpy.ndarray`
+    :return: Correlation coefficients of shape
+        ``(ntemplates, npts - nsamples + 1)`` for 1-D data or
+        ``(ntemplates, nchannels, npts - nsamples + 1)`` for 2-D data.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    templates = np.asarray(templates, dtype=np.float64)
+    if data.ndim not in (1, 2) or templates.ndim != data.ndim + 1:
+        msg = "Shapes of data %s and templates %s do not match." % (
+            data.shape, templates.shape)
+        raise ValueError(msg)
+    one_dimensional = data.ndim == 1
+    if one_dimensional:
+        data = data[np.newaxis, :]
+        templates = templates[:, np.newaxis, :]
+    cc = np.array(list(_correlate_templates_iter(data, templates)))
+    if one_dimensional:
+        cc = cc[:, 0, :]
+    return cc
+
+
+def _correlate_templates_iter(data, templates):
+    """
+    Generator yielding the normalized cross correlation of each template of
+    shape ``(nchannels, nsamples)`` against 2-D data of shape
+    ``(nchannels, npts)``, see
+    :func:`~obspy.signal.cross_correlation.correlateTemplates`.
+
+    Templates with all zero channels yield zero correlation on these
+    channels.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    templates = np.asarray(templates, dtype=np.float64)
+    if templates.shape[1] != data.shape[0]:
+        msg = "Number of template channels (%d) differs from number of " + \
+              "data channels (%d)."
+        raise ValueError(msg % (templates.shape[1], data.shape[0]))
+    npts = data.shape[-1]
+    nsamp = templates.shape[-1]
+    if nsamp > npts:
+        msg = "Templates are longer than data."
+        raise ValueError(msg)
+    nfft = _next_fast_len(npts)
+    # demean everything, the correlation of the demeaned template with a
+    # window of data is independent of the mean of that window
+    data = data - data.mean(axis=-1)[:, np.newaxis]
+    window_norms = _sliding_norms(data, nsamp)
+    spectra = np.fft.rfft(data, nfft, axis=-1)
+    for template in templates:
+        template = template - template.mean(axis=-1)[:, np.newaxis]
+        template_norms = np.sqrt((template ** 2).sum(axis=-1))
+        cc = np.fft.irfft(spectra * np.fft.rfft(template, nfft).conj(),
+                          nfft, axis=-1)[:, :npts - nsamp + 1]
+        norm = window_norms * template_norms[:, np.newaxis]
+        nonzero = norm > 0
+        cc[nonzero] /= norm[nonzero]
+        cc[~nonzero] = 0.0
+        yield cc
+
+
+def _sliding_norms(data, nsamp):
+    """
+    Square root of the sum of squared deviations from the window mean for
+    all windows of length nsamp of each row of data.
+
+    Windows whose variation is below the precision of the cumulative sums
+    get a norm of zero.
+    """
+    zeros = np.zeros((data.shape[0], 1), dtype=np.float64)
+    csum = np.concatenate((zeros, np.cumsum(data, axis=-1)), axis=-1)
+    csum2 = np.concatenate((zeros, np.cumsum(data ** 2, axis=-1)), axis=-1)
+    sums = csum[:, nsamp:] - csum[:, :-nsamp]
+    energy = csum2[:, nsamp:] - csum2[:, :-nsamp] - sums ** 2 / nsamp
+    tolerance = 10 * np.finfo(np.float64).eps * csum2[:, -1:]
+    energy[energy <= tolerance] = 0.0
+    return np.sqrt(energy)
+
+
 def xcorr_3C(st1, st2, shift_len, components=["Z", "N", "E"],
              full_xcorr=False, abs_max=True):
     """
@@ -502,7 +711,8 @@ def templatesMaxSimilarity(st, time, streams_templates):
                 data_long = tr2.data
             data_short = (data_short - data_short.mean()) / data_short.std()
             data_long = (data_long - data_long.mean()) / data_long.std()
-            tmp = np.correlate(data_long, data_short, native_str("valid"))
+            tmp = scipy.signal.fftconvolve(data_long, data_short[::-1],
+                                           mode=native_str("valid"))
             try:
                 cc += tmp
             except TypeError:
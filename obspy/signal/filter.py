@@ -20,12 +20,171 @@ Various Seismogram Filtering Functions
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future import standard_library
+with standard_library.hooks():
+    from collections import OrderedDict
 
+import threading
 import warnings
+import numpy as np
 from numpy import array, where, fft
 from scipy.fftpack import hilbert
 from scipy.signal import iirfilter, lfilter, remez, convolve, get_window, \
-    cheby2, cheb2ord
+    cheby2, cheb2ord, freqz
+try:
+    # second-order sections are available since SciPy 0.16
+    from scipy.signal import sosfilt
+except ImportError:
+    sosfilt = None
+
+
+# designed filters by their parameters, oldest entries are dropped first
+_FILTER_CACHE = OrderedDict()
+_FILTER_CACHE_SIZE = 256
+_FILTER_CACHE_LOCK = threading.Lock()
+
+
+def _cachedDesign(key, design):
+    """
+    Return the filter coefficients for key from the cache or compute them
+    by calling design() and store them in the cache.
+
+    The returned arrays are shared between all callers and must not be
+    modified, public functions hand out copies. They are not made read-only
+    as sosfilt() of some SciPy versions refuses read-only arrays.
+    """
+    with _FILTER_CACHE_LOCK:
+        try:
+            coefficients = _FILTER_CACHE.pop(key)
+        except KeyError:
+            coefficients = None
+        else:
+            _FILTER_CACHE[key] = coefficients
+    if coefficients is not None:
+        return coefficients
+    coefficients = design()
+    with _FILTER_CACHE_LOCK:
+        _FILTER_CACHE[key] = coefficients
+        while len(_FILTER_CACHE) > _FILTER_CACHE_SIZE:
+            _FILTER_CACHE.popitem(last=False)
+    return coefficients
+
+
+def _butterworthCorners(type, df, freq=None, freqmin=None, freqmax=None):
+    """
+    Returns the corner frequencies of a Butterworth filter in units of the
+    Nyquist frequency, warning or raising for corners above Nyquist.
+    """
+    fe = 0.5 * df
+    if type in ('bandpass', 'bandstop'):
+        low = freqmin / fe
+        high = freqmax / fe
+        # raise for some bad scenarios
+        if high > 1:
+            high = 1.0
+            msg = "Selected high corner frequency is above Nyquist. " + \
+                  "Setting Nyquist as high corner."
+            warnings.warn(msg)
+        if low > 1:
+            msg = "Selected low corner frequency is above Nyquist."
+            raise ValueError(msg)
+        return (float(low), float(high))
+    f = freq / fe
+    # raise for some bad scenarios
+    if f > 1:
+        if type == 'highpass':
+            msg = "Selected corner frequency is above Nyquist."
+            raise ValueError(msg)
+        f = 1.0
+        msg = "Selected corner frequency is above Nyquist. " + \
+              "Setting Nyquist as high corner."
+        warnings.warn(msg)
+    return float(f)
+
+
+def _butterworthDesign(type, df, corners=4, **freqs):
+    """
+    Design (or take from the cache) a Butterworth filter.
+
+    With SciPy 0.16 or newer the filter is designed as second-order
+    sections, which is numerically more stable for higher orders than the
+    (b, a) transfer function representation.
+
+    :type type: str
+    :param type: ``'bandpass'``, ``'bandstop'``, ``'lowpass'`` or
+        ``'highpass'``.
+    :param df: Sampling rate in Hz.
+    :param corners: Filter corners / order.
+    :param freqs: Corner frequencies in Hz, ``freqmin`` and ``freqmax`` for
+        band filters, ``freq`` otherwise.
+    :return: The coefficients as tuple ``(sos, )`` or ``(b, a)``, shared
+        between all callers.
+    """
+    wn = _butterworthCorners(type, df, **freqs)
+    btype = {'bandpass': 'band', 'bandstop': 'bandstop',
+             'lowpass': 'lowpass', 'highpass': 'highpass'}[type]
+    output = 'sos' if sosfilt is not None else 'ba'
+    key = ('butter', int(corners), wn, btype, output)
+
+    def _design():
+        if output == 'sos':
+            return (iirfilter(corners, wn, btype=btype, ftype='butter',
+                              output='sos'), )
+        return tuple(iirfilter(corners, wn, btype=btype, ftype='butter',
+                               output='ba'))
+
+    return _cachedDesign(key, _design)
+
+
+def _butterworthResponse(type, freqs, df, zerophase=False, **options):
+    """
+    Returns the frequency response of a Butterworth filter.
+
+    The filter is designed exactly as by ``Trace.filter(type, **options)``.
+    For zero phase filters the squared magnitude of the response is returned.
+
+    :type type: str
+    :param type: ``'bandpass'``, ``'bandstop'``, ``'lowpass'`` or
+        ``'highpass'``.
+    :type freqs: :class:`numpy.ndarray`
+    :param freqs: Frequencies in Hz.
+    :param df: Sampling rate in Hz.
+    :rtype: :class:`numpy.ndarray` of complex
+    """
+    coefficients = _butterworthDesign(type, df, **options)
+    worn = 2 * np.pi * np.asarray(freqs, dtype=np.float64) / df
+    if len(coefficients) == 1:
+        h = np.ones(len(worn), dtype=np.complex128)
+        for section in coefficients[0]:
+            h *= freqz(section[:3], section[3:], worN=worn)[1]
+    else:
+        h = freqz(coefficients[0], coefficients[1], worN=worn)[1]
+    if zerophase:
+        h = (h * h.conj()).real.astype(np.complex128)
+    return h
+
+
+def _butterworth(data, coefficients, zerophase):
+    """
+    Apply a Butterworth filter designed by :func:`_butterworthDesign`.
+    """
+    if len(coefficients) == 1:
+        sos = coefficients[0]
+
+        def _apply(x):
+            return sosfilt(sos, x)
+    else:
+        b, a = coefficients
+
+        def _apply(x):
+            return lfilter(b, a, x)
+    data = np.asarray(data, dtype=np.float64)
+    if zerophase:
+        # the reversed views are passed on directly, the filter routines
+        # create their output arrays anyway
+        firstpass = _apply(data)
+        return _apply(firstpass[::-1])[::-1]
+    return _apply(data)
 
 
 def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
@@ -35,7 +194,9 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
     Filter data from ``freqmin`` to ``freqmax`` using ``corners``
     corners.
     The filter uses :func:`scipy.signal.iirfilter` (for design)
-    and :func:`scipy.signal.lfilter` (for applying the filter).
+    and :func:`scipy.signal.sosfilt` (for applying the filter, with SciPy
+    versions before 0.16 :func:`scipy.signal.lfilter`). Filter designs are
+    cached and reused for identical parameters.
 
 
     :type data: numpy.ndarray
@@ -49,25 +210,9 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    low = freqmin / fe
-    high = freqmax / fe
-    # raise for some bad scenarios
-    if high > 1:
-        high = 1.0
-        msg = "Selected high corner frequency is above Nyquist. " + \
-              "Setting Nyquist as high corner."
-        warnings.warn(msg)
-    if low > 1:
-        msg = "Selected low corner frequency is above Nyquist."
-        raise ValueError(msg)
-    [b, a] = iirfilter(corners, [low, high], btype='band',
-                       ftype='butter', output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworthDesign('bandpass', df, corners, freqmin=freqmin,
+                                      freqmax=freqmax)
+    return _butterworth(data, coefficients, zerophase)
 
 
 def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
@@ -77,7 +222,9 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
     Filter data removing data between frequencies ``freqmin`` and ``freqmax``
     using ``corners`` corners.
     The filter uses :func:`scipy.signal.iirfilter` (for design)
-    and :func:`scipy.signal.lfilter` (for applying the filter).
+    and :func:`scipy.signal.sosfilt` (for applying the filter, with SciPy
+    versions before 0.16 :func:`scipy.signal.lfilter`). Filter designs are
+    cached and reused for identical parameters.
 
     :type data: numpy.ndarray
     :param data: Data to filter.
@@ -90,25 +237,9 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    low = freqmin / fe
-    high = freqmax / fe
-    # raise for some bad scenarios
-    if high > 1:
-        high = 1.0
-        msg = "Selected high corner frequency is above Nyquist. " + \
-              "Setting Nyquist as high corner."
-        warnings.warn(msg)
-    if low > 1:
-        msg = "Selected low corner frequency is above Nyquist."
-        raise ValueError(msg)
-    [b, a] = iirfilter(corners, [low, high],
-                       btype='bandstop', ftype='butter', output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworthDesign('bandstop', df, corners, freqmin=freqmin,
+                                      freqmax=freqmax)
+    return _butterworth(data, coefficients, zerophase)
 
 
 def lowpass(data, freq, df, corners=4, zerophase=False):
@@ -118,7 +249,9 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
     Filter data removing data over certain frequency ``freq`` using ``corners``
     corners.
     The filter uses :func:`scipy.signal.iirfilter` (for design)
-    and :func:`scipy.signal.lfilter` (for applying the filter).
+    and :func:`scipy.signal.sosfilt` (for applying the filter, with SciPy
+    versions before 0.16 :func:`scipy.signal.lfilter`). Filter designs are
+    cached and reused for identical parameters.
 
     :type data: numpy.ndarray
     :param data: Data to filter.
@@ -130,21 +263,8 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    f = freq / fe
-    # raise for some bad scenarios
-    if f > 1:
-        f = 1.0
-        msg = "Selected corner frequency is above Nyquist. " + \
-              "Setting Nyquist as high corner."
-        warnings.warn(msg)
-    [b, a] = iirfilter(corners, f, btype='lowpass', ftype='butter',
-                       output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworthDesign('lowpass', df, corners, freq=freq)
+    return _butterworth(data, coefficients, zerophase)
 
 
 def highpass(data, freq, df, corners=4, zerophase=False):
@@ -154,7 +274,9 @@ def highpass(data, freq, df, corners=4, zerophase=False):
     Filter data removing data below certain frequency ``freq`` using
     ``corners`` corners.
     The filter uses :func:`scipy.signal.iirfilter` (for design)
-    and :func:`scipy.signal.lfilter` (for applying the filter).
+    and :func:`scipy.signal.sosfilt` (for applying the filter, with SciPy
+    versions before 0.16 :func:`scipy.signal.lfilter`). Filter designs are
+    cached and reused for identical parameters.
 
     :type data: numpy.ndarray
     :param data: Data to filter.
@@ -166,19 +288,8 @@ def highpass(data, freq, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    f = freq / fe
-    # raise for some bad scenarios
-    if f > 1:
-        msg = "Selected corner frequency is above Nyquist."
-        raise ValueError(msg)
-    [b, a] = iirfilter(corners, f, btype='highpass', ftype='butter',
-                       output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworthDesign('highpass', df, corners, freq=freq)
+    return _butterworth(data, coefficients, zerophase)
 
 
 def envelope(data):
@@ -364,23 +475,29 @@ def lowpassCheby2(data, freq, df, maxorder=12, ba=False,
     """
     nyquist = df * 0.5
     # rp - maximum ripple of passband, rs - attenuation of stopband
-    rp, rs, order = 1, 96, 1e99
+    rp, rs = 1, 96
     ws = freq / nyquist  # stop band frequency
-    wp = ws  # pass band frequency
     # raise for some bad scenarios
     if ws > 1:
         ws = 1.0
         msg = "Selected corner frequency is above Nyquist. " + \
               "Setting Nyquist as high corner."
         warnings.warn(msg)
-    while True:
-        if order <= maxorder:
-            break
-        wp = wp * 0.99
-        order, wn = cheb2ord(wp, ws, rp, rs, analog=0)
-    b, a = cheby2(order, rs, wn, btype='low', analog=0, output='ba')
+
+    def _design():
+        order, wp = 1e99, ws
+        while True:
+            if order <= maxorder:
+                break
+            wp = wp * 0.99
+            order, wn = cheb2ord(wp, ws, rp, rs, analog=0)
+        b, a = cheby2(order, rs, wn, btype='low', analog=0, output='ba')
+        return b, a, wp
+
+    b, a, wp = _cachedDesign(('cheby2', float(ws), maxorder), _design)
     if ba:
-        return b, a
+        # the cached coefficients are shared
+        return b.copy(), a.copy()
     if freq_passband:
         return lfilter(b, a, data), wp * nyquist
     return lfilter(b, a, data)
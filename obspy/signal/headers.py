@@ -8,6 +8,7 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import ctypes as C
+import threading
 import numpy as np
 from obspy.core.util.libnames import _load_CDLL
 
@@ -16,6 +17,8 @@ from obspy.core.util.libnames import _load_CDLL
 clibsignal = _load_CDLL("signal")
 # Import shared libevresp
 clibevresp = _load_CDLL("evresp")
+# evalresp keeps its state in global variables, calls must not overlap
+clibevresp_lock = threading.Lock()
 
 clibsignal.calcSteer.argtypes = [
     C.c_int, C.c_int, C.c_int, C.c_int, C.c_int, C.c_float,
@@ -60,6 +63,31 @@ clibsignal.recstalta.argtypes = [
     C.c_int, C.c_int, C.c_int]
 clibsignal.recstalta.restype = C.c_void_p
 
+stalta_state_t = np.dtype([
+    (native_str('sta'), np.float64, 1),
+    (native_str('lta'), np.float64, 1),
+    (native_str('n'), np.int64, 1),
+], align=True)
+
+clibsignal.recstalta_chunk.argtypes = [
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    C.c_int, C.c_int, C.c_int,
+    np.ctypeslib.ndpointer(dtype=stalta_state_t, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+]
+clibsignal.recstalta_chunk.restype = C.c_void_p
+
+clibsignal.recstalta_2d.argtypes = [
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=2,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=2,
+                           flags=native_str('C_CONTIGUOUS')),
+    C.c_int, C.c_int, C.c_int, C.c_int]
+clibsignal.recstalta_2d.restype = C.c_void_p
+
 clibsignal.ppick.argtypes = [
     np.ctypeslib.ndpointer(dtype=np.float32, ndim=1,
                            flags=native_str('C_CONTIGUOUS')),
@@ -100,6 +128,45 @@ clibsignal.stalta.argtypes = [
 ]
 clibsignal.stalta.restype = C.c_int
 
+clibsignal.stalta_chunk.argtypes = [
+    np.ctypeslib.ndpointer(dtype=head_stalta_t, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=stalta_state_t, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+]
+clibsignal.stalta_chunk.restype = C.c_int
+
+clibsignal.delayed_stalta_chunk.argtypes = [
+    np.ctypeslib.ndpointer(dtype=head_stalta_t, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=stalta_state_t, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+]
+clibsignal.delayed_stalta_chunk.restype = C.c_int
+
+clibsignal.stalta_2d.argtypes = [
+    np.ctypeslib.ndpointer(dtype=head_stalta_t, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    C.c_int,
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=2,
+                           flags=native_str('C_CONTIGUOUS')),
+    np.ctypeslib.ndpointer(dtype=np.float64, ndim=2,
+                           flags=native_str('C_CONTIGUOUS')),
+]
+clibsignal.stalta_2d.restype = C.c_int
+
 clibsignal.hermite_interpolation.argtypes = [
     np.ctypeslib.ndpointer(dtype=np.float64, ndim=1,
                            flags=native_str('C_CONTIGUOUS')),
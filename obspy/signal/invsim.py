@@ -26,7 +26,7 @@ from future.utils import native_str
 
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.signal.detrend import simple as simpleDetrend
-from obspy.signal.headers import clibevresp
+from obspy.signal.headers import clibevresp, clibevresp_lock
 from obspy.signal.util import _npts2nfft
 import ctypes as C
 import math as M
@@ -234,9 +234,11 @@ def evalresp(t_samp, nfft, filename, date, station='*', channel='*',
             date.formatSEED().encode('ascii', 'strict'))
         fn = C.create_string_buffer(tempfile.encode('ascii', 'strict'))
         nfreqs = C.c_int(freqs.shape[0])
-        res = clibevresp.evresp(sta, cha, net, locid, datime, unts, fn,
-                                freqs, nfreqs, rtyp, vbs, start_stage,
-                                stop_stage, stdio_flag, C.c_int(0))
+        # evalresp keeps its state in global variables
+        with clibevresp_lock:
+            res = clibevresp.evresp(sta, cha, net, locid, datime, unts, fn,
+                                    freqs, nfreqs, rtyp, vbs, start_stage,
+                                    stop_stage, stdio_flag, C.c_int(0))
         # optimizing performance, see
         # http://wiki.python.org/moin/PythonSpeed/PerformanceTips
         try:
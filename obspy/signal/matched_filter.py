@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Network matched filter (template matching) detection.
+
+Multi-station templates of known events are correlated against continuous
+data channel by channel, the correlation functions are aligned according to
+the moveout of the template traces and stacked across the network. Times at
+which the stacked correlation exceeds a threshold are returned as
+detections.
+
+.. seealso:: :func:`~obspy.signal.trigger.coincidenceTrigger` for network
+    triggering based on characteristic functions.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import bisect
+import warnings
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from obspy.signal.cross_correlation import _correlate_templates_iter
+
+
+def matchedFilterDetection(stream, templates, threshold, min_separation=None,
+                           chunk_length=3600.0, threads=1):
+    """
+    Detect repeating events in continuous data by network template matching.
+
+    For every template the normalized cross correlation of each template
+    trace with the continuous data of the same trace ID is computed. The
+    correlation functions are shifted according to the start times of the
+    template traces relative to each other (i.e. the moveout across the
+    network is preserved), averaged over all channels and searched for
+    values exceeding ``threshold``.
+
+    The continuous data is processed in chunks. The spectra of the data in a
+    chunk are computed once and shared by all templates, chunks can be
+    processed in parallel threads (NumPy releases the GIL during FFTs).
+
+    :type stream: :class:`~obspy.core.stream.Stream`
+    :param stream: Continuous data, one gap-free trace per trace ID (merge
+        the stream beforehand). All traces need the same sampling rate. Only
+        the time span covered by all channels used by the templates is
+        searched.
+    :type templates: list or dict of :class:`~obspy.core.stream.Stream`
+    :param templates: Template events, each a stream with one trace per
+        trace ID. All traces of a template need the same number of samples
+        and the sampling rate of the continuous data. If a dictionary is
+        given its keys are used as template names, otherwise the index in
+        the list.
+    :type threshold: float
+    :param threshold: Threshold for the stacked (mean) correlation
+        coefficient of all channels of a template (0.0-1.0).
+    :type min_separation: float, optional
+    :param min_separation: Minimum time in seconds between two detections of
+        the same template. Of detections closer than that only the one with
+        the highest stacked correlation is kept. Defaults to the length of
+        the respective template.
+    :type chunk_length: float, optional
+    :param chunk_length: Length in seconds of the chunks the continuous data
+        is processed in. Chunks overlap by the length of the longest
+        template (including moveout).
+    :type threads: int, optional
+    :param threads: Number of chunks to process in parallel.
+    :rtype: list
+    :returns: List of detections sorted chronologically. Each detection is a
+        dictionary with keys ``'template'`` (name of the template),
+        ``'time'`` (:class:`~obspy.core.utcdatetime.UTCDateTime` of the start
+        of the earliest template trace in the continuous data),
+        ``'correlation'`` (stacked correlation coefficient),
+        ``'trace_ids'`` (list of channels used) and ``'correlations'``
+        (dictionary mapping trace IDs to the single channel correlation
+        coefficients at the time of the detection).
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> t = st[0].stats.starttime + 7
+    >>> template = st.slice(t, t + 3).copy()
+    >>> detections = matchedFilterDetection(st, [template], 0.9)
+    >>> len(detections)
+    1
+    >>> detections[0]['time'] == t
+    True
+    >>> round(detections[0]['correlation'], 7)
+    1.0
+    """
+    if isinstance(templates, dict):
+        names = sorted(templates.keys())
+        templates = [templates[name] for name in names]
+    else:
+        names = list(range(len(templates)))
+    if not templates:
+        return []
+    # set up the continuous data as 2-D array aligned to a common start
+    ids = sorted(set(tr.id for st in templates for tr in st))
+    channels = {}
+    for id_ in ids:
+        traces = stream.select(id=id_)
+        if len(traces) != 1:
+            msg = "Expected one trace with ID %s in continuous data but " + \
+                  "got %d. Channel is disregarded."
+            warnings.warn(msg % (id_, len(traces)))
+            continue
+        if isinstance(traces[0].data, np.ma.masked_array):
+            msg = "Continuous data of %s has gaps. Channel is disregarded."
+            warnings.warn(msg % id_)
+            continue
+        channels[id_] = traces[0]
+    if not channels:
+        return []
+    ids = [id_ for id_ in ids if id_ in channels]
+    sampling_rate = channels[ids[0]].stats.sampling_rate
+    for tr in list(channels.values()) + [tr for st in templates for tr in st]:
+        if tr.stats.sampling_rate != sampling_rate:
+            msg = "All traces need the same sampling rate."
+            raise ValueError(msg)
+    starttime = max(tr.stats.starttime for tr in channels.values())
+    endtime = min(tr.stats.endtime for tr in channels.values())
+    if endtime <= starttime:
+        return []
+    npts = int(round((endtime - starttime) * sampling_rate)) + 1
+    data = np.empty((len(ids), npts), dtype=np.float64)
+    for i, id_ in enumerate(ids):
+        tr = channels[id_]
+        offset = int(round((starttime - tr.stats.starttime) * sampling_rate))
+        data[i] = tr.data[offset:offset + npts]
+
+    # set up the templates, zero rows for channels a template does not use
+    groups = {}
+    lengths = {}
+    for name, st in zip(names, templates):
+        st = [tr for tr in st if tr.id in channels]
+        if not st:
+            msg = "No channel of template %s present in continuous data. " + \
+                  "Template is disregarded."
+            warnings.warn(msg % name)
+            continue
+        nsamp = st[0].stats.npts
+        if any(tr.stats.npts != nsamp for tr in st):
+            msg = "All traces of template %s need the same number of samples."
+            raise ValueError(msg % name)
+        reference = min(tr.stats.starttime for tr in st)
+        waveforms = np.zeros((len(ids), nsamp), dtype=np.float64)
+        offsets = {}
+        for tr in st:
+            row = ids.index(tr.id)
+            if row in offsets:
+                msg = "Template %s has more than one trace with ID %s."
+                raise ValueError(msg % (name, tr.id))
+            waveforms[row] = tr.data
+            offsets[row] = int(round((tr.stats.starttime - reference) *
+                                     sampling_rate))
+        groups.setdefault(nsamp, []).append((name, waveforms, offsets))
+        lengths[name] = nsamp
+    if not groups:
+        return []
+    # number of samples needed to evaluate the templates of a group at one
+    # position, the last valid position of a group is npts - spans[nsamp]
+    spans = dict((nsamp, max(nsamp + max(offsets.values())
+                             for _, _, offsets in group))
+                 for nsamp, group in groups.items())
+    span = max(spans.values())
+    if span > npts:
+        msg = "Continuous data is shorter than the templates."
+        raise ValueError(msg)
+
+    # process the data in chunks, each chunk owns a non-overlapping range of
+    # template positions, up to the last position of the shortest templates
+    step = max(int(chunk_length * sampling_rate), 1)
+    chunk_starts = list(range(0, npts - min(spans.values()) + 1, step))
+
+    waveforms = dict((nsamp, np.array([waveforms_
+                                       for _, waveforms_, _ in group]))
+                     for nsamp, group in groups.items())
+
+    def _process_chunk(start):
+        chunk = data[:, start:start + step + span - 1]
+        detections = []
+        for nsamp, group in groups.items():
+            if start > npts - spans[nsamp]:
+                # no valid positions of these templates left
+                continue
+            iterator = _correlate_templates_iter(chunk, waveforms[nsamp])
+            for (name, _, offsets), cc in zip(group, iterator):
+                detections.extend(_detect(cc, offsets, threshold, name,
+                                          start, step))
+        return detections
+
+    if threads is not None and threads > 1 and len(chunk_starts) > 1:
+        pool = ThreadPool(min(threads, len(chunk_starts)))
+        try:
+            results = pool.map(_process_chunk, chunk_starts)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_process_chunk(start) for start in chunk_starts]
+
+    # enforce the minimum separation of detections of the same template
+    detections = {}
+    for result in results:
+        for name, index, value, values in result:
+            detections.setdefault(name, []).append((index, value, values))
+    output = []
+    for name, template_detections in detections.items():
+        if min_separation is None:
+            separation = lengths[name]
+        else:
+            separation = int(min_separation * sampling_rate)
+        # greedily keep the best detections
+        kept = []
+        for index, value, values in sorted(template_detections,
+                                           key=lambda x: -x[1]):
+            pos = bisect.bisect(kept, index)
+            if pos > 0 and index - kept[pos - 1] < separation:
+                continue
+            if pos < len(kept) and kept[pos] - index < separation:
+                continue
+            kept.insert(pos, index)
+            output.append({
+                'template': name,
+                'time': starttime + index / sampling_rate,
+                'correlation': value,
+                'trace_ids': [ids[row] for row in sorted(values)],
+                'correlations': dict((ids[row], cc_)
+                                     for row, cc_ in values.items())})
+    output.sort(key=lambda x: (x['time'], -x['correlation']))
+    return output
+
+
+def _detect(cc, offsets, threshold, name, start, step):
+    """
+    Stack the correlation functions of one template on one chunk and find
+    the peaks of all stretches above the threshold.
+
+    Returns a list of tuples (template name, position in the continuous data,
+    stacked correlation, dictionary of single channel correlations by row).
+    """
+    max_offset = max(offsets.values())
+    length = min(step, cc.shape[1] - max_offset)
+    if length <= 0:
+        return []
+    stack = np.zeros(length, dtype=np.float64)
+    for row, offset in offsets.items():
+        stack += cc[row, offset:offset + length]
+    stack /= len(offsets)
+    above = np.where(stack >= threshold)[0]
+    if len(above) == 0:
+        return []
+    # split into consecutive stretches and take the maximum of each
+    stretches = np.split(above, np.where(np.diff(above) > 1)[0] + 1)
+    detections = []
+    for stretch in stretches:
+        index = stretch[stack[stretch].argmax()]
+        values = dict((row, float(cc[row, offset + index]))
+                      for row, offset in offsets.items())
+        detections.append((name, start + int(index), float(stack[index]),
+                           values))
+    return detections
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
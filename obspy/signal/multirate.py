@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Multirate signal processing.
+
+Polyphase FIR resampling by rational factors and multi-stage decimation by
+integer factors. The anti-alias filters are designed once per ratio and
+cached as filter banks, the data is processed in chunks so that memory
+usage does not depend on the length of the data.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+from future import standard_library
+with standard_library.hooks():
+    from collections import OrderedDict
+
+import threading
+from fractions import Fraction
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+# maximum number of cached filter banks
+CACHE_SIZE = 32
+
+_FILTER_BANKS = OrderedDict()
+_FILTER_BANKS_LOCK = threading.Lock()
+
+
+def rationalRatio(old_sampling_rate, new_sampling_rate, max_factor=1000):
+    """
+    Returns the up- and downsampling factors of a resampling ratio.
+
+    :type old_sampling_rate: float
+    :param old_sampling_rate: Sampling rate of the data.
+    :type new_sampling_rate: float
+    :param new_sampling_rate: Sampling rate after resampling.
+    :type max_factor: int, optional
+    :param max_factor: Maximum up- and downsampling factor.
+    :rtype: tuple of two ints
+    :return: Upsampling and downsampling factor without common divisor.
+
+    .. rubric:: Example
+
+    >>> rationalRatio(200.0, 40.0)
+    (1, 5)
+    >>> rationalRatio(100.0, 40.0)
+    (2, 5)
+    """
+    if old_sampling_rate <= 0 or new_sampling_rate <= 0:
+        raise ValueError("Sampling rates must be positive.")
+    ratio = float(new_sampling_rate) / float(old_sampling_rate)
+    fraction = Fraction(ratio).limit_denominator(max_factor)
+    up, down = fraction.numerator, fraction.denominator
+    if up < 1 or up > max_factor or \
+            abs(up / down - ratio) > 1e-9 * ratio:
+        msg = "Resampling ratio %s is not a ratio of integers up to %d." % (
+            ratio, max_factor)
+        raise ValueError(msg)
+    return up, down
+
+
+def _filterBank(up, down, half_length, beta):
+    """
+    Returns the cached polyphase filter bank of a resampling ratio.
+
+    Row ``p`` of the bank holds every ``up``-th coefficient of the
+    anti-alias filter starting at ``p`` in reversed order, so that the
+    output samples of phase ``p`` are dot products of the row with the
+    input data.
+    """
+    key = (up, down, half_length, beta)
+    with _FILTER_BANKS_LOCK:
+        bank = _FILTER_BANKS.pop(key, None)
+        if bank is not None:
+            _FILTER_BANKS[key] = bank
+            return bank
+    from scipy.signal import firwin
+    max_factor = max(up, down)
+    numtaps = 2 * half_length * max_factor + 1
+    h = firwin(numtaps, 1.0 / max_factor,
+               window=(native_str('kaiser'), beta))
+    h *= up
+    taps = -(-numtaps // up)
+    h = np.concatenate([h, np.zeros(taps * up - numtaps)])
+    bank = h.reshape(taps, up).T[:, ::-1].copy()
+    bank.flags.writeable = False
+    with _FILTER_BANKS_LOCK:
+        _FILTER_BANKS[key] = bank
+        while len(_FILTER_BANKS) > CACHE_SIZE:
+            _FILTER_BANKS.popitem(last=False)
+    return bank
+
+
+def _segment(data, start, stop):
+    """
+    Returns ``data[start:stop]`` with zeros for indices outside the data.
+    """
+    if start >= 0 and stop <= len(data):
+        return data[start:stop]
+    segment = np.zeros(stop - start, dtype=data.dtype)
+    first = max(start, 0)
+    last = min(stop, len(data))
+    if last > first:
+        segment[first - start:last - start] = data[first:last]
+    return segment
+
+
+def _filterWindows(segment, row, num, step):
+    """
+    Returns the dot products of ``row`` with ``num`` windows of the
+    contiguous array ``segment`` starting every ``step`` samples.
+    """
+    itemsize = segment.itemsize
+    windows = as_strided(segment, shape=(num, len(row)),
+                         strides=(step * itemsize, itemsize))
+    return np.dot(windows, row)
+
+
+def polyphaseResample(data, up, down, half_length=10, beta=5.0,
+                      chunk_size=262144):
+    """
+    Resamples data by a rational factor with a polyphase FIR filter.
+
+    The data is upsampled by ``up``, lowpass filtered with a zero phase
+    Kaiser windowed FIR filter and downsampled by ``down`` without ever
+    computing the intermediate samples. The result is the same as with
+    :func:`scipy.signal.resample_poly` but the filter bank is cached for
+    every ratio and long data is processed in chunks. The first sample of
+    the output is at the time of the first input sample, data outside of
+    the input array is taken to be zero.
+
+    :type data: :class:`numpy.ndarray`
+    :param data: Data to resample.
+    :type up: int
+    :param up: Upsampling factor.
+    :type down: int
+    :param down: Downsampling factor.
+    :type half_length: int, optional
+    :param half_length: Half length of the filter in samples of the lower
+        of the two sampling rates.
+    :type beta: float, optional
+    :param beta: Shape parameter of the Kaiser window.
+    :type chunk_size: int, optional
+    :param chunk_size: Maximum number of filter coefficients times output
+        samples computed at once, limits the size of temporary arrays.
+    :rtype: :class:`numpy.ndarray`
+    :return: Resampled data with ``len(data) * up // down`` samples.
+
+    .. rubric:: Example
+
+    >>> data = np.sin(np.arange(200) * 0.05)
+    >>> resampled = polyphaseResample(data, 2, 5)
+    >>> len(resampled)
+    80
+    >>> np.abs(resampled[10:70] - np.sin(np.arange(10, 70) * 0.125)).max() \
+        < 1e-3
+    True
+    """
+    if up < 1 or down < 1:
+        raise ValueError("Resampling factors must be positive integers.")
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    if up == down:
+        return data.copy()
+    npts = len(data) * up // down
+    output = np.empty(npts, dtype=np.float64)
+    if not npts:
+        return output
+    bank = _filterBank(up, down, half_length, beta)
+    taps = bank.shape[1]
+    delay = half_length * max(up, down)
+    # output samples n0, n0 + up, n0 + 2 * up, ... share the same phase of
+    # the filter bank and their input windows are down samples apart
+    step = max(chunk_size // taps, 1)
+    for n0 in range(min(up, npts)):
+        position = n0 * down + delay
+        row = bank[position % up]
+        # first input sample of the window of output sample n0
+        first = position // up - taps + 1
+        count = len(range(n0, npts, up))
+        for m in range(0, count, step):
+            num = min(step, count - m)
+            start = first + m * down
+            segment = _segment(data, start, start + (num - 1) * down + taps)
+            output[n0 + m * up:n0 + (m + num) * up:up] = \
+                _filterWindows(segment, row, num, down)
+    return output
+
+
+def decimationPlan(factor, max_stage_factor=10):
+    """
+    Splits a decimation factor into the factors of consecutive stages.
+
+    The prime factors of ``factor`` are combined to stage factors of at most
+    ``max_stage_factor`` (prime factors above it form a stage of their own).
+    The stages are ordered by decreasing factor, so that the data rate drops
+    as fast as possible.
+
+    :type factor: int
+    :param factor: Total decimation factor.
+    :type max_stage_factor: int, optional
+    :param max_stage_factor: Maximum decimation factor of a single stage.
+    :rtype: list of ints
+    :return: Decimation factors of the stages, their product is ``factor``.
+
+    .. rubric:: Example
+
+    >>> decimationPlan(1000)
+    [10, 10, 10]
+    >>> decimationPlan(96)
+    [8, 6, 2]
+    >>> decimationPlan(34)
+    [17, 2]
+    """
+    if factor < 1 or int(factor) != factor:
+        raise ValueError("Decimation factor must be a positive integer.")
+    factor = int(factor)
+    primes = []
+    divisor = 2
+    while divisor * divisor <= factor:
+        while factor % divisor == 0:
+            primes.append(divisor)
+            factor //= divisor
+        divisor += 1
+    if factor > 1:
+        primes.append(factor)
+    stages = []
+    for prime in sorted(primes, reverse=True):
+        for i, stage in enumerate(stages):
+            if stage * prime <= max_stage_factor:
+                stages[i] *= prime
+                break
+        else:
+            stages.append(prime)
+    return sorted(stages, reverse=True)
+
+
+class ChunkedDecimator(object):
+    """
+    Multi-stage decimation of a record in consecutive chunks.
+
+    The decimation factor is split into stages with
+    :func:`decimationPlan`, every stage applies a zero phase Kaiser windowed
+    FIR lowpass filter at the Nyquist frequency of its output and keeps
+    every ``q``-th sample. The filters are computed only at the output
+    samples and are cached per stage factor. Output samples are returned as
+    soon as all input samples they depend on have been processed, the
+    concatenated output of :meth:`process` and :meth:`flush` is the same
+    for any split of the record into chunks.
+
+    :type factor: int
+    :param factor: Total decimation factor.
+    :type half_length: int, optional
+    :param half_length: Half length of the filters in output samples of the
+        stages.
+    :type beta: float, optional
+    :param beta: Shape parameter of the Kaiser window.
+    :type max_stage_factor: int, optional
+    :param max_stage_factor: Maximum decimation factor of a single stage.
+    :type chunk_size: int, optional
+    :param chunk_size: Maximum number of filter coefficients times output
+        samples computed at once, limits the size of temporary arrays.
+
+    .. rubric:: Example
+
+    >>> decimator = ChunkedDecimator(100)
+    >>> decimator.stages
+    [10, 10]
+    >>> data = np.ones(10000)
+    >>> output = np.concatenate([decimator.process(data[:5000]),
+    ...                          decimator.process(data[5000:]),
+    ...                          decimator.flush()])
+    >>> len(output)
+    100
+    >>> np.abs(output[10:90] - 1).max() < 1e-3
+    True
+    """
+    def __init__(self, factor, half_length=10, beta=5.0,
+                 max_stage_factor=10, chunk_size=262144):
+        self.stages = decimationPlan(factor, max_stage_factor)
+        self.factor = int(factor)
+        self.half_length = int(half_length)
+        self.beta = beta
+        self.chunk_size = chunk_size
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the state, i.e. the next chunk is treated as start of a new
+        record.
+        """
+        # per stage the input samples not consumed yet starting with the
+        # window of the next output sample, the number of input samples
+        # received and of output samples computed
+        self._state = [[np.zeros(self.half_length * q), 0, 0]
+                       for q in self.stages]
+
+    def process(self, data):
+        """
+        Decimate the next chunk of data.
+
+        :type data: :class:`numpy.ndarray`
+        :param data: Next chunk of the record, directly following the
+            previously processed chunk.
+        :rtype: :class:`numpy.ndarray`
+        :return: Output samples completed by this chunk.
+        """
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        for q, state in zip(self.stages, self._state):
+            data = self._stage(q, state, data, False)
+        return data
+
+    def flush(self):
+        """
+        Finish the record, assuming zeros after its end, and reset the
+        state.
+
+        :rtype: :class:`numpy.ndarray`
+        :return: The remaining output samples. In total the decimated
+            record has ``ceil(npts / factor)`` samples.
+        """
+        data = np.empty(0, dtype=np.float64)
+        for q, state in zip(self.stages, self._state):
+            data = self._stage(q, state, data, True)
+        self.reset()
+        return data
+
+    def _stage(self, q, state, data, final):
+        """
+        Feeds data to a stage and returns its new output samples.
+        """
+        buf, received, produced = state
+        row = _filterBank(1, q, self.half_length, self.beta)[0]
+        taps = len(row)
+        received += len(data)
+        if final:
+            num = -(-received // q) - produced
+            buf = _segment(np.concatenate([buf, data]), 0,
+                           max((num - 1) * q + taps, 0))
+        else:
+            buf = np.concatenate([buf, data])
+            num = max((len(buf) - taps) // q + 1, 0)
+        output = np.empty(num, dtype=np.float64)
+        step = max(self.chunk_size // taps, 1)
+        for m in range(0, num, step):
+            count = min(step, num - m)
+            output[m:m + count] = _filterWindows(
+                buf[m * q:(m + count - 1) * q + taps], row, count, q)
+        state[:] = [buf[num * q:], received, produced + num]
+        return output
+
+
+def multistageDecimate(data, factor, half_length=10, beta=5.0,
+                       max_stage_factor=10, chunk_size=1048576):
+    """
+    Decimates data by an integer factor in several stages.
+
+    The data is processed in chunks by a :class:`ChunkedDecimator`, so the
+    size of temporary arrays does not depend on the length of the data. The
+    first output sample is at the time of the first input sample, the
+    result has ``ceil(len(data) / factor)`` samples like taking every
+    ``factor``-th sample.
+
+    :type data: :class:`numpy.ndarray`
+    :param data: Data to decimate.
+    :type factor: int
+    :param factor: Total decimation factor.
+    :type half_length: int, optional
+    :param half_length: Half length of the filters in output samples of the
+        stages.
+    :type beta: float, optional
+    :param beta: Shape parameter of the Kaiser window.
+    :type max_stage_factor: int, optional
+    :param max_stage_factor: Maximum decimation factor of a single stage.
+    :type chunk_size: int, optional
+    :param chunk_size: Number of input samples processed at once.
+    :rtype: :class:`numpy.ndarray`
+    """
+    decimator = ChunkedDecimator(factor, half_length=half_length, beta=beta,
+                                 max_stage_factor=max_stage_factor)
+    output = [decimator.process(data[i:i + chunk_size])
+              for i in range(0, len(data), chunk_size)]
+    output.append(decimator.flush())
+    return np.concatenate(output)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -560,9 +560,9 @@ class PPSD():
                 msg = "Skipping incompatible trace."
                 warnings.warn(msg)
                 continue
-            t1 = tr.stats.starttime
-            t2 = tr.stats.endtime
-            while t1 + self.ppsd_length <= t2:
+            for slice in tr.slide(self.ppsd_length,
+                                  (1 - self.overlap) * self.ppsd_length):
+                t1 = slice.stats.starttime
                 if self.__check_time_present(t1):
                     msg = "Already covered time spans detected (e.g. %s), " + \
                           "skipping these slices."
@@ -571,7 +571,6 @@ class PPSD():
                 else:
                     # throw warnings if trace length is different
                     # than ppsd_length..!?!
-                    slice = tr.slice(t1, t1 + self.ppsd_length)
                     # XXX not good, should be working in place somehow
                     # XXX how to do it with the padding, though?
                     success = self.__process(slice)
@@ -580,7 +579,6 @@ class PPSD():
                         if verbose:
                             print(t1)
                         changed = True
-                t1 += (1 - self.overlap) * self.ppsd_length  # advance
 
             # enforce time limits, pad zeros if gaps
             # tr.trim(t, t+PPSD_LENGTH, pad=True)
@@ -25,3 +25,63 @@ void recstalta(double *a, double *charfct, int ndat, int nsta, int nlta) {
 
     return;
 }
+
+
+/* Persistent state of a recursive STA/LTA between consecutive chunks of
+ * the same record. n is the number of samples processed so far. */
+typedef struct _recstaltaStateS {
+    double sta;
+    double lta;
+    long long n;
+} recstaltaStateS;
+
+/* Chunked version of recstalta(). Processing a record in consecutive chunks
+ * gives the same characteristic function as processing it in one go, as
+ * long as the same state is handed over between the calls. */
+void recstalta_chunk(double *a, double *charfct, int ndat, int nsta, int nlta,
+                     recstaltaStateS *state) {
+    int i;
+    long long k;
+    double csta = 1./((double)nsta);
+    double clta = 1./((double)nlta);
+    double sta = state->sta;
+    double lta = state->lta;
+
+    for (i=0;i<ndat;i++) {
+        k = state->n + i;
+        if (k == 0) {
+            /* the first sample of the record is not taken into account */
+            charfct[i] = 0.0;
+            continue;
+        }
+        sta = csta * pow(a[i],2) + (1-csta)*sta;
+        lta = clta * pow(a[i],2) + (1-clta)*lta;
+        if (k < nlta) {
+            charfct[i] = 0.0;
+        }
+        else {
+            charfct[i] = sta/lta;
+        }
+    }
+
+    state->sta = sta;
+    state->lta = lta;
+    state->n += ndat;
+
+    return;
+}
+
+
+/* Recursive STA/LTA of nchan channels of equal length ndat, stored row by
+ * row in a and charfct. */
+void recstalta_2d(double *a, double *charfct, int nchan, int ndat, int nsta,
+                  int nlta) {
+    int i;
+
+    for (i=0;i<nchan;i++) {
+        recstalta(a + (size_t)i * ndat, charfct + (size_t)i * ndat, ndat,
+                  nsta, nlta);
+    }
+
+    return;
+}
@@ -6,6 +6,7 @@
 #---------------------------------------------------------------------*/
 
 #include <math.h>
+#include <stddef.h>
 
 #define OPTIMIZED_VERSION
 
@@ -15,6 +16,14 @@ typedef struct _headS {
     int Nlta;
 } headS;
 
+/* Persistent state of a STA/LTA between consecutive chunks of the same
+ * record. n is the number of samples processed so far. */
+typedef struct _staltaStateS {
+    double sta;
+    double lta;
+    long long n;
+} staltaStateS;
+
 int stalta(const headS *head, const double *data, double *charfct)
 {
     int i;
@@ -72,3 +81,118 @@ int stalta(const headS *head, const double *data, double *charfct)
 
     return 0;
 }
+
+
+/* Chunked version of stalta(). head->N is the length of the current chunk,
+ * buf is a ring buffer of length head->Nlta holding the squared samples of
+ * the last LTA window (allocated by the caller, content is only touched by
+ * this routine). */
+int stalta_chunk(const headS *head, staltaStateS *state, double *buf,
+                 const double *data, double *charfct)
+{
+    int i;
+    long long k;
+    double sq;
+    double sta = state->sta;
+    double lta = state->lta;
+    const double frac = (double) head->Nlta / (double) head->Nsta;
+
+    if (head->Nsta < 1 || head->Nlta < head->Nsta) {
+        return 1;
+    }
+
+    for (i = 0; i < head->N; ++i) {
+        k = state->n + i;
+        sq = pow(data[i], 2);
+        if (k < head->Nsta) {
+            sta += sq;
+            lta += sq;
+        }
+        else if (k < head->Nlta) {
+            lta += sq;
+            sta += sq - buf[(k - head->Nsta) % head->Nlta];
+        }
+        else {
+            sta += sq - buf[(k - head->Nsta) % head->Nlta];
+            lta += sq - buf[k % head->Nlta];
+        }
+        buf[k % head->Nlta] = sq;
+        if (k < head->Nlta - 1) {
+            charfct[i] = 0.;
+        }
+        else {
+            charfct[i] = sta / lta * frac;
+        }
+    }
+
+    state->sta = sta;
+    state->lta = lta;
+    state->n += head->N;
+
+    return 0;
+}
+
+
+/* Chunked delayed STA/LTA. buf is a ring buffer of length
+ * head->Nsta + head->Nlta + 1 holding the last squared samples. Samples
+ * before the start of the record are treated as zero. */
+int delayed_stalta_chunk(const headS *head, staltaStateS *state, double *buf,
+                         const double *data, double *charfct)
+{
+    int i;
+    long long k;
+    double sq;
+    double sta = state->sta;
+    double lta = state->lta;
+    const long long nbuf = (long long) head->Nsta + head->Nlta + 1;
+    const long long nmute = (long long) head->Nsta + head->Nlta + 50;
+
+    if (head->Nsta < 1 || head->Nlta < 1) {
+        return 1;
+    }
+
+    for (i = 0; i < head->N; ++i) {
+        k = state->n + i;
+        sq = pow(data[i], 2);
+        sta += (sq + (k >= head->Nsta ?
+                      buf[(k - head->Nsta) % nbuf] : 0.)) / head->Nsta;
+        lta += ((k >= head->Nsta + 1 ?
+                 buf[(k - head->Nsta - 1) % nbuf] : 0.) +
+                (k >= nbuf ? buf[k % nbuf] : 0.)) / head->Nlta;
+        /* slot of sample k - nbuf is not needed anymore */
+        buf[k % nbuf] = sq;
+        if (k < nmute) {
+            charfct[i] = 0.;
+        }
+        else {
+            charfct[i] = sta / lta;
+        }
+    }
+
+    state->sta = sta;
+    state->lta = lta;
+    state->n += head->N;
+
+    return 0;
+}
+
+
+/* Classic STA/LTA of nchan channels of equal length head->N, stored row by
+ * row in data and charfct. Returns the first nonzero error code of
+ * stalta(). */
+int stalta_2d(const headS *head, int nchan, const double *data,
+              double *charfct)
+{
+    int i;
+    int errcode;
+
+    for (i = 0; i < nchan; ++i) {
+        errcode = stalta(head, data + (size_t)i * head->N,
+                         charfct + (size_t)i * head->N);
+        if (errcode != 0) {
+            return errcode;
+        }
+    }
+
+    return 0;
+}
@@ -8,8 +8,10 @@ from future.builtins import *  # NOQA
 
 import os
 import unittest
+import numpy as np
 from obspy import read, UTCDateTime
-from obspy.signal.cross_correlation import xcorrPickCorrection
+from obspy.signal.cross_correlation import xcorrPickCorrection, xcorr, \
+    correlateTemplate, correlateTemplates
 
 
 class CrossCorrelationTestCase(unittest.TestCase):
@@ -51,6 +53,59 @@ class CrossCorrelationTestCase(unittest.TestCase):
         self.assertEqual(tr1, tr1_copy)
         self.assertEqual(tr2, tr2_copy)
 
+    def test_xcorrFFT(self):
+        """
+        Frequency domain cross correlation has to agree with the time domain
+        version and has to allow arbitrary shifts.
+        """
+        np.random.seed(815)
+        tr1 = np.random.randn(1000).astype(np.float32)
+        tr2 = np.concatenate((np.zeros(10), tr1[:-10])).astype(np.float32)
+        shift1, value1, cc1 = xcorr(tr1, tr2, 100, full_xcorr=True,
+                                    method='direct')
+        shift2, value2, cc2 = xcorr(tr1, tr2, 100, full_xcorr=True,
+                                    method='fft')
+        self.assertEqual(shift1, -10)
+        self.assertEqual(shift2, -10)
+        self.assertAlmostEqual(value1, value2, 6)
+        np.testing.assert_allclose(cc1, cc2, atol=1e-6)
+        # shift_len larger than half the trace length
+        self.assertRaises(ValueError, xcorr, tr1, tr2, 600, method='direct')
+        shift, value, cc = xcorr(tr1, tr2, 1200, full_xcorr=True)
+        self.assertEqual(shift, -10)
+        self.assertAlmostEqual(value, value2)
+        self.assertEqual(len(cc), 2401)
+        # lags without any overlap of the traces
+        self.assertTrue(np.all(cc[:201] == 0))
+        self.assertTrue(np.all(cc[-201:] == 0))
+        self.assertRaises(ValueError, xcorr, tr1, tr2, 100, method='bogus')
+
+    def test_correlateTemplates(self):
+        """
+        Sliding normalized cross correlation of one or many templates.
+        """
+        np.random.seed(815)
+        data = np.random.randn(3, 5000)
+        templates = np.array([data[:, 1000:1200], data[:, 3000:3200]])
+        cc = correlateTemplates(data, templates)
+        self.assertEqual(cc.shape, (2, 3, 4801))
+        np.testing.assert_array_equal(cc[0].argmax(axis=-1), [1000] * 3)
+        np.testing.assert_array_equal(cc[1].argmax(axis=-1), [3000] * 3)
+        self.assertAlmostEqual(cc[1, 2, 3000], 1.0)
+        # compare against correlation coefficient of a single window
+        expected = np.corrcoef(templates[0, 1], data[1, 1234:1434])[0, 1]
+        self.assertAlmostEqual(cc[0, 1, 1234], expected)
+        # single channel version
+        cc1 = correlateTemplate(data[2], templates[1, 2])
+        np.testing.assert_allclose(cc1, cc[1, 2], atol=1e-12)
+        # windows of constant data give zero
+        data = np.zeros(1000)
+        data[500:] = 1.0
+        cc = correlateTemplate(data, np.random.randn(50))
+        self.assertTrue(np.all(cc[:450] == 0))
+        self.assertTrue(np.all(cc[501:] == 0))
+        self.assertRaises(ValueError, correlateTemplates, data, templates)
+
 
 def suite():
     return unittest.makeSuite(CrossCorrelationTestCase, 'test')
@@ -9,6 +9,7 @@ from future.builtins import *  # NOQA
 
 from obspy.signal import bandpass, lowpass, highpass
 from obspy.signal.filter import envelope, lowpassCheby2
+from obspy.signal import filter as filter_module
 import os
 import unittest
 import gzip
@@ -251,6 +252,54 @@ class FilterTestCase(unittest.TestCase):
         # be 0 (1dB ripple) before filter ramp
         self.assertTrue(h_db[freq < 25].min() > -1)
 
+    def test_filterDesignCache(self):
+        """
+        Filter designs are reused and results agree with filtering using the
+        uncached (b, a) representation.
+        """
+        np.random.seed(815)
+        data = np.random.randn(2000)
+        filter_module._FILTER_CACHE.clear()
+        for zerophase in (False, True):
+            datcorr = bandpass(data, 1.0, 10.0, 100.0, corners=4,
+                               zerophase=zerophase)
+            b, a = sg.iirfilter(4, [0.02, 0.2], btype='band',
+                                ftype='butter', output='ba')
+            expected = sg.lfilter(b, a, data)
+            if zerophase:
+                expected = sg.lfilter(b, a, expected[::-1])[::-1]
+            np.testing.assert_allclose(datcorr, expected, rtol=0,
+                                       atol=1e-7)
+        self.assertEqual(len(filter_module._FILTER_CACHE), 1)
+        # same parameters, different sampling rate and corner frequency
+        bandpass(data, 2.0, 20.0, 200.0, corners=4)
+        self.assertEqual(len(filter_module._FILTER_CACHE), 1)
+        lowpassCheby2(data, 10.0, 100.0)
+        lowpassCheby2(data, 10.0, 100.0)
+        self.assertEqual(len(filter_module._FILTER_CACHE), 2)
+        # the cache is bounded
+        for i in range(filter_module._FILTER_CACHE_SIZE + 10):
+            lowpass(data, 1.0 + i * 0.1, 1000.0)
+        self.assertEqual(len(filter_module._FILTER_CACHE),
+                         filter_module._FILTER_CACHE_SIZE)
+
+    def test_filterDesignCacheModification(self):
+        """
+        Modifying returned coefficients does not change the cached design.
+        """
+        np.random.seed(815)
+        data = np.random.randn(2000)
+        filter_module._FILTER_CACHE.clear()
+        b, a = lowpassCheby2(data, 10.0, 100.0, ba=True)
+        expected = lowpassCheby2(data, 10.0, 100.0)
+        b *= 2
+        a[0] = 5.0
+        b2, a2 = lowpassCheby2(data, 10.0, 100.0, ba=True)
+        np.testing.assert_array_equal(b2, b / 2)
+        self.assertNotEqual(a2[0], 5.0)
+        np.testing.assert_array_equal(lowpassCheby2(data, 10.0, 100.0),
+                                      expected)
+
 
 def suite():
     return unittest.makeSuite(FilterTestCase, 'test')
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.signal.matched_filter test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import unittest
+import warnings
+
+import numpy as np
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.signal.matched_filter import matchedFilterDetection
+
+
+class MatchedFilterTestCase(unittest.TestCase):
+    """
+    Test cases for network template matching.
+    """
+    def setUp(self):
+        np.random.seed(815)
+        self.starttime = UTCDateTime(2014, 1, 1)
+        self.sampling_rate = 100.0
+        self.moveout = [0, 50, 120]
+        self.event_positions = [20000, 90000, 150050]
+        noise = np.random.randn(3, 200000)
+        self.event = np.random.randn(3, 300) * 5
+        for position in self.event_positions:
+            for i, shift in enumerate(self.moveout):
+                start = position + shift
+                noise[i, start:start + 300] += self.event[i]
+        header = {'sampling_rate': self.sampling_rate,
+                  'starttime': self.starttime, 'network': 'XX',
+                  'channel': 'HHZ'}
+        self.stream = Stream()
+        self.template = Stream()
+        for i, shift in enumerate(self.moveout):
+            header['station'] = 'S%d' % i
+            self.stream.append(Trace(data=noise[i], header=dict(header)))
+            header_ = dict(header)
+            header_['starttime'] = UTCDateTime(2013, 1, 1) + \
+                shift / self.sampling_rate
+            self.template.append(Trace(data=self.event[i], header=header_))
+
+    def test_detection(self):
+        """
+        Events are found at the correct times, independent of chunking and
+        threading.
+        """
+        expected = [self.starttime + pos / self.sampling_rate
+                    for pos in self.event_positions]
+        for chunk_length, threads in ((3600.0, 1), (100.0, 1), (37.3, 4)):
+            detections = matchedFilterDetection(
+                self.stream, {'event': self.template}, 0.7,
+                chunk_length=chunk_length, threads=threads)
+            self.assertEqual([d['time'] for d in detections], expected)
+            for d in detections:
+                self.assertEqual(d['template'], 'event')
+                self.assertTrue(d['correlation'] > 0.95)
+                self.assertEqual(sorted(d['correlations'].keys()),
+                                 d['trace_ids'])
+                self.assertAlmostEqual(
+                    np.mean(list(d['correlations'].values())),
+                    d['correlation'])
+
+    def test_mixedTemplateLengths(self):
+        """
+        Short templates are evaluated up to the end of the data, also if a
+        longer template is used at the same time.
+        """
+        data = np.random.randn(11200)
+        event = np.random.randn(50) * 5
+        data[11100:11150] += event
+        header = {'network': 'XX', 'station': 'S0', 'sampling_rate': 1.0}
+        stream = Stream([Trace(data=data, header=dict(header))])
+        templates = {
+            'short': Stream([Trace(data=event, header=dict(header))]),
+            'long': Stream([Trace(data=np.random.randn(500),
+                                  header=dict(header))])}
+        for chunk_length in (3600.0, 1000.0, 7.0):
+            detections = matchedFilterDetection(stream, templates, 0.9,
+                                                chunk_length=chunk_length)
+            self.assertEqual(len(detections), 1)
+            self.assertEqual(detections[0]['template'], 'short')
+            self.assertEqual(detections[0]['time'], UTCDateTime(11100))
+            self.assertTrue(detections[0]['correlation'] > 0.95)
+
+    def test_missingChannel(self):
+        """
+        Channels missing in the continuous data are disregarded with a
+        warning.
+        """
+        stream = self.stream.copy()
+        stream.remove(stream[2])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            detections = matchedFilterDetection(stream, [self.template], 0.7)
+        self.assertEqual(len(w), 1)
+        self.assertEqual(len(detections), 3)
+        self.assertEqual(detections[0]['template'], 0)
+        self.assertEqual(detections[0]['trace_ids'],
+                         ['XX.S0..HHZ', 'XX.S1..HHZ'])
+
+    def test_minSeparation(self):
+        """
+        Only the best detection within the minimum separation is kept.
+        """
+        detections = matchedFilterDetection(self.stream, [self.template],
+                                            0.7, min_separation=2000)
+        self.assertEqual(len(detections), 1)
+
+
+def suite():
+    return unittest.makeSuite(MatchedFilterTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.signal.multirate test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import unittest
+
+import numpy as np
+from scipy.signal import firwin
+
+from obspy.signal import multirate
+from obspy.signal.multirate import ChunkedDecimator, decimationPlan, \
+    multistageDecimate, polyphaseResample, rationalRatio
+
+
+class MultirateTestCase(unittest.TestCase):
+    """
+    Test cases for polyphase resampling.
+    """
+    def setUp(self):
+        np.random.seed(815)
+
+    def _reference(self, data, up, down, half_length=10, beta=5.0):
+        """
+        Upsampling with zeros, filtering and downsampling the slow way.
+        """
+        max_factor = max(up, down)
+        h = firwin(2 * half_length * max_factor + 1, 1.0 / max_factor,
+                   window=(native_str('kaiser'), beta)) * up
+        upsampled = np.zeros(len(data) * up)
+        upsampled[::up] = data
+        filtered = np.convolve(upsampled, h)
+        delay = half_length * max_factor
+        return filtered[delay::down][:len(data) * up // down]
+
+    def test_rationalRatio(self):
+        self.assertEqual(rationalRatio(200.0, 40.0), (1, 5))
+        self.assertEqual(rationalRatio(100.0, 40.0), (2, 5))
+        self.assertEqual(rationalRatio(40.0, 100.0), (5, 2))
+        self.assertEqual(rationalRatio(100.0, 100.0), (1, 1))
+        self.assertEqual(rationalRatio(1 / 3.0, 0.5), (3, 2))
+        self.assertRaises(ValueError, rationalRatio, 100.0, np.pi)
+        self.assertRaises(ValueError, rationalRatio, 100.0, 0.0)
+
+    def test_polyphaseResample(self):
+        """
+        Compares the result with filtering the upsampled data, also for
+        chunked processing and lengths shorter than the filter.
+        """
+        for up, down, npts in ((1, 5, 10000), (2, 5, 9999), (5, 2, 1001),
+                               (3, 7, 10), (7, 3, 2)):
+            data = np.random.randn(npts)
+            expected = self._reference(data, up, down)
+            for chunk_size in (1, 100, 262144):
+                result = polyphaseResample(data, up, down,
+                                           chunk_size=chunk_size)
+                self.assertEqual(len(result), npts * up // down)
+                np.testing.assert_allclose(result, expected, atol=1e-12)
+        data = np.arange(10, dtype=np.int32)
+        np.testing.assert_array_equal(polyphaseResample(data, 2, 2), data)
+        self.assertEqual(len(polyphaseResample(data, 1, 20)), 0)
+
+    def test_filterBankCache(self):
+        """
+        Filter banks are designed once per ratio and are read only.
+        """
+        bank = multirate._filterBank(2, 5, 10, 5.0)
+        self.assertTrue(multirate._filterBank(2, 5, 10, 5.0) is bank)
+        self.assertFalse(bank.flags.writeable)
+        self.assertEqual(bank.shape, (2, 51))
+        for i in range(multirate.CACHE_SIZE + 1):
+            multirate._filterBank(1, i + 2, 1, 5.0)
+        self.assertTrue(len(multirate._FILTER_BANKS) <= multirate.CACHE_SIZE)
+        self.assertFalse(multirate._filterBank(2, 5, 10, 5.0) is bank)
+
+    def test_decimationPlan(self):
+        self.assertEqual(decimationPlan(1), [])
+        self.assertEqual(decimationPlan(5), [5])
+        self.assertEqual(decimationPlan(1000), [10, 10, 10])
+        self.assertEqual(decimationPlan(1000, max_stage_factor=5),
+                         [5, 5, 5, 4, 2])
+        self.assertEqual(decimationPlan(2 * 3 * 31), [31, 6])
+        self.assertRaises(ValueError, decimationPlan, 0)
+        self.assertRaises(ValueError, decimationPlan, 2.5)
+
+    def test_multistageDecimate(self):
+        """
+        A single stage is the same as polyphase resampling, the output does
+        not depend on the chunks.
+        """
+        data = np.random.randn(20003)
+        for factor in (2, 7, 10, 13):
+            result = multistageDecimate(data, factor)
+            self.assertEqual(len(result), len(data[::factor]))
+            expected = polyphaseResample(data, 1, factor)
+            np.testing.assert_allclose(result[:len(expected)], expected,
+                                       atol=1e-12)
+        expected = multistageDecimate(data, 100)
+        self.assertEqual(len(expected), 201)
+        for chunk_size in (1, 99, 5000):
+            result = multistageDecimate(data, 100, chunk_size=chunk_size)
+            np.testing.assert_allclose(result, expected, atol=1e-12)
+        # the decimator can be reused
+        decimator = ChunkedDecimator(100, chunk_size=1000)
+        for _ in range(2):
+            result = np.concatenate([decimator.process(data[:12345]),
+                                     decimator.process(data[12345:]),
+                                     decimator.flush()])
+            np.testing.assert_allclose(result, expected, atol=1e-12)
+        np.testing.assert_array_equal(multistageDecimate(data, 1), data)
+        self.assertEqual(len(multistageDecimate(data[:0], 10)), 0)
+
+
+def suite():
+    return unittest.makeSuite(MultirateTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -162,6 +162,30 @@ class StreamTestCase(unittest.TestCase):
         for i, tr in enumerate(st):
             st_bkp[i].decimate(10, strict_length=False)
             self.assertEqual(tr, st_bkp[i])
+        # multi-stage decimation
+        st = st_bkp.copy()
+        st.decimate(25, method='multistage')
+        for i, tr in enumerate(st):
+            st_bkp[i].decimate(25, method='multistage')
+            self.assertEqual(tr, st_bkp[i])
+
+    def test_trigger(self):
+        """
+        Tests that traces of equal length triggered at once by the stream
+        give the same results and processing information as triggering each
+        trace on its own.
+        """
+        st = read()
+        for type_ in ('recstalta', 'classicstalta'):
+            for threads in (1, 2):
+                st1 = st.copy()
+                st1.trigger(type_, sta=0.5, lta=2, threads=threads)
+                for i, tr in enumerate(st1):
+                    tr2 = st[i].copy()
+                    tr2.trigger(type_, sta=0.5, lta=2)
+                    self.assertEqual(tr, tr2)
+                    self.assertEqual(tr.stats.processing,
+                                     tr2.stats.processing)
 
 
 def suite():
@@ -167,6 +167,30 @@ class TraceTestCase(unittest.TestCase):
         tr2.decimate(4, no_filter=True)
         np.testing.assert_array_equal(tr.data, tr2.data)
 
+    def test_decimate_multistage(self):
+        """
+        Tests multi-stage decimation of the Trace object.
+        """
+        t = np.arange(200000) / 1000.0
+        tr = Trace(data=np.sin(2 * np.pi * 0.05 * t) +
+                   np.sin(2 * np.pi * 0.9 * t))
+        tr.stats.sampling_rate = 1000.0
+        tr_bkp = tr.copy()
+        self.assertRaises(ValueError, tr.decimate, 1000, method='fir')
+        tr.decimate(1000, method='multistage')
+        self.assertEqual(tr.stats.npts, 200)
+        self.assertEqual(tr.stats.sampling_rate, 1.0)
+        self.assertEqual(tr.stats.starttime, tr_bkp.stats.starttime)
+        self.assertTrue("method='multistage'" in tr.stats.processing[0])
+        # the 0.9 Hz signal is removed, the 0.05 Hz signal is retained
+        expected = np.sin(2 * np.pi * 0.05 * np.arange(200))
+        np.testing.assert_allclose(tr.data[20:-20], expected[20:-20],
+                                   atol=5e-3)
+        # no filtering is the same for all methods
+        tr = tr_bkp.copy()
+        tr.decimate(10, no_filter=True, method='multistage')
+        np.testing.assert_array_equal(tr.data, tr_bkp.data[::10])
+
 
 def suite():
     return unittest.makeSuite(TraceTestCase, 'test')
@@ -9,7 +9,9 @@ from future.builtins import *  # NOQA
 from ctypes import ArgumentError
 from obspy import read, Stream, UTCDateTime
 from obspy.signal import recSTALTA, recSTALTAPy, triggerOnset, pkBaer, \
-    coincidenceTrigger, arPick, classicSTALTA, classicSTALTAPy
+    coincidenceTrigger, arPick, classicSTALTA, classicSTALTAPy, \
+    ChunkedRecSTALTA, ChunkedClassicSTALTA, ChunkedDelayedSTALTA, \
+    recSTALTA2D, classicSTALTA2D
 from obspy.signal.util import clibsignal
 import gzip
 import numpy as np
@@ -422,6 +424,57 @@ class TriggerTestCase(unittest.TestCase):
         ref = np.array([0.38012302, 0.37704431, 0.47674533, 0.67992292])
         self.assertTrue(np.allclose(ref, c2[99:103]))
 
+    def test_chunkedSTALTA(self):
+        """
+        Processing data in chunks has to give results identical to a single
+        pass over the whole data.
+        """
+        nsta, nlta = 5, 10
+        indices = [3, 7, 1000, 1001, 5000, 77777]
+        # recursive STA/LTA
+        trig = ChunkedRecSTALTA(nsta, nlta)
+        cft = np.concatenate([trig.process(chunk)
+                              for chunk in np.split(self.data, indices)])
+        np.testing.assert_array_equal(cft, recSTALTA(self.data, nsta, nlta))
+        self.assertEqual(trig.samples_processed, len(self.data))
+        # classic STA/LTA
+        trig = ChunkedClassicSTALTA(nsta, nlta)
+        cft = np.concatenate([trig.process(chunk)
+                              for chunk in np.split(self.data, indices)])
+        np.testing.assert_array_equal(cft,
+                                      classicSTALTA(self.data, nsta, nlta))
+        # reset starts a new record
+        trig.reset()
+        np.testing.assert_array_equal(trig.process(self.data), cft)
+        # delayed STA/LTA, compare single pass to chunked processing
+        trig = ChunkedDelayedSTALTA(nsta, nlta)
+        cft = trig.process(self.data)
+        trig.reset()
+        cft2 = np.concatenate([trig.process(chunk)
+                               for chunk in np.split(self.data, indices)])
+        np.testing.assert_array_equal(cft, cft2)
+        self.assertTrue(np.all(cft[:nsta + nlta + 50] == 0))
+        # invalid window lengths
+        self.assertRaises(ValueError, ChunkedClassicSTALTA, 10, 5)
+        self.assertRaises(ValueError, ChunkedRecSTALTA, 0, 5)
+
+    def test_STALTA2D(self):
+        """
+        Multi-channel characteristic functions have to be identical to the
+        single channel versions, regardless of the number of threads.
+        """
+        nsta, nlta = 5, 10
+        data = self.data.reshape((10, -1))
+        for func2d, func in ((recSTALTA2D, recSTALTA),
+                             (classicSTALTA2D, classicSTALTA)):
+            ref = np.array([func(row, nsta, nlta) for row in data])
+            for threads in (1, 3, 20):
+                cft = func2d(data, nsta, nlta, threads=threads)
+                np.testing.assert_array_equal(cft, ref)
+            self.assertRaises(ValueError, func2d, self.data, nsta, nlta)
+        self.assertRaises(Exception, classicSTALTA2D, data[:, :5], nsta,
+                          nlta, threads=2)
+
 
 def suite():
     return unittest.makeSuite(TriggerTestCase, 'test')
@@ -13,7 +13,9 @@ Various routines related to triggering/picking
 
 Module implementing the Recursive STA/LTA. Two versions, a fast ctypes one and
 a bit slower python one. Furthermore, the classic and delayed STA/LTA, the
-carlSTATrig and the zDetect are implemented.
+carlSTATrig and the zDetect are implemented. Chunked versions of the
+recursive, classic and delayed STA/LTA keep their state between calls and can
+be used to process arbitrarily long records piece by piece.
 Also includes picking routines, routines for evaluation and visualization of
 characteristic functions and a coincidence triggering routine.
 
@@ -31,10 +33,11 @@ from future.builtins import *  # NOQA
 
 import warnings
 import ctypes as C
+import threading
 from collections import deque
 import numpy as np
 from obspy import UTCDateTime
-from obspy.signal.headers import clibsignal, head_stalta_t
+from obspy.signal.headers import clibsignal, head_stalta_t, stalta_state_t
 from obspy.signal.cross_correlation import templatesMaxSimilarity
 
 
@@ -196,6 +199,118 @@ def classicSTALTA(a, nsta, nlta):
     return charfct
 
 
+def _runOnRowBlocks(func, nrows, threads):
+    """
+    Call ``func(start, stop)`` on blocks of rows, distributed over the given
+    number of threads.
+
+    ctypes releases the GIL during foreign function calls, so the C routines
+    of the individual blocks really run in parallel.
+    """
+    threads = max(1, min(int(threads or 1), nrows))
+    if threads == 1:
+        func(0, nrows)
+        return
+    bounds = np.linspace(0, nrows, threads + 1).astype(np.int64)
+    errors = []
+
+    def _target(start, stop):
+        try:
+            func(start, stop)
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=_target, args=(int(start), int(stop)))
+               for start, stop in zip(bounds[:-1], bounds[1:])]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+def recSTALTA2D(a, nsta, nlta, threads=1):
+    """
+    Recursive STA/LTA of multiple channels of equal length.
+
+    Fast version written in C computing the characteristic functions of all
+    channels with a single library call per thread. The result of each row
+    is identical to :func:`~obspy.signal.trigger.recSTALTA` applied to the
+    respective channel.
+
+    :type a: :class:`numpy.ndarray`, dtype=float64
+    :param a: Seismic traces, 2-D array of shape ``(nchannels, npts)``
+    :type nsta: int
+    :param nsta: Length of short time average window in samples
+    :type nlta: int
+    :param nlta: Length of long time average window in samples
+    :type threads: int
+    :param threads: Number of threads the channels are distributed over.
+    :rtype: :class:`numpy.ndarray`, dtype=float64
+    :return: Characteristic functions of recursive STA/LTA, same shape as
+        ``a``
+    """
+    # be nice and adapt type if necessary
+    a = np.ascontiguousarray(a, np.float64)
+    if a.ndim != 2:
+        msg = "Data has to be a 2-D array of shape (nchannels, npts)."
+        raise ValueError(msg)
+    nchan, ndat = a.shape
+    charfct = np.empty_like(a)
+
+    def _recstalta(start, stop):
+        clibsignal.recstalta_2d(a[start:stop], charfct[start:stop],
+                                stop - start, ndat, nsta, nlta)
+
+    _runOnRowBlocks(_recstalta, nchan, threads)
+    return charfct
+
+
+def classicSTALTA2D(a, nsta, nlta, threads=1):
+    """
+    Classic STA/LTA of multiple channels of equal length.
+
+    Fast version written in C computing the characteristic functions of all
+    channels with a single library call per thread. The result of each row
+    is identical to :func:`~obspy.signal.trigger.classicSTALTA` applied to
+    the respective channel.
+
+    :type a: :class:`numpy.ndarray`
+    :param a: Seismic traces, 2-D array of shape ``(nchannels, npts)``
+    :type nsta: int
+    :param nsta: Length of short time average window in samples
+    :type nlta: int
+    :param nlta: Length of long time average window in samples
+    :type threads: int
+    :param threads: Number of threads the channels are distributed over.
+    :rtype: :class:`numpy.ndarray`
+    :return: Characteristic functions of classic STA/LTA, same shape as
+        ``a``
+    """
+    # ensure correct type and contiguous of data
+    data = np.ascontiguousarray(a, dtype=np.float64)
+    if data.ndim != 2:
+        msg = "Data has to be a 2-D array of shape (nchannels, npts)."
+        raise ValueError(msg)
+    nchan, ndat = data.shape
+    # initialize C struct / NumPy structured array
+    head = np.empty(1, dtype=head_stalta_t)
+    head[:] = (ndat, nsta, nlta)
+    # all memory should be allocated by python
+    charfct = np.empty_like(data)
+
+    def _stalta(start, stop):
+        # run and check the error-code
+        errcode = clibsignal.stalta_2d(head, stop - start, data[start:stop],
+                                       charfct[start:stop])
+        if errcode != 0:
+            raise Exception('ERROR %d stalta: len(data) < nlta' % errcode)
+
+    _runOnRowBlocks(_stalta, nchan, threads)
+    return charfct
+
+
 def classicSTALTAPy(a, nsta, nlta):
     """
     Computes the standard STA/LTA from a given input array a. The length of
@@ -295,6 +410,140 @@ def zDetect(a, nsta):
     return Z
 
 
+class _ChunkedSTALTA(object):
+    """
+    Base class for STA/LTA triggers that keep their state between calls.
+    """
+    def __init__(self, nsta, nlta):
+        self.nsta = int(nsta)
+        self.nlta = int(nlta)
+        if self.nsta < 1 or self.nlta < 1:
+            msg = "nsta and nlta have to be positive integers."
+            raise ValueError(msg)
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the state, i.e. the next chunk is treated as start of a new
+        record.
+        """
+        # all memory should be allocated by python
+        self.state = np.zeros(1, dtype=stalta_state_t)
+
+    @property
+    def samples_processed(self):
+        """
+        Number of samples processed since the last reset.
+        """
+        return int(self.state['n'][0])
+
+    def process(self, a):
+        """
+        Compute the characteristic function for the next chunk of data.
+
+        :type a: NumPy :class:`~numpy.ndarray`
+        :param a: Next chunk of the seismic trace, directly following the
+            previously processed chunk.
+        :rtype: NumPy :class:`~numpy.ndarray`
+        :return: Characteristic function for the samples of the chunk.
+        """
+        a = np.ascontiguousarray(a, np.float64)
+        charfct = np.empty(len(a), dtype=np.float64)
+        self._process(a, charfct)
+        return charfct
+
+
+class ChunkedRecSTALTA(_ChunkedSTALTA):
+    """
+    Recursive STA/LTA processing a record in consecutive chunks.
+
+    Fast version written in C. The concatenated output of
+    :meth:`~ChunkedRecSTALTA.process` is identical to the output of
+    :func:`~obspy.signal.trigger.recSTALTA` on the whole record (for records
+    longer than ``nlta``).
+
+    :type nsta: int
+    :param nsta: Length of short time average window in samples
+    :type nlta: int
+    :param nlta: Length of long time average window in samples
+
+    .. rubric:: Example
+
+    >>> import numpy as np
+    >>> np.random.seed(815)
+    >>> data = np.random.randn(1000)
+    >>> trig = ChunkedRecSTALTA(5, 10)
+    >>> cft = np.concatenate([trig.process(chunk)
+    ...                       for chunk in np.split(data, 4)])
+    >>> np.array_equal(cft, recSTALTA(data, 5, 10))
+    True
+    """
+    def _process(self, a, charfct):
+        clibsignal.recstalta_chunk(a, charfct, len(a), self.nsta, self.nlta,
+                                   self.state)
+
+
+class ChunkedClassicSTALTA(_ChunkedSTALTA):
+    """
+    Classic STA/LTA processing a record in consecutive chunks.
+
+    Fast version written in C. The concatenated output of
+    :meth:`~ChunkedClassicSTALTA.process` is identical to the output of
+    :func:`~obspy.signal.trigger.classicSTALTA` on the whole record.
+
+    :type nsta: int
+    :param nsta: Length of short time average window in samples
+    :type nlta: int
+    :param nlta: Length of long time average window in samples
+    """
+    def __init__(self, nsta, nlta):
+        if nlta < nsta:
+            msg = "nlta has to be greater or equal to nsta."
+            raise ValueError(msg)
+        super(ChunkedClassicSTALTA, self).__init__(nsta, nlta)
+
+    def reset(self):
+        super(ChunkedClassicSTALTA, self).reset()
+        # squared samples of the last LTA window
+        self._buffer = np.zeros(self.nlta, dtype=np.float64)
+
+    def _process(self, a, charfct):
+        head = np.empty(1, dtype=head_stalta_t)
+        head[:] = (len(a), self.nsta, self.nlta)
+        errcode = clibsignal.stalta_chunk(head, self.state, self._buffer, a,
+                                          charfct)
+        if errcode != 0:
+            raise Exception('ERROR %d stalta_chunk' % errcode)
+
+
+class ChunkedDelayedSTALTA(_ChunkedSTALTA):
+    """
+    Delayed STA/LTA processing a record in consecutive chunks.
+
+    Fast version written in C. Samples before the start of the record are
+    treated as zero, so the result is independent of how the record is split
+    into chunks. Like :func:`~obspy.signal.trigger.delayedSTALTA` the first
+    ``nsta + nlta + 50`` samples are muted.
+
+    :type nsta: int
+    :param nsta: Length of short time average window in samples
+    :type nlta: int
+    :param nlta: Length of long time average window in samples
+    """
+    def reset(self):
+        super(ChunkedDelayedSTALTA, self).reset()
+        # squared samples of the last STA and LTA windows
+        self._buffer = np.zeros(self.nsta + self.nlta + 1, dtype=np.float64)
+
+    def _process(self, a, charfct):
+        head = np.empty(1, dtype=head_stalta_t)
+        head[:] = (len(a), self.nsta, self.nlta)
+        errcode = clibsignal.delayed_stalta_chunk(head, self.state,
+                                                  self._buffer, a, charfct)
+        if errcode != 0:
+            raise Exception('ERROR %d delayed_stalta_chunk' % errcode)
+
+
 def triggerOnset(charfct, thres1, thres2, max_len=9e99, max_len_delete=False):
     """
     Calculate trigger on and off times.
@@ -614,18 +863,20 @@ def coincidenceTrigger(trigger_type, thr_on, thr_off, stream,
         similarity_threshold = dict.fromkeys([tr.stats.station for tr in st],
                                              similarity_threshold)
 
-    # the single station triggering
-    triggers = []
-    # prepare kwargs for triggerOnset
-    kwargs = {'max_len_delete': delete_long_trigger}
     for tr in st:
         if tr.id not in trace_ids:
             msg = "At least one trace's ID was not found in the " + \
                   "trace ID list and was disregarded (%s)" % tr.id
             warnings.warn(msg, UserWarning)
-            continue
-        if trigger_type is not None:
-            tr.trigger(trigger_type, **options)
+    st.traces = [tr for tr in st if tr.id in trace_ids]
+    # the single station triggering, done by the stream so that equal length
+    # traces are processed in one go where possible
+    if trigger_type is not None:
+        st.trigger(trigger_type, **options)
+    triggers = []
+    # prepare kwargs for triggerOnset
+    kwargs = {'max_len_delete': delete_long_trigger}
+    for tr in st:
         kwargs['max_len'] = int(max_trigger_length * tr.stats.sampling_rate
                                 + 0.5)
         tmp_triggers = triggerOnset(tr.data, thr_on, thr_off, **kwargs)
@@ -293,6 +293,39 @@ def _npts2nfft(npts, smart=True):
     return nfft
 
 
+def _next_fast_len(n):
+    """
+    Returns the smallest number not smaller than n that only has prime
+    factors 2, 3 and 5, i.e. a length for which FFTs are fast.
+
+    >>> _next_fast_len(1000)
+    1000
+    >>> _next_fast_len(1009)
+    1024
+    >>> _next_fast_len(1801)
+    1875
+    """
+    n = int(n)
+    if n <= 6:
+        return max(n, 1)
+    best = nextpow2(n)
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            # smallest power of two that brings p35 up to at least n
+            candidate = p35
+            while candidate < n:
+                candidate *= 2
+            if candidate < best:
+                best = candidate
+            if candidate == n:
+                return n
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
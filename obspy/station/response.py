@@ -743,7 +743,7 @@ class Response(ComparingObject):
         :returns: frequency response and corresponding frequencies
         """
         import obspy.signal.evrespwrapper as ew
-        from obspy.signal.headers import clibevresp
+        from obspy.signal.headers import clibevresp, clibevresp_lock
 
         out_units = output.upper()
         if out_units not in ("DISP", "VEL", "ACC"):
@@ -1058,34 +1058,37 @@ class Response(ComparingObject):
         output = np.empty(len(freqs), dtype=np.complex128)
         out_units = C.c_char_p(out_units.encode('ascii', 'strict'))
 
-        # Set global variables
-        if self.resource_id:
-            clibevresp.curr_file.value = self.resource_id.encode('utf-8')
-        else:
-            clibevresp.curr_file.value = None
-
-        try:
-            rc = clibevresp._obspy_check_channel(C.byref(chan))
-            if rc:
-                e, m = ew.ENUM_ERROR_CODES[rc]
-                raise e('check_channel: ' + m)
-
-            rc = clibevresp._obspy_norm_resp(C.byref(chan), -1, 0)
-            if rc:
-                e, m = ew.ENUM_ERROR_CODES[rc]
-                raise e('norm_resp: ' + m)
-
-            rc = clibevresp._obspy_calc_resp(C.byref(chan), freqs, len(freqs),
-                                             output, out_units, -1, 0, 0)
-            if rc:
-                e, m = ew.ENUM_ERROR_CODES[rc]
-                raise e('calc_resp: ' + m)
-
-            # XXX: Check if this is really not needed.
-            # output *= scale_factor[0]
-
-        finally:
-            clibevresp.curr_file.value = None
+        # evalresp keeps its state in global variables
+        with clibevresp_lock:
+            # Set global variables
+            if self.resource_id:
+                clibevresp.curr_file.value = self.resource_id.encode('utf-8')
+            else:
+                clibevresp.curr_file.value = None
+
+            try:
+                rc = clibevresp._obspy_check_channel(C.byref(chan))
+                if rc:
+                    e, m = ew.ENUM_ERROR_CODES[rc]
+                    raise e('check_channel: ' + m)
+
+                rc = clibevresp._obspy_norm_resp(C.byref(chan), -1, 0)
+                if rc:
+                    e, m = ew.ENUM_ERROR_CODES[rc]
+                    raise e('norm_resp: ' + m)
+
+                rc = clibevresp._obspy_calc_resp(C.byref(chan), freqs,
+                                                 len(freqs), output,
+                                                 out_units, -1, 0, 0)
+                if rc:
+                    e, m = ew.ENUM_ERROR_CODES[rc]
+                    raise e('calc_resp: ' + m)
+
+                # XXX: Check if this is really not needed.
+                # output *= scale_factor[0]
+
+            finally:
+                clibevresp.curr_file.value = None
 
         return output, freqs
 
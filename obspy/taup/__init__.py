@@ -18,7 +18,8 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 # Convenience imports.
-from obspy.taup.taup import getTravelTimes, travelTimePlot
+from obspy.taup.taup import getTravelTimes, getTravelTimesArray, \
+    travelTimePlot
 
 if __name__ == '__main__':
     import doctest
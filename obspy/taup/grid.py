@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed travel time grids for fast repeated travel time queries.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    Unknown
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+from obspy.taup.taup import getTravelTimesArray
+
+
+# Default directory for cached travel time grids.
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.obspy', 'taup')
+
+
+def _computeRow(args):
+    """
+    Travel times of all phases for one depth, used by the worker processes.
+    """
+    distances, depth, model = args
+    return getTravelTimesArray(distances, depth, model=model)
+
+
+class TravelTimeGrid(object):
+    """
+    Travel times of all phases on a regular distance/depth grid.
+
+    The grid is computed once per model and grid spacing with
+    :func:`~obspy.taup.taup.getTravelTimesArray` and stored as compressed
+    NumPy file in ``cache_dir``. Later instances with the same parameters
+    load the file. Travel times are bilinearly interpolated from the grid.
+
+    To control the accuracy the exact travel times at the centers of all
+    grid cells are computed as well. Queries falling into a cell whose
+    interpolated center value deviates by more than ``tolerance`` from the
+    exact one (e.g. cells containing the end of a branch or a triplication)
+    or cells in which a phase starts or ends are answered with the exact
+    routine instead. The tolerance is hence not guaranteed everywhere but
+    holds for all but very few queries.
+
+    :type model: str, optional
+    :param model: Either ``'iasp91'`` or ``'ak135'`` velocity model.
+    :type distance_step: float, optional
+    :param distance_step: Grid spacing in degrees between 0 and 180 degrees.
+        Adjusted slightly if 180 is not a multiple of it.
+    :type depth_step: float, optional
+    :param depth_step: Grid spacing in kilometer. Adjusted slightly if
+        ``max_depth`` is not a multiple of it.
+    :type max_depth: float, optional
+    :param max_depth: Maximum source depth of the grid in kilometer, at most
+        800 km.
+    :type tolerance: float, optional
+    :param tolerance: Maximum difference in seconds between interpolated and
+        exact travel times at cell centers for a cell to be interpolated.
+        ``None`` disables the check, all queries are interpolated.
+    :type cache_dir: str, optional
+    :param cache_dir: Directory for the grid files. Defaults to
+        ``~/.obspy/taup``.
+    :type processes: int, optional
+    :param processes: Number of processes used to compute a grid that is not
+        cached yet. Defaults to the number of CPUs. On Windows the calling
+        script needs an ``if __name__ == '__main__':`` guard to use more than
+        one process.
+
+    .. rubric:: Example
+
+    >>> from obspy.taup.grid import TravelTimeGrid
+    >>> grid = TravelTimeGrid(model='ak135')  # doctest: +SKIP
+    >>> tt = grid.getTravelTimes([52.474, 150.0], 611.0,
+    ...                          phases=['P', 'PP'])  # doctest: +SKIP
+    >>> print(round(tt['P'][0], 1))  # doctest: +SKIP
+    497.5
+    """
+    def __init__(self, model='iasp91', distance_step=0.5, depth_step=10.0,
+                 max_depth=800.0, tolerance=0.1, cache_dir=None,
+                 processes=None):
+        if not 0 < max_depth <= 800.0:
+            msg = "max_depth has to be between 0 and 800 km."
+            raise ValueError(msg)
+        self.model = model
+        self.tolerance = tolerance
+        self.distances = np.linspace(
+            0.0, 180.0, int(round(180.0 / distance_step)) + 1)
+        self.depths = np.linspace(
+            0.0, max_depth, max(int(round(max_depth / depth_step)), 1) + 1)
+        if cache_dir is None:
+            cache_dir = DEFAULT_CACHE_DIR
+        filename = os.path.join(cache_dir, 'grid_%s_%d_%d_%g.npz' % (
+            model, len(self.distances), len(self.depths), max_depth))
+        if os.path.exists(filename):
+            self._load(filename)
+        else:
+            self._compute(processes)
+            self._save(filename)
+        self._setMask()
+
+    def _compute(self, processes):
+        """
+        Computes the grid and the cell centers, in parallel processes.
+        """
+        center_distances = (self.distances[:-1] + self.distances[1:]) / 2.0
+        center_depths = (self.depths[:-1] + self.depths[1:]) / 2.0
+        jobs = [(self.distances, depth, self.model) for depth in self.depths]
+        jobs += [(center_distances, depth, self.model)
+                 for depth in center_depths]
+        if processes == 1:
+            rows = [_computeRow(job) for job in jobs]
+        else:
+            pool = multiprocessing.Pool(processes)
+            try:
+                rows = pool.map(_computeRow, jobs)
+            finally:
+                pool.close()
+                pool.join()
+        self.phases = sorted(set(phase for row in rows for phase in row))
+
+        def _stack(rows, ndist):
+            times = np.empty((len(self.phases), len(rows), ndist),
+                             dtype=np.float32)
+            times.fill(np.NaN)
+            for _i, row in enumerate(rows):
+                for _k, phase in enumerate(self.phases):
+                    if phase in row:
+                        times[_k, _i] = row[phase]
+            return times
+
+        self.times = _stack(rows[:len(self.depths)], len(self.distances))
+        self._center_times = _stack(rows[len(self.depths):],
+                                    len(center_distances))
+
+    def _save(self, filename):
+        """
+        Writes the grid to disk. The file is moved into place in the end so
+        concurrent readers never see a partial file.
+        """
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            try:
+                os.makedirs(dirname)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(dirname):
+                    raise
+        fd, tempname = tempfile.mkstemp(dir=dirname, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                np.savez_compressed(
+                    fh, phases=np.array(self.phases), times=self.times,
+                    center_times=self._center_times,
+                    distances=self.distances, depths=self.depths)
+            if os.path.exists(filename):
+                # os.rename does not replace existing files on Windows
+                os.remove(tempname)
+            else:
+                os.rename(tempname, filename)
+        except:
+            if os.path.exists(tempname):
+                os.remove(tempname)
+            raise
+
+    def _load(self, filename):
+        """
+        Reads a grid written by :meth:`_save`.
+        """
+        data = np.load(filename)
+        try:
+            self.phases = [str(phase) for phase in data['phases']]
+            self.times = data['times']
+            self._center_times = data['center_times']
+            self.distances = data['distances']
+            self.depths = data['depths']
+        finally:
+            data.close()
+
+    def _setMask(self):
+        """
+        Flags the cells which can not be interpolated within the tolerance.
+        """
+        if self.tolerance is None:
+            self._inexact = None
+            return
+        times = self.times
+        corners = [times[:, :-1, :-1], times[:, :-1, 1:], times[:, 1:, :-1],
+                   times[:, 1:, 1:]]
+        interpolated = sum(corners) / 4.0
+        exact = self._center_times
+        with np.errstate(invalid='ignore'):
+            ok = np.abs(interpolated - exact) <= self.tolerance
+        # cells in which a branch ends are never interpolated
+        nans = sum(np.isnan(corner).astype(np.int8) for corner in corners)
+        ok |= (nans == 4) & np.isnan(exact)
+        self._inexact = ~ok
+
+    def getTravelTimes(self, distances, depths, phases=None):
+        """
+        Returns interpolated travel times of many pairs of distance and
+        source depth.
+
+        Same interface and return value as
+        :func:`~obspy.taup.taup.getTravelTimesArray`.
+
+        :type distances: float or array-like
+        :param distances: Distances in degrees.
+        :type depths: float or array-like
+        :param depths: Depths in kilometer, at most the maximum depth of the
+            grid.
+        :type phases: list of str, optional
+        :param phases: Phase names to return. Defaults to all phases of the
+            grid.
+        :rtype: dict
+        :return: Dictionary mapping phase names to arrays of travel times in
+            seconds. ``NaN`` where the phase does not arrive.
+        """
+        distances, depths = np.broadcast_arrays(np.asarray(distances),
+                                                np.asarray(depths))
+        shape = distances.shape
+        dist = np.abs(distances.ravel().astype(np.float64)) % 360.0
+        dist = np.where(dist > 180.0, 360.0 - dist, dist)
+        depth = np.abs(depths.ravel().astype(np.float64))
+        if len(depth) and depth.max() > self.depths[-1]:
+            msg = "Source depth of %.2f km is deeper than the grid."
+            raise ValueError(msg % depth.max())
+        if phases is None:
+            phases = self.phases
+        # cell indices and weights
+        pos = dist / (self.distances[1] - self.distances[0])
+        i = np.minimum(pos.astype(np.int64), len(self.distances) - 2)
+        wx = pos - i
+        pos = depth / (self.depths[1] - self.depths[0])
+        j = np.minimum(pos.astype(np.int64), len(self.depths) - 2)
+        wz = pos - j
+
+        result = {}
+        exact = np.zeros(len(dist), dtype=np.bool_)
+        for phase in phases:
+            if phase not in self.phases:
+                times = np.empty(len(dist), dtype=np.float64)
+                times.fill(np.NaN)
+                result[phase] = times
+                continue
+            k = self.phases.index(phase)
+            t = self.times[k]
+            result[phase] = (
+                (1.0 - wz) * ((1.0 - wx) * t[j, i] + wx * t[j, i + 1]) +
+                wz * ((1.0 - wx) * t[j + 1, i] + wx * t[j + 1, i + 1]))
+            if self._inexact is not None:
+                exact |= self._inexact[k][j, i]
+        if exact.any():
+            exact_times = getTravelTimesArray(dist[exact], depth[exact],
+                                              phases=phases, model=self.model)
+            for phase in phases:
+                result[phase][exact] = exact_times[phase]
+        for phase in phases:
+            result[phase] = result[phase].reshape(shape)
+        return result
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -70,3 +70,58 @@ C
         end do
       endif
       end
+      subroutine ttimes_array(ndelta, deltas, zs, modnam, nphase, phcd,
+     1                        tt, toang, dtdd, dtdh, dddp)
+C
+C     Travel times for many distances and one source depth. The model
+C     tables are read and the depth correction is done only once for all
+C     distances.
+C
+C     Added by the obspy dev team: devs@obspy.org
+C
+      save
+      parameter (max=60)
+      logical prnt(3)
+      character*8 phcd(max,ndelta),phlst(10)
+      character*500 modnam
+      integer ndelta,nphase(ndelta)
+      dimension deltas(ndelta)
+      dimension tt(max,ndelta),toang(max,ndelta),dtdd(max,ndelta),
+     1          dtdh(max,ndelta),dddp(max,ndelta)
+      dimension usrc(2)
+      data in/1/,phlst(1)/'query'/,prnt(3)/.true./
+      data rzero/6371.0/
+
+      rd = 45.0/atan(1.0)
+      prnt(1) = .false.
+      prnt(2) = .false.
+      call tabin(in,modnam)
+      call brnset(1,phlst,prnt)
+
+      if (zs.ge.0.) then
+        call depset(zs,usrc)
+        etafocp = 0.0
+        etafocs = 0.0
+        if (usrc(1) .gt. 0.0) then
+          vpfoc = ((rzero-zs)/rzero)/usrc(1)
+          etafocp = (rzero-zs)/(vpfoc*rd)
+        end if
+        if (usrc(2) .gt. 0.0) then
+          vsfoc = ((rzero-zs)/rzero)/usrc(2)
+          etafocs = (rzero-zs)/(vsfoc*rd)
+        end if
+        do i=1,ndelta
+          call trtm(deltas(i),max,n,tt(1,i),dtdd(1,i),dtdh(1,i),
+     1              dddp(1,i),phcd(1,i))
+          nphase(i) = n
+          do j=1,n
+            if (phcd(j,i)(1:1).eq.'P' .or. phcd(j,i)(1:1).eq.'p') then
+              toang(j,i) = rd*asin(abs(dtdd(j,i))/etafocp)
+            else
+              toang(j,i) = rd*asin(abs(dtdd(j,i))/etafocs)
+            end if
+            if (dtdh(j,i) .gt. 0.0) toang(j,i) = 180.-toang(j,i)
+          end do
+        end do
+      endif
+      end
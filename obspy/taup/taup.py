@@ -5,6 +5,7 @@ obspy.taup - Travel time calculation tool
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import inspect
 import numpy as np
@@ -19,8 +20,9 @@ lib_name = _get_lib_name('tau', add_extension_suffix=False)
 try:
     # Linux / Mac using python import
     libtau = __import__('obspy.lib.' + lib_name, globals(), locals(),
-                        ['ttimes'])
+                        ['ttimes', 'ttimes_array'])
     ttimes = libtau.ttimes
+    ttimes_array = libtau.ttimes_array
 except ImportError:
     # Windows using ctypes
     if platform.system() == "Windows":
@@ -48,6 +50,27 @@ except ImportError:
                            dddp.ctypes.data_as(C.POINTER(C.c_float)))
             phase_names = np.array([p.value for p in phase_names])
             return phase_names, tt, toang, dtdd, dtdh, dddp
+
+        def ttimes_array(deltas, depth, modnam):
+            deltas = np.require(deltas, 'float32', ['F_CONTIGUOUS'])
+            ndelta = C.c_int(len(deltas))
+            depth = C.c_float(abs(depth))
+            # initialize some arrays...
+            phase_names = (C.c_char * 8 * 60 * len(deltas))()
+            flags = ['F_CONTIGUOUS', 'ALIGNED', 'WRITEABLE']
+            nphase = np.zeros(len(deltas), 'int32', flags)
+            arrays = [np.zeros((60, len(deltas)), 'float32', flags)
+                      for _i in range(5)]
+
+            libtau.ttimes_array_(
+                C.byref(ndelta),
+                deltas.ctypes.data_as(C.POINTER(C.c_float)),
+                C.byref(depth), modnam.encode('ascii'),
+                nphase.ctypes.data_as(C.POINTER(C.c_int)), phase_names,
+                *[a.ctypes.data_as(C.POINTER(C.c_float)) for a in arrays])
+            phase_names = np.frombuffer(phase_names, dtype='S1').reshape(
+                (len(deltas), 60, 8))
+            return [nphase, phase_names] + arrays
     else:
         raise
 
@@ -67,6 +90,62 @@ AVAILABLE_PHASES = [
     'pSdiff', 'sP', 'sPKPab', 'sPKPbc', 'sPKPdf', 'sPKPdiff', 'sPKiKP', 'sPb',
     'sPdiff', 'sPg', 'sPn', 'sS', 'sSKSac', 'sSKSdf', 'sSdiff', 'sSn']
 
+# Model names mapped to the 500 character strings passed to libtau.
+_MODEL_PATHS = {}
+
+
+def _getModelPath(model):
+    """
+    Returns the model path padded for libtau, raises if the model tables do
+    not exist. The check is done only once per model.
+    """
+    try:
+        return _MODEL_PATHS[model]
+    except KeyError:
+        pass
+    model_path = os.path.join(_taup_dir, 'tables', model)
+    if not os.path.exists(model_path + os.path.extsep + 'hed') or \
+       not os.path.exists(model_path + os.path.extsep + 'tbl'):
+        msg = 'Model %s not found' % model
+        raise ValueError(msg)
+    # modnam is a string with 500 chars.
+    _MODEL_PATHS[model] = model_path.ljust(500)
+    return _MODEL_PATHS[model]
+
+
+def _getTravelTimesArray(deltas, depths, model):
+    """
+    Calls libtau for every pair of distance and depth. The pairs are grouped
+    by depth so the model tables are read only once per depth.
+
+    Returns the number of phases of every pair, the phase names (as array of
+    byte strings with shape (len(deltas), 60)) and the travel times (with
+    shape (60, len(deltas))).
+    """
+    deltas = np.asarray(deltas, dtype=np.float32)
+    depths = np.abs(np.asarray(depths, dtype=np.float32))
+    # Raise an error, otherwise libtau sends an EXIT signal. Depends on the
+    # model but 800 km works for the included models.
+    if len(depths) and depths.max() > 800.00:
+        raise ValueError("Source depth of %.2f km is too deep." %
+                         depths.max())
+    modnam = _getModelPath(model)
+    nphase = np.zeros(len(deltas), dtype=np.int32)
+    phase_names = np.zeros((len(deltas), 60), dtype=native_str('S8'))
+    tt = np.zeros((60, len(deltas)), dtype=np.float32)
+    unique_depths, inverse = np.unique(depths, return_inverse=True)
+    order = np.argsort(inverse, kind='mergesort')
+    bounds = np.searchsorted(inverse[order],
+                             np.arange(len(unique_depths) + 1))
+    for _i, depth in enumerate(unique_depths):
+        idx = order[bounds[_i]:bounds[_i + 1]]
+        result = ttimes_array(deltas[idx], depth, modnam)
+        nphase[idx] = result[0]
+        phase_names[idx] = np.ascontiguousarray(result[1]).view(
+            native_str('S8'))[:, :, 0]
+        tt[:, idx] = result[2]
+    return nphase, np.char.strip(phase_names), tt
+
 
 def getTravelTimes(delta, depth, model='iasp91'):
     """
@@ -102,18 +181,11 @@ def getTravelTimes(delta, depth, model='iasp91'):
     # model but 800 km works for the included models.
     if depth > 800.00:
         raise ValueError("Source depth of %.2f km is too deep." % depth)
-    model_path = os.path.join(_taup_dir, 'tables', model)
-    if not os.path.exists(model_path + os.path.extsep + 'hed') or \
-       not os.path.exists(model_path + os.path.extsep + 'tbl'):
-        msg = 'Model %s not found' % model
-        raise ValueError(msg)
+    modnam = _getModelPath(model)
 
     # Depth in kilometer.
     depth = abs(depth)
 
-    # modnam is a string with 500 chars.
-    modnam = os.path.join(_taup_dir, 'tables', model).ljust(500)
-
     phase_names, tt, toang, dtdd, dtdh, dddp = ttimes(delta, depth, modnam)
 
     phases = []
@@ -134,6 +206,67 @@ def getTravelTimes(delta, depth, model='iasp91'):
     return phases
 
 
+def getTravelTimesArray(distances, depths, phases=None, model='iasp91'):
+    """
+    Returns the travel times of many pairs of distance and source depth.
+
+    Uses the same library as :func:`getTravelTimes` but evaluates all pairs
+    at once. Pairs sharing a source depth are computed together, the model
+    tables are read only once for them.
+
+    :type distances: float or array-like
+    :param distances: Distances in degrees.
+    :type depths: float or array-like
+    :param depths: Depths in kilometer. ``distances`` and ``depths`` are
+        broadcast against each other, e.g. pass distances with shape
+        ``(nevents, nstations)`` and depths with shape ``(nevents, 1)``.
+    :type phases: list of str, optional
+    :param phases: Phase names to return. Defaults to all phases arriving
+        at any of the pairs.
+    :type model: str, optional
+    :param model: Either ``'iasp91'`` or ``'ak135'`` velocity model. Defaults
+        to ``'iasp91'``.
+    :rtype: dict
+    :return: Dictionary mapping phase names to arrays of travel times in
+        seconds, shaped like the broadcast distances and depths. Pairs
+        without an arrival of the phase are set to ``NaN``. If a phase has
+        several arrivals (e.g. triplications) the first one is used.
+
+    .. rubric:: Example
+
+    >>> from obspy.taup.taup import getTravelTimesArray
+    >>> tt = getTravelTimesArray([52.474, 150.0], 611.0, phases=['P', 'PP'],
+    ...                          model='ak135')
+    >>> tt['P'].shape
+    (2,)
+    >>> print(round(tt['P'][0], 2))
+    497.54
+    >>> np.isnan(tt['P'][1])
+    True
+    >>> print(round(tt['PP'][1], 2))
+    1343.62
+    """
+    distances, depths = np.broadcast_arrays(np.asarray(distances),
+                                            np.asarray(depths))
+    shape = distances.shape
+    nphase, phase_names, tt = _getTravelTimesArray(
+        distances.ravel(), depths.ravel(), model)
+    if phases is None:
+        phases = sorted(set(
+            name.decode() for names, n in zip(phase_names, nphase)
+            for name in names[:n]))
+    result = {}
+    for phase in phases:
+        # phases are given in time order, the first match is the earliest
+        # arrival
+        match = phase_names == phase.encode()
+        first = match.argmax(axis=1)
+        times = tt[first, np.arange(len(first))].astype(np.float64)
+        times[~match.any(axis=1)] = np.NaN
+        result[phase] = times.reshape(shape)
+    return result
+
+
 def travelTimePlot(min_degree=0, max_degree=360, npoints=1000,
                    phases=None, depth=100, model='iasp91'):
     """
@@ -178,22 +311,17 @@ def travelTimePlot(min_degree=0, max_degree=360, npoints=1000,
         data[phase] = [[], []]
 
     degrees = np.linspace(min_degree, max_degree, npoints)
-    # Loop over all degrees.
-    for degree in degrees:
-        tt = getTravelTimes(degree, depth, model)
-        # Mirror if necessary.
-        if degree > 180:
-            degree = 180 - (degree - 180)
-        for item in tt:
-            phase = item['phase_name']
+    nphase, phase_names, tt = _getTravelTimesArray(
+        degrees, np.repeat(depth, npoints), model)
+    # Mirror if necessary.
+    degrees = np.where(degrees > 180, 360 - degrees, degrees)
+    for _i, degree in enumerate(degrees):
+        for _j in range(nphase[_i]):
+            phase = phase_names[_i, _j].decode()
             # Check if this phase should be plotted.
             if phase in data:
-                try:
-                    data[phase][1].append(item['time'] / 60.0)
-                    data[phase][0].append(degree)
-                except:
-                    data[phase][1].append(np.NaN)
-                    data[phase][0].append(degree)
+                data[phase][1].append(tt[_j, _i] / 60.0)
+                data[phase][0].append(degree)
     # Plot and some formatting.
     for key, value in data.items():
         plt.plot(value[0], value[1], '.', label=key)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.taup.grid test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from obspy.taup.grid import TravelTimeGrid
+from obspy.taup.taup import getTravelTimesArray
+
+
+class TravelTimeGridTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.taup.grid.
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='obspy-')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_cache(self):
+        """
+        Grids are computed once and loaded from the cache directory later.
+        """
+        kwargs = {'distance_step': 10.0, 'depth_step': 100.0,
+                  'max_depth': 200.0, 'cache_dir': self.tempdir}
+        grid = TravelTimeGrid(processes=2, **kwargs)
+        self.assertEqual(len(os.listdir(self.tempdir)), 1)
+        self.assertEqual(grid.times.shape,
+                         (len(grid.phases), 3, 19))
+        cached = TravelTimeGrid(processes=1, **kwargs)
+        self.assertEqual(cached.phases, grid.phases)
+        np.testing.assert_array_equal(cached.times, grid.times)
+        # different spacing, new file
+        TravelTimeGrid(processes=1, distance_step=20.0, depth_step=100.0,
+                       max_depth=200.0, cache_dir=self.tempdir)
+        self.assertEqual(len(os.listdir(self.tempdir)), 2)
+        self.assertRaises(ValueError, TravelTimeGrid, max_depth=801.0,
+                          cache_dir=self.tempdir)
+
+    def test_getTravelTimes(self):
+        """
+        Interpolated travel times agree with the exact ones.
+        """
+        grid = TravelTimeGrid(distance_step=2.0, depth_step=50.0,
+                              max_depth=300.0, tolerance=0.5,
+                              cache_dir=self.tempdir, processes=1)
+        np.random.seed(815)
+        distances = np.random.uniform(0, 180, (20, 10))
+        depths = np.random.uniform(0, 300, (20, 1))
+        phases = ['P', 'S', 'PKPdf', 'PP', 'Pdiff', 'unknown']
+        result = grid.getTravelTimes(distances, depths, phases=phases)
+        expected = getTravelTimesArray(distances, depths, phases=phases)
+        self.assertEqual(sorted(result.keys()), sorted(phases))
+        for phase in phases[:-1]:
+            self.assertEqual(result[phase].shape, distances.shape)
+            np.testing.assert_array_equal(np.isnan(result[phase]),
+                                          np.isnan(expected[phase]))
+            mask = ~np.isnan(expected[phase])
+            error = np.abs(result[phase][mask] - expected[phase][mask])
+            self.assertTrue(np.all(error < 1.0))
+            self.assertTrue(np.mean(error) < 0.1)
+        self.assertEqual(result['unknown'].shape, distances.shape)
+        self.assertTrue(np.all(np.isnan(result['unknown'])))
+        # exact values on grid points, distances beyond 180 degrees
+        result = grid.getTravelTimes([40.0, 320.0], 100.0, phases=['P'])
+        expected = getTravelTimesArray([40.0, 40.0], 100.0, phases=['P'])
+        np.testing.assert_allclose(result['P'], expected['P'], rtol=1e-6)
+        self.assertRaises(ValueError, grid.getTravelTimes, 10.0, 301.0)
+
+
+def suite():
+    return unittest.makeSuite(TravelTimeGridTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
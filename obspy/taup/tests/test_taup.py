@@ -6,7 +6,8 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
-from obspy.taup.taup import getTravelTimes
+from obspy.taup.taup import getTravelTimes, getTravelTimesArray
+import numpy as np
 import os
 import unittest
 
@@ -168,6 +169,34 @@ class TauPTestCase(unittest.TestCase):
         self.assertRaises(ValueError, getTravelTimes, 10, 801,
                           model="ak135")
 
+    def test_getTravelTimesArray(self):
+        """
+        Tests getTravelTimesArray against single calls to getTravelTimes.
+        """
+        distances = np.array([[10.0, 52.474, 150.0], [100.0, 35.0, 175.0]])
+        depths = np.array([[611.0], [0.0]])
+        for model in ('iasp91', 'ak135'):
+            result = getTravelTimesArray(distances, depths, model=model)
+            for (i, j), distance in np.ndenumerate(distances):
+                tt = getTravelTimes(distance, depths[i, 0], model=model)
+                first = {}
+                for item in tt:
+                    first.setdefault(item['phase_name'], item['time'])
+                for phase, times in result.items():
+                    self.assertEqual(times.shape, distances.shape)
+                    if phase in first:
+                        self.assertAlmostEqual(times[i, j], first[phase], 3)
+                    else:
+                        self.assertTrue(np.isnan(times[i, j]))
+        # selected phases, scalar input
+        result = getTravelTimesArray(52.474, 611.0, phases=['P', 'Pdiff'])
+        self.assertEqual(sorted(result.keys()), ['P', 'Pdiff'])
+        self.assertEqual(result['P'].shape, ())
+        self.assertTrue(np.isnan(result['Pdiff']))
+        self.assertRaises(ValueError, getTravelTimesArray, [10, 20], 801)
+        self.assertRaises(ValueError, getTravelTimesArray, 10, 10,
+                          model='unknown')
+
 
 def suite():
     return unittest.makeSuite(TauPTestCase, 'test')